@@ -3,6 +3,11 @@ Diagnostics Package
 
 Provides diagnostic tools for analyzing trading strategy performance:
 - Signal audit: Track gating funnel and rejection reasons
+- Audit store: Bounded-memory array storage for audit records
+- Audit export: Partitioned Parquet dataset for audit records (optional pyarrow)
+- Background writer: Off-thread queue for diagnostics jobs
+- Prediction store: Memory-mapped FreqAI predictions per training window
+- Stage timer: Per-stage, per-pair latency histograms of the strategy hot path
 - Visualization: Interactive notebooks for diagnostic analysis
 
 Author: Strategy Team
@@ -14,11 +19,28 @@ from diagnostics.signal_audit import (
     SignalAuditConfig,
     SignalAuditRecord,
     GatingStats,
+    GATE_STAGES,
 )
+from diagnostics.audit_store import AuditRecordStore
+from diagnostics.audit_export import ParquetAuditExporter, read_audit_dataset
+from diagnostics.background_writer import BackgroundDiagnosticsWriter
+from diagnostics.prediction_store import PredictionStore, PredictionWindow, PREDICTION_COLUMNS
+from diagnostics.stage_timer import LatencyHistogram, StageTimer, timed_stage
 
 __all__ = [
     'SignalAuditLogger',
     'SignalAuditConfig',
     'SignalAuditRecord',
     'GatingStats',
+    'GATE_STAGES',
+    'AuditRecordStore',
+    'ParquetAuditExporter',
+    'read_audit_dataset',
+    'BackgroundDiagnosticsWriter',
+    'PredictionStore',
+    'PredictionWindow',
+    'PREDICTION_COLUMNS',
+    'LatencyHistogram',
+    'StageTimer',
+    'timed_stage',
 ]
@@ -0,0 +1,276 @@
+"""
+Signal Audit Parquet Export
+
+Streams audit rows into an append-only Parquet dataset partitioned by pair
+and date (hive layout: pair=<pair>/date=<YYYY-MM-DD>/part-*.parquet). Rows
+are buffered per partition until they fill a row group. When the rows
+buffered across all partitions pass max_pending_rows, completed days (a
+later date has arrived for their pair) are written whole, oldest first,
+and only if that is not enough are open days written too, so memory stays
+bounded and files appear as records accumulate. Every write produces new
+immutable part files, so the dataset is readable at any time and nothing
+is ever rewritten. Readers project columns and filter by time range or
+pair without loading the whole dataset.
+
+pyarrow is an optional dependency, only needed when Parquet export is used.
+
+Author: Strategy Team
+Version: 1.0.0
+Created: October 2025
+"""
+
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+from urllib.parse import quote
+
+import numpy as np
+import pandas as pd
+
+from diagnostics.audit_store import (
+    AUDIT_DTYPE,
+    AUDIT_VALUE_COLUMNS,
+    GATE_STAGES,
+    AuditRecordStore,
+)
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # Optional dependency
+    pa = ds = pq = None
+
+logger = logging.getLogger(__name__)
+
+
+def _require_pyarrow() -> None:
+    if pa is None:
+        raise ImportError("Parquet audit export requires pyarrow (pip install pyarrow)")
+
+
+def audit_arrow_schema() -> "pa.Schema":
+    """Arrow schema of the audit data files (pair and date are partition keys)"""
+    _require_pyarrow()
+    fields = [('timestamp', pa.timestamp('ns'))]
+    fields += [(gate, pa.bool_()) for gate, _ in GATE_STAGES]
+    for column in AUDIT_VALUE_COLUMNS:
+        if column == 'governance_status':
+            fields.append((column, pa.string()))
+        else:
+            fields.append((column, pa.from_numpy_dtype(AUDIT_DTYPE[column])))
+    fields += [
+        ('enter_long', pa.bool_()),
+        ('enter_short', pa.bool_()),
+        ('rejection_stage', pa.string()),
+    ]
+    return pa.schema(fields)
+
+
+def _partitioning() -> "ds.Partitioning":
+    return ds.partitioning(pa.schema([('pair', pa.string()), ('date', pa.string())]), flavor='hive')
+
+
+class ParquetAuditExporter:
+    """
+    Append-only, partitioned Parquet writer for audit rows.
+    
+    Usage:
+        exporter = ParquetAuditExporter(Path("user_data/diagnostics/audit_parquet"))
+        store.spill_handler = exporter.write_chunk  # Export as chunks fill up
+        ...
+        exporter.flush()  # Write remaining partial row groups
+        
+        df = read_audit_dataset(exporter.root_dir, columns=['timestamp', 'z_score'],
+                                start="2025-10-01", pairs=["BTC/USDT:USDT"])
+    """
+    
+    def __init__(
+        self,
+        root_dir: Path,
+        row_group_size: int = 50_000,
+        session: Optional[str] = None,
+        max_pending_rows: Optional[int] = None,
+    ):
+        """
+        Initialize exporter.
+        
+        Args:
+            root_dir: Dataset root directory
+            row_group_size: Rows per Parquet row group
+            session: Part file prefix (defaults to timestamp and pid)
+            max_pending_rows: Buffered rows (all partitions) above which
+                every partition is written out (defaults to row_group_size)
+        """
+        _require_pyarrow()
+        if row_group_size < 1:
+            raise ValueError("row_group_size must be positive")
+        
+        self.root_dir = Path(root_dir)
+        self.row_group_size = int(row_group_size)
+        self.max_pending_rows = int(max_pending_rows) if max_pending_rows is not None else self.row_group_size
+        if self.max_pending_rows < 1:
+            raise ValueError("max_pending_rows must be positive")
+        self.session = session or f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{os.getpid()}"
+        self.schema = audit_arrow_schema()
+        
+        # Rows waiting for a full row group, per (pair, date) partition
+        self._pending: Dict[Tuple[str, str], List["pa.Table"]] = {}
+        self._pending_rows: Dict[Tuple[str, str], int] = {}
+        
+        self._part = 0
+        self.files: List[Path] = []
+        self.rows_written = 0
+    
+    @property
+    def pending_rows(self) -> int:
+        """Rows buffered but not yet written"""
+        return sum(self._pending_rows.values())
+    
+    def write_chunk(self, rows: np.ndarray, store: AuditRecordStore) -> None:
+        """
+        Buffer a chunk of store rows and write all full row groups.
+        
+        Signature matches AuditRecordStore.spill_handler.
+        
+        Args:
+            rows: Structured rows (AUDIT_DTYPE)
+            store: Store owning the categorical ids of the rows
+        """
+        if len(rows) == 0:
+            return
+        self.write_frame(store.decode(rows))
+    
+    def write_frame(self, df: pd.DataFrame) -> None:
+        """
+        Buffer decoded audit rows and write all full row groups; above
+        max_pending_rows, write completed days and then open ones.
+        
+        Args:
+            df: DataFrame in SignalAuditRecord column layout
+        """
+        dates = pd.to_datetime(df['timestamp']).dt.strftime('%Y-%m-%d').fillna('none')
+        for (pair, date), part in df.groupby([df['pair'], dates], sort=False):
+            key = (str(pair), date)
+            table = pa.Table.from_pandas(part.drop(columns=['pair']), schema=self.schema, preserve_index=False)
+            self._pending.setdefault(key, []).append(table)
+            self._pending_rows[key] = self._pending_rows.get(key, 0) + len(table)
+        
+        for key in list(self._pending):
+            if self._pending_rows[key] >= self.row_group_size:
+                self._write_partition(key, final=False)
+        
+        if self.pending_rows > self.max_pending_rows:
+            # A partition is complete once its pair has rows of a later date
+            latest: Dict[str, str] = {}
+            for pair, date in self._pending:
+                if date != 'none' and date > latest.get(pair, ''):
+                    latest[pair] = date
+            completed = sorted(
+                (key for key in self._pending if key[1] != 'none' and key[1] < latest[key[0]]),
+                key=lambda key: key[1],
+            )
+            for key in completed:
+                if self.pending_rows <= self.max_pending_rows:
+                    break
+                self._write_partition(key, final=True)
+        
+        if self.pending_rows > self.max_pending_rows:
+            self.flush()
+    
+    def flush(self) -> List[Path]:
+        """
+        Write all buffered rows, including partial row groups.
+        
+        Returns:
+            Part files written by this flush
+        """
+        first = len(self.files)
+        for key in list(self._pending):
+            self._write_partition(key, final=True)
+        return self.files[first:]
+    
+    def _write_partition(self, key: Tuple[str, str], final: bool) -> None:
+        """Write full row groups of one partition (and the remainder if final)"""
+        table = pa.concat_tables(self._pending.pop(key))
+        self._pending_rows.pop(key)
+        
+        n_write = len(table) if final else len(table) - len(table) % self.row_group_size
+        if n_write:
+            pair, date = key
+            path = (
+                self.root_dir / f"pair={quote(pair, safe='')}" / f"date={date}"
+                / f"part-{self.session}-{self._part:05d}.parquet"
+            )
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._part += 1
+            
+            with pq.ParquetWriter(path, self.schema) as writer:
+                writer.write_table(table.slice(0, n_write), row_group_size=self.row_group_size)
+            self.files.append(path)
+            self.rows_written += n_write
+            logger.debug(f"Wrote {n_write} audit rows to {path}")
+        
+        if n_write < len(table):
+            self._pending[key] = [table.slice(n_write)]
+            self._pending_rows[key] = len(table) - n_write
+
+
+def read_audit_dataset(
+    root_dir: Path,
+    columns: Optional[Sequence[str]] = None,
+    start: Optional[object] = None,
+    end: Optional[object] = None,
+    pairs: Optional[Sequence[str]] = None,
+    files: Optional[Sequence[Path]] = None,
+) -> pd.DataFrame:
+    """
+    Read audit rows from a partitioned Parquet dataset.
+    
+    Only the requested columns are read, and the pair/date partitions are
+    pruned before any data file is opened.
+    
+    Args:
+        root_dir: Dataset root directory
+        columns: Columns to load (None = all, including 'pair' and 'date')
+        start: Inclusive lower timestamp bound
+        end: Inclusive upper timestamp bound
+        pairs: Only load these pairs
+        files: Restrict to these part files (must live under root_dir)
+    
+    Returns:
+        DataFrame of matching rows (in partition order, not sorted)
+    """
+    _require_pyarrow()
+    
+    partitioning = _partitioning()
+    if files is not None:
+        if not files:
+            names = list(columns) if columns else audit_arrow_schema().names + ['pair', 'date']
+            return pd.DataFrame(columns=names)
+        dataset = ds.dataset(
+            [str(f) for f in files], format='parquet', partitioning=partitioning, partition_base_dir=str(root_dir),
+        )
+    else:
+        dataset = ds.dataset(str(root_dir), format='parquet', partitioning=partitioning)
+    
+    expression = None
+    
+    def add(condition):
+        return condition if expression is None else expression & condition
+    
+    if start is not None:
+        start = pd.Timestamp(start)
+        expression = add(ds.field('date') >= start.strftime('%Y-%m-%d'))
+        expression = add(ds.field('timestamp') >= pa.scalar(start.to_datetime64().astype('datetime64[ns]'), pa.timestamp('ns')))
+    if end is not None:
+        end = pd.Timestamp(end)
+        expression = add(ds.field('date') <= end.strftime('%Y-%m-%d'))
+        expression = add(ds.field('timestamp') <= pa.scalar(end.to_datetime64().astype('datetime64[ns]'), pa.timestamp('ns')))
+    if pairs is not None:
+        expression = add(ds.field('pair').isin(list(pairs)))
+    
+    table = dataset.to_table(columns=list(columns) if columns else None, filter=expression)
+    return table.to_pandas()
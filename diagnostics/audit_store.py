@@ -0,0 +1,278 @@
+"""
+Signal Audit Record Store
+
+Fixed-capacity, array-backed storage for signal audit rows. Rows live in a
+NumPy structured array with small-int stage codes and interned categorical
+ids for pair and governance status, so memory stays flat however long the
+bot runs. When the buffer fills up, the full chunk is spilled to disk (or,
+without a spill directory, the oldest rows are overwritten). Rejection
+stage counts are maintained incrementally on every append.
+
+Author: Strategy Team
+Version: 1.0.0
+Created: October 2025
+"""
+
+import json
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+# Gating funnel in evaluation order: (record field, rejection stage label).
+# A candle's rejection stage is the label of the first gate it failed; its
+# stage code is the 1-based position here (0 = passed all gates).
+GATE_STAGES: List[Tuple[str, str]] = [
+    ('do_predict', 'do_predict'),
+    ('di_ok', 'DI_check'),
+    ('vol_ok', 'volume_regime'),
+    ('regime_ok', 'market_regime'),
+    ('trend_strength_ok', 'trend_strength'),
+    ('z_score_signal', 'z_score_signal'),
+    ('quantile_ok', 'quantile_filter'),
+    ('governance_ok', 'governance'),
+]
+
+STAGE_LABELS: List[Optional[str]] = [None] + [stage for _, stage in GATE_STAGES]
+
+# Diagnostic value columns and their defaults
+AUDIT_VALUE_COLUMNS: Dict[str, Any] = {
+    'di_value': 0.0,
+    'volume_regime': 0.0,
+    'market_regime': 0,
+    'trend_strength': 0.0,
+    'z_score': 0.0,
+    'quantile': 0.0,
+    'governance_status': "none",
+    'governance_risk_multiplier': 1.0,
+}
+
+AUDIT_DTYPE = np.dtype(
+    [('timestamp', 'datetime64[ns]'), ('pair_id', np.uint16)]
+    + [(gate, np.bool_) for gate, _ in GATE_STAGES]
+    + [
+        ('di_value', np.float32),
+        ('volume_regime', np.float32),
+        ('market_regime', np.int8),
+        ('trend_strength', np.float32),
+        ('z_score', np.float32),
+        ('quantile', np.float32),
+        ('governance_status_id', np.uint8),
+        ('governance_risk_multiplier', np.float32),
+        ('enter_long', np.bool_),
+        ('enter_short', np.bool_),
+        ('stage_code', np.int8),
+    ]
+)
+
+
+class _Interner:
+    """Maps categorical strings to small integer ids"""
+    
+    def __init__(self):
+        self.values: List[str] = []
+        self._ids: Dict[str, int] = {}
+    
+    def id(self, value: str) -> int:
+        value = str(value)
+        if value not in self._ids:
+            self._ids[value] = len(self.values)
+            self.values.append(value)
+        return self._ids[value]
+    
+    def ids(self, values) -> np.ndarray:
+        """Vectorized id lookup for a scalar or array of values"""
+        if np.ndim(values) == 0:
+            return np.asarray(self.id(values))
+        uniques, inverse = np.unique(np.asarray(values).astype(str), return_inverse=True)
+        return np.array([self.id(u) for u in uniques], dtype=np.int64)[inverse]
+    
+    def decode(self, ids: np.ndarray) -> np.ndarray:
+        return np.asarray(self.values, dtype=object)[ids] if len(ids) else np.empty(0, dtype=object)
+
+
+class AuditRecordStore:
+    """
+    Ring buffer of audit rows backed by a NumPy structured array.
+    
+    Usage:
+        store = AuditRecordStore(capacity=100_000, spill_dir=Path("audit_chunks"))
+        store.append_columns("BTC/USDT:USDT", columns)
+        
+        store.stage_counts   # rows per stage code, updated on append
+        df = store.to_frame()  # spilled chunks + in-memory rows
+    """
+    
+    def __init__(self, capacity: int = 100_000, spill_dir: Optional[Path] = None):
+        """
+        Initialize record store.
+        
+        Args:
+            capacity: Rows held in memory
+            spill_dir: Directory for spilled chunks (None = overwrite oldest rows)
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be positive")
+        
+        self.capacity = int(capacity)
+        self.spill_dir = Path(spill_dir) if spill_dir is not None else None
+        
+        self._buffer = np.zeros(self.capacity, dtype=AUDIT_DTYPE)
+        self._start = 0  # Oldest row (ring mode)
+        self._size = 0   # Rows currently in memory
+        
+        self.pairs = _Interner()
+        self.statuses = _Interner()
+        
+        # Incremental counters
+        self.stage_counts = np.zeros(len(STAGE_LABELS), dtype=np.int64)
+        self.total_rows = 0
+        self.spilled_rows = 0
+        self.overwritten_rows = 0
+        self.spilled_chunks: List[Path] = []
+        
+        # Optional callback receiving each full chunk instead of the .npy spill
+        self.spill_handler = None
+    
+    def __len__(self) -> int:
+        """Rows available (in memory plus spilled to disk)"""
+        return self._size + self.spilled_rows
+    
+    @property
+    def memory_bytes(self) -> int:
+        """Size of the in-memory buffer"""
+        return self._buffer.nbytes
+    
+    def append(self, rows: np.ndarray) -> None:
+        """
+        Append structured rows (AUDIT_DTYPE).
+        
+        Args:
+            rows: Structured array of rows to store
+        """
+        if len(rows) == 0:
+            return
+        
+        self.stage_counts += np.bincount(rows['stage_code'], minlength=len(STAGE_LABELS))
+        self.total_rows += len(rows)
+        
+        offset = 0
+        while offset < len(rows):
+            if self._size == self.capacity:
+                if self.spill_dir is not None or self.spill_handler is not None:
+                    self._spill()
+                else:
+                    # Ring mode: drop the oldest rows to make room
+                    n = min(len(rows) - offset, self.capacity)
+                    self._start = (self._start + n) % self.capacity
+                    self._size -= n
+                    self.overwritten_rows += n
+            
+            n = min(len(rows) - offset, self.capacity - self._size)
+            pos = (self._start + self._size) % self.capacity
+            first = min(n, self.capacity - pos)
+            self._buffer[pos:pos + first] = rows[offset:offset + first]
+            if first < n:
+                self._buffer[:n - first] = rows[offset + first:offset + n]
+            self._size += n
+            offset += n
+    
+    def append_columns(self, pair: str, columns: Dict[str, Any]) -> None:
+        """
+        Append rows given as columns; scalars are broadcast.
+        
+        Args:
+            pair: Trading pair for all rows
+            columns: Gate masks, value columns, enter_long/short, stage_code
+                and optional timestamp
+        """
+        n = max((len(v) for v in columns.values() if np.ndim(v)), default=1)
+        rows = np.zeros(n, dtype=AUDIT_DTYPE)
+        rows['timestamp'] = np.datetime64('NaT')
+        rows['pair_id'] = self.pairs.id(pair)
+        
+        for name, value in columns.items():
+            if name == 'governance_status':
+                rows['governance_status_id'] = self.statuses.ids(value)
+            elif name in AUDIT_DTYPE.names:
+                rows[name] = np.asarray(value) if name != 'timestamp' else np.asarray(value, dtype='datetime64[ns]')
+        
+        if 'governance_status' not in columns:
+            rows['governance_status_id'] = self.statuses.id(AUDIT_VALUE_COLUMNS['governance_status'])
+        
+        self.append(rows)
+    
+    def flush(self) -> None:
+        """Spill in-memory rows now (no-op without a spill target)"""
+        if self._size and (self.spill_dir is not None or self.spill_handler is not None):
+            self._spill()
+    
+    def _ordered(self) -> np.ndarray:
+        """In-memory rows, oldest first"""
+        end = self._start + self._size
+        if end <= self.capacity:
+            return self._buffer[self._start:end]
+        return np.concatenate([self._buffer[self._start:], self._buffer[:end - self.capacity]])
+    
+    def _spill(self) -> None:
+        """Write the full in-memory chunk out and reset the buffer"""
+        chunk = self._ordered()
+        if self.spill_handler is not None:
+            self.spill_handler(chunk, self)
+        else:
+            self.spill_dir.mkdir(parents=True, exist_ok=True)
+            path = self.spill_dir / f"audit_chunk_{len(self.spilled_chunks):06d}.npy"
+            np.save(path, chunk)
+            self.spilled_chunks.append(path)
+            with open(self.spill_dir / "categories.json", "w", encoding="utf-8") as f:
+                json.dump({'pairs': self.pairs.values, 'governance_status': self.statuses.values}, f)
+            logger.debug(f"Spilled {len(chunk)} audit rows to {path}")
+        self.spilled_rows += len(chunk)
+        self._start = 0
+        self._size = 0
+    
+    def iter_chunks(self, include_spilled: bool = True) -> Iterator[np.ndarray]:
+        """Yield stored rows chunk by chunk (spilled chunks memory-mapped)"""
+        if include_spilled:
+            for path in self.spilled_chunks:
+                yield np.load(path, mmap_mode='r')
+        if self._size:
+            yield self._ordered()
+    
+    def decode(self, rows: np.ndarray) -> pd.DataFrame:
+        """Convert structured rows to a DataFrame in SignalAuditRecord column order"""
+        data = {
+            'timestamp': rows['timestamp'],
+            'pair': self.pairs.decode(rows['pair_id']),
+        }
+        for gate, _ in GATE_STAGES:
+            data[gate] = rows[gate]
+        for column in AUDIT_VALUE_COLUMNS:
+            if column == 'governance_status':
+                data[column] = self.statuses.decode(rows['governance_status_id'])
+            else:
+                data[column] = rows[column]
+        data['enter_long'] = rows['enter_long']
+        data['enter_short'] = rows['enter_short']
+        data['rejection_stage'] = np.asarray(STAGE_LABELS, dtype=object)[rows['stage_code']]
+        return pd.DataFrame(data)
+    
+    def to_frame(self, include_spilled: bool = True) -> pd.DataFrame:
+        """All available rows as one DataFrame"""
+        frames = [self.decode(chunk) for chunk in self.iter_chunks(include_spilled)]
+        if not frames:
+            return self.decode(np.zeros(0, dtype=AUDIT_DTYPE))
+        return pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+
+
+def default_spill_dir(output_dir: Path, dirname: str) -> Path:
+    """Per-session spill directory so chunks of different runs never mix"""
+    session = f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{os.getpid()}"
+    return Path(output_dir) / dirname / session
@@ -0,0 +1,233 @@
+"""
+Background Diagnostics Writer
+
+Moves diagnostics work (signal audit logging, debug summaries, exports) off
+the strategy thread. Callers enqueue a job on a bounded queue; a single
+worker thread drains it in batches and runs the jobs in submission order.
+Flush callbacks run when a batch-size worth of jobs has been processed or
+the flush interval has elapsed, and once more on shutdown.
+
+Backpressure is explicit: when the queue is full a job is either dropped
+(and counted) or the caller blocks until there is room.
+
+Author: Strategy Team
+Version: 1.0.0
+Created: October 2025
+"""
+
+import atexit
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()  # Worker shutdown sentinel
+
+
+class BackgroundDiagnosticsWriter:
+    """
+    Bounded-queue worker thread for diagnostics jobs.
+    
+    Jobs must not share mutable state with the caller: pass copies of any
+    arrays or frames the strategy may modify afterwards. State touched by
+    jobs (e.g. a SignalAuditLogger) should only be read after flush().
+    
+    Usage:
+        writer = BackgroundDiagnosticsWriter(max_queue_size=1000, on_full="drop")
+        writer.flush_callbacks.append(audit.records.flush)
+        writer.submit(audit.log_gate_arrays, pair, **arrays)  # Returns immediately
+        
+        writer.flush()   # Wait until all submitted jobs ran
+        writer.close()   # Also registered with atexit
+    """
+    
+    def __init__(
+        self,
+        max_queue_size: int = 10_000,
+        batch_size: int = 100,
+        flush_interval: float = 5.0,
+        on_full: str = "drop",
+        block_timeout: Optional[float] = None,
+        name: str = "diagnostics-writer",
+    ):
+        """
+        Initialize writer and start the worker thread.
+        
+        Args:
+            max_queue_size: Maximum queued jobs
+            batch_size: Jobs drained per batch; flush callbacks run every batch_size jobs
+            flush_interval: Seconds between time-based flushes
+            on_full: "drop" (count and discard the job) or "block" (wait for room)
+            block_timeout: Max seconds to block when on_full="block" (None = forever)
+            name: Worker thread name
+        """
+        if on_full not in ("drop", "block"):
+            raise ValueError(f"on_full must be 'drop' or 'block', got {on_full!r}")
+        if max_queue_size < 1 or batch_size < 1:
+            raise ValueError("max_queue_size and batch_size must be positive")
+        
+        self.batch_size = int(batch_size)
+        self.flush_interval = float(flush_interval)
+        self.on_full = on_full
+        self.block_timeout = block_timeout
+        
+        self.flush_callbacks: List[Callable[[], Any]] = []
+        self.close_callbacks: List[Callable[[], Any]] = []
+        
+        # Counters
+        self.submitted = 0
+        self.processed = 0
+        self.dropped = 0
+        self.errors = 0
+        
+        self._queue: "queue.Queue" = queue.Queue(maxsize=int(max_queue_size))
+        self._closed = False
+        self._last_flush = time.monotonic()
+        self._since_flush = 0
+        
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+    
+    @property
+    def queue_size(self) -> int:
+        """Jobs currently waiting"""
+        return self._queue.qsize()
+    
+    def submit(self, fn: Callable, *args, **kwargs) -> bool:
+        """
+        Enqueue a job.
+        
+        Args:
+            fn: Callable to run on the worker thread
+            *args, **kwargs: Arguments for fn
+        
+        Returns:
+            True if queued, False if dropped (queue full or writer closed)
+        """
+        if self._closed:
+            self.dropped += 1
+            return False
+        
+        item = (fn, args, kwargs)
+        try:
+            if self.on_full == "block":
+                self._queue.put(item, timeout=self.block_timeout)
+            else:
+                self._queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 1000 == 0:
+                logger.warning(f"Diagnostics queue full, dropped {self.dropped} jobs so far")
+            return False
+        
+        self.submitted += 1
+        return True
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every job submitted so far has run, then run flush callbacks.
+        
+        Args:
+            timeout: Max seconds to wait (None = forever)
+        
+        Returns:
+            True if the queue was drained within the timeout
+        """
+        if not self._thread.is_alive():
+            return False
+        
+        done = threading.Event()
+        try:
+            self._queue.put(done, timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+    
+    def close(self, timeout: Optional[float] = 10.0) -> None:
+        """
+        Drain remaining jobs, run flush and close callbacks, stop the worker.
+        
+        Args:
+            timeout: Max seconds to wait for the worker
+        """
+        if self._closed:
+            return
+        self._closed = True
+        atexit.unregister(self.close)
+        
+        if self._thread.is_alive():
+            try:
+                self._queue.put(_STOP, timeout=timeout)
+            except queue.Full:
+                logger.warning(f"Diagnostics queue still full after {timeout}s, abandoning {self.queue_size} jobs")
+            else:
+                self._thread.join(timeout)
+            if self._thread.is_alive():
+                logger.warning(f"Diagnostics writer did not stop within {timeout}s ({self.queue_size} jobs left)")
+        
+        self._run_callbacks(self.close_callbacks)
+    
+    def get_stats(self) -> Dict[str, int]:
+        """Writer counters"""
+        return {
+            'submitted': self.submitted,
+            'processed': self.processed,
+            'dropped': self.dropped,
+            'errors': self.errors,
+            'queue_size': self.queue_size,
+        }
+    
+    def _run(self) -> None:
+        """Worker loop: drain batches, run jobs, flush on size or time"""
+        while True:
+            timeout = max(0.0, self._last_flush + self.flush_interval - time.monotonic())
+            try:
+                batch = [self._queue.get(timeout=timeout)]
+            except queue.Empty:
+                batch = []
+                if not self._since_flush:
+                    self._last_flush = time.monotonic()  # Idle: restart the interval
+            
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            for item in batch:
+                if item is _STOP:
+                    self._flush()
+                    return
+                if isinstance(item, threading.Event):
+                    self._flush()
+                    item.set()
+                    continue
+                
+                fn, args, kwargs = item
+                try:
+                    fn(*args, **kwargs)
+                except Exception as e:
+                    self.errors += 1
+                    logger.warning(f"Diagnostics job {getattr(fn, '__name__', fn)} failed: {e}")
+                self.processed += 1
+                self._since_flush += 1
+            
+            elapsed = time.monotonic() - self._last_flush
+            if self._since_flush >= self.batch_size or (self._since_flush and elapsed >= self.flush_interval):
+                self._flush()
+    
+    def _flush(self) -> None:
+        self._run_callbacks(self.flush_callbacks)
+        self._since_flush = 0
+        self._last_flush = time.monotonic()
+    
+    def _run_callbacks(self, callbacks: List[Callable[[], Any]]) -> None:
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.warning(f"Diagnostics callback {getattr(callback, '__name__', callback)} failed: {e}")
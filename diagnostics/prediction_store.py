@@ -0,0 +1,315 @@
+"""
+FreqAI Prediction Store
+
+Persists the FreqAI output columns (&-s_close, &-s_close_mean/_std,
+do_predict, DI_values, ...) per (identifier, pair, training window) as plain
+.npy arrays with a small JSON index per pair. Readers memory-map the arrays,
+so backtests, diagnostics and the evaluation protocol can use predictions
+zero-copy without loading models or pandas pickles.
+
+Every window records fingerprints of the model settings and of the feature
+engineering code; windows whose fingerprints differ from the current ones
+are ignored by readers and replaced on the next write.
+
+Layout:
+    <root>/<identifier>/<pair>/index.json
+    <root>/<identifier>/<pair>/<window start>/{date,c0,c1,...}.npy
+
+Author: Strategy Team
+Version: 1.0.0
+Created: October 2025
+"""
+
+import hashlib
+import inspect
+import json
+import logging
+import os
+import shutil
+import tempfile
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# FreqAI outputs the strategy's entry/exit logic reads
+PREDICTION_COLUMNS = ('&-s_close', '&-s_close_mean', '&-s_close_std', 'do_predict', 'DI_values')
+
+# Strategy methods whose source defines the feature set
+FEATURE_METHODS = (
+    'feature_engineering_expand_all',
+    'feature_engineering_expand_basic',
+    'feature_engineering_standard',
+    'set_freqai_targets',
+)
+
+
+def _digest(payload: Any) -> str:
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def model_fingerprint(config: Dict) -> str:
+    """
+    Hash of the settings that change the trained models.
+    
+    Args:
+        config: Full freqtrade config; the model class is the top-level
+            freqaimodel (set by --freqaimodel), the rest comes from freqai
+    """
+    freqai_config = config.get('freqai', {})
+    return _digest({
+        'identifier': freqai_config.get('identifier'),
+        'model': config.get('freqaimodel') or freqai_config.get('model'),
+        'model_training_parameters': freqai_config.get('model_training_parameters', {}),
+        'data_split_parameters': freqai_config.get('data_split_parameters', {}),
+        'train_period_days': freqai_config.get('train_period_days'),
+    })
+
+
+def feature_fingerprint(strategy: Any, freqai_config: Dict) -> str:
+    """Hash of the feature engineering code and feature parameters"""
+    sources = {}
+    for name in FEATURE_METHODS:
+        method = getattr(strategy, name, None)
+        try:
+            sources[name] = inspect.getsource(method) if method is not None else None
+        except (OSError, TypeError):
+            sources[name] = getattr(method, '__qualname__', None)
+    return _digest({'sources': sources, 'feature_parameters': freqai_config.get('feature_parameters', {})})
+
+
+def _pair_dir_name(pair: str) -> str:
+    return pair.replace('/', '_').replace(':', '_')
+
+
+@dataclass
+class PredictionWindow:
+    """One stored training window of one pair"""
+    pair: str
+    start: int          # First candle, ms since epoch
+    end: int            # Last candle, ms since epoch
+    rows: int
+    path: Path
+    columns: Dict[str, str]  # Column name -> file stem
+    model_hash: str
+    feature_hash: str
+    
+    def load(self, column: str) -> np.ndarray:
+        """Memory-mapped, read-only column ('date' for the int64 ms timestamps)"""
+        stem = 'date' if column == 'date' else self.columns[column]
+        return np.load(self.path / f"{stem}.npy", mmap_mode='r')
+    
+    def arrays(self, columns: Optional[Sequence[str]] = None) -> Dict[str, np.ndarray]:
+        """Memory-mapped date plus the requested (default: all) columns"""
+        names = list(columns) if columns is not None else list(self.columns)
+        return {'date': self.load('date'), **{name: self.load(name) for name in names}}
+
+
+class PredictionStore:
+    """
+    Memory-mapped prediction columns per (identifier, pair, training window).
+    
+    Args:
+        root_dir: Store directory
+        model_hash: Current model_fingerprint (None: accept any stored window)
+        feature_hash: Current feature_fingerprint (None: accept any)
+    """
+    
+    INDEX_FILE = 'index.json'
+    
+    def __init__(self, root_dir: Path, model_hash: Optional[str] = None, feature_hash: Optional[str] = None):
+        self.root_dir = Path(root_dir)
+        self.model_hash = model_hash
+        self.feature_hash = feature_hash
+    
+    @classmethod
+    def for_strategy(cls, root_dir: Path, strategy: Any, config: Dict) -> "PredictionStore":
+        """Store validated against a strategy's current model and feature fingerprints (full config)"""
+        return cls(root_dir, model_fingerprint(config), feature_fingerprint(strategy, config.get('freqai', {})))
+    
+    def _pair_dir(self, identifier: str, pair: str) -> Path:
+        return self.root_dir / identifier / _pair_dir_name(pair)
+    
+    def _read_index(self, pair_dir: Path) -> List[Dict]:
+        try:
+            with open(pair_dir / self.INDEX_FILE) as f:
+                return json.load(f)['windows']
+        except (OSError, ValueError, KeyError):
+            return []
+    
+    def _write_index(self, pair_dir: Path, pair: str, entries: List[Dict]) -> None:
+        fd, tmp = tempfile.mkstemp(dir=pair_dir, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump({'pair': pair, 'windows': sorted(entries, key=lambda e: e['start'])}, f, indent=1)
+        os.replace(tmp, pair_dir / self.INDEX_FILE)
+    
+    def _is_current(self, entry: Dict) -> bool:
+        return ((self.model_hash is None or entry.get('model_hash') == self.model_hash)
+                and (self.feature_hash is None or entry.get('feature_hash') == self.feature_hash))
+    
+    def write(
+        self,
+        identifier: str,
+        pair: str,
+        dataframe: pd.DataFrame,
+        columns: Sequence[str] = PREDICTION_COLUMNS,
+        window_days: Optional[float] = None,
+        anchor: Optional[datetime] = None,
+    ) -> List[PredictionWindow]:
+        """
+        Store the prediction columns of an analyzed dataframe.
+        
+        Args:
+            identifier: freqai.identifier
+            pair: Pair name
+            dataframe: Frame with a date column and the prediction columns
+            columns: Columns to store (missing ones are skipped)
+            window_days: Split rows into windows of this length (FreqAI's
+                backtest_period_days); None stores one window
+            anchor: Start of the first window (default: first candle)
+        
+        Returns:
+            The written windows. They replace stored windows that overlap
+            the dataframe's dates or whose fingerprints are no longer current.
+        """
+        if dataframe is None or len(dataframe) == 0:
+            return []
+        dates = pd.to_datetime(dataframe['date'], utc=True)
+        date_ms = dates.dt.as_unit('ms').astype('int64').to_numpy()
+        present = [c for c in columns if c in dataframe.columns]
+        
+        if window_days:
+            step = int(window_days * 86_400_000)
+            origin = pd.Timestamp(anchor if anchor is not None else dates.iloc[0]).value // 1_000_000
+            window_ids = (date_ms - origin) // step
+        else:
+            window_ids = np.zeros(len(date_ms), dtype=np.int64)
+        
+        splits = np.split(np.arange(len(date_ms)), np.flatnonzero(np.diff(window_ids)) + 1)
+        lo, hi = int(date_ms[0]), int(date_ms[-1])
+        
+        pair_dir = self._pair_dir(identifier, pair)
+        pair_dir.mkdir(parents=True, exist_ok=True)
+        # Stored windows overlapping the new rows are superseded
+        entries = {
+            e['start']: e for e in self._read_index(pair_dir)
+            if self._is_current(e) and (e['end'] < lo or e['start'] > hi)
+        }
+        file_map = {name: f"c{i}" for i, name in enumerate(present)}
+        
+        written = []
+        for rows in splits:
+            start, end = int(date_ms[rows[0]]), int(date_ms[rows[-1]])
+            # Write into a temporary directory and swap it in, so readers never see half a window
+            tmp_dir = Path(tempfile.mkdtemp(dir=pair_dir, prefix='.tmp-'))
+            np.save(tmp_dir / 'date.npy', date_ms[rows])
+            for name, stem in file_map.items():
+                values = dataframe[name].to_numpy(dtype=np.float64, na_value=np.nan)[rows]
+                np.save(tmp_dir / f"{stem}.npy", np.ascontiguousarray(values))
+            window_dir = pair_dir / str(start)
+            if window_dir.exists():
+                shutil.rmtree(window_dir)
+            os.replace(tmp_dir, window_dir)
+            entries[start] = {
+                'start': start,
+                'end': end,
+                'rows': int(len(rows)),
+                'dir': window_dir.name,
+                'columns': file_map,
+                'model_hash': self.model_hash,
+                'feature_hash': self.feature_hash,
+                'created': datetime.now(timezone.utc).isoformat(),
+            }
+            written.append(self._window(pair, pair_dir, entries[start]))
+        
+        self._write_index(pair_dir, pair, list(entries.values()))
+        self._remove_unindexed(pair_dir, entries.values())
+        return written
+    
+    def _remove_unindexed(self, pair_dir: Path, entries) -> None:
+        """Delete window directories no longer in the index (stale fingerprints)"""
+        keep = {e['dir'] for e in entries}
+        for child in pair_dir.iterdir():
+            if child.is_dir() and not child.name.startswith('.') and child.name not in keep:
+                shutil.rmtree(child, ignore_errors=True)
+    
+    def _window(self, pair: str, pair_dir: Path, entry: Dict) -> PredictionWindow:
+        return PredictionWindow(
+            pair=pair,
+            start=entry['start'],
+            end=entry['end'],
+            rows=entry['rows'],
+            path=pair_dir / entry['dir'],
+            columns=entry['columns'],
+            model_hash=entry.get('model_hash'),
+            feature_hash=entry.get('feature_hash'),
+        )
+    
+    def windows(self, identifier: str, pair: str, start: Optional[int] = None, end: Optional[int] = None) -> List[PredictionWindow]:
+        """
+        Current windows of a pair, in time order.
+        
+        Args:
+            start, end: Only windows overlapping [start, end] (ms since epoch)
+        """
+        pair_dir = self._pair_dir(identifier, pair)
+        result = []
+        for entry in self._read_index(pair_dir):
+            if not self._is_current(entry):
+                continue
+            if (start is not None and entry['end'] < start) or (end is not None and entry['start'] > end):
+                continue
+            result.append(self._window(pair, pair_dir, entry))
+        return result
+    
+    def pairs(self, identifier: str) -> List[str]:
+        """Pairs stored under an identifier"""
+        base = self.root_dir / identifier
+        pairs = []
+        for index in sorted(base.glob(f"*/{self.INDEX_FILE}")):
+            try:
+                with open(index) as f:
+                    pairs.append(json.load(f)['pair'])
+            except (OSError, ValueError, KeyError):
+                continue
+        return pairs
+    
+    def read(
+        self,
+        identifier: str,
+        pair: str,
+        columns: Optional[Sequence[str]] = None,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Columns of all current windows of a pair joined in time order.
+        
+        A single window is returned as its memory maps (zero-copy); several
+        windows are concatenated. Rows outside [start, end] are dropped.
+        """
+        windows = self.windows(identifier, pair, start, end)
+        if not windows:
+            return {}
+        parts = [w.arrays(columns) for w in windows]
+        names = parts[0].keys()
+        joined = parts[0] if len(parts) == 1 else {n: np.concatenate([p[n] for p in parts]) for n in names}
+        if start is not None or end is not None:
+            date = joined['date']
+            lo = np.searchsorted(date, start, side='left') if start is not None else 0
+            hi = np.searchsorted(date, end, side='right') if end is not None else len(date)
+            joined = {n: v[lo:hi] for n, v in joined.items()}
+        return joined
+    
+    def read_frame(self, identifier: str, pair: str, columns: Optional[Sequence[str]] = None, **kwargs) -> pd.DataFrame:
+        """read() as a DataFrame indexed by UTC date (copies the data)"""
+        arrays = self.read(identifier, pair, columns, **kwargs)
+        if not arrays:
+            return pd.DataFrame()
+        index = pd.to_datetime(np.asarray(arrays.pop('date')), unit='ms', utc=True)
+        return pd.DataFrame({n: np.asarray(v) for n, v in arrays.items()}, index=index)
@@ -23,9 +23,18 @@ import pandas as pd
 import numpy as np
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional
 from dataclasses import dataclass, field, asdict
 
+from diagnostics.audit_store import (
+    AUDIT_VALUE_COLUMNS,
+    GATE_STAGES,
+    STAGE_LABELS,
+    AuditRecordStore,
+    default_spill_dir,
+)
+from diagnostics.audit_export import ParquetAuditExporter, read_audit_dataset
+
 logger = logging.getLogger(__name__)
 
 
@@ -36,6 +45,16 @@ class SignalAuditConfig:
     output_dir: Path = field(default_factory=lambda: Path("user_data/diagnostics"))
     csv_filename: str = "signal_audit.csv"
     
+    # Record storage (bounded memory)
+    buffer_capacity: int = 100_000  # Rows kept in memory
+    spill_to_disk: bool = True      # Spill full chunks to output_dir/spill_dirname
+    spill_dirname: str = "audit_chunks"
+    
+    # Partitioned Parquet export (requires pyarrow); replaces .npy spills
+    parquet_export: bool = False
+    parquet_dirname: str = "audit_parquet"
+    parquet_row_group_size: int = 50_000
+    
     # Logging frequency
     log_every_n_candles: int = 100  # Log summary every N candles
     
@@ -62,6 +81,15 @@ class GatingStats:
         total = self.passed_count + self.failed_count
         if total > 0:
             self.rejection_rate_pct = (self.failed_count / total) * 100
+    
+    def update_many(self, passed_count: int, failed_count: int):
+        """Update statistics with a batch of results"""
+        self.passed_count += int(passed_count)
+        self.failed_count += int(failed_count)
+        
+        total = self.passed_count + self.failed_count
+        if total > 0:
+            self.rejection_rate_pct = (self.failed_count / total) * 100
 
 
 @dataclass
@@ -112,16 +140,22 @@ class SignalAuditLogger:
     Usage:
         audit = SignalAuditLogger()
         
-        # In strategy's populate_entry_trend:
-        for idx, row in dataframe.iterrows():
-            record = SignalAuditRecord(
-                timestamp=row.name,
-                pair=metadata['pair'],
-                do_predict=(row.get('do_predict', 0) == 1),
-                di_ok=(row.get('DI_values', 1.0) < di_threshold),
-                # ... other fields
-            )
-            audit.log_record(record)
+        # In strategy's populate_entry_trend, once per pair per call:
+        audit.log_gate_arrays(
+            pair=metadata['pair'],
+            timestamps=dataframe['date'],
+            do_predict=do_pred,
+            di_ok=di_ok,
+            vol_ok=vol_ok,
+            ts_ok_long=ts_ok_long,
+            ts_ok_short=ts_ok_short,
+            long_sig=long_sig,
+            short_sig=short_sig,
+            governance_ok=allow_entries,
+        )
+        
+        # Single candles can still be logged as records
+        audit.log_record(SignalAuditRecord(...))
         
         # Export to CSV
         audit.export_to_csv()
@@ -140,8 +174,21 @@ class SignalAuditLogger:
         self.config = config or SignalAuditConfig()
         self.config.output_dir.mkdir(parents=True, exist_ok=True)
         
-        # Storage for records
-        self.records: List[SignalAuditRecord] = []
+        # Bounded array-backed storage for audited candles
+        spill_dir = (
+            default_spill_dir(self.config.output_dir, self.config.spill_dirname)
+            if self.config.spill_to_disk else None
+        )
+        self.records = AuditRecordStore(self.config.buffer_capacity, spill_dir)
+        
+        # Full chunks stream into the Parquet dataset when enabled
+        self.exporter: Optional[ParquetAuditExporter] = None
+        if self.config.parquet_export:
+            self.exporter = ParquetAuditExporter(
+                self.config.output_dir / self.config.parquet_dirname,
+                row_group_size=self.config.parquet_row_group_size,
+            )
+            self.records.spill_handler = self.exporter.write_chunk
         
         # Statistics per stage
         self.stage_stats: Dict[str, GatingStats] = {
@@ -160,6 +207,9 @@ class SignalAuditLogger:
         self.total_trades_entered = 0
         self.candles_since_last_trade = 0
         
+        # Last audited candle per pair (batches re-send the whole dataframe)
+        self._last_timestamp: Dict[str, np.datetime64] = {}
+        
         logger.info(f"SignalAuditLogger initialized: {self.config.output_dir}")
     
     def log_record(self, record: SignalAuditRecord) -> None:
@@ -170,37 +220,27 @@ class SignalAuditLogger:
             record: SignalAuditRecord with gating funnel results
         """
         # Determine rejection stage (first stage that failed)
-        if not record.do_predict:
-            record.rejection_stage = "do_predict"
-        elif not record.di_ok:
-            record.rejection_stage = "DI_check"
-        elif not record.vol_ok:
-            record.rejection_stage = "volume_regime"
-        elif not record.regime_ok:
-            record.rejection_stage = "market_regime"
-        elif not record.trend_strength_ok:
-            record.rejection_stage = "trend_strength"
-        elif not record.z_score_signal:
-            record.rejection_stage = "z_score_signal"
-        elif not record.quantile_ok:
-            record.rejection_stage = "quantile_filter"
-        elif not record.governance_ok:
-            record.rejection_stage = "governance"
-        else:
-            record.rejection_stage = None  # Passed all gates
+        stage_code = 0  # Passed all gates
+        for code, (gate, _) in enumerate(GATE_STAGES, start=1):
+            if not getattr(record, gate):
+                stage_code = code
+                break
+        record.rejection_stage = STAGE_LABELS[stage_code]
         
         # Store record
-        self.records.append(record)
+        columns = {gate: getattr(record, gate) for gate, _ in GATE_STAGES}
+        columns.update({column: getattr(record, column) for column in AUDIT_VALUE_COLUMNS})
+        columns.update(
+            timestamp=record.timestamp,
+            enter_long=record.enter_long,
+            enter_short=record.enter_short,
+            stage_code=stage_code,
+        )
+        self.records.append_columns(record.pair, columns)
         
         # Update statistics
-        self.stage_stats['do_predict'].update(record.do_predict)
-        self.stage_stats['di_ok'].update(record.di_ok)
-        self.stage_stats['vol_ok'].update(record.vol_ok)
-        self.stage_stats['regime_ok'].update(record.regime_ok)
-        self.stage_stats['trend_strength_ok'].update(record.trend_strength_ok)
-        self.stage_stats['z_score_signal'].update(record.z_score_signal)
-        self.stage_stats['quantile_ok'].update(record.quantile_ok)
-        self.stage_stats['governance_ok'].update(record.governance_ok)
+        for gate, _ in GATE_STAGES:
+            self.stage_stats[gate].update(getattr(record, gate))
         
         # Update counters
         self.total_candles_processed += 1
@@ -218,6 +258,149 @@ class SignalAuditLogger:
         # Alerts
         self._check_alerts()
     
+    def log_gate_arrays(
+        self,
+        pair: str,
+        do_predict,
+        di_ok,
+        vol_ok,
+        ts_ok_long,
+        ts_ok_short,
+        long_sig,
+        short_sig,
+        governance_ok=True,
+        allow_shorts=True,
+        regime_ok=True,
+        quantile_ok=True,
+        enter_long=None,
+        enter_short=None,
+        timestamps=None,
+        values: Optional[Dict[str, Any]] = None,
+    ) -> int:
+        """
+        Log a batch of candles from the strategy's boolean gate arrays.
+        
+        Gates are directional in the strategy, so the trend gate passes if
+        either side passes, and the z-score gate passes only for a crossing
+        on a side whose trend gate also passed. Scalars are broadcast (e.g.
+        governance flags). Rejection stages are derived with np.select and
+        all counters are updated once per call.
+        
+        When timestamps are given, candles at or before the last audited
+        candle for this pair are skipped, so the full dataframe can be passed
+        on every call and only new candles are counted.
+        
+        Args:
+            pair: Trading pair
+            do_predict, di_ok, vol_ok: Filter masks
+            ts_ok_long, ts_ok_short: Trend strength masks per side
+            long_sig, short_sig: Z-score crossing masks per side
+            governance_ok: Governance allows new entries
+            allow_shorts: Governance allows short entries
+            regime_ok, quantile_ok: Optional extra gates (default: pass)
+            enter_long, enter_short: Final entry masks (derived if None)
+            timestamps: Candle timestamps (e.g. dataframe['date'])
+            values: Optional diagnostic columns (see AUDIT_VALUE_COLUMNS)
+            
+        Returns:
+            Number of candles logged
+        """
+        arrays = [x for x in (do_predict, di_ok, vol_ok, ts_ok_long, ts_ok_short,
+                              long_sig, short_sig, timestamps) if np.ndim(x)]
+        if not arrays:
+            raise ValueError("At least one gate array or timestamps is required")
+        n = len(arrays[0])
+        
+        def as_mask(x) -> np.ndarray:
+            return np.broadcast_to(np.asarray(x, dtype=bool), (n,))
+        
+        do_predict, di_ok, vol_ok = as_mask(do_predict), as_mask(di_ok), as_mask(vol_ok)
+        ts_ok_long, ts_ok_short = as_mask(ts_ok_long), as_mask(ts_ok_short)
+        long_sig, short_sig = as_mask(long_sig), as_mask(short_sig)
+        
+        long_setup = ts_ok_long & long_sig
+        short_setup = ts_ok_short & short_sig
+        gates = {
+            'do_predict': do_predict,
+            'di_ok': di_ok,
+            'vol_ok': vol_ok,
+            'regime_ok': as_mask(regime_ok),
+            'trend_strength_ok': ts_ok_long | ts_ok_short,
+            'z_score_signal': long_setup | short_setup,
+            'quantile_ok': as_mask(quantile_ok),
+            'governance_ok': as_mask(governance_ok) & (long_setup | as_mask(allow_shorts)),
+        }
+        
+        passed_all = np.logical_and.reduce(list(gates.values()))
+        if enter_long is None:
+            enter_long = passed_all & long_setup
+        if enter_short is None:
+            enter_short = passed_all & short_setup & as_mask(allow_shorts)
+        enter_long, enter_short = as_mask(enter_long), as_mask(enter_short)
+        
+        # Only audit candles newer than the last batch for this pair
+        keep = slice(None)
+        ts = None
+        if timestamps is not None:
+            ts = np.asarray(timestamps, dtype='datetime64[ns]')
+            last = self._last_timestamp.get(pair)
+            if last is not None:
+                keep = ts > last
+                if not keep.any():
+                    return 0
+                ts = ts[keep]
+            self._last_timestamp[pair] = ts.max()
+        
+        gates = {gate: mask[keep] for gate, mask in gates.items()}
+        enter_long, enter_short = enter_long[keep], enter_short[keep]
+        entered = enter_long | enter_short
+        n_new = len(entered)
+        
+        # First failing stage: code i+1 for GATE_STAGES[i], 0 = passed all
+        stage_codes = np.select(
+            [~gates[gate] for gate, _ in GATE_STAGES],
+            np.arange(1, len(GATE_STAGES) + 1),
+            default=0,
+        )
+        for gate, mask in gates.items():
+            passed = int(np.count_nonzero(mask))
+            self.stage_stats[gate].update_many(passed, n_new - passed)
+        
+        # Store batch (rejection counts are updated by the store)
+        columns = dict(gates)
+        values = values or {}
+        for column, default in AUDIT_VALUE_COLUMNS.items():
+            value = values.get(column, default)
+            columns[column] = np.broadcast_to(np.asarray(value), (n,))[keep] if np.ndim(value) else value
+        columns.update(
+            enter_long=enter_long,
+            enter_short=enter_short,
+            stage_code=stage_codes,
+        )
+        if ts is not None:
+            columns['timestamp'] = ts
+        self.records.append_columns(pair, columns)
+        
+        # Update counters
+        previous_total = self.total_candles_processed
+        self.total_candles_processed += n_new
+        trades = int(np.count_nonzero(entered))
+        self.total_trades_entered += trades
+        if trades:
+            self.candles_since_last_trade = n_new - 1 - int(np.flatnonzero(entered)[-1])
+        else:
+            self.candles_since_last_trade += n_new
+        
+        # Periodic logging (once per batch if a multiple was crossed)
+        every = self.config.log_every_n_candles
+        if self.total_candles_processed // every > previous_total // every:
+            self._log_periodic_summary()
+        
+        # Alerts
+        self._check_alerts()
+        
+        return n_new
+    
     def _log_periodic_summary(self) -> None:
         """Log periodic summary of gating statistics"""
         logger.info(
@@ -279,23 +462,51 @@ class SignalAuditLogger:
         Returns:
             Path to exported CSV file
         """
-        if not self.records:
+        if len(self.records) == 0:
             logger.warning("No records to export")
             return None
         
         filename = filename or self.config.csv_filename
         output_path = self.config.output_dir / filename
         
-        # Convert records to DataFrame
-        df = pd.DataFrame([r.to_dict() for r in self.records])
+        # Spilled chunks (Parquet or .npy) and in-memory rows as one DataFrame
+        df = self.records.to_frame()
+        if self.exporter is not None:
+            self.exporter.flush()
+            exported = read_audit_dataset(self.exporter.root_dir, files=self.exporter.files)
+            df = pd.concat([exported[df.columns], df], ignore_index=True)
         
         # Export to CSV
         df.to_csv(output_path, index=False)
         
-        logger.info(f"Exported {len(self.records)} records to {output_path}")
+        logger.info(f"Exported {len(df)} records to {output_path}")
         
         return output_path
     
+    def export_to_parquet(self) -> List[Path]:
+        """
+        Append all in-memory records to the partitioned Parquet dataset.
+        
+        Rows already exported are not written again; each call adds new part
+        files under output_dir/parquet_dirname.
+        
+        Returns:
+            Part files written by this session so far
+        """
+        if self.exporter is None:
+            logger.warning("Parquet export disabled (set SignalAuditConfig.parquet_export)")
+            return []
+        
+        self.records.flush()
+        self.exporter.flush()
+        
+        logger.info(
+            f"Exported {self.exporter.rows_written} records to {self.exporter.root_dir} "
+            f"({len(self.exporter.files)} part files)"
+        )
+        
+        return list(self.exporter.files)
+    
     def get_summary_report(self) -> Dict:
         """
         Generate summary report of gating funnel performance.
@@ -303,7 +514,7 @@ class SignalAuditLogger:
         Returns:
             Dictionary with summary statistics
         """
-        if not self.records:
+        if self.total_candles_processed == 0:
             return {}
         
         # Overall stats
@@ -320,14 +531,12 @@ class SignalAuditLogger:
                 'rejection_rate_pct': stats.rejection_rate_pct,
             }
         
-        # Rejection reasons distribution
-        rejection_counts = {}
-        for record in self.records:
-            if record.rejection_stage:
-                rejection_counts[record.rejection_stage] = \
-                    rejection_counts.get(record.rejection_stage, 0) + 1
-        
-        # Sort by count
+        # Rejection reasons distribution (maintained incrementally by the store)
+        rejection_counts = {
+            stage: int(count)
+            for stage, count in zip(STAGE_LABELS[1:], self.records.stage_counts[1:])
+            if count
+        }
         top_rejection_reasons = sorted(
             rejection_counts.items(),
             key=lambda x: x[1],
@@ -0,0 +1,308 @@
+"""
+Stage Timer
+
+Per-stage, per-pair latency histograms for the strategy hot path
+(freqai.start, the feature hooks, set_freqai_targets, entry/exit trend and
+the trade callbacks). Stages are timed with a context manager or a method
+decorator; each (stage, pair) keeps an HDR-style log-linear histogram with
+128 sub-buckets per power of two (under 1% relative error) in a fixed-size
+integer list, so recording is an index computation and an increment.
+
+Timing can be switched on and off at runtime (attribute or toggle file);
+when off the context manager is a shared no-op. Snapshots are dumped to
+JSON at intervals.
+
+Author: Strategy Team
+Version: 1.0.0
+Created: October 2025
+"""
+
+import contextlib
+import functools
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SUB_BUCKET_BITS = 7
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS                  # 128
+MAX_SHIFT = 36                                       # Up to ~2^43 ns (~2.4 h)
+BUCKET_COUNT = (MAX_SHIFT + 2) * SUB_BUCKETS
+ALL_PAIRS = '*'
+
+_NULL_CONTEXT = contextlib.nullcontext()
+
+
+def bucket_index(value: int) -> int:
+    """Log-linear bucket of a non-negative integer value"""
+    if value < 2 * SUB_BUCKETS:
+        return max(value, 0)
+    shift = min(value.bit_length() - SUB_BUCKET_BITS - 1, MAX_SHIFT)
+    return min(shift * SUB_BUCKETS + (value >> shift), BUCKET_COUNT - 1)
+
+
+def bucket_lower(index: int) -> int:
+    """Smallest value falling into a bucket"""
+    if index < 2 * SUB_BUCKETS:
+        return index
+    shift = index // SUB_BUCKETS - 1
+    return (index - shift * SUB_BUCKETS) << shift
+
+
+def bucket_upper(index: int) -> int:
+    """Largest value falling into a bucket"""
+    if index < 2 * SUB_BUCKETS:
+        return index
+    shift = index // SUB_BUCKETS - 1
+    return bucket_lower(index) + (1 << shift) - 1
+
+
+class LatencyHistogram:
+    """
+    Log-linear histogram of nanosecond latencies.
+    
+    Percentiles report the upper bound of the bucket holding the requested
+    rank, clipped to the recorded maximum.
+    """
+    
+    __slots__ = ('counts', 'count', 'total', 'min', 'max')
+    
+    def __init__(self):
+        self.counts: List[int] = [0] * BUCKET_COUNT
+        self.count = 0
+        self.total = 0
+        self.min: Optional[int] = None
+        self.max: Optional[int] = None
+    
+    def record(self, value_ns: int) -> None:
+        self.counts[bucket_index(value_ns)] += 1
+        self.count += 1
+        self.total += value_ns
+        if self.min is None or value_ns < self.min:
+            self.min = value_ns
+        if self.max is None or value_ns > self.max:
+            self.max = value_ns
+    
+    def merge(self, other: "LatencyHistogram") -> "LatencyHistogram":
+        """Add another histogram's recordings to this one"""
+        for index, n in enumerate(other.counts):
+            if n:
+                self.counts[index] += n
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+        return self
+    
+    def percentile(self, q: float) -> Optional[int]:
+        """Latency (ns) at percentile q in [0, 100]; None if empty"""
+        if not self.count:
+            return None
+        rank = max(1, int(round(q / 100.0 * self.count)))
+        seen = 0
+        for index, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return min(bucket_upper(index), self.max)
+        return self.max
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Summary plus the non-empty buckets ({lower bound ns: count})"""
+        return {
+            'count': self.count,
+            'min_ns': self.min,
+            'max_ns': self.max,
+            'mean_ns': self.total / self.count if self.count else None,
+            'p50_ns': self.percentile(50),
+            'p90_ns': self.percentile(90),
+            'p99_ns': self.percentile(99),
+            'p999_ns': self.percentile(99.9),
+            'buckets': {str(bucket_lower(i)): n for i, n in enumerate(self.counts) if n},
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LatencyHistogram":
+        hist = cls()
+        for lower, n in data.get('buckets', {}).items():
+            hist.counts[bucket_index(int(lower))] += n
+        hist.count = data.get('count', 0)
+        hist.min = data.get('min_ns')
+        hist.max = data.get('max_ns')
+        hist.total = int(round((data.get('mean_ns') or 0) * hist.count))
+        return hist
+
+
+class StageTimer:
+    """
+    Per-stage, per-pair latency histograms with a runtime switch.
+    
+    Usage:
+        timer = StageTimer(enabled=True, dump_path="user_data/stage_timing.json")
+        with timer.stage("freqai.start", pair):
+            ...
+        timer.maybe_dump()   # Once per bot loop; writes every dump_interval seconds
+    
+    Args:
+        enabled: Start with timing on
+        dump_path: JSON file written by dump()/maybe_dump() (None = no dumps)
+        dump_interval: Seconds between maybe_dump() writes
+        toggle_file: If set, maybe_dump() turns timing on while this file
+            exists and off when it does not (switch without a restart)
+    """
+    
+    def __init__(
+        self,
+        enabled: bool = False,
+        dump_path: Optional[Path] = None,
+        dump_interval: float = 300.0,
+        toggle_file: Optional[Path] = None,
+    ):
+        self.enabled = enabled
+        self.dump_path = Path(dump_path) if dump_path else None
+        self.dump_interval = dump_interval
+        self.toggle_file = Path(toggle_file) if toggle_file else None
+        self._histograms: Dict[str, Dict[str, LatencyHistogram]] = {}
+        self._lock = threading.Lock()
+        self._started = time.time()
+        self._last_dump = time.monotonic()
+    
+    def record(self, stage: str, pair: Optional[str], elapsed_ns: int) -> None:
+        """Add one latency to the (stage, pair) histogram"""
+        with self._lock:
+            pairs = self._histograms.get(stage)
+            if pairs is None:
+                pairs = self._histograms[stage] = {}
+            key = pair or ALL_PAIRS
+            hist = pairs.get(key)
+            if hist is None:
+                hist = pairs[key] = LatencyHistogram()
+            hist.record(elapsed_ns)
+    
+    @contextlib.contextmanager
+    def _timed(self, stage: str, pair: Optional[str]) -> Iterator[None]:
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.record(stage, pair, time.perf_counter_ns() - start)
+    
+    def stage(self, stage: str, pair: Optional[str] = None):
+        """Context manager timing its body (a shared no-op while disabled)"""
+        if not self.enabled:
+            return _NULL_CONTEXT
+        return self._timed(stage, pair)
+    
+    def histogram(self, stage: str, pair: Optional[str] = None) -> Optional[LatencyHistogram]:
+        """Histogram of one pair, or of all pairs merged when pair is None"""
+        with self._lock:
+            pairs = self._histograms.get(stage)
+            if not pairs:
+                return None
+            if pair is not None:
+                return pairs.get(pair)
+            return functools.reduce(LatencyHistogram.merge, pairs.values(), LatencyHistogram())
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON-ready summary: per stage, every pair plus all pairs merged"""
+        with self._lock:
+            stages = {name: dict(pairs) for name, pairs in self._histograms.items()}
+        result = {}
+        for name, pairs in sorted(stages.items()):
+            merged = functools.reduce(LatencyHistogram.merge, pairs.values(), LatencyHistogram())
+            result[name] = {'all': merged.to_dict(), 'pairs': {p: h.to_dict() for p, h in sorted(pairs.items())}}
+        return {
+            'generated_at': time.time(),
+            'started_at': self._started,
+            'enabled': self.enabled,
+            'stages': result,
+        }
+    
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+        self._started = time.time()
+    
+    def dump(self, path: Optional[Path] = None, snapshot: Optional[Dict[str, Any]] = None) -> Optional[Path]:
+        """Write a snapshot as JSON (atomic replace)"""
+        path = Path(path) if path else self.dump_path
+        if path is None:
+            return None
+        data = snapshot if snapshot is not None else self.snapshot()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, indent=1)
+        os.replace(tmp, path)
+        return path
+    
+    def maybe_dump(self, submit: Optional[Callable[..., Any]] = None) -> bool:
+        """
+        Apply the toggle file and write a snapshot if dump_interval elapsed.
+        
+        Args:
+            submit: Runs the file write, e.g. a background writer's submit;
+                the snapshot itself is taken on the calling thread
+        
+        Returns:
+            Whether a dump was started
+        """
+        if self.toggle_file is not None:
+            enabled = self.toggle_file.exists()
+            if enabled != self.enabled:
+                logger.info(f"Stage timing {'enabled' if enabled else 'disabled'} via {self.toggle_file}")
+                self.enabled = enabled
+        now = time.monotonic()
+        if self.dump_path is None or now - self._last_dump < self.dump_interval:
+            return False
+        self._last_dump = now
+        if not self._histograms:
+            return False
+        snapshot = self.snapshot()
+        if submit is not None:
+            submit(self.dump, None, snapshot)
+        else:
+            self.dump(None, snapshot)
+        return True
+
+
+def _pair_of(args: tuple, kwargs: dict) -> Optional[str]:
+    """Pair from a metadata dict (feature hooks, trend methods) or a pair argument (callbacks)"""
+    metadata = kwargs.get('metadata')
+    if metadata is None:
+        metadata = next((a for a in args if isinstance(a, dict) and 'pair' in a), None)
+    if isinstance(metadata, dict):
+        return metadata.get('pair')
+    pair = kwargs.get('pair')
+    if pair is None and args and isinstance(args[0], str):
+        pair = args[0]
+    return pair
+
+
+def timed_stage(stage: str) -> Callable:
+    """
+    Decorator timing a strategy method as a stage of self._get_stage_timer()
+    (None or a disabled timer runs the method as is).
+    
+    The pair is taken from the metadata dict or the pair argument.
+    """
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(self, *args, **kwargs):
+            get_timer = getattr(self, '_get_stage_timer', None)
+            timer = get_timer() if get_timer is not None else None
+            if timer is None or not timer.enabled:
+                return fn(self, *args, **kwargs)
+            start = time.perf_counter_ns()
+            try:
+                return fn(self, *args, **kwargs)
+            finally:
+                timer.record(stage, _pair_of(args, kwargs), time.perf_counter_ns() - start)
+        return wrapper
+    return decorator
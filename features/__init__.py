@@ -0,0 +1,30 @@
+"""
+Features Package
+
+Feature computation infrastructure for the strategy's FreqAI hooks:
+- Feature store: Month-partitioned Parquet cache of hook outputs (optional pyarrow)
+- Shared feature blocks: Corr-pair hook outputs computed once per bot cycle
+- Resampler: Higher timeframes derived incrementally from base candles
+- Batched features: Regime and rolling features for all pairs over a pairs x time tensor
+
+Author: Strategy Team
+Version: 1.0.0
+"""
+
+from features.batched_features import BatchedFeatureEngine, PairTensor, batched_features
+from features.feature_store import FeatureStore, cached_features, schema_hash
+from features.resampler import MultiTimeframeResampler, OHLCVAggregator, ResampledDataProvider
+from features.shared_features import SharedFeatureBlocks
+
+__all__ = [
+    'BatchedFeatureEngine',
+    'FeatureStore',
+    'MultiTimeframeResampler',
+    'OHLCVAggregator',
+    'PairTensor',
+    'ResampledDataProvider',
+    'SharedFeatureBlocks',
+    'batched_features',
+    'cached_features',
+    'schema_hash',
+]
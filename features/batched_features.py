@@ -0,0 +1,399 @@
+"""
+Cross-Pair Batched Features
+
+FreqAI runs feature_engineering_standard and _expand_basic once per pair
+and timeframe, so with 100+ whitelist pairs a cycle becomes thousands of
+small TA-Lib and pandas calls on a few hundred rows each, dominated by
+Python overhead.
+
+PairTensor stacks the candles of all pairs of one timeframe into
+(pairs x time) float arrays on a common date grid; pairs with a shorter
+history are right-aligned and NaN-padded on the left. The regime features
+(EMA trend strength, ATR volatility regime, volume regime, market regime and
+its rolling means) and the rolling volatility/volume stats are then computed
+for all pairs in one set of array operations, reproducing TA-Lib's EMA/ATR
+seeding per row. BatchedFeatureEngine does this once per cycle and timeframe
+and hands each pair's pipeline its slice, joined by date, so the number of
+array operations per cycle no longer grows with the number of pairs.
+
+Pairs whose candles cannot be placed on the grid (gaps, missing values) and
+frames that do not match the stacked candles fall back to the per-pair hook,
+as do frames starting after the pair's first stacked candle: their EMA/ATR
+seeds and rolling windows start later than the stacked history's.
+
+Author: Strategy Team
+Version: 1.0.0
+Created: October 2025
+"""
+
+import functools
+import logging
+import threading
+from typing import Callable, Dict, List, Mapping, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+TENSOR_COLUMNS = ('high', 'low', 'close', 'volume')
+
+
+class PairTensor:
+    """
+    Candles of several pairs as (pairs x time) arrays on a common date grid.
+    
+    Attributes:
+        pairs: Row labels
+        dates: Date grid (UTC)
+        start: First valid column of each row
+        values: Column -> (pairs x time) float64 array
+    """
+    
+    def __init__(self, pairs: List[str], dates: pd.DatetimeIndex, start: np.ndarray, values: Dict[str, np.ndarray]):
+        self.pairs = pairs
+        self.dates = dates
+        self.start = start
+        self.values = values
+        self._rows = {pair: i for i, pair in enumerate(pairs)}
+        self._grid = pd.Index(dates.as_unit('ns').asi8)
+    
+    def __len__(self) -> int:
+        return len(self.pairs)
+    
+    def __contains__(self, pair: str) -> bool:
+        return pair in self._rows
+    
+    def row(self, pair: str) -> int:
+        return self._rows[pair]
+    
+    @property
+    def valid(self) -> np.ndarray:
+        """Mask of the columns each row has candles for"""
+        return np.arange(len(self.dates)) >= self.start[:, None]
+    
+    def positions(self, pair: str, dataframe: pd.DataFrame) -> Optional[np.ndarray]:
+        """
+        Grid columns of dataframe's candles if they are this pair's stacked
+        candles from its first one on, else None.
+        """
+        if pair not in self._rows or 'close' not in dataframe.columns:
+            return None
+        row = self._rows[pair]
+        positions = self._grid.get_indexer(_utc_ns(dataframe['date']))
+        if positions[0] != self.start[row] or (positions < self.start[row]).any():
+            return None
+        close = dataframe['close'].to_numpy(dtype=np.float64, na_value=np.nan)
+        if not np.array_equal(close, self.values['close'][row, positions]):
+            return None
+        return positions
+
+
+def _utc_ns(dates: pd.Series) -> np.ndarray:
+    """Dates as int64 UTC nanoseconds"""
+    index = pd.DatetimeIndex(dates)
+    index = index.tz_localize('UTC') if index.tz is None else index.tz_convert('UTC')
+    return index.as_unit('ns').asi8
+
+
+def stack_pairs(frames: Mapping[str, pd.DataFrame], columns=TENSOR_COLUMNS) -> Optional[PairTensor]:
+    """
+    Stack candle frames into a PairTensor.
+    
+    The grid is the union of all dates. A pair is stacked only if its dates
+    are the last rows of the grid (no gaps, same newest candle) and its
+    columns hold no missing values; others are left out.
+    
+    Returns:
+        The tensor, or None if no pair could be stacked
+    """
+    usable = {}
+    for pair, frame in frames.items():
+        if frame is None or len(frame) == 0 or any(c not in frame.columns for c in columns):
+            continue
+        block = [frame[col].to_numpy(dtype=np.float64, na_value=np.nan) for col in columns]
+        if any(np.isnan(values).any() for values in block):
+            continue
+        usable[pair] = (_utc_ns(frame['date']), block)
+    if not usable:
+        return None
+    grid = np.unique(np.concatenate([dates for dates, _ in usable.values()]))
+    pairs, starts = [], []
+    for pair, (dates, _) in usable.items():
+        start = len(grid) - len(dates)
+        if np.array_equal(dates, grid[start:]):
+            pairs.append(pair)
+            starts.append(start)
+        else:
+            logger.debug(f"{pair} candles do not end on the common grid; not batched")
+    if not pairs:
+        return None
+    values = {col: np.full((len(pairs), len(grid)), np.nan) for col in columns}
+    for row, (pair, start) in enumerate(zip(pairs, starts)):
+        for col, column_values in zip(columns, usable[pair][1]):
+            values[col][row, start:] = column_values
+    dates = pd.DatetimeIndex(grid.astype('datetime64[ns]')).tz_localize('UTC')
+    return PairTensor(pairs, dates, np.asarray(starts, dtype=np.int64), values)
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """Rolling mean along time (NaN until window valid values, as pandas)"""
+    out = np.full(values.shape, np.nan)
+    if values.shape[1] < window:
+        return out
+    missing = np.isnan(values)
+    sums = np.cumsum(np.where(missing, 0.0, values), axis=1)
+    counts = np.cumsum(missing, axis=1)
+    sums = np.concatenate([np.zeros((len(values), 1)), sums], axis=1)
+    counts = np.concatenate([np.zeros((len(values), 1), dtype=counts.dtype), counts], axis=1)
+    window_sums = sums[:, window:] - sums[:, :-window]
+    complete = counts[:, window:] == counts[:, :-window]
+    out[:, window - 1:] = np.where(complete, window_sums / window, np.nan)
+    return out
+
+
+def rolling_std(values: np.ndarray, window: int) -> np.ndarray:
+    """Rolling sample standard deviation along time (NaN for windows with missing values)"""
+    out = np.full(values.shape, np.nan)
+    if values.shape[1] < window:
+        return out
+    windows = np.lib.stride_tricks.sliding_window_view(values, window, axis=1)
+    out[:, window - 1:] = windows.std(axis=-1, ddof=1)
+    return out
+
+
+def _seed_windows(values: np.ndarray, first: np.ndarray, period: int) -> np.ndarray:
+    """Mean of values[row, first:first + period] per row (NaN where the row is too short)"""
+    width = values.shape[1]
+    columns = first[:, None] + np.arange(period)
+    inside = columns < width
+    gathered = np.take_along_axis(values, np.minimum(columns, width - 1), axis=1)
+    return np.where(inside.all(axis=1), gathered.mean(axis=1), np.nan)
+
+
+def _ema_spec(values: np.ndarray, period: int, start: np.ndarray) -> tuple:
+    """TA-Lib EMA: SMA of the first period values at start + period - 1, then k = 2 / (period + 1)"""
+    return values, _seed_windows(values, start, period), start + period - 1, 2.0 / (period + 1)
+
+
+def _atr_spec(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int, start: np.ndarray) -> tuple:
+    """TA-Lib ATR: SMA of true ranges 1..period at start + period, then Wilder smoothing"""
+    prev = np.concatenate([np.full((len(close), 1), np.nan), close[:, :-1]], axis=1)
+    true_range = np.maximum(high - low, np.maximum(np.abs(high - prev), np.abs(low - prev)))
+    return true_range, _seed_windows(true_range, start + 1, period), start + period, 1.0 / period
+
+
+def _seeded_recursions(*specs: tuple) -> List[np.ndarray]:
+    """
+    Run exponential recursions y = y + k * (x - y) for all rows of all
+    specs (values, seed, seed_at, k) in one pass over time: the loop is
+    over candles, each step a vector operation over every pair.
+    """
+    values = np.concatenate([spec[0] for spec in specs]).T.copy()
+    seed = np.concatenate([spec[1] for spec in specs])
+    seed_at = np.concatenate([spec[2] for spec in specs])
+    alpha = np.concatenate([np.full(len(spec[0]), spec[3]) for spec in specs])
+    width, rows = values.shape
+    out = np.full((width, rows), np.nan)
+    seeded = seed_at < width
+    if seeded.any():
+        seeds_at = {}
+        for row in np.flatnonzero(seeded):
+            seeds_at.setdefault(int(seed_at[row]), []).append(row)
+        prev = np.full(rows, np.nan)
+        for t in range(int(seed_at[seeded].min()), width):
+            prev = prev + alpha * (values[t] - prev)
+            starting = seeds_at.get(t)
+            if starting is not None:
+                prev[starting] = seed[starting]
+            out[t] = prev
+    out = out.T
+    bounds = np.cumsum([0] + [len(spec[0]) for spec in specs])
+    return [out[a:b] for a, b in zip(bounds[:-1], bounds[1:])]
+
+
+def ema(values: np.ndarray, period: int, start: np.ndarray) -> np.ndarray:
+    """TA-Lib EMA of each row, starting at the row's first valid column"""
+    return _seeded_recursions(_ema_spec(values, period, start))[0]
+
+
+def atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int, start: np.ndarray) -> np.ndarray:
+    """TA-Lib ATR of each row, starting at the row's first valid column"""
+    return _seeded_recursions(_atr_spec(high, low, close, period, start))[0]
+
+
+def regime_features(tensor: PairTensor, trend_threshold: float = 0.005,
+                    volatility_threshold: float = 1.0) -> Dict[str, np.ndarray]:
+    """Batched feature_engineering_standard: time, trend/volatility/volume regime and market regime"""
+    v = tensor.values
+    close, volume = v['close'], v['volume']
+    days = np.asarray((tensor.dates.dayofweek + 1) / 7, dtype=np.float64)
+    hours = np.asarray((tensor.dates.hour + 1) / 25, dtype=np.float64)
+    ema_short, ema_long, atr_20 = _seeded_recursions(
+        _ema_spec(close, 20, tensor.start),
+        _ema_spec(close, 50, tensor.start),
+        _atr_spec(v['high'], v['low'], close, 20, tensor.start),
+    )
+    volume_ma = rolling_mean(volume, 20)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        trend_strength = np.where(ema_long != 0, (ema_short - ema_long) / ema_long, 0)
+        volatility_regime = np.where(close != 0, atr_20 / close, 0)
+        volume_regime = np.where(volume_ma != 0, volume / volume_ma, 1)
+    
+    # 0 = Range, 1 = Trending Up, 2 = Trending Down, 3 = High Volatility
+    trend_up = trend_strength > trend_threshold
+    trend_down = trend_strength < -trend_threshold
+    high_vol = volatility_regime > volatility_threshold * 0.02
+    market_regime = np.zeros(close.shape, dtype=np.int64)
+    market_regime[trend_up & ~high_vol] = 1
+    market_regime[trend_down & ~high_vol] = 2
+    market_regime[high_vol] = 3
+    # Padding must not enter the rolling windows of a pair's first candles
+    regime = np.where(tensor.valid, market_regime, np.nan)
+    
+    return {
+        '%-day_of_week': days,
+        '%-hour_of_day': hours,
+        '%-trend_strength': trend_strength,
+        '%-volatility_regime': volatility_regime,
+        '%-volume_regime': volume_regime,
+        '%-market_regime': market_regime,
+        '%-regime_short': rolling_mean(regime, 10),
+        '%-regime_medium': rolling_mean(regime, 50),
+        '%-regime_long': rolling_mean(regime, 200),
+    }
+
+
+def basic_features(tensor: PairTensor) -> Dict[str, np.ndarray]:
+    """Batched feature_engineering_expand_basic: returns, raw values and rolling volatility/volume stats"""
+    close, volume = tensor.values['close'], tensor.values['volume']
+    prev = np.concatenate([np.full((len(close), 1), np.nan), close[:, :-1]], axis=1)
+    return {
+        '%-pct-change': close / prev - 1,
+        '%-raw_volume': volume,
+        '%-raw_price': close,
+        '%-volatility': rolling_std(close, 20),
+        '%-volume_mean_20': rolling_mean(volume, 20),
+        '%-volume_std_20': rolling_std(volume, 20),
+    }
+
+
+BATCHED_HOOKS: Dict[str, Callable[..., Dict[str, np.ndarray]]] = {
+    'feature_engineering_standard': regime_features,
+    'feature_engineering_expand_basic': basic_features,
+}
+
+
+class BatchedFeatureEngine:
+    """
+    Per-cycle batched feature hooks over all pairs of a timeframe.
+    
+    Usage:
+        engine = BatchedFeatureEngine(lambda tf: {p: dp.get_pair_dataframe(p, tf) for p in pairs})
+        engine.new_cycle()                                   # Start of every bot iteration
+        result = engine.compute('feature_engineering_expand_basic', pair, '1h', dataframe)
+        if result is None: ...                               # Run the per-pair hook
+    
+    Args:
+        source: Timeframe -> {pair: candles} of every pair to stack
+        hooks: Hook name -> kernel(tensor, **params) returning
+            {column: (pairs x time) or (time,) array} in the hook's column order
+    """
+    
+    def __init__(
+        self,
+        source: Callable[[str], Mapping[str, pd.DataFrame]],
+        hooks: Optional[Mapping[str, Callable[..., Dict[str, np.ndarray]]]] = None,
+    ):
+        self.source = source
+        self.hooks = dict(BATCHED_HOOKS if hooks is None else hooks)
+        self._tensors: Dict[str, Optional[PairTensor]] = {}
+        self._features: Dict[tuple, Dict[str, np.ndarray]] = {}
+        self._lock = threading.Lock()
+        self.stats = {'batches': 0, 'served': 0, 'fallback': 0, 'cycles': 0}
+    
+    def new_cycle(self) -> None:
+        """Drop last cycle's tensors and features"""
+        with self._lock:
+            self._tensors.clear()
+            self._features.clear()
+            self.stats['cycles'] += 1
+    
+    def _tensor(self, timeframe: str) -> Optional[PairTensor]:
+        if timeframe not in self._tensors:
+            self._tensors[timeframe] = stack_pairs(self.source(timeframe))
+        return self._tensors[timeframe]
+    
+    def compute(self, hook: str, pair: str, timeframe: str, dataframe: pd.DataFrame,
+                **params) -> Optional[pd.DataFrame]:
+        """
+        Batched output of a feature hook for one pair.
+        
+        Args:
+            hook: Key of hooks
+            pair, timeframe: The pipeline's pair and candle timeframe
+            dataframe: Hook input (must have date and close columns)
+            **params: Passed to the kernel (e.g. hyperopt thresholds)
+        
+        Returns:
+            dataframe with the feature columns added, or None when the pair
+            is not batched and the per-pair hook must run
+        """
+        kernel = self.hooks.get(hook)
+        if kernel is None or dataframe is None or len(dataframe) == 0 or 'date' not in dataframe.columns:
+            return None
+        with self._lock:
+            tensor = self._tensor(timeframe)
+            positions = tensor.positions(pair, dataframe) if tensor is not None else None
+            if positions is None:
+                self.stats['fallback'] += 1
+                return None
+            key = (timeframe, hook, tuple(sorted(params.items())))
+            features = self._features.get(key)
+            if features is None:
+                features = self._features[key] = kernel(tensor, **params)
+                self.stats['batches'] += 1
+            self.stats['served'] += 1
+        row = tensor.row(pair)
+        columns = {col: (values[row, positions] if values.ndim == 2 else values[positions])
+                   for col, values in features.items()}
+        result = dataframe.drop(columns=[c for c in columns if c in dataframe.columns])
+        return pd.concat([result, pd.DataFrame(columns, index=dataframe.index)], axis=1)
+    
+    def summary(self) -> Dict[str, int]:
+        """Counters plus the pairs stacked per timeframe this cycle"""
+        with self._lock:
+            stacked = {tf: len(t) if t is not None else 0 for tf, t in self._tensors.items()}
+        return {**self.stats, 'stacked': stacked}
+
+
+def batched_features(hook: str, **params: str) -> Callable:
+    """
+    Decorator serving a strategy feature hook from self._get_batch_engine()
+    (None, or a pair the engine cannot serve, runs the hook as is).
+    
+    Args:
+        hook: Key of the engine's hooks
+        **params: Kernel keyword -> strategy attribute; hyperopt parameters
+            are passed by their .value
+    """
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(self, dataframe, *args, **kwargs):
+            get_engine = getattr(self, '_get_batch_engine', None)
+            engine = get_engine() if get_engine is not None else None
+            if engine is not None:
+                metadata = kwargs.get('metadata', args[0] if args else None) or {}
+                pair = metadata.get('pair')
+                timeframe = metadata.get('tf') or metadata.get('timeframe') or getattr(self, 'timeframe', None)
+                if pair and timeframe:
+                    values = {}
+                    for name, attr in params.items():
+                        value = getattr(self, attr)
+                        values[name] = getattr(value, 'value', value)
+                    result = engine.compute(hook, pair, timeframe, dataframe, **values)
+                    if result is not None:
+                        return result
+            return fn(self, dataframe, *args, **kwargs)
+        return wrapper
+    return decorator
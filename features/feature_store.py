@@ -0,0 +1,342 @@
+"""
+Persistent Feature Store
+
+Caches the output of the strategy's FreqAI feature hooks
+(feature_engineering_expand_all/_expand_basic/_standard) as Parquet files
+partitioned by pair, timeframe, hook and month:
+
+    <root>/<pair>/<timeframe>/<hook>/<YYYY-MM>.parquet
+
+Each partition carries a schema hash of the feature engineering code, the
+feature parameters and the strategy's parameter values in its Parquet
+metadata; partitions with another hash are ignored and replaced. A hook call
+whose candles are already cached only computes the missing tail (plus a
+warm-up of earlier candles for rolling and recursive indicators), so reruns
+over the same history skip nearly all feature engineering.
+
+pyarrow is an optional dependency, only needed when the store is enabled.
+
+Author: Strategy Team
+Version: 1.0.0
+Created: October 2025
+"""
+
+import functools
+import hashlib
+import inspect
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Optional dependency
+    pa = pq = None
+
+logger = logging.getLogger(__name__)
+
+# Strategy hooks whose output the store caches
+FEATURE_HOOKS = (
+    'feature_engineering_expand_all',
+    'feature_engineering_expand_basic',
+    'feature_engineering_standard',
+)
+
+SCHEMA_KEY = b'feature_schema_hash'
+
+
+def _require_pyarrow() -> None:
+    if pa is None:
+        raise ImportError("The feature store requires pyarrow (pip install pyarrow)")
+
+
+def schema_hash(strategy: Any, freqai_config: Dict) -> str:
+    """
+    Hash of everything the hook outputs depend on: hook source code,
+    freqai feature_parameters and the strategy's hyperopt parameter values
+    (e.g. trend_threshold feeds %-market_regime).
+    """
+    sources = {}
+    for name in FEATURE_HOOKS:
+        method = getattr(strategy, name, None)
+        try:
+            sources[name] = inspect.getsource(method) if method is not None else None
+        except (OSError, TypeError):
+            sources[name] = getattr(method, '__qualname__', None)
+    params = {
+        name: getattr(value, 'value')
+        for name, value in sorted(vars(type(strategy)).items())
+        if hasattr(value, 'value') and hasattr(value, 'space')
+    }
+    payload = {
+        'sources': sources,
+        'feature_parameters': freqai_config.get('feature_parameters', {}),
+        'params': params,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def _slug(value: str) -> str:
+    return str(value).replace('/', '_').replace(':', '_')
+
+
+class FeatureStore:
+    """
+    Month-partitioned Parquet cache of feature hook outputs.
+    
+    Args:
+        root_dir: Store directory
+        schema: Current schema_hash
+        warmup: Candles before the missing tail recomputed with it, so rolling
+            windows and recursive indicators (EMA, ATR, RSI) have converged;
+            must exceed the longest indicator lookback
+    """
+    
+    def __init__(self, root_dir: Path, schema: str, warmup: int = 1000):
+        _require_pyarrow()
+        self.root_dir = Path(root_dir)
+        self.schema = schema
+        self.warmup = warmup
+        self.stats = {'hits': 0, 'partial': 0, 'misses': 0, 'rows_computed': 0, 'rows_cached': 0}
+    
+    @classmethod
+    def for_strategy(cls, root_dir: Path, strategy: Any, freqai_config: Dict, warmup: int = 1000) -> "FeatureStore":
+        return cls(root_dir, schema_hash(strategy, freqai_config), warmup)
+    
+    def _key_dir(self, pair: str, timeframe: str, hook: str) -> Path:
+        return self.root_dir / _slug(pair) / _slug(timeframe) / hook
+    
+    def load(self, pair: str, timeframe: str, hook: str, start=None, end=None) -> Optional[pd.DataFrame]:
+        """
+        Cached feature rows (date + feature columns) of the current schema.
+        
+        Args:
+            start, end: Only read month partitions overlapping this date range
+        
+        Returns:
+            DataFrame sorted by date, or None if nothing is cached
+        """
+        key_dir = self._key_dir(pair, timeframe, hook)
+        if not key_dir.exists():
+            return None
+        first = pd.Timestamp(start).strftime('%Y-%m') if start is not None else None
+        last = pd.Timestamp(end).strftime('%Y-%m') if end is not None else None
+        frames = []
+        for path in sorted(key_dir.glob('*.parquet')):
+            month = path.stem
+            if (first and month < first) or (last and month > last):
+                continue
+            try:
+                if (pq.read_schema(path).metadata or {}).get(SCHEMA_KEY, b'').decode() != self.schema:
+                    continue
+                frames.append(pq.read_table(path).to_pandas())
+            except (OSError, pa.ArrowException) as e:
+                logger.warning(f"Skipping unreadable feature partition {path}: {e}")
+        if not frames:
+            return None
+        return pd.concat(frames, ignore_index=True).sort_values('date', kind='stable').reset_index(drop=True)
+    
+    def first_date(self, pair: str, timeframe: str, hook: str) -> Optional[pd.Timestamp]:
+        """
+        First cached candle of the current schema, i.e. the start of the
+        history the cached features were computed over (None if nothing is cached).
+        """
+        key_dir = self._key_dir(pair, timeframe, hook)
+        if not key_dir.exists():
+            return None
+        for path in sorted(key_dir.glob('*.parquet')):
+            try:
+                if (pq.read_schema(path).metadata or {}).get(SCHEMA_KEY, b'').decode() != self.schema:
+                    continue
+                dates = pq.read_table(path, columns=['date']).to_pandas()['date']
+            except (OSError, pa.ArrowException) as e:
+                logger.warning(f"Skipping unreadable feature partition {path}: {e}")
+                continue
+            if len(dates):
+                return pd.to_datetime(dates, utc=True).min()
+        return None
+    
+    def save(self, pair: str, timeframe: str, hook: str, features: pd.DataFrame, replace: bool = False) -> List[Path]:
+        """
+        Write feature rows into their month partitions.
+        
+        Each touched month is rewritten with its cached rows merged with
+        the new ones (new rows win); partitions of another schema are removed.
+        
+        Args:
+            replace: Remove all cached partitions first (features computed
+                over a history with another start)
+        
+        Returns:
+            The written partition paths
+        """
+        key_dir = self._key_dir(pair, timeframe, hook)
+        key_dir.mkdir(parents=True, exist_ok=True)
+        for path in key_dir.glob('*.parquet'):
+            try:
+                stale = replace or (pq.read_schema(path).metadata or {}).get(SCHEMA_KEY, b'').decode() != self.schema
+            except (OSError, pa.ArrowException):
+                stale = True
+            if stale:
+                path.unlink(missing_ok=True)
+        
+        dates = pd.to_datetime(features['date'], utc=True)
+        months = dates.dt.strftime('%Y-%m')
+        written = []
+        for month, rows in features.groupby(months.to_numpy(), sort=True):
+            path = key_dir / f"{month}.parquet"
+            if path.exists():
+                cached = pq.read_table(path).to_pandas()
+                rows = pd.concat([cached[~cached['date'].isin(rows['date'])], rows], ignore_index=True)
+            rows = rows.sort_values('date', kind='stable').reset_index(drop=True)
+            table = pa.Table.from_pandas(rows, preserve_index=False)
+            table = table.replace_schema_metadata({**(table.schema.metadata or {}), SCHEMA_KEY: self.schema.encode()})
+            fd, tmp = tempfile.mkstemp(dir=key_dir, suffix='.tmp')
+            os.close(fd)
+            pq.write_table(table, tmp)
+            os.replace(tmp, path)
+            written.append(path)
+        return written
+    
+    def compute(
+        self,
+        pair: str,
+        timeframe: str,
+        hook: str,
+        dataframe: pd.DataFrame,
+        fn: Callable[[pd.DataFrame], pd.DataFrame],
+    ) -> pd.DataFrame:
+        """
+        Run a feature hook through the cache.
+        
+        Cached features were computed over the history from the first
+        cached candle. A frame starting there takes them as they are; a
+        frame starting later computes its first warmup rows itself (so its
+        leading NaNs and warm-up values are those of fn on the frame) and
+        takes the cached features after them. Candles after the last cached
+        one are computed with warm-up rows and appended to the cache. The
+        whole frame is recomputed when it starts before the cache or the
+        cache has gaps inside the frame.
+        
+        Args:
+            pair, timeframe, hook: Cache key
+            dataframe: Hook input (must have a date column)
+            fn: The hook, called with a dataframe and returning it with the
+                feature columns added
+        
+        Returns:
+            dataframe with the feature columns: those of fn on the frame,
+            except that recursive indicators past the warm-up rows carry
+            values converged over a longer history
+        """
+        if dataframe is None or len(dataframe) == 0:
+            return fn(dataframe)
+        dates = pd.to_datetime(dataframe['date'], utc=True)
+        cached = self.load(pair, timeframe, hook, dates.iloc[0], dates.iloc[-1])
+        first = self.first_date(pair, timeframe, hook) if cached is not None else None
+        
+        if cached is not None:
+            cached_dates = pd.to_datetime(cached['date'], utc=True)
+            last = cached_dates.iloc[-1]
+            covered = dates <= last
+            known = dates[covered].isin(cached_dates)
+            if dates.iloc[0] >= first and known.all():
+                tail_start = int(covered.sum())
+                feature_cols = [c for c in cached.columns if c != 'date']
+                head = 0 if dates.iloc[0] == first else min(self.warmup, tail_start)
+                pieces = [cached.loc[~cached_dates.isin(dates.iloc[:head]), ['date'] + feature_cols]]
+                computed = 0
+                
+                if head:
+                    # Leading rows as the hook computes them from the frame's own start
+                    part = fn(dataframe.iloc[:head].copy())
+                    if sorted(c for c in part.columns if c not in dataframe.columns) != sorted(feature_cols):
+                        pieces = None
+                    else:
+                        pieces.append(part[['date'] + feature_cols])
+                        computed += head
+                
+                if pieces is not None and tail_start < len(dataframe):
+                    # Recompute the tail with warm-up rows and append it to the cache
+                    begin = max(0, tail_start - self.warmup)
+                    part = fn(dataframe.iloc[begin:].copy())
+                    if sorted(c for c in part.columns if c not in dataframe.columns) != sorted(feature_cols):
+                        pieces = None
+                    else:
+                        tail = part.iloc[tail_start - begin:][['date'] + feature_cols]
+                        self.save(pair, timeframe, hook, tail)
+                        pieces.append(tail)
+                        computed += len(dataframe) - begin
+                
+                if pieces is not None:
+                    self.stats['hits' if computed == 0 else 'partial'] += 1
+                    self.stats['rows_computed'] += computed
+                    self.stats['rows_cached'] += tail_start - head
+                    merged = pd.concat(pieces, ignore_index=True)
+                    return self._attach(dataframe, dates, merged, pd.to_datetime(merged['date'], utc=True), feature_cols)
+                logger.info(f"Feature columns of {hook} for {pair} {timeframe} changed; recomputing")
+        
+        result = fn(dataframe.copy())
+        new_cols = [c for c in result.columns if c not in dataframe.columns]
+        if first is None or dates.iloc[0] <= first:
+            # A frame starting after the cache would store features of another history
+            self.save(pair, timeframe, hook, result[['date'] + new_cols], replace=first is not None and dates.iloc[0] < first)
+        self.stats['misses'] += 1
+        self.stats['rows_computed'] += len(dataframe)
+        return result
+    
+    @staticmethod
+    def _attach(dataframe, dates, features, feature_dates, feature_cols) -> pd.DataFrame:
+        """dataframe with the cached feature columns aligned by date"""
+        positions = pd.Index(feature_dates).get_indexer(dates)
+        out = dataframe.copy()
+        new = {col: features[col].to_numpy()[positions] for col in feature_cols}
+        return pd.concat([out, pd.DataFrame(new, index=out.index)], axis=1)
+
+
+def cached_features(hook: str, shared: bool = False) -> Callable:
+    """
+    Decorator routing a strategy feature hook through the strategy's
+    feature store (self._get_feature_store(); None runs the hook as is).
+    
+    The cache key is (metadata pair, metadata tf, hook[, period]).
+    
+    Args:
+        hook: Hook name used in the cache key
+        shared: Also share the output within a bot cycle through
+            self._get_shared_features() (corr-pair hooks, which FreqAI runs
+            once per whitelist pair); checked before the feature store
+    """
+    def decorator(fn: Callable) -> Callable:
+        signature = inspect.signature(fn)
+        
+        @functools.wraps(fn)
+        def wrapper(self, dataframe, *args, **kwargs):
+            get_store = getattr(self, '_get_feature_store', None)
+            store = get_store() if get_store is not None else None
+            get_shared = getattr(self, '_get_shared_features', None) if shared else None
+            blocks = get_shared() if get_shared is not None else None
+            if store is None and blocks is None:
+                return fn(self, dataframe, *args, **kwargs)
+            bound = signature.bind(self, dataframe, *args, **kwargs).arguments
+            metadata = bound.get('metadata') or bound.get('kwargs', {}).get('metadata') or {}
+            pair = metadata.get('pair')
+            timeframe = metadata.get('tf') or metadata.get('timeframe')
+            if not pair or not timeframe or 'date' not in dataframe.columns:
+                return fn(self, dataframe, *args, **kwargs)
+            key = hook if 'period' not in bound else f"{hook}-{bound['period']}"
+            compute = lambda df: fn(self, df, *args, **kwargs)
+            if store is not None:
+                hook_fn = compute
+                compute = lambda df: store.compute(pair, timeframe, key, df, hook_fn)
+            if blocks is not None:
+                return blocks.compute(pair, timeframe, key, dataframe, compute)
+            return compute(dataframe)
+        return wrapper
+    return decorator
@@ -0,0 +1,271 @@
+"""
+Incremental Multi-Timeframe Resampler
+
+FreqAI analyzes every pair on each timeframe in include_timeframes, which
+means fetching 15m and 1h candles that can be derived exactly from the 5m
+base candles. OHLCVAggregator keeps one rolling aggregation per higher
+timeframe and folds in new base candles as they close (open = first,
+high = max, low = min, close = last, volume = sum). MultiTimeframeResampler
+tracks the aggregators of every pair and reports parity against exchange
+bars. ResampledDataProvider serves the derived frames in place of
+DataProvider.get_pair_dataframe, so no extra candles are loaded or
+requested.
+
+Only closed bars are served: a bar closes when its last base candle
+arrives, or as an incomplete bar (fewer base candles than expected) when a
+later bucket starts. Buckets are aligned to the epoch, which matches
+exchange candles for timeframes up to one day.
+
+Author: Strategy Team
+Version: 1.0.0
+Created: October 2025
+"""
+
+import logging
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+OHLCV_COLUMNS = ('date', 'open', 'high', 'low', 'close', 'volume')
+
+_UNIT_MINUTES = {'m': 1, 'h': 60, 'd': 1440}
+
+
+def timeframe_to_minutes(timeframe: str) -> int:
+    """Minutes in a timeframe string ('5m', '1h', '1d')"""
+    try:
+        return int(timeframe[:-1]) * _UNIT_MINUTES[timeframe[-1]]
+    except (KeyError, ValueError, IndexError):
+        raise ValueError(f"Unsupported timeframe for resampling: {timeframe!r}")
+
+
+class OHLCVAggregator:
+    """
+    Rolling aggregation of base candles into one higher timeframe.
+    
+    Args:
+        base_minutes: Base candle length
+        target_minutes: Aggregated bar length (a multiple of base_minutes)
+        max_bars: Closed bars kept (oldest are dropped)
+    """
+    
+    def __init__(self, base_minutes: int, target_minutes: int, max_bars: int = 5000):
+        if target_minutes <= base_minutes or target_minutes % base_minutes:
+            raise ValueError(f"{target_minutes}m is not a multiple of the {base_minutes}m base timeframe")
+        self.base_ms = base_minutes * 60_000
+        self.step_ms = target_minutes * 60_000
+        self.ratio = target_minutes // base_minutes
+        self.max_bars = max_bars
+        self._bars = {name: np.empty(0, dtype=np.int64 if name in ('date', 'candles') else np.float64)
+                      for name in OHLCV_COLUMNS + ('candles',)}
+        self._partial: Optional[Tuple] = None   # (bucket, open, high, low, close, volume, candles)
+        self.last_base: Optional[int] = None    # Last folded base candle, ms since epoch
+    
+    def __len__(self) -> int:
+        return len(self._bars['date'])
+    
+    def extend(self, date_ms: np.ndarray, open_, high, low, close, volume) -> int:
+        """
+        Fold base candles (sorted by date) into the aggregation.
+        
+        Candles at or before the last folded one are ignored.
+        
+        Returns:
+            Number of bars closed by these candles
+        """
+        date_ms = np.asarray(date_ms, dtype=np.int64)
+        columns = [np.asarray(v, dtype=np.float64) for v in (open_, high, low, close, volume)]
+        if self.last_base is not None:
+            first_new = int(np.searchsorted(date_ms, self.last_base, side='right'))
+            date_ms = date_ms[first_new:]
+            columns = [v[first_new:] for v in columns]
+        if len(date_ms) == 0:
+            return 0
+        counts = np.ones(len(date_ms), dtype=np.int64)
+        buckets = date_ms - date_ms % self.step_ms
+        if self._partial is not None:
+            # Continue the open bar as a pre-aggregated leading row
+            bucket, *values, candles = self._partial
+            buckets = np.concatenate([[bucket], buckets])
+            columns = [np.concatenate([[value], v]) for value, v in zip(values, columns)]
+            counts = np.concatenate([[candles], counts])
+        
+        o, h, l, c, v = columns
+        starts = np.concatenate([[0], np.flatnonzero(np.diff(buckets)) + 1])
+        ends = np.concatenate([starts[1:], [len(buckets)]])
+        bars = {
+            'date': buckets[starts],
+            'open': o[starts],
+            'high': np.maximum.reduceat(h, starts),
+            'low': np.minimum.reduceat(l, starts),
+            'close': c[ends - 1],
+            'volume': np.add.reduceat(v, starts),
+            'candles': np.add.reduceat(counts, starts),
+        }
+        self.last_base = int(date_ms[-1])
+        
+        # The last bar stays open until its final base candle arrives
+        closed = len(starts)
+        if self.last_base != bars['date'][-1] + self.step_ms - self.base_ms:
+            closed -= 1
+            self._partial = tuple(bars[name][-1] for name in OHLCV_COLUMNS + ('candles',))
+        else:
+            self._partial = None
+        if closed:
+            for name, values in bars.items():
+                self._bars[name] = np.concatenate([self._bars[name], values[:closed]])[-self.max_bars:]
+        return closed
+    
+    def frame(self) -> pd.DataFrame:
+        """Closed bars as an OHLCV DataFrame (date = bar open, UTC)"""
+        data = {name: self._bars[name].copy() for name in OHLCV_COLUMNS}
+        data['date'] = pd.to_datetime(data['date'], unit='ms', utc=True).as_unit('ms')
+        return pd.DataFrame(data)
+    
+    def candles(self) -> np.ndarray:
+        """Base candles folded into each closed bar (ratio = complete)"""
+        return self._bars['candles'].copy()
+
+
+class MultiTimeframeResampler:
+    """
+    Higher-timeframe aggregators for every pair, fed from base candles.
+    
+    Args:
+        base_timeframe: Timeframe of the candles passed to update()
+        timeframes: Higher timeframes to derive
+        max_bars: Closed bars kept per pair and timeframe
+    """
+    
+    def __init__(self, base_timeframe: str = '5m', timeframes: Iterable[str] = ('15m', '1h'), max_bars: int = 5000):
+        self.base_timeframe = base_timeframe
+        self.base_minutes = timeframe_to_minutes(base_timeframe)
+        self.timeframes = tuple(timeframes)
+        for tf in self.timeframes:
+            OHLCVAggregator(self.base_minutes, timeframe_to_minutes(tf))  # Validates the multiple
+        self.max_bars = max_bars
+        self._aggregators: Dict[str, Dict[str, OHLCVAggregator]] = {}
+        self.parity_stats: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    
+    def _pair_aggregators(self, pair: str) -> Dict[str, OHLCVAggregator]:
+        if pair not in self._aggregators:
+            self._aggregators[pair] = {
+                tf: OHLCVAggregator(self.base_minutes, timeframe_to_minutes(tf), self.max_bars)
+                for tf in self.timeframes
+            }
+        return self._aggregators[pair]
+    
+    def update(self, pair: str, dataframe: pd.DataFrame) -> int:
+        """
+        Fold a pair's base candles into its aggregators.
+        
+        The full analyzed frame can be passed every cycle; only candles
+        after the last folded one are aggregated.
+        
+        Returns:
+            Number of higher-timeframe bars closed
+        """
+        if dataframe is None or len(dataframe) == 0 or not self.timeframes:
+            return 0
+        aggregators = self._pair_aggregators(pair)
+        date_ms = pd.to_datetime(dataframe['date'], utc=True).dt.as_unit('ms').astype('int64').to_numpy()
+        # All aggregators of a pair advance together
+        last = next(iter(aggregators.values())).last_base
+        first_new = 0 if last is None else int(np.searchsorted(date_ms, last, side='right'))
+        if first_new == len(date_ms):
+            return 0
+        new = dataframe.iloc[first_new:]
+        values = [new[col].to_numpy(dtype=np.float64) for col in OHLCV_COLUMNS[1:]]
+        return sum(a.extend(date_ms[first_new:], *values) for a in aggregators.values())
+    
+    def frame(self, pair: str, timeframe: str) -> Optional[pd.DataFrame]:
+        """Closed bars of a pair on a derived timeframe (None if none yet)"""
+        aggregator = self._aggregators.get(pair, {}).get(timeframe)
+        if aggregator is None or len(aggregator) == 0:
+            return None
+        return aggregator.frame()
+    
+    def parity(self, pair: str, timeframe: str, exchange: pd.DataFrame, rtol: float = 1e-9) -> Dict[str, Any]:
+        """
+        Compare derived bars with exchange-provided bars of the same timeframe.
+        
+        Only dates present in both are compared; incomplete derived bars
+        (missing base candles) are counted separately and not compared.
+        
+        Returns:
+            Dict with compared, mismatched, incomplete and missing (exchange
+            bars without a derived bar) counts and the largest relative
+            difference per OHLCV column; also kept in parity_stats
+        """
+        aggregator = self._aggregators.get(pair, {}).get(timeframe)
+        report = {'compared': 0, 'mismatched': 0, 'incomplete': 0, 'missing': 0, 'max_rel_diff': {}}
+        if aggregator is None or exchange is None or len(exchange) == 0:
+            return report
+        derived = aggregator.frame()
+        complete = aggregator.candles() == aggregator.ratio
+        merged = derived.assign(_complete=complete).merge(
+            exchange[list(OHLCV_COLUMNS)].assign(date=pd.to_datetime(exchange['date'], utc=True).dt.as_unit('ms')),
+            on='date', how='right', suffixes=('', '_exchange'),
+        )
+        in_range = merged['date'].between(derived['date'].iloc[0], derived['date'].iloc[-1])
+        found = merged['open'].notna()
+        report['missing'] = int((in_range & ~found).sum())
+        report['incomplete'] = int((found & ~merged['_complete'].astype(bool)).sum())
+        rows = merged[found & merged['_complete'].astype(bool)]
+        report['compared'] = int(len(rows))
+        mismatched = np.zeros(len(rows), dtype=bool)
+        for col in OHLCV_COLUMNS[1:]:
+            ours = rows[col].to_numpy(dtype=np.float64)
+            theirs = rows[f'{col}_exchange'].to_numpy(dtype=np.float64)
+            rel = np.abs(ours - theirs) / np.maximum(np.abs(theirs), 1e-12)
+            report['max_rel_diff'][col] = float(rel.max()) if len(rel) else 0.0
+            mismatched |= rel > rtol
+        report['mismatched'] = int(mismatched.sum())
+        self.parity_stats[(pair, timeframe)] = report
+        if report['mismatched']:
+            logger.warning(f"Resampled {pair} {timeframe}: {report['mismatched']}/{report['compared']} bars differ from the exchange")
+        return report
+
+
+class ResampledDataProvider:
+    """
+    DataProvider wrapper serving derived timeframes from the resampler.
+    
+    get_pair_dataframe() for a derived timeframe reads the pair's base
+    candles from the wrapped provider, folds the new ones in and returns the
+    resampled frame; every other call goes to the wrapped provider.
+    
+    Args:
+        dp: freqtrade DataProvider
+        resampler: MultiTimeframeResampler
+        verify: Also compare derived bars with the wrapped provider's own
+            bars of that timeframe; those must stay subscribed (the
+            strategy keeps them in informative_pairs while verifying)
+    """
+    
+    def __init__(self, dp: Any, resampler: MultiTimeframeResampler, verify: bool = False):
+        self._dp = dp
+        self.resampler = resampler
+        self.verify = verify
+    
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._dp, name)
+    
+    def get_pair_dataframe(self, pair: str, timeframe: Optional[str] = None, *args, **kwargs) -> pd.DataFrame:
+        if timeframe not in self.resampler.timeframes:
+            frame = self._dp.get_pair_dataframe(pair, timeframe, *args, **kwargs)
+            if timeframe == self.resampler.base_timeframe:
+                self.resampler.update(pair, frame)
+            return frame
+        self.resampler.update(pair, self._dp.get_pair_dataframe(pair, self.resampler.base_timeframe, *args, **kwargs))
+        derived = self.resampler.frame(pair, timeframe)
+        if derived is None:
+            return self._dp.get_pair_dataframe(pair, timeframe, *args, **kwargs)
+        if self.verify:
+            exchange = self._dp.get_pair_dataframe(pair, timeframe, *args, **kwargs)
+            if exchange is not None and len(exchange):
+                self.resampler.parity(pair, timeframe, exchange)
+        return derived
@@ -0,0 +1,125 @@
+"""
+Shared Corr-Pair Feature Blocks
+
+informative_pairs() adds include_corr_pairlist for every timeframe, and
+FreqAI runs feature_engineering_expand_all/_expand_basic on each corr pair's
+candles inside every whitelist pair's pipeline. With three whitelist pairs,
+ETH's 15m features are computed three times per cycle.
+
+SharedFeatureBlocks keeps one feature block per (pair, timeframe, hook) for
+the current bot cycle. The first pipeline to need a block computes it; the
+others join it to their own candle frame by date, so the cost scales with
+the number of unique pairs rather than whitelist x corr pairs. Blocks are
+only reused when the caller's candles are a date subset of the block's that
+starts on the block's first candle (rolling and recursive features depend
+on where the history starts) and their closes match; anything else is
+recomputed and replaces the block.
+
+Author: Strategy Team
+Version: 1.0.0
+Created: October 2025
+"""
+
+import logging
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+class _Block:
+    """Feature columns of one (pair, timeframe, hook) computed this cycle"""
+    __slots__ = ('dates', 'close', 'input_columns', 'features')
+    
+    def __init__(self, dates: pd.Index, close: np.ndarray, input_columns: List[str], features: pd.DataFrame):
+        self.dates = dates
+        self.close = close
+        self.input_columns = input_columns
+        self.features = features
+
+
+class SharedFeatureBlocks:
+    """
+    Per-cycle in-memory feature blocks shared across whitelist pipelines.
+    
+    Args:
+        max_blocks: Blocks kept before the least recently used one is
+            dropped (pairs x timeframes x hook calls of one cycle)
+    """
+    
+    def __init__(self, max_blocks: int = 256):
+        self.max_blocks = max_blocks
+        self._blocks: "OrderedDict[tuple, _Block]" = OrderedDict()
+        self.stats = {'computed': 0, 'shared': 0, 'cycles': 0}
+    
+    def __len__(self) -> int:
+        return len(self._blocks)
+    
+    def new_cycle(self) -> None:
+        """Drop all blocks; called at the start of every bot iteration"""
+        self._blocks.clear()
+        self.stats['cycles'] += 1
+    
+    def _lookup(self, key: tuple, dataframe: pd.DataFrame, dates: pd.DatetimeIndex) -> Optional[np.ndarray]:
+        """Row positions of dataframe's candles in the cached block, or None"""
+        block = self._blocks.get(key)
+        if block is None or list(dataframe.columns) != block.input_columns or not block.dates.is_unique:
+            return None
+        positions = block.dates.get_indexer(dates)
+        if (positions < 0).any() or positions[0] != 0:
+            return None
+        if 'close' in dataframe.columns:
+            close = dataframe['close'].to_numpy(dtype=np.float64, na_value=np.nan)
+            if not np.array_equal(close, block.close[positions], equal_nan=True):
+                return None
+        return positions
+    
+    def compute(
+        self,
+        pair: str,
+        timeframe: str,
+        hook: str,
+        dataframe: pd.DataFrame,
+        fn: Callable[[pd.DataFrame], pd.DataFrame],
+    ) -> pd.DataFrame:
+        """
+        Run a feature hook once per cycle and share its output.
+        
+        Args:
+            pair, timeframe, hook: Block key (hook includes the period)
+            dataframe: Hook input (must have a date column)
+            fn: The hook, called with a dataframe and returning it with the
+                feature columns added
+        
+        Returns:
+            dataframe with the feature columns, as fn would return it
+        """
+        if dataframe is None or len(dataframe) == 0:
+            return fn(dataframe)
+        key = (pair, timeframe, hook)
+        dates = pd.DatetimeIndex(pd.to_datetime(dataframe['date'], utc=True))
+        positions = self._lookup(key, dataframe, dates)
+        if positions is not None:
+            self._blocks.move_to_end(key)
+            self.stats['shared'] += 1
+            features = self._blocks[key].features
+            joined = {col: features[col].to_numpy()[positions] for col in features.columns}
+            return pd.concat([dataframe.copy(), pd.DataFrame(joined, index=dataframe.index)], axis=1)
+        
+        result = fn(dataframe.copy())
+        new_cols = [c for c in result.columns if c not in dataframe.columns]
+        close = (dataframe['close'].to_numpy(dtype=np.float64, na_value=np.nan) if 'close' in dataframe.columns
+                 else np.full(len(dataframe), np.nan))
+        self._blocks[key] = _Block(dates, close, list(dataframe.columns), result[new_cols].reset_index(drop=True))
+        self._blocks.move_to_end(key)
+        while len(self._blocks) > self.max_blocks:
+            self._blocks.popitem(last=False)
+        self.stats['computed'] += 1
+        return result
+    
+    def summary(self) -> Dict[str, int]:
+        """Counters plus the number of blocks held"""
+        return {**self.stats, 'blocks': len(self._blocks)}
@@ -0,0 +1,732 @@
+"""
+Prediction-Cached Fast Hyperopt
+
+FreqAIHybridHyperopt tunes entry gating thresholds and the ROI table. This
+module computes the FreqAI predictions, DI values and regime features once
+per timerange, persists them in the diagnostics PredictionStore (memory-mapped
+.npy arrays) and then evaluates each epoch
+with a vectorized copy of populate_entry_trend/populate_exit_trend plus a
+lightweight trade simulation, so an epoch takes milliseconds instead of a
+full backtest.
+
+Only parameters that leave model training unchanged are searched.
+trend_threshold also sets the %-market_regime feature the model is trained
+on, so it is held at the value the predictions were cached with (the
+strategy default) and left to the full hyperopt.
+
+Usage:
+    python -m src.fast_hyperopt --config config/config.json \\
+        --timerange 20250101-20250301 --epochs 500 [--halving-eta 3]
+
+Author: Strategy Team
+Version: 1.0.0
+"""
+
+import json
+import math
+import heapq
+import hashlib
+import logging
+import argparse
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from diagnostics.prediction_store import PredictionStore
+from tools.result_cache import input_digests
+
+logger = logging.getLogger(__name__)
+
+# Cached array -> (analyzed dataframe column, default when the column is missing).
+# Defaults match the fallbacks in FreqAIHybridStrategy.populate_entry_trend.
+CACHED_COLUMNS = {
+    "open": ("open", 0.0),
+    "high": ("high", 0.0),
+    "low": ("low", 0.0),
+    "close": ("close", 0.0),
+    "target": ("&-s_close", 0.0),
+    "target_mean": ("&-s_close_mean", 0.0),
+    "target_std": ("&-s_close_std", 1.0),
+    "do_predict": ("do_predict", 0.0),
+    "di": ("DI_values", 1.0),
+    "volume_regime": ("%-volume_regime", 1.0),
+    "market_regime": ("%-market_regime", 0.0),
+    "trend_strength": ("%-trend_strength", 0.0),
+    "atr": ("atr_14", 0.0),
+}
+
+# Search space of FreqAIHybridHyperopt (hyperopt_parameters + roi_space), minus
+# trend_threshold: it feeds %-market_regime, so changing it would need retraining
+PARAM_SPACE = {
+    "buy_di_threshold": (0.2, 1.2),
+    "sell_di_threshold": (0.2, 1.2),
+    "z_base_thr": (0.2, 1.0),
+    "z_hv_thr": (0.6, 1.8),
+    "vol_min": (0.6, 1.2),
+    "vol_max": (2.0, 4.5),
+    "roi_t0": (0.005, 0.03),
+    "roi_t15": (0.003, 0.02),
+    "roi_t45": (0.001, 0.015),
+}
+
+# Strategy defaults (DecimalParameter defaults and minimal_roi)
+DEFAULT_PARAMS = {
+    "buy_di_threshold": 1.0,
+    "sell_di_threshold": 1.0,
+    "trend_threshold": 0.005,
+    "z_base_thr": 0.3,
+    "z_hv_thr": 0.8,
+    "vol_min": 0.7,
+    "vol_max": 4.0,
+    "roi_t0": 0.02,
+    "roi_t15": 0.01,
+    "roi_t45": 0.005,
+}
+
+# Column order of parameter matrices (parameters outside PARAM_SPACE keep their defaults)
+PARAM_NAMES = list(DEFAULT_PARAMS)
+
+
+def params_matrix(points: List[Dict[str, float]]) -> np.ndarray:
+    """(K, len(PARAM_NAMES)) matrix of parameter dicts (missing values from DEFAULT_PARAMS)"""
+    return np.array(
+        [[float(point.get(name, DEFAULT_PARAMS[name])) for name in PARAM_NAMES] for point in points],
+        dtype=np.float64,
+    ).reshape(len(points), len(PARAM_NAMES))
+
+
+def extract_arrays(dataframe) -> Dict[str, np.ndarray]:
+    """
+    Pull the columns the entry/exit logic reads out of an analyzed dataframe.
+    
+    Args:
+        dataframe: Output of strategy.populate_indicators (FreqAI columns included)
+    
+    Returns:
+        Dict of float64 arrays (CACHED_COLUMNS keys) plus int64 "date" in ms
+    """
+    arrays = {}
+    for name, (column, default) in CACHED_COLUMNS.items():
+        if column in dataframe.columns:
+            values = dataframe[column].to_numpy(dtype=np.float64, na_value=np.nan)
+            # populate_indicators replaces inf/nan with 0 before the entry logic runs
+            arrays[name] = np.nan_to_num(values, nan=0.0, posinf=0.0, neginf=0.0)
+        else:
+            arrays[name] = np.full(len(dataframe), default, dtype=np.float64)
+    dates = dataframe["date"]
+    if getattr(dates.dt, "tz", None) is None:
+        dates = dates.dt.tz_localize("UTC")
+    arrays["date"] = dates.dt.tz_convert("UTC").dt.as_unit("ms").astype("int64").to_numpy(dtype=np.int64)
+    return arrays
+
+
+def _crossed_above(series: np.ndarray, threshold: np.ndarray) -> np.ndarray:
+    """qtpylib.crossed_above on (broadcast) arrays along the last axis (never true on the first candle)"""
+    series, threshold = np.broadcast_arrays(series, threshold)
+    crossed = np.zeros(series.shape, dtype=bool)
+    crossed[..., 1:] = (series[..., 1:] > threshold[..., 1:]) & (series[..., :-1] <= threshold[..., :-1])
+    return crossed
+
+
+def _crossed_below(series: np.ndarray, threshold: np.ndarray) -> np.ndarray:
+    """qtpylib.crossed_below on (broadcast) arrays along the last axis (never true on the first candle)"""
+    series, threshold = np.broadcast_arrays(series, threshold)
+    crossed = np.zeros(series.shape, dtype=bool)
+    crossed[..., 1:] = (series[..., 1:] < threshold[..., 1:]) & (series[..., :-1] >= threshold[..., :-1])
+    return crossed
+
+
+@dataclass
+class PairData:
+    """Cached prediction arrays of one pair with the parameter-free parts precomputed"""
+    pair: str
+    arrays: Dict[str, np.ndarray]
+    
+    def __post_init__(self):
+        a = self.arrays
+        self.z = (a["target"] - a["target_mean"]) / (a["target_std"] + 1e-12)
+        self.do_predict = a["do_predict"] == 1
+        self.high_vol = a["market_regime"] == 3
+        # populate_exit_trend does not read any hyperopt parameter
+        zero = np.zeros_like(self.z)
+        self.exit_long = (self.do_predict & _crossed_below(self.z, zero)) | self.high_vol
+        self.exit_short = (self.do_predict & _crossed_above(self.z, zero)) | self.high_vol
+        # custom_stoploss: 1.5 x ATR% clamped to [1.5%, 5%] (no governance tightening)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            atr_pct = np.where(a["close"] > 0, a["atr"] / a["close"], 0.0)
+        self.stop_pct = np.clip(1.5 * atr_pct, 0.015, 0.05)
+        steps = np.diff(a["date"])
+        self.timeframe_minutes = float(np.median(steps)) / 60000.0 if len(steps) else 5.0
+    
+    def __len__(self) -> int:
+        return len(self.z)
+    
+    def until(self, end_ms: int) -> "PairData":
+        """Prefix of the candles dated before end_ms (array views, no copy)"""
+        stop = int(np.searchsorted(self.arrays["date"], end_ms, side="left"))
+        return PairData(pair=self.pair, arrays={k: v[:stop] for k, v in self.arrays.items()})
+
+
+def entry_signals_batch(data: PairData, matrix: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized populate_entry_trend for K parameter sets at once.
+    
+    Every gate is a threshold test, so each parameter column is compared
+    as a (K, 1) vector against the candle arrays. Candles that cannot fire
+    for any row (checked against the loosest bound of each column) are
+    dropped first, so the (K, candles) work covers only the few candles
+    where z crosses into the thresholds' range.
+    
+    The governance gate is not applied: its live state says nothing about
+    the historical timerange being optimized.
+    
+    Args:
+        data: Cached pair arrays (N candles)
+        matrix: (K, len(PARAM_NAMES)) parameter matrix (see params_matrix)
+    
+    Returns:
+        (enter_long, enter_short) boolean arrays of shape (K, N)
+    """
+    a = data.arrays
+    column = {name: matrix[:, [i]] for i, name in enumerate(PARAM_NAMES)}
+    enter_long = np.zeros((len(matrix), len(data)), dtype=bool)
+    enter_short = np.zeros((len(matrix), len(data)), dtype=bool)
+    if not len(matrix) or len(data) < 2:
+        return enter_long, enter_short
+    
+    z, z_prev = data.z[1:], data.z[:-1]
+    di, vol, trend = a["di"][1:], a["volume_regime"][1:], a["trend_strength"][1:]
+    high_vol, high_vol_prev = data.high_vol[1:], data.high_vol[:-1]
+    thr_low = min(column["z_base_thr"].min(), column["z_hv_thr"].min())
+    thr_high = max(column["z_base_thr"].max(), column["z_hv_thr"].max())
+    loose = (
+        data.do_predict[1:]
+        & (di < column["buy_di_threshold"].max())
+        & (vol > column["vol_min"].min())
+        & (vol < column["vol_max"].max())
+    )
+    min_trend = column["trend_threshold"].min()
+    
+    for side, out in ((1, enter_long), (-1, enter_short)):
+        # Long: z crosses above +thr in an uptrend; short: below -thr in a downtrend
+        candidates = loose & (side * trend > min_trend) & (side * z > thr_low) & (side * z_prev <= thr_high)
+        idx = np.flatnonzero(candidates)
+        if not len(idx):
+            continue
+        thr = np.where(high_vol[idx], column["z_hv_thr"], column["z_base_thr"])
+        thr_prev = np.where(high_vol_prev[idx], column["z_hv_thr"], column["z_base_thr"])
+        out[:, idx + 1] = (
+            (di[idx] < column["buy_di_threshold"])
+            & (vol[idx] > column["vol_min"])
+            & (vol[idx] < column["vol_max"])
+            & (side * trend[idx] > column["trend_threshold"])
+            & (side * z[idx] > thr)
+            & (side * z_prev[idx] <= thr_prev)
+        )
+    return enter_long, enter_short
+
+
+def entry_signals(data: PairData, params: Dict[str, float]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized populate_entry_trend for one parameter set.
+    
+    Returns:
+        (enter_long, enter_short) boolean arrays
+    """
+    enter_long, enter_short = entry_signals_batch(data, params_matrix([params]))
+    return enter_long[0], enter_short[0]
+
+
+def roi_table(params: Dict[str, float]) -> Dict[str, float]:
+    """FreqAIHybridHyperopt.generate_roi_table"""
+    return {
+        "0": float(params.get("roi_t0", 0.02)),
+        "15": float(params.get("roi_t15", 0.01)),
+        "45": float(params.get("roi_t45", 0.005)),
+        "120": 0.0,
+    }
+
+
+def roi_curve(table: Dict[str, float], timeframe_minutes: float) -> np.ndarray:
+    """
+    Minimum ROI per candle offset from the entry candle.
+    
+    Returns:
+        Array whose last value applies to all later offsets
+    """
+    minutes = np.array(sorted(int(k) for k in table), dtype=np.float64)
+    values = np.array([table[str(int(m))] for m in minutes], dtype=np.float64)
+    offsets = np.arange(int(minutes[-1] // timeframe_minutes) + 1) * timeframe_minutes
+    return values[np.searchsorted(minutes, offsets, side="right") - 1]
+
+
+def hyperopt_loss(results: Dict, trade_count: int, min_trades: int = 0, params: Optional[Dict] = None) -> float:
+    """Same formula as FreqAIHybridHyperopt.loss_function (lower is better)"""
+    pf = results.get("profit_ratio", 0.0)
+    dd = results.get("max_drawdown_abs", 0.0)
+    trade_penalty = 0.0
+    if trade_count < 30:
+        trade_penalty = 0.5
+    elif trade_count < 50:
+        trade_penalty = 0.2
+    dd_penalty = min(dd / 1000.0, 1.0)
+    return float((1.5 - pf) + dd_penalty + trade_penalty)
+
+
+def hyperopt_loss_batch(profit_ratio: np.ndarray, max_drawdown_abs: np.ndarray, trade_count: np.ndarray) -> np.ndarray:
+    """hyperopt_loss over arrays of K results"""
+    trade_count = np.asarray(trade_count)
+    trade_penalty = np.where(trade_count < 30, 0.5, np.where(trade_count < 50, 0.2, 0.0))
+    dd_penalty = np.minimum(np.asarray(max_drawdown_abs, dtype=np.float64) / 1000.0, 1.0)
+    return (1.5 - np.asarray(profit_ratio, dtype=np.float64)) + dd_penalty + trade_penalty
+
+
+@dataclass
+class SimulationConfig:
+    """Trade simulation settings (mirror the backtest config being optimized)"""
+    starting_balance: float = 1000.0
+    stake_amount: Optional[float] = None  # Default: starting_balance / max_open_trades
+    max_open_trades: int = 3
+    fee: float = 0.0005
+    leverage: float = 1.0
+    chunk: int = 64  # Candles scanned at a time for stoploss/ROI hits
+    
+    @property
+    def stake(self) -> float:
+        if self.stake_amount is not None:
+            return float(self.stake_amount)
+        return self.starting_balance / max(self.max_open_trades, 1)
+
+
+def simulate_pair(
+    data: PairData,
+    enter_long: np.ndarray,
+    enter_short: np.ndarray,
+    roi: np.ndarray,
+    sim: SimulationConfig,
+) -> np.ndarray:
+    """
+    Replay one pair's signals the way freqtrade backtesting does.
+    
+    Signals act on the next candle's open; one trade per pair at a time;
+    a candle with both entry signals (or an entry and its own exit signal)
+    does not enter. Open trades check stoploss, then ROI on every candle,
+    and leave at the next open after an exit signal. Trailing stops and
+    custom_exit are not modelled.
+    
+    Returns:
+        Structured array of trades (open_idx, close_idx, is_short, profit_ratio)
+    """
+    a = data.arrays
+    n = len(data)
+    side = np.zeros(n, dtype=np.int8)
+    side[enter_long & ~enter_short & ~data.exit_long] = 1
+    side[enter_short & ~enter_long & ~data.exit_short] = -1
+    side[-1] = 0  # No next candle to enter on
+    signals = np.flatnonzero(side)
+    exit_idx = {1: np.flatnonzero(data.exit_long), -1: np.flatnonzero(data.exit_short)}
+    opens, highs, lows, closes = a["open"], a["high"], a["low"], a["close"]
+    # ROI padded so any chunk starting past the last step reads its value
+    roi_ext = np.concatenate([roi, np.full(sim.chunk, roi[-1])]) / sim.leverage
+    
+    trades = []
+    first_signal = 0
+    pos = np.searchsorted(signals, first_signal)
+    while pos < len(signals):
+        signal = signals[pos]
+        direction = int(side[signal])
+        entry = signal + 1
+        entry_price = opens[entry]
+        if entry_price <= 0:
+            pos += 1
+            continue
+        stop_dist = data.stop_pct[signal] / sim.leverage
+        exits = exit_idx[direction]
+        k = np.searchsorted(exits, entry)
+        last = exits[k] if k < len(exits) else n - 1
+        
+        close_idx, exit_price, at_open = None, None, False
+        start = entry
+        while start <= last and close_idx is None:
+            stop = min(start + sim.chunk, last + 1)
+            offset = min(start - entry, len(roi) - 1)
+            roi_dist = roi_ext[offset:offset + stop - start]
+            if direction == 1:
+                stop_price = entry_price * (1 - stop_dist)
+                roi_price = entry_price * (1 + roi_dist)
+                stop_hit = lows[start:stop] <= stop_price
+                roi_hit = highs[start:stop] >= roi_price
+            else:
+                stop_price = entry_price * (1 + stop_dist)
+                roi_price = entry_price * (1 - roi_dist)
+                stop_hit = highs[start:stop] >= stop_price
+                roi_hit = lows[start:stop] <= roi_price
+            hits = stop_hit | roi_hit
+            if hits.any():
+                j = int(np.argmax(hits))
+                close_idx = start + j
+                candle_open = opens[close_idx]
+                if stop_hit[j]:  # Stoploss is checked before ROI
+                    price = stop_price
+                    gapped = candle_open < price if direction == 1 else candle_open > price
+                else:
+                    price = roi_price[j]
+                    gapped = candle_open > price if direction == 1 else candle_open < price
+                # A candle that opens beyond the level fills at its open
+                exit_price = candle_open if (close_idx > entry and gapped) else price
+            start = stop
+        
+        if close_idx is None:
+            if k < len(exits) and last + 1 < n:
+                close_idx, exit_price, at_open = last + 1, opens[last + 1], True
+            else:
+                close_idx, exit_price = n - 1, closes[n - 1]  # Force exit at the end
+        
+        if direction == 1:
+            ratio = exit_price * (1 - sim.fee) / (entry_price * (1 + sim.fee)) - 1
+        else:
+            ratio = 1 - exit_price * (1 + sim.fee) / (entry_price * (1 - sim.fee))
+        trades.append((entry, close_idx, direction == -1, ratio * sim.leverage))
+        # The next entry signal may fill on the exit candle only if the exit was at its open
+        first_signal = close_idx - 1 if at_open else close_idx
+        pos = np.searchsorted(signals, first_signal)
+    
+    return np.array(trades, dtype=[("open_idx", "i8"), ("close_idx", "i8"), ("is_short", "?"), ("profit_ratio", "f8")])
+
+
+def _cap_open_trades(open_ts: np.ndarray, close_ts: np.ndarray, max_open_trades: int) -> np.ndarray:
+    """Mask of trades kept when at most max_open_trades are open across pairs"""
+    keep = np.zeros(len(open_ts), dtype=bool)
+    if max_open_trades is None or max_open_trades < 0:
+        keep[:] = True
+        return keep
+    open_closes: List[int] = []
+    for i in np.argsort(open_ts, kind="stable"):
+        while open_closes and open_closes[0] <= open_ts[i]:
+            heapq.heappop(open_closes)
+        if len(open_closes) < max_open_trades:
+            keep[i] = True
+            heapq.heappush(open_closes, int(close_ts[i]))
+    return keep
+
+
+def summarize_trades(trades: Dict[str, np.ndarray], data: Dict[str, PairData], sim: SimulationConfig) -> Dict:
+    """
+    Combine per-pair trades into the results dict the loss reads.
+    
+    Returns:
+        Dict with profit_ratio (total profit / starting balance),
+        max_drawdown_abs, profit_abs, trade_count, wins, losses
+    """
+    open_ts, close_ts, ratios = [], [], []
+    for pair, pair_trades in trades.items():
+        dates = data[pair].arrays["date"]
+        open_ts.append(dates[pair_trades["open_idx"]])
+        close_ts.append(dates[pair_trades["close_idx"]])
+        ratios.append(pair_trades["profit_ratio"])
+    if not ratios or not sum(len(r) for r in ratios):
+        return {"profit_ratio": 0.0, "profit_abs": 0.0, "max_drawdown_abs": 0.0, "trade_count": 0, "wins": 0, "losses": 0}
+    
+    open_ts, close_ts, ratios = np.concatenate(open_ts), np.concatenate(close_ts), np.concatenate(ratios)
+    keep = _cap_open_trades(open_ts, close_ts, sim.max_open_trades)
+    close_ts, profit = close_ts[keep], ratios[keep] * sim.stake
+    
+    balance = sim.starting_balance + np.cumsum(profit[np.argsort(close_ts, kind="stable")])
+    peak = np.maximum.accumulate(np.concatenate([[sim.starting_balance], balance]))[1:]
+    total = float(profit.sum())
+    return {
+        "profit_ratio": total / sim.starting_balance,
+        "profit_abs": total,
+        "max_drawdown_abs": float(np.max(peak - balance, initial=0.0)),
+        "trade_count": int(len(profit)),
+        "wins": int((profit > 0).sum()),
+        "losses": int((profit < 0).sum()),
+    }
+
+
+def prediction_fingerprint(config_file, timerange: str, strategy_file, project_dir=".") -> str:
+    """
+    Hash of everything the cached predictions depend on: the timerange and
+    the inputs ResultCache fingerprints (strategy source and parameter file,
+    local packages, config JSON and the freqaimodel's source).
+    """
+    try:
+        with open(config_file) as f:
+            freqai_model = json.load(f).get("freqaimodel")
+    except (OSError, ValueError):
+        freqai_model = None
+    payload = {
+        "timerange": timerange,
+        **input_digests(Path(project_dir), config_file, Path(strategy_file), freqai_model),
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def save_predictions(store: PredictionStore, identifier: str, arrays: Dict[str, Dict[str, np.ndarray]]) -> None:
+    """
+    Persist extract_arrays output per pair in a PredictionStore.
+    
+    Windows are tagged with the store's model_hash (the prediction
+    fingerprint), so entries of another fingerprint are replaced.
+    """
+    for pair, pair_arrays in sorted(arrays.items()):
+        frame = pd.DataFrame({
+            "date": pd.to_datetime(pair_arrays["date"], unit="ms", utc=True),
+            **{name: pair_arrays[name] for name in CACHED_COLUMNS},
+        })
+        store.write(identifier, pair, frame, columns=list(CACHED_COLUMNS))
+
+
+def load_predictions(store: PredictionStore, identifier: str) -> Optional[Dict[str, PairData]]:
+    """Stored PairData per pair, backed by the store's memory maps (None if nothing current is stored)"""
+    data = {}
+    for pair in store.pairs(identifier):
+        try:
+            arrays = store.read(identifier, pair)
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable stored predictions of {pair}: {e}")
+            return None
+        if not arrays:
+            continue  # Written under another fingerprint
+        if not set(CACHED_COLUMNS) <= set(arrays):
+            return None
+        data[pair] = PairData(pair=pair, arrays=arrays)
+    return data or None
+
+
+def compute_predictions(config_file: str, timerange: str) -> Dict[str, Dict[str, np.ndarray]]:
+    """
+    Run FreqAI once over the timerange (training every window as a backtest
+    would) and extract the cached arrays of every whitelisted pair.
+    
+    Requires freqtrade; this is the only slow step of a fast hyperopt run.
+    """
+    from freqtrade.configuration import Configuration
+    from freqtrade.enums import RunMode
+    from freqtrade.optimize.backtesting import Backtesting
+    
+    config = Configuration.from_files([config_file])
+    config["timerange"] = timerange
+    config["runmode"] = RunMode.BACKTEST
+    backtesting = Backtesting(config)
+    data, _ = backtesting.load_bt_data()
+    analyzed = backtesting.strategy.advise_all_indicators(data)
+    return {pair: extract_arrays(df) for pair, df in analyzed.items()}
+
+
+class FastHyperopt:
+    """
+    Epoch loop over cached predictions.
+    
+    Each evaluation reruns only the entry signals (exit signals and
+    z-scores do not depend on the parameters) and the trade simulation.
+    """
+    
+    def __init__(
+        self,
+        data: Dict[str, PairData],
+        sim: Optional[SimulationConfig] = None,
+        loss_fn: Callable[..., float] = hyperopt_loss,
+        space: Optional[Dict[str, Tuple[float, float]]] = None,
+        min_trades: int = 0,
+    ):
+        self.data = data
+        self.sim = sim or SimulationConfig()
+        self.loss_fn = loss_fn
+        self.space = space or PARAM_SPACE
+        self.min_trades = min_trades
+    
+    def evaluate(self, params: Dict[str, float]) -> Dict[str, Any]:
+        """
+        Score one parameter set.
+        
+        Returns:
+            Dict with params, loss and results
+        """
+        return self.evaluate_batch([params])[0]
+    
+    def evaluate_batch(self, points, max_cells: int = 4_000_000) -> List[Dict[str, Any]]:
+        """
+        Score K parameter sets with one broadcast signal pass per pair.
+        
+        Entry signals of all K candidates are computed as (K, candles)
+        arrays, in row blocks of at most max_cells cells to bound memory.
+        The trade replay is path dependent and still runs once per
+        candidate; the default loss is then applied to all K at once.
+        
+        Args:
+            points: List of parameter dicts, or a (K, len(PARAM_NAMES)) matrix
+            max_cells: Largest K x candles block evaluated at once
+        
+        Returns:
+            One evaluate()-shaped dict per point, in order
+        """
+        matrix = points if isinstance(points, np.ndarray) else params_matrix(points)
+        k = len(matrix)
+        trades: List[Dict[str, np.ndarray]] = [{} for _ in range(k)]
+        curves = {}  # (roi row, timeframe) -> roi curve
+        for pair, data in self.data.items():
+            rows = max(1, max_cells // max(len(data), 1))
+            for start in range(0, k, rows):
+                block = matrix[start:start + rows]
+                enter_long, enter_short = entry_signals_batch(data, block)
+                for i, row in enumerate(block):
+                    table = roi_table(dict(zip(PARAM_NAMES, row)))
+                    key = (tuple(table.values()), data.timeframe_minutes)
+                    if key not in curves:
+                        curves[key] = roi_curve(table, data.timeframe_minutes)
+                    trades[start + i][pair] = simulate_pair(data, enter_long[i], enter_short[i], curves[key], self.sim)
+        
+        results = [summarize_trades(t, self.data, self.sim) for t in trades]
+        params = [dict(zip(PARAM_NAMES, map(float, row))) for row in matrix]
+        if self.loss_fn is hyperopt_loss:
+            losses = hyperopt_loss_batch(
+                [r["profit_ratio"] for r in results],
+                [r["max_drawdown_abs"] for r in results],
+                [r["trade_count"] for r in results],
+            ).tolist()
+        else:
+            losses = [self.loss_fn(r, r["trade_count"], self.min_trades, p) for r, p in zip(results, params)]
+        return [{"params": p, "loss": float(l), "results": r} for p, l, r in zip(params, losses, results)]
+    
+    def sample_matrix(self, rng: np.random.Generator, n: int = 1) -> np.ndarray:
+        """(n, len(PARAM_NAMES)) uniform random points (parameters outside the space keep their defaults)"""
+        matrix = np.tile(params_matrix([DEFAULT_PARAMS]), (n, 1))
+        for i, name in enumerate(PARAM_NAMES):
+            if name in self.space:
+                low, high = self.space[name]
+                matrix[:, i] = rng.uniform(low, high, size=n)
+        return matrix
+    
+    def sample(self, rng: np.random.Generator, n: int = 1) -> List[Dict[str, float]]:
+        """n uniform random points of the search space"""
+        return [dict(zip(PARAM_NAMES, map(float, row))) for row in self.sample_matrix(rng, n)]
+    
+    def prefix(self, fraction: float) -> "FastHyperopt":
+        """The same search restricted to the first fraction of the timerange"""
+        starts = [d.arrays["date"][0] for d in self.data.values() if len(d)]
+        ends = [d.arrays["date"][-1] for d in self.data.values() if len(d)]
+        if fraction >= 1 or not starts:
+            return self
+        end_ms = min(starts) + fraction * (max(ends) - min(starts))
+        data = {pair: d.until(end_ms) for pair, d in self.data.items()}
+        return FastHyperopt(data, self.sim, self.loss_fn, self.space, self.min_trades)
+    
+    def successive_halving(
+        self,
+        n_candidates: int = 81,
+        eta: int = 3,
+        rungs: Optional[int] = None,
+        seed: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Successive-halving search over timerange prefixes.
+        
+        Rung i of R scores the surviving candidates on the first
+        eta^-(R-1-i) of the timerange and keeps the best 1/eta of them,
+        so clearly bad sets (too few trades, deep drawdowns) are dropped
+        after a short prefix and only the last rung uses the full range.
+        The strategy defaults are always among the candidates.
+        
+        Args:
+            n_candidates: Parameter sets in the first rung
+            eta: Reduction factor per rung
+            rungs: Number of rungs (default: floor(log_eta(n_candidates)))
+            seed: Sampler seed
+        
+        Returns:
+            Dict with best (evaluate() result on the full timerange), rungs
+            (fraction, candidates, best_loss per rung) and cost (work in
+            full-timerange evaluations; a full sweep costs n_candidates)
+        """
+        if eta < 2:
+            raise ValueError("eta must be at least 2")
+        if rungs is None:
+            rungs = max(1, int(math.log(max(n_candidates, 1)) / math.log(eta) + 1e-9))
+        rng = np.random.default_rng(seed)
+        matrix = np.vstack([params_matrix([DEFAULT_PARAMS]), self.sample_matrix(rng, max(n_candidates - 1, 0))])
+        
+        history, cost, results = [], 0.0, []
+        for rung in range(rungs):
+            fraction = float(eta) ** -(rungs - 1 - rung)
+            results = self.prefix(fraction).evaluate_batch(matrix)
+            cost += fraction * len(matrix)
+            order = np.argsort([r["loss"] for r in results], kind="stable")
+            history.append({"fraction": fraction, "candidates": len(matrix), "best_loss": results[order[0]]["loss"]})
+            logger.info(f"Rung {rung + 1}/{rungs}: {len(matrix)} candidates on {fraction:.1%} of the timerange, best loss {history[-1]['best_loss']:.4f}")
+            if rung < rungs - 1:
+                keep = max(1, len(matrix) // eta)
+                matrix = matrix[order[:keep]]
+        best = min(results, key=lambda r: r["loss"])
+        return {"best": best, "rungs": history, "cost": cost}
+    
+    def run(self, epochs: int = 100, seed: Optional[int] = None, batch_size: int = 100) -> Dict[str, Any]:
+        """
+        Random-search epochs in batches (the strategy defaults are evaluated first).
+        
+        Returns:
+            Dict with best (evaluate() result) and epochs (all losses)
+        """
+        rng = np.random.default_rng(seed)
+        best = self.evaluate(DEFAULT_PARAMS)
+        losses = [best["loss"]]
+        remaining = max(epochs - 1, 0)
+        while remaining > 0:
+            batch = self.evaluate_batch(self.sample_matrix(rng, min(batch_size, remaining)))
+            remaining -= len(batch)
+            for result in batch:
+                losses.append(result["loss"])
+                if result["loss"] < best["loss"]:
+                    best = result
+                    logger.info(f"Epoch {len(losses)}: loss {best['loss']:.4f}, {best['results']['trade_count']} trades")
+        return {"best": best, "epochs": losses}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fast hyperopt on cached FreqAI predictions")
+    parser.add_argument("--config", default="config/config.json")
+    parser.add_argument("--strategy-file", default="user_data/strategies/FreqAIHybridStrategy.py")
+    parser.add_argument("--timerange", required=True)
+    parser.add_argument("--epochs", type=int, default=500)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--batch-size", type=int, default=100, help="Parameter sets evaluated per broadcast batch")
+    parser.add_argument("--halving-eta", type=int,
+                        help="Successive halving: score --epochs candidates on growing timerange prefixes, keeping 1/eta per rung")
+    parser.add_argument("--cache-dir", default="user_data/hyperopt_cache")
+    parser.add_argument("--rebuild", action="store_true", help="Recompute predictions even if cached")
+    args = parser.parse_args()
+    
+    with open(args.config) as f:
+        config = json.load(f)
+    sim = SimulationConfig(
+        starting_balance=float(config.get("dry_run_wallet", 1000.0)),
+        max_open_trades=int(config.get("max_open_trades", 3)),
+    )
+    
+    fingerprint = prediction_fingerprint(args.config, args.timerange, args.strategy_file)
+    store = PredictionStore(args.cache_dir, model_hash=fingerprint)
+    identifier = config.get("freqai", {}).get("identifier", "default")
+    data = None if args.rebuild else load_predictions(store, identifier)
+    if data is None:
+        logger.info(f"Computing FreqAI predictions for {args.timerange} (stored as {fingerprint})")
+        save_predictions(store, identifier, compute_predictions(args.config, args.timerange))
+        data = load_predictions(store, identifier)
+    
+    hyperopt = FastHyperopt(data, sim)
+    if args.halving_eta:
+        outcome = hyperopt.successive_halving(args.epochs, args.halving_eta, seed=args.seed)
+        logger.info(f"Successive halving cost {outcome['cost']:.1f} full-timerange evaluations for {args.epochs} candidates")
+    else:
+        outcome = hyperopt.run(args.epochs, args.seed, args.batch_size)
+    print(json.dumps(outcome["best"], indent=2))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    main()
@@ -0,0 +1,187 @@
+"""
+Unit tests for the partitioned Parquet signal audit export.
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+from pathlib import Path
+import tempfile
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+from diagnostics.audit_export import ParquetAuditExporter, read_audit_dataset
+from diagnostics.audit_store import AuditRecordStore, GATE_STAGES
+from diagnostics.signal_audit import SignalAuditLogger, SignalAuditConfig
+
+
+@pytest.fixture
+def temp_output_dir():
+    """Create temporary directory for test outputs"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        yield Path(tmpdir)
+
+
+def make_columns(n, start=0):
+    """Columns for n hourly rows"""
+    columns = {gate: np.ones(n, dtype=bool) for gate, _ in GATE_STAGES}
+    columns.update(
+        timestamp=np.datetime64('2023-01-01T00:00') + np.arange(start, start + n) * np.timedelta64(1, 'h'),
+        z_score=np.arange(start, start + n, dtype=float),
+        stage_code=np.zeros(n, dtype=int),
+    )
+    return columns
+
+
+class TestParquetAuditExporter:
+    """Test ParquetAuditExporter"""
+    
+    def test_partitions_and_row_groups(self, temp_output_dir):
+        """Rows land in pair/date partitions with fixed-size row groups"""
+        store = AuditRecordStore(capacity=100)
+        exporter = ParquetAuditExporter(temp_output_dir, row_group_size=10)
+        store.spill_handler = exporter.write_chunk
+        
+        store.append_columns("BTC/USDT:USDT", make_columns(48))
+        store.append_columns("ETH/USDT:USDT", make_columns(24))
+        store.flush()
+        
+        # Full row groups are written; above the pending cap the remainder of
+        # BTC's completed first day follows, the open days stay buffered
+        assert exporter.rows_written == 64
+        assert exporter.pending_rows == 8
+        
+        exporter.flush()
+        assert exporter.rows_written == 72
+        assert exporter.pending_rows == 0
+        
+        dates = sorted(p.name for p in temp_output_dir.glob("pair=BTC%2FUSDT%3AUSDT/date=*"))
+        assert dates == ["date=2023-01-01", "date=2023-01-02"]
+        for path in exporter.files:
+            metadata = pq.ParquetFile(path).metadata
+            sizes = [metadata.row_group(i).num_rows for i in range(metadata.num_row_groups)]
+            assert all(size == 10 for size in sizes[:-1])
+    
+    def test_append_only(self, temp_output_dir):
+        """Later writes add new part files and never touch earlier ones"""
+        store = AuditRecordStore(capacity=100)
+        exporter = ParquetAuditExporter(temp_output_dir, row_group_size=5)
+        store.spill_handler = exporter.write_chunk
+        
+        store.append_columns("BTC/USDT:USDT", make_columns(5))
+        store.flush()
+        first_files = list(exporter.files)
+        mtimes = [p.stat().st_mtime_ns for p in first_files]
+        
+        store.append_columns("BTC/USDT:USDT", make_columns(5, start=5))
+        store.flush()
+        
+        assert exporter.files[:1] == first_files
+        assert len(exporter.files) == 2
+        assert [p.stat().st_mtime_ns for p in first_files] == mtimes
+    
+    def test_read_projection_and_filters(self, temp_output_dir):
+        """Readers load only requested columns, pairs and time range"""
+        store = AuditRecordStore(capacity=100)
+        exporter = ParquetAuditExporter(temp_output_dir, row_group_size=8)
+        store.spill_handler = exporter.write_chunk
+        store.append_columns("BTC/USDT:USDT", make_columns(48))
+        store.append_columns("ETH/USDT:USDT", make_columns(48))
+        store.flush()
+        exporter.flush()
+        
+        df = read_audit_dataset(
+            temp_output_dir,
+            columns=['timestamp', 'z_score', 'pair'],
+            start="2023-01-01 22:00",
+            end="2023-01-02 01:00",
+            pairs=["BTC/USDT:USDT"],
+        )
+        
+        assert list(df.columns) == ['timestamp', 'z_score', 'pair']
+        assert sorted(df['z_score']) == [22.0, 23.0, 24.0, 25.0]
+        assert set(df['pair']) == {"BTC/USDT:USDT"}
+    
+    def test_files_appear_before_flush(self, temp_output_dir):
+        """The pending-row cap writes completed days without flush()"""
+        store = AuditRecordStore(capacity=288)
+        exporter = ParquetAuditExporter(temp_output_dir, row_group_size=50_000, max_pending_rows=1_000)
+        store.spill_handler = exporter.write_chunk
+        
+        for day in range(10):
+            for pair in ("BTC/USDT:USDT", "ETH/USDT:USDT", "SOL/USDT:USDT"):
+                columns = make_columns(288, start=day * 288)
+                columns['timestamp'] = np.datetime64('2023-01-01') + (np.arange(288) + day * 288) * np.timedelta64(5, 'm')
+                store.append_columns(pair, columns)
+            assert exporter.pending_rows <= 1_000
+        
+        assert exporter.rows_written >= 8 * 3 * 288
+        assert len(list(temp_output_dir.glob("pair=*/date=*/*.parquet"))) >= 24
+        store.flush()
+        exporter.flush()
+        assert exporter.rows_written == 10 * 3 * 288
+    
+    def test_completed_days_buffered_below_cap(self, temp_output_dir):
+        """A date rollover alone writes nothing; each day is written whole on flush"""
+        store = AuditRecordStore(capacity=100)
+        exporter = ParquetAuditExporter(temp_output_dir, row_group_size=1_000, max_pending_rows=10_000)
+        store.spill_handler = exporter.write_chunk
+        
+        store.append_columns("BTC/USDT:USDT", make_columns(72))
+        store.flush()
+        assert exporter.rows_written == 0
+        assert exporter.pending_rows == 72
+        
+        assert len(exporter.flush()) == 3
+        assert [pq.ParquetFile(p).metadata.num_rows for p in exporter.files] == [24, 24, 24]
+    
+    def test_invalid_row_group_size(self, temp_output_dir):
+        """Row group size must be positive"""
+        with pytest.raises(ValueError):
+            ParquetAuditExporter(temp_output_dir, row_group_size=0)
+
+
+class TestLoggerParquetExport:
+    """Test SignalAuditLogger Parquet export"""
+    
+    def test_export_to_parquet(self, temp_output_dir):
+        """Logger streams spilled chunks and flushes the rest on export"""
+        config = SignalAuditConfig(
+            output_dir=temp_output_dir,
+            buffer_capacity=30,
+            parquet_export=True,
+            parquet_row_group_size=16,
+            log_every_n_candles=10_000,
+        )
+        audit = SignalAuditLogger(config)
+        n = 100
+        ones = np.ones(n, dtype=bool)
+        timestamps = pd.date_range("2023-01-01", periods=n, freq="5min")
+        audit.log_gate_arrays(
+            "BTC/USDT:USDT",
+            do_predict=ones, di_ok=ones, vol_ok=ones,
+            ts_ok_long=ones, ts_ok_short=ones,
+            long_sig=ones, short_sig=~ones,
+            timestamps=timestamps,
+        )
+        
+        # Spilled chunks were written as full row groups while logging
+        assert audit.exporter.rows_written == 80
+        assert not list(temp_output_dir.rglob("*.npy"))
+        
+        files = audit.export_to_parquet()
+        df = read_audit_dataset(temp_output_dir / "audit_parquet", files=files)
+        
+        assert len(df) == n
+        assert df['enter_long'].all()
+        
+        # CSV export still covers every row
+        output_path = audit.export_to_csv()
+        csv = pd.read_csv(output_path)
+        assert len(csv) == n
+        assert csv['timestamp'].is_monotonic_increasing
+    
+    def test_export_disabled(self, temp_output_dir):
+        """Without the config flag nothing is written"""
+        audit = SignalAuditLogger(SignalAuditConfig(output_dir=temp_output_dir))
+        assert audit.export_to_parquet() == []
@@ -0,0 +1,132 @@
+"""
+Unit tests for the bounded-memory signal audit record store.
+"""
+
+import pytest
+import numpy as np
+from pathlib import Path
+import tempfile
+
+from diagnostics.audit_store import (
+    AuditRecordStore,
+    AUDIT_DTYPE,
+    GATE_STAGES,
+    STAGE_LABELS,
+)
+from diagnostics.signal_audit import SignalAuditLogger, SignalAuditConfig
+
+
+@pytest.fixture
+def temp_output_dir():
+    """Create temporary directory for test outputs"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        yield Path(tmpdir)
+
+
+def make_columns(n, start=0, stage_code=0):
+    """Columns for n rows with increasing timestamps"""
+    columns = {gate: np.ones(n, dtype=bool) for gate, _ in GATE_STAGES}
+    columns.update(
+        timestamp=np.datetime64('2023-01-01T00:00') + np.arange(start, start + n) * np.timedelta64(5, 'm'),
+        z_score=np.arange(start, start + n, dtype=float),
+        governance_status="normal",
+        stage_code=np.full(n, stage_code),
+    )
+    return columns
+
+
+class TestAuditRecordStore:
+    """Test AuditRecordStore"""
+    
+    def test_append_and_round_trip(self):
+        """Stored columns decode back to record column layout"""
+        store = AuditRecordStore(capacity=10)
+        store.append_columns("BTC/USDT:USDT", make_columns(3))
+        store.append_columns("ETH/USDT:USDT", make_columns(2, start=3, stage_code=6))
+        
+        df = store.to_frame()
+        
+        assert len(store) == 5
+        assert list(df['pair']) == ["BTC/USDT:USDT"] * 3 + ["ETH/USDT:USDT"] * 2
+        assert list(df['z_score']) == [0.0, 1.0, 2.0, 3.0, 4.0]
+        assert df['rejection_stage'][:3].isna().all()
+        assert list(df['rejection_stage'][3:]) == [STAGE_LABELS[6]] * 2
+        assert (df['governance_status'] == "normal").all()
+    
+    def test_ring_overwrites_oldest(self):
+        """Without a spill directory the oldest rows are overwritten"""
+        store = AuditRecordStore(capacity=4)
+        store.append_columns("BTC/USDT:USDT", make_columns(3))
+        store.append_columns("BTC/USDT:USDT", make_columns(3, start=3))
+        
+        assert len(store) == 4
+        assert store.overwritten_rows == 2
+        assert list(store.to_frame()['z_score']) == [2.0, 3.0, 4.0, 5.0]
+    
+    def test_spill_keeps_memory_flat(self, temp_output_dir):
+        """Full chunks spill to disk and the buffer never grows"""
+        store = AuditRecordStore(capacity=8, spill_dir=temp_output_dir)
+        initial_bytes = store.memory_bytes
+        
+        for i in range(5):
+            store.append_columns("BTC/USDT:USDT", make_columns(5, start=5 * i))
+        
+        assert store.memory_bytes == initial_bytes
+        assert store.spilled_rows == 24
+        assert len(list(temp_output_dir.glob("audit_chunk_*.npy"))) == 3
+        assert (temp_output_dir / "categories.json").exists()
+        assert list(store.to_frame()['z_score']) == list(range(25))
+    
+    def test_stage_counts_incremental(self):
+        """Stage counts include rows that were overwritten"""
+        store = AuditRecordStore(capacity=2)
+        store.append_columns("BTC/USDT:USDT", make_columns(3, stage_code=2))
+        store.append_columns("BTC/USDT:USDT", make_columns(1))
+        
+        assert store.stage_counts[2] == 3
+        assert store.stage_counts[0] == 1
+        assert store.total_rows == 4
+    
+    def test_spill_handler(self):
+        """A spill handler receives full chunks instead of .npy files"""
+        chunks = []
+        store = AuditRecordStore(capacity=4)
+        store.spill_handler = lambda chunk, s: chunks.append(chunk.copy())
+        store.append_columns("BTC/USDT:USDT", make_columns(10))
+        
+        assert [len(c) for c in chunks] == [4, 4]
+        assert chunks[0].dtype == AUDIT_DTYPE
+        assert len(store) == 10
+    
+    def test_invalid_capacity(self):
+        """Capacity must be positive"""
+        with pytest.raises(ValueError):
+            AuditRecordStore(capacity=0)
+
+
+class TestLoggerStorage:
+    """Test SignalAuditLogger on top of the record store"""
+    
+    def test_logger_spills_to_session_dir(self, temp_output_dir):
+        """Long runs spill chunks under output_dir and export everything"""
+        config = SignalAuditConfig(output_dir=temp_output_dir, buffer_capacity=50, log_every_n_candles=10_000)
+        audit = SignalAuditLogger(config)
+        n = 120
+        ones = np.ones(n, dtype=bool)
+        zeros = np.zeros(n, dtype=bool)
+        audit.log_gate_arrays(
+            "BTC/USDT:USDT",
+            do_predict=ones, di_ok=ones, vol_ok=ones,
+            ts_ok_long=ones, ts_ok_short=zeros,
+            long_sig=zeros, short_sig=zeros,
+        )
+        
+        assert len(audit.records) == n
+        assert audit.records.spilled_rows == 100
+        assert len(list((temp_output_dir / "audit_chunks").rglob("audit_chunk_*.npy"))) == 2
+        
+        report = audit.get_summary_report()
+        assert report['top_rejection_reasons'] == [('z_score_signal', n)]
+        
+        output_path = audit.export_to_csv()
+        assert sum(1 for _ in open(output_path)) == n + 1
@@ -0,0 +1,158 @@
+"""
+Unit tests for the background diagnostics writer.
+"""
+
+import pytest
+import threading
+import time
+import numpy as np
+from pathlib import Path
+import tempfile
+
+from diagnostics.background_writer import BackgroundDiagnosticsWriter
+from diagnostics.signal_audit import SignalAuditLogger, SignalAuditConfig
+
+
+@pytest.fixture
+def writer():
+    """Writer that is always closed after the test"""
+    w = BackgroundDiagnosticsWriter(max_queue_size=100, batch_size=10, flush_interval=0.05)
+    yield w
+    w.close()
+
+
+class TestBackgroundDiagnosticsWriter:
+    """Test BackgroundDiagnosticsWriter"""
+    
+    def test_runs_jobs_in_order(self, writer):
+        """Jobs run on the worker thread in submission order"""
+        results = []
+        threads = set()
+        
+        def job(i):
+            results.append(i)
+            threads.add(threading.current_thread().name)
+        
+        for i in range(50):
+            assert writer.submit(job, i)
+        
+        assert writer.flush(timeout=5)
+        assert results == list(range(50))
+        assert threads == {"diagnostics-writer"}
+        assert writer.get_stats()['processed'] == 50
+    
+    def test_drop_when_full(self):
+        """Full queue drops jobs and counts them"""
+        release = threading.Event()
+        w = BackgroundDiagnosticsWriter(max_queue_size=2, batch_size=1, on_full="drop")
+        try:
+            w.submit(release.wait)
+            time.sleep(0.05)  # Worker is now blocked in the first job
+            
+            accepted = [w.submit(lambda: None) for _ in range(5)]
+            
+            assert accepted == [True, True, False, False, False]
+            assert w.dropped == 3
+        finally:
+            release.set()
+            w.close()
+    
+    def test_block_when_full(self):
+        """Blocking mode waits for room instead of dropping"""
+        release = threading.Event()
+        w = BackgroundDiagnosticsWriter(max_queue_size=1, batch_size=1, on_full="block", block_timeout=0.1)
+        try:
+            w.submit(release.wait)
+            time.sleep(0.05)
+            assert w.submit(lambda: None)
+            
+            start = time.monotonic()
+            assert not w.submit(lambda: None)  # Times out while the worker is busy
+            assert time.monotonic() - start >= 0.1
+            
+            release.set()
+            assert w.submit(lambda: None)
+            assert w.flush(timeout=5)
+            assert w.dropped == 1
+        finally:
+            release.set()
+            w.close()
+    
+    def test_flush_callbacks_on_size_and_time(self, writer):
+        """Flush callbacks run after batch_size jobs and after the interval"""
+        flushes = []
+        writer.flush_callbacks.append(lambda: flushes.append(writer.processed))
+        
+        for _ in range(10):
+            writer.submit(lambda: None)
+        time.sleep(0.2)
+        assert flushes and flushes[0] == 10
+        
+        writer.submit(lambda: None)
+        time.sleep(0.2)
+        assert flushes[-1] == 11
+    
+    def test_job_errors_are_counted(self, writer):
+        """A failing job does not stop the worker"""
+        results = []
+        writer.submit(lambda: 1 / 0)
+        writer.submit(results.append, "ok")
+        
+        assert writer.flush(timeout=5)
+        assert writer.errors == 1
+        assert results == ["ok"]
+    
+    def test_close_drains_queue(self):
+        """Close runs all queued jobs, then flush and close callbacks"""
+        events = []
+        w = BackgroundDiagnosticsWriter(flush_interval=60)
+        w.flush_callbacks.append(lambda: events.append("flush"))
+        w.close_callbacks.append(lambda: events.append("close"))
+        for i in range(20):
+            w.submit(events.append, i)
+        
+        w.close()
+        
+        assert events == list(range(20)) + ["flush", "close"]
+        assert not w.submit(events.append, "late")
+    
+    def test_close_full_queue_times_out(self):
+        """Close returns after the timeout when a stuck job keeps the queue full"""
+        release = threading.Event()
+        w = BackgroundDiagnosticsWriter(max_queue_size=1, batch_size=1)
+        w.submit(release.wait)
+        time.sleep(0.05)  # Worker picks up the blocking job
+        assert w.submit(lambda: None)
+        
+        start = time.monotonic()
+        w.close(timeout=0.2)
+        
+        assert time.monotonic() - start < 2
+        release.set()
+    
+    def test_invalid_on_full(self):
+        """Unknown backpressure mode is rejected"""
+        with pytest.raises(ValueError):
+            BackgroundDiagnosticsWriter(on_full="spill")
+
+
+class TestAsyncSignalAudit:
+    """Test signal audit logging through the writer"""
+    
+    def test_audit_via_writer(self, writer):
+        """Audit batches submitted to the writer land in the logger"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            audit = SignalAuditLogger(SignalAuditConfig(output_dir=Path(tmpdir)))
+            n = 50
+            ones = np.ones(n, dtype=bool)
+            for _ in range(3):
+                writer.submit(
+                    audit.log_gate_arrays, "BTC/USDT:USDT",
+                    do_predict=ones, di_ok=ones, vol_ok=ones,
+                    ts_ok_long=ones, ts_ok_short=ones,
+                    long_sig=ones, short_sig=~ones,
+                )
+            
+            assert writer.flush(timeout=5)
+            assert audit.total_candles_processed == 3 * n
+            assert audit.total_trades_entered == 3 * n
@@ -0,0 +1,126 @@
+"""
+Unit tests for the local backtest executor.
+"""
+
+import sys
+import time
+import textwrap
+from pathlib import Path
+
+import pytest
+
+from tools.backtest_executor import BacktestConfig, BacktestExecutorBase, LocalBacktestExecutor
+
+
+# Stand-in for `freqtrade backtesting`: writes a result file into --userdir
+FAKE_FREQTRADE = textwrap.dedent('''
+    import json, sys, time, zipfile
+    from pathlib import Path
+    
+    args = sys.argv[1:]
+    userdir = Path(args[args.index("--userdir") + 1])
+    strategy = args[args.index("--strategy") + 1]
+    timerange = args[args.index("--timerange") + 1]
+    if timerange == "fail":
+        print("boom", file=sys.stderr)
+        sys.exit(2)
+    time.sleep(0.3)
+    
+    assert (userdir / "strategies").exists()
+    results_dir = userdir / "backtest_results"
+    name = "backtest-result-" + timerange
+    stats = {"strategy": {strategy: {"profit_total_abs": float(len(timerange)), "total_trades": 7}}}
+    with zipfile.ZipFile(results_dir / (name + ".zip"), "w") as zf:
+        zf.writestr(name + ".json", json.dumps(stats))
+    (results_dir / ".last_result.json").write_text(json.dumps({"latest_backtest": name + ".zip"}))
+    print("Backtesting done")
+''')
+
+
+@pytest.fixture
+def project_dir(tmp_path, monkeypatch):
+    """Minimal project tree with a fake freqtrade"""
+    (tmp_path / "user_data" / "strategies").mkdir(parents=True)
+    (tmp_path / "fake_freqtrade.py").write_text(FAKE_FREQTRADE)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def make_executor(project_dir, **kwargs):
+    return LocalBacktestExecutor(
+        project_dir=str(project_dir),
+        freqtrade_cmd=[sys.executable, str(project_dir / "fake_freqtrade.py")],
+        **kwargs
+    )
+
+
+def make_config(timerange):
+    return BacktestConfig(strategy="FreqAIHybridStrategy", timerange=timerange, pairs=["BTC/USDT:USDT"])
+
+
+class TestLocalBacktestExecutor:
+    """Test LocalBacktestExecutor"""
+    
+    def test_execute_backtest(self, project_dir):
+        """Runs the command in a private userdir and parses the zipped result"""
+        executor = make_executor(project_dir)
+        result = executor.execute_backtest(make_config("20250101-20250201"))
+        
+        assert result["results"]["total_profit_abs"] == 17.0
+        assert result["results"]["total_trades"] == 7
+        assert "Backtesting done" in result["output"]
+        assert list((project_dir / "backtest_results").glob("backtest_FreqAIHybridStrategy_*.zip"))
+        # Job directory is cleaned up
+        assert not list((project_dir / "backtest_jobs").iterdir())
+    
+    def test_progress_events(self, project_dir):
+        """on_progress receives parsed output lines and the exit event"""
+        events = []
+        executor = make_executor(project_dir, on_progress=lambda config, event: events.append((config, event)))
+        config = make_config("20250101-20250201")
+        executor.execute_backtest(config)
+        
+        assert all(c is config for c, _ in events)
+        assert [e.message for _, e in events][:1] == ["Backtesting done"]
+        assert events[-1][1].kind == "exit"
+    
+    def test_command_uses_userdir(self, project_dir):
+        """The per-job userdir is appended to the configured command"""
+        executor = LocalBacktestExecutor(project_dir=str(project_dir))
+        cmd = executor.build_command(make_config("20250101-20250201"), Path("jobs/x"))
+        
+        assert cmd[:2] == ["freqtrade", "backtesting"]
+        assert cmd[-2:] == ["--userdir", str(Path("jobs/x"))]
+    
+    def test_batch_runs_in_parallel(self, project_dir):
+        """Jobs run concurrently without clobbering each other's results"""
+        executor = make_executor(project_dir, max_workers=4)
+        timeranges = [f"2025010{i}-20250201" for i in range(1, 5)]
+        
+        start = time.time()
+        results = executor.execute_batch([make_config(t) for t in timeranges])
+        elapsed = time.time() - start
+        
+        assert [r["config"].timerange for r in results] == timeranges
+        assert all(r["results"]["total_trades"] == 7 for r in results)
+        assert elapsed < 4 * 0.3 + 1.0
+    
+    def test_failure_reported(self, project_dir):
+        """Non-zero exit raises; batches record the error"""
+        executor = make_executor(project_dir, keep_job_dirs=True)
+        
+        with pytest.raises(RuntimeError, match="boom"):
+            executor.execute_backtest(make_config("fail"))
+        
+        results = executor.execute_batch([make_config("fail")])
+        assert "exited with code 2" in results[0]["error"]
+        # Job directories kept for inspection
+        assert len(list((project_dir / "backtest_jobs").iterdir())) == 2
+    
+    def test_base_requires_run_backtest(self):
+        """Executors that do not implement _run_backtest cannot be created"""
+        class Incomplete(BacktestExecutorBase):
+            pass
+        
+        with pytest.raises(TypeError, match="_run_backtest"):
+            Incomplete()
@@ -0,0 +1,135 @@
+"""
+Unit tests for sharded backtests and trade merging.
+"""
+
+import sys
+import time
+import textwrap
+
+import pytest
+
+from tools.backtest_executor import BacktestConfig, LocalBacktestExecutor
+from tools.backtest_sharding import apply_max_open_trades, compute_stats, merge_shard_results, shard_config
+
+HOUR = 3600 * 1000
+START = 1735689600 * 1000  # 2025-01-01
+
+
+def trade(pair, open_h, close_h, profit):
+    return {"pair": pair, "open_timestamp": START + open_h * HOUR, "close_timestamp": START + close_h * HOUR, "profit_abs": profit}
+
+
+def make_config(pairs):
+    return BacktestConfig(strategy="FreqAIHybridStrategy", timerange="20250101-20250201", pairs=pairs)
+
+
+# Stand-in for freqtrade: trains pairs one after another (0.3s each) and
+# opens one 48h trade per pair, all at the same time
+FAKE_FREQTRADE = textwrap.dedent('''
+    import json, sys, time
+    from pathlib import Path
+    
+    args = sys.argv[1:]
+    userdir = Path(args[args.index("--userdir") + 1])
+    pairs = args[args.index("--pairs") + 1:]
+    pairs = pairs[:next((i for i, a in enumerate(pairs) if a.startswith("--")), len(pairs))]
+    trades = []
+    for i, pair in enumerate(pairs):
+        time.sleep(0.3)
+        trades.append({
+            "pair": pair,
+            "open_date": "2025-01-02 00:00:00+00:00",
+            "close_date": "2025-01-04 00:00:00+00:00",
+            "profit_abs": 10.0 if pair.startswith(("BTC", "ETH")) else -5.0,
+        })
+    stats = {"trades": trades, "max_open_trades": 3, "starting_balance": 1000, "total_trades": len(trades)}
+    results = userdir / "backtest_results"
+    (results / "r.json").write_text(json.dumps({"strategy": {"FreqAIHybridStrategy": stats}}))
+    (results / ".last_result.json").write_text(json.dumps({"latest_backtest": "r.json"}))
+''')
+
+
+class TestShardConfig:
+    """Test shard_config"""
+    
+    def test_groups(self):
+        """Pairs split into groups; other fields copied"""
+        config = make_config(["A", "B", "C", "D", "E"])
+        shards = shard_config(config, shard_size=2)
+        
+        assert [s.pairs for s in shards] == [["A", "B"], ["C", "D"], ["E"]]
+        assert all(s.timerange == config.timerange for s in shards)
+        assert config.pairs == ["A", "B", "C", "D", "E"]
+        with pytest.raises(ValueError):
+            shard_config(config, shard_size=0)
+    
+    def test_command_passes_pairs(self):
+        """The freqtrade command carries the shard's pairs"""
+        assert make_config(["BTC/USDT:USDT", "ETH/USDT:USDT"]).to_command().endswith("--pairs BTC/USDT:USDT ETH/USDT:USDT")
+
+
+class TestMerge:
+    """Test trade merging"""
+    
+    def test_max_open_trades(self):
+        """Trades beyond the slot limit are dropped; closed slots are reused"""
+        trades = [
+            trade("A", 0, 10, 1.0),
+            trade("B", 1, 5, 1.0),
+            trade("C", 2, 3, 1.0),   # Third concurrent trade: dropped
+            trade("D", 5, 8, 1.0),   # B closed at 5: slot free
+        ]
+        accepted, rejected = apply_max_open_trades(trades, 2)
+        
+        assert [t["pair"] for t in accepted] == ["A", "B", "D"]
+        assert [t["pair"] for t in rejected] == ["C"]
+        assert len(apply_max_open_trades(trades, None)[0]) == 4
+    
+    def test_stats(self):
+        """Profit, win rate and drawdown from the merged trades"""
+        trades = [trade("A", 0, 1, 100.0), trade("B", 0, 2, -220.0), trade("C", 0, 30, 60.0)]
+        stats = compute_stats(trades, starting_balance=1000.0)
+        
+        assert stats["total_profit_abs"] == pytest.approx(-60.0)
+        assert stats["total_profit_pct"] == pytest.approx(-0.06)
+        assert (stats["total_trades"], stats["wins"], stats["losses"]) == (3, 2, 1)
+        assert stats["max_drawdown"] == pytest.approx(0.2)  # 1100 -> 880
+        assert stats["sharpe_ratio"] is not None  # Two trading days
+    
+    def test_failed_shard(self):
+        """A failed shard fails the merge"""
+        with pytest.raises(RuntimeError, match="1/2 shards failed: boom"):
+            merge_shard_results(make_config(["A", "B"]), [{"results": {"result_file": "x"}}, {"config": None, "error": "boom"}])
+
+
+class TestExecuteSharded:
+    """Test sharded execution on the local executor"""
+    
+    def test_parallel_shards_merge(self, tmp_path, monkeypatch):
+        """Six pairs in six parallel shards: ~1 pair's wall time, trades capped at max_open_trades"""
+        (tmp_path / "user_data" / "strategies").mkdir(parents=True)
+        (tmp_path / "fake_freqtrade.py").write_text(FAKE_FREQTRADE)
+        monkeypatch.chdir(tmp_path)
+        executor = LocalBacktestExecutor(
+            project_dir=str(tmp_path),
+            max_workers=6,
+            freqtrade_cmd=[sys.executable, str(tmp_path / "fake_freqtrade.py")]
+        )
+        config = make_config(["BTC/USDT:USDT", "ETH/USDT:USDT", "SOL/USDT:USDT", "XRP/USDT:USDT", "ADA/USDT:USDT", "DOT/USDT:USDT"])
+        
+        start = time.time()
+        result = executor.execute_sharded(config, shard_size=1)
+        elapsed = time.time() - start
+        
+        assert elapsed < 6 * 0.3  # Unsharded: one process training six pairs
+        assert result["config"] is config
+        assert result["results"]["shards"] == 6
+        # All six open together; max_open_trades=3 keeps the first three by pair name
+        assert result["results"]["total_trades"] == 3
+        assert result["results"]["rejected_trades"] == 3
+        assert result["results"]["total_profit_abs"] == pytest.approx(10.0 - 5.0 - 5.0)
+        assert len(set(result["shards"])) == 6  # No result file overwritten
+        
+        capped = executor.execute_sharded(config, shard_size=2, max_open_trades=10)
+        assert capped["results"]["total_trades"] == 6
+        assert capped["results"]["shards"] == 3
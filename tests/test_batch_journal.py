@@ -0,0 +1,112 @@
+"""
+Unit tests for the append-only batch journal.
+"""
+
+import json
+import sys
+
+from tools.backtest_executor import BacktestConfig, LocalBacktestExecutor
+from tools.batch_journal import BatchJournal, config_key
+
+
+def make_config(timerange):
+    return BacktestConfig(strategy="FreqAIHybridStrategy", timerange=timerange, pairs=["BTC/USDT:USDT"])
+
+
+def ok_result(config, profit=1.0):
+    return {"config": config, "elapsed_seconds": 1.0, "results": {"total_profit_abs": profit}, "output": ["x"] * 100}
+
+
+class TestBatchJournal:
+    """Test BatchJournal"""
+    
+    def test_config_key(self):
+        """Equal configs share a key, different ones do not"""
+        assert config_key(make_config("20250101-20250201")) == config_key(make_config("20250101-20250201"))
+        assert config_key(make_config("20250101-20250201")) != config_key(make_config("20250201-20250301"))
+    
+    def test_append_and_resume(self, tmp_path):
+        """Completed configs are returned, failed and new ones are pending"""
+        journal = BatchJournal(tmp_path / "sweep.jsonl")
+        a, b, c = (make_config(t) for t in ("a", "b", "c"))
+        journal.append(a, ok_result(a, profit=5.0))
+        journal.append(b, {"config": b, "error": "connection dropped"})
+        
+        stored = journal.resume([a, b, c])
+        
+        assert stored[0]["results"]["total_profit_abs"] == 5.0
+        assert stored[0]["config"] is a
+        assert "output" not in stored[0]
+        assert stored[1:] == [None, None]
+        assert len((tmp_path / "sweep.jsonl").read_text().splitlines()) == 2
+    
+    def test_truncated_line_ignored(self, tmp_path):
+        """A half-written last line is skipped and the next append starts a new line"""
+        path = tmp_path / "sweep.jsonl"
+        journal = BatchJournal(path)
+        a, b = make_config("a"), make_config("b")
+        journal.append(a, ok_result(a))
+        with open(path, "a") as f:
+            f.write('{"key": "trunc')
+        
+        journal.append(b, ok_result(b))
+        
+        assert [r is not None for r in journal.resume([a, b])] == [True, True]
+    
+    def test_success_is_final(self, tmp_path):
+        """A later error does not un-complete a config"""
+        journal = BatchJournal(tmp_path / "sweep.jsonl")
+        a = make_config("a")
+        journal.append(a, ok_result(a))
+        journal.append(a, {"config": a, "error": "boom"})
+        
+        assert journal.resume([a])[0] is not None
+    
+    def test_compact(self, tmp_path):
+        """Compaction keeps one record per config and writes the summary"""
+        journal = BatchJournal(tmp_path / "sweep.jsonl")
+        a, b = make_config("a"), make_config("b")
+        journal.append(a, {"config": a, "error": "boom"})
+        journal.append(a, ok_result(a, profit=2.0))
+        journal.append(b, ok_result(b, profit=3.0))
+        
+        summary_path = journal.compact()
+        
+        assert summary_path == tmp_path / "sweep.json"
+        summary = json.loads(summary_path.read_text())
+        assert [s["results"]["total_profit_abs"] for s in summary] == [2.0, 3.0]
+        assert summary[0]["config"]["timerange"] == "a"
+        assert len(journal.read()) == 2
+
+
+class TestExecutorResume:
+    """Test resuming a sweep through an executor"""
+    
+    def test_local_batch_resumes(self, tmp_path, monkeypatch):
+        """A second run with the same journal skips completed backtests"""
+        (tmp_path / "user_data" / "strategies").mkdir(parents=True)
+        runs = tmp_path / "runs.txt"
+        script = tmp_path / "fake_freqtrade.py"
+        script.write_text(
+            "import json, sys, pathlib\n"
+            "args = sys.argv[1:]\n"
+            "timerange = args[args.index('--timerange') + 1]\n"
+            f"open({str(runs)!r}, 'a').write(timerange + '\\n')\n"
+            "if timerange == 'bad': sys.exit(1)\n"
+            "d = pathlib.Path(args[args.index('--userdir') + 1]) / 'backtest_results'\n"
+            "(d / 'r.json').write_text(json.dumps({'strategy': {'FreqAIHybridStrategy': {'total_trades': 1}}}))\n"
+            "(d / '.last_result.json').write_text(json.dumps({'latest_backtest': 'r.json'}))\n"
+        )
+        monkeypatch.chdir(tmp_path)
+        executor = LocalBacktestExecutor(project_dir=str(tmp_path), max_workers=2, freqtrade_cmd=[sys.executable, str(script)])
+        configs = [make_config(t) for t in ("a", "bad", "c")]
+        journal_path = tmp_path / "backtest_results" / "sweep.jsonl"
+        
+        first = executor.execute_batch(configs, journal=journal_path)
+        second = executor.execute_batch(configs, journal=journal_path)
+        
+        assert "error" in first[1]
+        assert [r["results"]["total_trades"] for r in (second[0], second[2])] == [1, 1]
+        assert sorted(runs.read_text().split()) == ["a", "bad", "bad", "c"]
+        assert (tmp_path / "backtest_results" / "sweep.json").exists()
+        assert not list((tmp_path / "backtest_results").glob("batch_results_*"))
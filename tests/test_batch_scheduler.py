@@ -0,0 +1,152 @@
+"""
+Unit tests for the concurrent backtest batch scheduler.
+"""
+
+import pytest
+import threading
+import time
+
+from tools.batch_scheduler import BatchScheduler
+
+
+class FakeExecutor:
+    """Executor stand-in that sleeps and optionally fails"""
+    
+    def __init__(self, duration=0.05, failures=0):
+        self.duration = duration
+        self.failures = failures
+        self.calls = []
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+    
+    def execute_backtest(self, config):
+        with self._lock:
+            self.calls.append(config)
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            fail = self.failures > 0
+            if fail:
+                self.failures -= 1
+        try:
+            time.sleep(self.duration)
+            if fail:
+                raise RuntimeError("connection dropped")
+            return {"config": config, "elapsed_seconds": self.duration, "results": {"config": config}}
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+class TestBatchScheduler:
+    """Test BatchScheduler"""
+    
+    def test_wall_time_scales_with_workers(self):
+        """20 jobs on 4 workers take about 5 job durations"""
+        workers = [FakeExecutor(duration=0.1) for _ in range(4)]
+        scheduler = BatchScheduler(workers)
+        
+        start = time.time()
+        results = scheduler.execute_batch(list(range(20)))
+        elapsed = time.time() - start
+        
+        assert [r["results"]["config"] for r in results] == list(range(20))
+        assert elapsed < 1.0  # Sequential would take 2.0s
+        assert sum(len(w.calls) for w in workers) == 20
+    
+    def test_concurrency_cap_per_worker(self):
+        """A worker never runs more jobs than its cap"""
+        fast = FakeExecutor(duration=0.02)
+        slow = FakeExecutor(duration=0.02)
+        scheduler = BatchScheduler({"fast": fast, "slow": slow}, max_concurrency={"fast": 3, "slow": 1})
+        
+        list(scheduler.run(list(range(30))))
+        
+        assert fast.peak <= 3
+        assert slow.peak == 1
+        assert len(fast.calls) > len(slow.calls)
+    
+    def test_worker_concurrency_limit(self):
+        """Workers declaring max_concurrency are clamped to it"""
+        class RemoteExecutor(FakeExecutor):
+            max_concurrency = 1
+        
+        remote = RemoteExecutor(duration=0.02)
+        local = FakeExecutor(duration=0.02)
+        scheduler = BatchScheduler({"remote": remote, "local": local}, max_concurrency=3)
+        
+        assert scheduler.max_concurrency == {"remote": 1, "local": 3}
+        list(scheduler.run(list(range(12))))
+        assert remote.peak == 1
+    
+    def test_streams_in_completion_order(self):
+        """Results are yielded as soon as each job finishes"""
+        class VariableExecutor:
+            def execute_backtest(self, config):
+                time.sleep(config)
+                return {"config": config}
+        
+        scheduler = BatchScheduler([VariableExecutor()], max_concurrency=3)
+        order = [job.config for job in scheduler.run([0.3, 0.1, 0.2])]
+        
+        assert order == [0.1, 0.2, 0.3]
+    
+    def test_retry_with_backoff(self):
+        """Failed jobs are retried and succeed"""
+        worker = FakeExecutor(duration=0.01, failures=2)
+        scheduler = BatchScheduler([worker], max_retries=2, backoff_base=0.05)
+        
+        start = time.time()
+        jobs = list(scheduler.run(["a"]))
+        
+        assert jobs[0].ok
+        assert jobs[0].attempts == 3
+        assert time.time() - start >= 0.05 + 0.1  # Two backoffs
+    
+    def test_gives_up_after_max_retries(self):
+        """Jobs failing more than max_retries times report the errors"""
+        worker = FakeExecutor(duration=0.0, failures=10)
+        scheduler = BatchScheduler([worker], max_retries=1, backoff_base=0.01)
+        
+        results = scheduler.execute_batch(["a"])
+        
+        assert results[0]["config"] == "a"
+        assert "connection dropped" in results[0]["error"]
+        assert len(worker.calls) == 2
+    
+    def test_failing_worker_taken_out_of_rotation(self):
+        """A worker failing max_consecutive_failures times in a row gets no more jobs"""
+        broken = FakeExecutor(duration=0.01, failures=100)
+        healthy = FakeExecutor(duration=0.01)
+        scheduler = BatchScheduler(
+            {"broken": broken, "healthy": healthy},
+            max_retries=5, backoff_base=0.01, max_consecutive_failures=2,
+        )
+        
+        results = scheduler.execute_batch(list(range(10)))
+        
+        assert [r["results"]["config"] for r in results] == list(range(10))
+        assert len(broken.calls) == 2
+        assert scheduler.healthy_workers == ["healthy"]
+    
+    def test_no_healthy_workers_fails_remaining_jobs(self):
+        """Once every worker is retired, queued jobs fail instead of hanging"""
+        worker = FakeExecutor(duration=0.0, failures=100)
+        scheduler = BatchScheduler([worker], max_retries=5, backoff_base=0.01, max_consecutive_failures=3)
+        
+        results = scheduler.execute_batch(list(range(5)))
+        
+        assert all("error" in r for r in results)
+        assert sum("no healthy workers left" in r["error"] for r in results) >= 2
+        assert len(worker.calls) == 3
+        assert scheduler.healthy_workers == []
+    
+    def test_retry_delay_capped(self):
+        """Backoff doubles up to backoff_max"""
+        scheduler = BatchScheduler([FakeExecutor()], backoff_base=10, backoff_max=30)
+        assert [scheduler.retry_delay(a) for a in (1, 2, 3, 4)] == [10, 20, 30, 30]
+    
+    def test_requires_workers(self):
+        """Empty worker set is rejected"""
+        with pytest.raises(ValueError):
+            BatchScheduler([])
@@ -0,0 +1,252 @@
+"""
+Unit tests for the cross-pair batched feature computation.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from features.batched_features import (
+    BatchedFeatureEngine,
+    atr,
+    basic_features,
+    batched_features,
+    ema,
+    regime_features,
+    stack_pairs,
+)
+
+PAIRS = ["BTC/USDT:USDT", "ETH/USDT:USDT", "SOL/USDT:USDT", "XRP/USDT:USDT"]
+
+
+def make_candles(n, end="2025-03-01", seed=0, freq="5min"):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    spread = close * rng.uniform(0.001, 0.02, n)
+    return pd.DataFrame({
+        "date": pd.date_range(end=end, periods=n, freq=freq, tz="UTC"),
+        "open": close,
+        "high": close + spread,
+        "low": close - spread,
+        "close": close,
+        "volume": rng.uniform(1, 10, n),
+    })
+
+
+def talib_ema(values, period):
+    """Loop reference of TA-Lib's EMA"""
+    out = np.full(len(values), np.nan)
+    if len(values) >= period:
+        out[period - 1] = values[:period].mean()
+        k = 2.0 / (period + 1)
+        for i in range(period, len(values)):
+            out[i] = (values[i] - out[i - 1]) * k + out[i - 1]
+    return out
+
+
+def talib_atr(high, low, close, period):
+    """Loop reference of TA-Lib's ATR"""
+    out = np.full(len(close), np.nan)
+    true_range = np.full(len(close), np.nan)
+    for i in range(1, len(close)):
+        true_range[i] = max(high[i] - low[i], abs(high[i] - close[i - 1]), abs(low[i] - close[i - 1]))
+    if len(close) > period:
+        out[period] = true_range[1:period + 1].mean()
+        for i in range(period + 1, len(close)):
+            out[i] = (out[i - 1] * (period - 1) + true_range[i]) / period
+    return out
+
+
+def standard_hook(dataframe, trend_threshold=0.005, volatility_threshold=1.0):
+    """Per-pair feature_engineering_standard of the strategy (TA-Lib replaced by the references)"""
+    dataframe["%-day_of_week"] = (dataframe["date"].dt.dayofweek + 1) / 7
+    dataframe["%-hour_of_day"] = (dataframe["date"].dt.hour + 1) / 25
+    close = dataframe["close"].to_numpy()
+    ema_short, ema_long = talib_ema(close, 20), talib_ema(close, 50)
+    dataframe["%-trend_strength"] = np.where(ema_long != 0, (ema_short - ema_long) / ema_long, 0)
+    atr_20 = talib_atr(dataframe["high"].to_numpy(), dataframe["low"].to_numpy(), close, 20)
+    dataframe["%-volatility_regime"] = np.where(dataframe["close"] != 0, atr_20 / dataframe["close"], 0)
+    volume_ma = dataframe["volume"].rolling(window=20).mean()
+    dataframe["%-volume_regime"] = np.where(volume_ma != 0, dataframe["volume"] / volume_ma, 1)
+    dataframe["%-market_regime"] = 0
+    trend_up = dataframe["%-trend_strength"] > trend_threshold
+    trend_down = dataframe["%-trend_strength"] < -trend_threshold
+    high_vol = dataframe["%-volatility_regime"] > volatility_threshold * 0.02
+    dataframe.loc[trend_up & ~high_vol, "%-market_regime"] = 1
+    dataframe.loc[trend_down & ~high_vol, "%-market_regime"] = 2
+    dataframe.loc[high_vol, "%-market_regime"] = 3
+    dataframe["%-regime_short"] = dataframe["%-market_regime"].rolling(window=10).mean()
+    dataframe["%-regime_medium"] = dataframe["%-market_regime"].rolling(window=50).mean()
+    dataframe["%-regime_long"] = dataframe["%-market_regime"].rolling(window=200).mean()
+    return dataframe
+
+
+def basic_hook(dataframe):
+    """Per-pair feature_engineering_expand_basic of the strategy"""
+    dataframe["%-pct-change"] = dataframe["close"].pct_change()
+    dataframe["%-raw_volume"] = dataframe["volume"]
+    dataframe["%-raw_price"] = dataframe["close"]
+    dataframe["%-volatility"] = dataframe["close"].rolling(window=20).std()
+    dataframe["%-volume_mean_20"] = dataframe["volume"].rolling(window=20).mean()
+    dataframe["%-volume_std_20"] = dataframe["volume"].rolling(window=20).std()
+    return dataframe
+
+
+class Threshold:
+    def __init__(self, value):
+        self.value = value
+
+
+class FakeStrategy:
+    """Strategy stand-in with the batched hooks and per-pair call counts"""
+    timeframe = "5m"
+    
+    def __init__(self, engine=None):
+        self.engine = engine
+        self.trend_threshold = Threshold(0.002)
+        self.volatility_threshold = Threshold(1.0)
+        self.calls = []
+    
+    def _get_batch_engine(self):
+        return self.engine
+    
+    @batched_features('feature_engineering_standard', trend_threshold='trend_threshold',
+                      volatility_threshold='volatility_threshold')
+    def feature_engineering_standard(self, dataframe, metadata, **kwargs):
+        self.calls.append(("standard", metadata["pair"]))
+        return standard_hook(dataframe, self.trend_threshold.value, self.volatility_threshold.value)
+    
+    @batched_features('feature_engineering_expand_basic')
+    def feature_engineering_expand_basic(self, dataframe, metadata, **kwargs):
+        self.calls.append(("basic", metadata["pair"]))
+        return basic_hook(dataframe)
+
+
+@pytest.fixture
+def frames():
+    """Pairs with different history lengths ending on the same candle"""
+    lengths = [600, 600, 450, 120]
+    return {pair: make_candles(n, seed=i) for i, (pair, n) in enumerate(zip(PAIRS, lengths))}
+
+
+class TestKernels:
+    """Test stacking and the TA-Lib compatible recursions"""
+    
+    def test_stack_pairs(self, frames):
+        gapped = make_candles(300, seed=9).drop(index=100).reset_index(drop=True)
+        stale = make_candles(300, end="2025-02-28", seed=10)
+        missing = make_candles(300, seed=11)
+        missing.loc[5, "volume"] = np.nan
+        tensor = stack_pairs({**frames, "GAP": gapped, "OLD": stale, "NAN": missing, "EMPTY": pd.DataFrame()})
+        
+        assert tensor.pairs == PAIRS
+        assert len(tensor.dates) == 600
+        assert list(tensor.start) == [0, 0, 150, 480]
+        row = tensor.row("SOL/USDT:USDT")
+        assert np.isnan(tensor.values["close"][row, :150]).all()
+        np.testing.assert_array_equal(tensor.values["close"][row, 150:], frames["SOL/USDT:USDT"]["close"])
+        assert stack_pairs({"GAP": gapped.iloc[:0]}) is None
+    
+    def test_ema_and_atr_match_talib(self, frames):
+        tensor = stack_pairs(frames)
+        v = tensor.values
+        ema_50 = ema(v["close"], 50, tensor.start)
+        atr_20 = atr(v["high"], v["low"], v["close"], 20, tensor.start)
+        for pair, frame in frames.items():
+            row, start = tensor.row(pair), tensor.start[tensor.row(pair)]
+            assert np.isnan(ema_50[row, :start]).all()
+            np.testing.assert_allclose(ema_50[row, start:], talib_ema(frame["close"].to_numpy(), 50), rtol=1e-12)
+            expected = talib_atr(frame["high"].to_numpy(), frame["low"].to_numpy(), frame["close"].to_numpy(), 20)
+            np.testing.assert_allclose(atr_20[row, start:], expected, rtol=1e-12)
+    
+    def test_features_match_per_pair_hooks(self, frames):
+        """Every pair's slice equals the per-pair hook output, short histories included"""
+        tensor = stack_pairs(frames)
+        regime = regime_features(tensor, trend_threshold=0.002)
+        basic = basic_features(tensor)
+        for pair, frame in frames.items():
+            row, start = tensor.row(pair), tensor.start[tensor.row(pair)]
+            expected = standard_hook(frame.copy(), trend_threshold=0.002)
+            for col, values in regime.items():
+                got = values[row, start:] if values.ndim == 2 else values[start:]
+                np.testing.assert_allclose(got, expected[col].to_numpy(dtype=np.float64), rtol=1e-10, err_msg=col)
+            expected = basic_hook(frame.copy())
+            for col, values in basic.items():
+                np.testing.assert_allclose(values[row, start:], expected[col], rtol=1e-10, err_msg=col)
+        assert set(np.unique(regime["%-market_regime"])) <= {0, 1, 2, 3}
+    
+    def test_talib_parity(self, frames):
+        """The recursions agree with TA-Lib itself when it is installed"""
+        ta = pytest.importorskip("talib.abstract")
+        tensor = stack_pairs(frames)
+        regime = regime_features(tensor)
+        frame = frames["SOL/USDT:USDT"]
+        row, start = tensor.row("SOL/USDT:USDT"), tensor.start[tensor.row("SOL/USDT:USDT")]
+        ema_short, ema_long = ta.EMA(frame, timeperiod=20), ta.EMA(frame, timeperiod=50)
+        np.testing.assert_allclose(regime["%-trend_strength"][row, start:], (ema_short - ema_long) / ema_long, rtol=1e-9)
+        atr_20 = ta.ATR(frame, timeperiod=20)
+        np.testing.assert_allclose(regime["%-volatility_regime"][row, start:], atr_20 / frame["close"], rtol=1e-9)
+
+
+class TestBatchedFeatureEngine:
+    """Test per-cycle batching through the hook decorator"""
+    
+    def test_one_batch_serves_all_pairs(self, frames):
+        sources = []
+        engine = BatchedFeatureEngine(lambda tf: sources.append(tf) or frames)
+        strategy = FakeStrategy(engine)
+        reference = FakeStrategy()
+        for pair, frame in frames.items():
+            got = strategy.feature_engineering_standard(frame.copy(), metadata={"pair": pair})
+            expected = reference.feature_engineering_standard(frame.copy(), metadata={"pair": pair})
+            pd.testing.assert_frame_equal(got, expected, check_dtype=False)
+            got = strategy.feature_engineering_expand_basic(frame.copy(), metadata={"pair": pair, "tf": "5m"})
+            pd.testing.assert_frame_equal(got, reference.feature_engineering_expand_basic(
+                frame.copy(), metadata={"pair": pair, "tf": "5m"}))
+        
+        assert strategy.calls == []
+        assert sources == ["5m"]
+        assert engine.stats == {"batches": 2, "served": 8, "fallback": 0, "cycles": 0}
+        assert engine.summary()["stacked"] == {"5m": 4}
+    
+    def test_tail_slice_falls_back(self, frames):
+        """A frame starting after the pair's first stacked candle gets the per-pair hook's output"""
+        engine = BatchedFeatureEngine(lambda tf: frames)
+        strategy = FakeStrategy(engine)
+        tail = frames["ETH/USDT:USDT"].tail(100).reset_index(drop=True)
+        
+        got = strategy.feature_engineering_standard(tail.copy(), metadata={"pair": "ETH/USDT:USDT"})
+        
+        expected = FakeStrategy().feature_engineering_standard(tail.copy(), metadata={"pair": "ETH/USDT:USDT"})
+        pd.testing.assert_frame_equal(got, expected)
+        assert strategy.calls == [("standard", "ETH/USDT:USDT")]
+        assert engine.stats["fallback"] == 1
+    
+    def test_fallback_and_new_cycle(self, frames):
+        engine = BatchedFeatureEngine(lambda tf: frames)
+        strategy = FakeStrategy(engine)
+        unknown = make_candles(300, seed=20)
+        revised = frames["BTC/USDT:USDT"].copy()
+        revised.loc[len(revised) - 1, "close"] *= 1.01
+        
+        strategy.feature_engineering_expand_basic(unknown, metadata={"pair": "DOGE/USDT:USDT", "tf": "5m"})
+        strategy.feature_engineering_expand_basic(revised, metadata={"pair": "BTC/USDT:USDT", "tf": "5m"})
+        strategy.feature_engineering_expand_basic(frames["ETH/USDT:USDT"], metadata={"pair": "ETH/USDT:USDT"})
+        assert strategy.calls == [("basic", "DOGE/USDT:USDT"), ("basic", "BTC/USDT:USDT")]
+        assert engine.stats["fallback"] == 2
+        
+        strategy.trend_threshold = Threshold(0.004)
+        strategy.feature_engineering_standard(frames["ETH/USDT:USDT"].copy(), metadata={"pair": "ETH/USDT:USDT"})
+        strategy.trend_threshold = Threshold(0.002)
+        strategy.feature_engineering_standard(frames["ETH/USDT:USDT"].copy(), metadata={"pair": "ETH/USDT:USDT"})
+        assert engine.stats["batches"] == 3
+        
+        engine.new_cycle()
+        assert engine.summary()["stacked"] == {}
+        strategy.feature_engineering_expand_basic(frames["ETH/USDT:USDT"], metadata={"pair": "ETH/USDT:USDT"})
+        assert engine.stats["batches"] == 4
+    
+    def test_without_engine(self, frames):
+        strategy = FakeStrategy()
+        strategy.feature_engineering_expand_basic(frames["BTC/USDT:USDT"].copy(), metadata={"pair": "BTC/USDT:USDT"})
+        assert strategy.calls == [("basic", "BTC/USDT:USDT")]
@@ -0,0 +1,282 @@
+"""
+Unit tests for the SSH backtest executor against a local sshd stand-in.
+"""
+
+import io
+import os
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+from tools.backtest_executor import BacktestConfig, ColabBacktestExecutor
+
+
+class FakeChannel:
+    """Channel of a finished command; output is handed out in small pieces"""
+    
+    eof_received = True
+    
+    def __init__(self, returncode=0, stdout=b"", stderr=b""):
+        self.returncode = returncode
+        self.closed = False
+        self.stdout = io.BytesIO(stdout)
+        self.stderr = io.BytesIO(stderr)
+        self.remaining = {"stdout": len(stdout), "stderr": len(stderr)}
+    
+    def _recv(self, name, nbytes):
+        data = getattr(self, name).read(min(nbytes, 4096))
+        self.remaining[name] -= len(data)
+        return data
+    
+    def recv_ready(self):
+        return self.remaining["stdout"] > 0
+    
+    def recv_stderr_ready(self):
+        return self.remaining["stderr"] > 0
+    
+    def recv(self, nbytes):
+        return self._recv("stdout", nbytes)
+    
+    def recv_stderr(self, nbytes):
+        return self._recv("stderr", nbytes)
+    
+    def exit_status_ready(self):
+        return True
+    
+    def recv_exit_status(self):
+        return self.returncode
+
+
+class FakeStream(io.BytesIO):
+    """stdout/stderr of a finished local command"""
+    
+    def __init__(self, data, channel):
+        super().__init__(data)
+        self.channel = channel
+    
+    def __iter__(self):
+        return iter(self.getvalue().decode().splitlines())
+
+
+class FakeTransport:
+    def __init__(self):
+        self.active = True
+        self.keepalive = None
+    
+    def is_active(self):
+        return self.active
+    
+    def set_keepalive(self, interval):
+        self.keepalive = interval
+
+
+class FakeSFTP:
+    """SFTP over the local filesystem"""
+    
+    def __init__(self, server):
+        self.server = server
+        self.channel = FakeChannel()
+    
+    def get_channel(self):
+        return self.channel
+    
+    def get(self, remote, local):
+        self.server.bytes_transferred += os.path.getsize(remote)
+        shutil.copy(remote, local)
+    
+    def open(self, path):
+        return open(path, "rb")
+    
+    def remove(self, path):
+        os.remove(path)
+    
+    def close(self):
+        self.channel.closed = True
+
+
+class FakeServer:
+    """Shared state of the stand-in host across client instances"""
+    
+    def __init__(self):
+        self.connects = 0
+        self.sftp_opens = 0
+        self.commands = []
+        self.exec_kwargs = []
+        self.bytes_transferred = 0
+        self.fail_next_exec = False
+        self.clients = []
+    
+    def client(self):
+        client = FakeSSHClient(self)
+        self.clients.append(client)
+        return client
+
+
+class FakeSSHClient:
+    """paramiko.SSHClient stand-in running commands in a local shell"""
+    
+    def __init__(self, server):
+        self.server = server
+        self.transport = None
+    
+    def set_missing_host_key_policy(self, policy):
+        pass
+    
+    def connect(self, **kwargs):
+        self.server.connects += 1
+        self.transport = FakeTransport()
+    
+    def get_transport(self):
+        return self.transport
+    
+    def exec_command(self, command, **kwargs):
+        if self.server.fail_next_exec:
+            self.server.fail_next_exec = False
+            self.transport.active = False
+            raise EOFError("connection reset")
+        self.server.commands.append(command)
+        self.server.exec_kwargs.append(kwargs)
+        proc = subprocess.run(command, shell=True, capture_output=True)
+        channel = FakeChannel(proc.returncode, proc.stdout, proc.stderr)
+        return None, FakeStream(proc.stdout, channel), FakeStream(proc.stderr, channel)
+    
+    def open_sftp(self):
+        self.server.sftp_opens += 1
+        return FakeSFTP(self.server)
+    
+    def close(self):
+        if self.transport:
+            self.transport.active = False
+
+
+# Writes a result JSON and .last_result.json like freqtrade backtesting
+FAKE_BACKTEST = (
+    "import json, pathlib; d = pathlib.Path('user_data/backtest_results'); "
+    "d.mkdir(parents=True, exist_ok=True); "
+    "stats = {'strategy': {'FreqAIHybridStrategy': {'profit_total_abs': 12.5, 'total_trades': 3, 'pad': 'x' * 50000}}}; "
+    "(d / 'backtest-result-1.json').write_text(json.dumps(stats)); "
+    "(d / '.last_result.json').write_text(json.dumps({'latest_backtest': 'backtest-result-1.json'})); "
+    "print('Backtesting done')"
+)
+
+
+class FakeBacktestConfig(BacktestConfig):
+    def to_command(self) -> str:
+        return f'"{sys.executable}" -c "{FAKE_BACKTEST}"'
+
+
+class FailingBacktestConfig(BacktestConfig):
+    def to_command(self) -> str:
+        return f'"{sys.executable}" -c "import sys; print(\'no data\'); sys.exit(3)"'
+
+
+@pytest.fixture
+def remote(tmp_path, monkeypatch):
+    """Remote checkout directory and a local working directory"""
+    remote_dir = tmp_path / "remote"
+    remote_dir.mkdir()
+    local_dir = tmp_path / "local"
+    local_dir.mkdir()
+    monkeypatch.chdir(local_dir)
+    return remote_dir
+
+
+def make_executor(server, remote_dir, **kwargs):
+    return ColabBacktestExecutor(
+        tunnel_url="tcp://localhost:2222",
+        password="secret",
+        remote_dir=str(remote_dir),
+        client_factory=server.client,
+        **kwargs
+    )
+
+
+def make_config():
+    return FakeBacktestConfig(strategy="FreqAIHybridStrategy", timerange="20250101-20250201", pairs=["BTC/USDT:USDT"])
+
+
+@pytest.mark.skipif(shutil.which("gzip") is None, reason="gzip not available")
+class TestColabBacktestExecutor:
+    """Test ColabBacktestExecutor connection reuse"""
+    
+    def test_reuses_transport_and_sftp(self, remote):
+        """Several backtests share one connection and one SFTP session"""
+        server = FakeServer()
+        executor = make_executor(server, remote)
+        executor.connect()
+        
+        results = [executor.execute_backtest(make_config()) for _ in range(3)]
+        
+        assert all(r["results"]["total_profit_abs"] == 12.5 for r in results)
+        assert server.connects == 1
+        assert server.sftp_opens == 1
+        assert all("get_pty" not in kw for kw in server.exec_kwargs)
+        assert server.clients[0].transport.keepalive == 30
+        executor.disconnect()
+    
+    def test_compressed_transfer(self, remote):
+        """Result JSON is gzipped remotely and the temporary .gz removed"""
+        server = FakeServer()
+        executor = make_executor(server, remote)
+        executor.connect()
+        
+        executor.execute_backtest(make_config())
+        
+        assert any(cmd.startswith("gzip -c") for cmd in server.commands)
+        assert server.bytes_transferred < 5000  # Raw JSON is > 50 kB
+        assert not list((remote / "user_data" / "backtest_results").glob("*.gz"))
+        assert len(list((remote.parent / "local" / "backtest_results").glob("*.json"))) == 1
+    
+    def test_uncompressed_transfer(self, remote):
+        """compress_results=False transfers the file as is"""
+        server = FakeServer()
+        executor = make_executor(server, remote, compress_results=False)
+        executor.connect()
+        
+        result = executor.execute_backtest(make_config())
+        
+        assert result["results"]["total_trades"] == 3
+        assert not any(cmd.startswith("gzip") for cmd in server.commands)
+        assert server.bytes_transferred > 50000
+    
+    def test_reconnects_after_drop(self, remote):
+        """A dropped transport is re-established before the next backtest"""
+        server = FakeServer()
+        executor = make_executor(server, remote)
+        executor.connect()
+        executor.execute_backtest(make_config())
+        
+        server.clients[-1].transport.active = False
+        result = executor.execute_backtest(make_config())
+        
+        assert result["results"]["total_trades"] == 3
+        assert server.connects == 2
+        assert server.sftp_opens == 2
+        assert executor.reconnects == 1
+    
+    def test_retries_on_connection_error(self, remote):
+        """A connection error mid-operation reconnects and retries"""
+        server = FakeServer()
+        executor = make_executor(server, remote)
+        executor.connect()
+        server.fail_next_exec = True
+        
+        result = executor.execute_backtest(make_config())
+        
+        assert result["results"]["total_trades"] == 3
+        assert server.connects == 2
+    
+    def test_failed_run_raises(self, remote):
+        """A non-zero remote exit raises instead of returning the previous run's result"""
+        server = FakeServer()
+        executor = make_executor(server, remote)
+        executor.connect()
+        executor.execute_backtest(make_config())
+        
+        failing = FailingBacktestConfig(strategy="FreqAIHybridStrategy", timerange="20250101-20250201", pairs=["BTC/USDT:USDT"])
+        with pytest.raises(RuntimeError, match="exited with code 3"):
+            executor.execute_backtest(failing)
+        
+        assert not (remote / "user_data" / "backtest_results" / ".last_result.json").exists()
@@ -21,6 +21,13 @@ from src.evaluation_protocol import (
     EvaluationConfig,
     EvaluationProtocol,
     WalkForwardResult,
+    stationary_bootstrap_blocks,
+    expand_bootstrap_blocks,
+    stationary_bootstrap_ci,
+    load_stored_predictions,
+    _ReturnPathIndex,
+    _combine_block_metrics,
+    _return_metrics,
 )
 
 
@@ -383,6 +390,90 @@ class TestEvaluationProtocol:
             protocol.walk_forward_validation(bad_data, dummy_strategy)
 
 
+class TestStationaryBootstrap:
+    """Test block-bootstrap confidence intervals"""
+    
+    @pytest.fixture
+    def returns(self):
+        rng = np.random.default_rng(7)
+        values = rng.normal(0.0002, 0.01, 2000)
+        values[rng.random(2000) < 0.3] = 0.0  # Flat periods
+        return values
+    
+    def test_blocks_cover_series(self):
+        """Every replicate covers exactly n_obs observations"""
+        rng = np.random.default_rng(0)
+        starts, lengths = stationary_bootstrap_blocks(500, 20, 10, rng)
+        
+        assert starts.shape == lengths.shape
+        assert (lengths.sum(axis=1) == 500).all()
+        
+        idx = expand_bootstrap_blocks(starts, lengths, 500)
+        assert idx.shape == (20, 500)
+        assert idx.min() >= 0 and idx.max() < 500
+    
+    def test_block_metrics_match_dense_resample(self, returns):
+        """Range-query metrics equal metrics of the expanded resample"""
+        rng = np.random.default_rng(1)
+        starts, lengths = stationary_bootstrap_blocks(len(returns), 30, 12, rng)
+        index = _ReturnPathIndex(returns, int(lengths.max()) + 1)
+        metrics = _combine_block_metrics(index, starts, lengths, len(returns), 105120)
+        
+        dense = expand_bootstrap_blocks(starts, lengths, len(returns))
+        for k, row in enumerate(dense):
+            expected = _return_metrics(returns[row], 105120)
+            for name, value in expected.items():
+                assert metrics[name][k] == pytest.approx(value, rel=1e-9, abs=1e-9)
+    
+    def test_ci_contains_estimate(self, returns):
+        """Interval brackets the point estimate"""
+        ci = stationary_bootstrap_ci(returns, n_replicates=500, seed=42)
+        
+        assert set(ci) == {'sharpe_ratio', 'max_drawdown_pct', 'win_rate_pct'}
+        for stats in ci.values():
+            assert stats['lower'] <= stats['estimate'] <= stats['upper']
+            assert stats['std'] >= 0
+    
+    def test_reproducible_with_workers(self, returns):
+        """Same seed and worker count gives identical intervals"""
+        first = stationary_bootstrap_ci(returns, n_replicates=300, seed=3, n_workers=3)
+        second = stationary_bootstrap_ci(returns, n_replicates=300, seed=3, n_workers=3)
+        
+        assert first == second
+    
+    def test_too_few_returns(self):
+        """Bootstrap requires at least two returns"""
+        with pytest.raises(ValueError):
+            stationary_bootstrap_ci([0.01])
+    
+    def test_generate_report_with_returns(self, returns, temp_results_dir):
+        """generate_report adds bootstrap intervals when returns are given"""
+        config = EvaluationConfig(
+            results_dir=temp_results_dir,
+            bootstrap_replicates=200,
+            bootstrap_seed=0,
+        )
+        protocol = EvaluationProtocol(config)
+        results = [
+            WalkForwardResult(
+                window_id=1,
+                train_start=datetime(2023, 1, 1),
+                train_end=datetime(2023, 3, 31),
+                test_start=datetime(2023, 4, 1),
+                test_end=datetime(2023, 4, 30),
+                test_sharpe=1.5,
+                passed_constraints=True,
+            ),
+        ]
+        
+        report = protocol.generate_report(results, returns=returns)
+        
+        assert 'bootstrap_ci' in report
+        assert 'sharpe_ratio' in report['bootstrap_ci']
+        assert report['bootstrap_seconds'] > 0
+        assert 'bootstrap_ci' not in protocol.generate_report(results)
+
+
 class TestIntegration:
     """Integration tests for complete workflows"""
     
@@ -422,5 +513,29 @@ class TestIntegration:
         assert (temp_results_dir / "oos_test_result.csv").exists()
 
 
+class TestStoredPredictions:
+    """Test loading predictions from the strategy's prediction store"""
+    
+    def test_load_range(self, tmp_path):
+        """Stored windows are joined per pair and clipped to the range"""
+        from diagnostics.prediction_store import PredictionStore
+        
+        dates = pd.date_range("2025-01-01", periods=96, freq="1h", tz="UTC")
+        frame = pd.DataFrame({"date": dates, "&-s_close": np.arange(96.0), "do_predict": 1})
+        store = PredictionStore(tmp_path)
+        store.write("hybrid", "BTC/USDT:USDT", frame, window_days=1)
+        store.write("hybrid", "ETH/USDT:USDT", frame.iloc[:24])
+        
+        loaded = load_stored_predictions(
+            tmp_path, "hybrid", start=datetime(2025, 1, 2), end=datetime(2025, 1, 3, 5),
+        )
+        
+        assert list(loaded) == ["BTC/USDT:USDT"]
+        btc = loaded["BTC/USDT:USDT"]
+        assert btc.index[0] == pd.Timestamp("2025-01-02", tz="UTC")
+        assert len(btc) == 30
+        assert btc["&-s_close"].tolist() == list(np.arange(24.0, 54.0))
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,319 @@
+"""
+Unit tests for the prediction-cached fast hyperopt.
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.fast_hyperopt import (
+    DEFAULT_PARAMS,
+    FastHyperopt,
+    PairData,
+    SimulationConfig,
+    entry_signals,
+    entry_signals_batch,
+    extract_arrays,
+    hyperopt_loss,
+    hyperopt_loss_batch,
+    load_predictions,
+    params_matrix,
+    prediction_fingerprint,
+    roi_curve,
+    roi_table,
+    save_predictions,
+    simulate_pair,
+)
+from diagnostics.prediction_store import PredictionStore
+
+START = pd.Timestamp("2025-01-01", tz="UTC")
+
+
+def make_frame(n=10, close=100.0, **columns):
+    """Analyzed-dataframe stand-in: flat candles, one prediction column set"""
+    frame = pd.DataFrame({
+        "date": pd.date_range(START, periods=n, freq="5min"),
+        "open": close, "high": close, "low": close, "close": close,
+        "do_predict": 1, "DI_values": 0.5, "%-volume_regime": 1.0,
+        "%-market_regime": 0, "%-trend_strength": 0.01, "atr_14": 0.0,
+        "&-s_close": 0.0, "&-s_close_mean": 0.0, "&-s_close_std": 1.0,
+    })
+    for name, values in columns.items():
+        frame[name] = values
+    return frame
+
+
+def make_pair(frame, pair="BTC/USDT:USDT"):
+    return PairData(pair=pair, arrays=extract_arrays(frame))
+
+
+def random_pair(n, seed, pair="BTC/USDT:USDT"):
+    """Random walk prices with noisy predictions"""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.003, n)))
+    frame = make_frame(n, close=close)
+    frame["open"] = np.r_[close[0], close[:-1]]
+    frame["high"] = np.maximum(frame["open"], close) * (1 + rng.uniform(0, 0.002, n))
+    frame["low"] = np.minimum(frame["open"], close) * (1 - rng.uniform(0, 0.002, n))
+    frame["&-s_close"] = rng.normal(0, 1, n)
+    frame["DI_values"] = rng.uniform(0, 1.2, n)
+    frame["%-volume_regime"] = rng.uniform(0.5, 3, n)
+    frame["%-trend_strength"] = rng.normal(0, 0.01, n)
+    frame["%-market_regime"] = rng.choice([0, 1, 2, 3], n, p=[0.4, 0.25, 0.25, 0.1])
+    frame["atr_14"] = close * 0.01
+    return make_pair(frame, pair)
+
+
+def reference_entries(data, params):
+    """populate_entry_trend written out with pandas, as the strategy does it"""
+    a = {k: pd.Series(v) for k, v in data.arrays.items()}
+    z = (a["target"] - a["target_mean"]) / (a["target_std"] + 1e-12)
+    gate = (a["do_predict"] == 1) & (a["di"] < params["buy_di_threshold"])
+    gate &= (a["volume_regime"] > params["vol_min"]) & (a["volume_regime"] < params["vol_max"])
+    thr = pd.Series(np.where(a["market_regime"] == 3, params["z_hv_thr"], params["z_base_thr"]))
+    long_sig = (z > thr) & (z.shift(1) <= thr.shift(1))
+    short_sig = (z < -thr) & (z.shift(1) >= -thr.shift(1))
+    enter_long = gate & (a["trend_strength"] > params["trend_threshold"]) & long_sig
+    enter_short = gate & (a["trend_strength"] < -params["trend_threshold"]) & short_sig
+    return enter_long.to_numpy(), enter_short.to_numpy()
+
+
+class TestSignals:
+    """Test the vectorized entry/exit logic"""
+    
+    def test_entry_crossings_and_gates(self):
+        """Entries fire on threshold crossings that pass every gate"""
+        z = [0.0, 0.5, 0.6, 0.0, 0.5, 0.0, -0.5, 0.0, 0.5, 0.0]
+        frame = make_frame(10, **{"&-s_close": z})
+        frame.loc[8, "DI_values"] = 2.0  # Gated by buy_di_threshold
+        data = make_pair(frame)
+        
+        enter_long, enter_short = entry_signals(data, DEFAULT_PARAMS)
+        assert np.flatnonzero(enter_long).tolist() == [1, 4]
+        assert not enter_short.any()  # Trend strength only allows longs
+        
+        frame["%-trend_strength"] = -0.01
+        enter_long, enter_short = entry_signals(make_pair(frame), DEFAULT_PARAMS)
+        assert np.flatnonzero(enter_short).tolist() == [6]
+        assert not enter_long.any()
+    
+    def test_high_volatility_threshold_and_exits(self):
+        """Regime 3 uses z_hv_thr and forces exits; z flips exit"""
+        z = [0.0, 0.5, 0.0, 0.9, 0.9, -0.1, 0.2, 0.0]
+        frame = make_frame(8, **{"&-s_close": z, "%-market_regime": [3, 3, 3, 3, 0, 0, 0, 0]})
+        data = make_pair(frame)
+        
+        enter_long, _ = entry_signals(data, DEFAULT_PARAMS)
+        assert np.flatnonzero(enter_long).tolist() == [3]  # 0.5 < z_hv_thr=0.8
+        assert np.flatnonzero(data.exit_long).tolist() == [0, 1, 2, 3, 5]
+        assert np.flatnonzero(data.exit_short).tolist() == [0, 1, 2, 3, 6]
+    
+    def test_extract_defaults(self):
+        """Missing FreqAI columns fall back like the strategy; NaN becomes 0"""
+        frame = make_frame(3).drop(columns=["DI_values", "&-s_close_std"])
+        frame.loc[0, "&-s_close"] = np.nan
+        arrays = extract_arrays(frame)
+        
+        assert arrays["di"].tolist() == [1.0] * 3
+        assert arrays["target_std"].tolist() == [1.0] * 3
+        assert arrays["target"][0] == 0.0
+        assert arrays["date"][1] - arrays["date"][0] == 5 * 60 * 1000
+
+
+class TestSimulation:
+    """Test the trade simulation"""
+    
+    def test_roi_curve(self):
+        """ROI steps at 15, 45 and 120 minutes on 5m candles"""
+        curve = roi_curve(roi_table(DEFAULT_PARAMS), 5.0)
+        assert len(curve) == 25
+        assert curve[[0, 2, 3, 8, 9, 23, 24]].tolist() == [0.02, 0.02, 0.01, 0.01, 0.005, 0.005, 0.0]
+    
+    def test_exits(self):
+        """Exit signal, stoploss and ROI exits on the expected candles"""
+        sim = SimulationConfig(fee=0.0)
+        signal = np.zeros(10, dtype=bool)
+        signal[1] = True
+        roi = roi_curve(roi_table(DEFAULT_PARAMS), 5.0)
+        
+        # Exit signal on candle 5: leave at candle 6's open
+        frame = make_frame(10)
+        frame.loc[6:, "open"] = 101.0
+        data = make_pair(frame)
+        data.exit_long[:] = False
+        data.exit_long[5] = True
+        trades = simulate_pair(data, signal, ~signal & False, roi, sim)
+        assert (trades["open_idx"][0], trades["close_idx"][0]) == (2, 6)
+        assert trades["profit_ratio"][0] == pytest.approx(0.01)
+        
+        # Candle 4 dips 2%: stoploss (minimum 1.5%) fills at the stop price
+        frame = make_frame(10)
+        frame.loc[4, "low"] = 98.0
+        trades = simulate_pair(make_pair(frame), signal, ~signal & False, roi, sim)
+        assert trades["close_idx"][0] == 4
+        assert trades["profit_ratio"][0] == pytest.approx(-0.015)
+        
+        # Short: price falls 2.5% on candle 3, inside the 2% ROI window
+        frame = make_frame(10)
+        frame.loc[3, "low"] = 97.5
+        trades = simulate_pair(make_pair(frame), ~signal & False, signal, roi, sim)
+        assert bool(trades["is_short"][0]) and trades["close_idx"][0] == 3
+        assert trades["profit_ratio"][0] == pytest.approx(0.02)
+    
+    def test_one_trade_per_pair(self):
+        """Signals while a trade is open are ignored; trades left open are closed at the end"""
+        frame = make_frame(40)
+        signal = np.zeros(40, dtype=bool)
+        signal[[1, 5, 35]] = True
+        data = make_pair(frame)
+        data.exit_long[:] = False
+        trades = simulate_pair(data, signal, np.zeros(40, dtype=bool), roi_curve(roi_table(DEFAULT_PARAMS), 5.0), SimulationConfig(fee=0.0))
+        
+        # First trade exits by the 0% ROI after 120m (candle 2 + 24)
+        assert trades["open_idx"].tolist() == [2, 36]
+        assert trades["close_idx"].tolist() == [26, 39]
+
+
+class TestFastHyperopt:
+    """Test the epoch loop and the prediction cache"""
+    
+    def test_run(self):
+        """Epochs evaluate quickly and the best loss is not worse than the defaults"""
+        data = {p: random_pair(20000, seed, p) for seed, p in enumerate(["BTC/USDT:USDT", "ETH/USDT:USDT"])}
+        hyperopt = FastHyperopt(data, SimulationConfig(max_open_trades=1))
+        default = hyperopt.evaluate(DEFAULT_PARAMS)
+        assert default["results"]["trade_count"] > 0
+        
+        start = time.time()
+        outcome = hyperopt.run(epochs=20, seed=1)
+        per_epoch = (time.time() - start) / 20
+        
+        assert len(outcome["epochs"]) == 20
+        assert outcome["best"]["loss"] <= default["loss"]
+        assert per_epoch < 0.5
+        # trend_threshold shapes the cached regime features, so it is never searched
+        samples = hyperopt.sample(np.random.default_rng(0), 20)
+        assert {p["trend_threshold"] for p in samples} == {DEFAULT_PARAMS["trend_threshold"]}
+        assert outcome["best"]["params"]["trend_threshold"] == DEFAULT_PARAMS["trend_threshold"]
+    
+    def test_cache_roundtrip(self, tmp_path):
+        """Stored arrays load back as memory-mapped PairData; the fingerprint tracks its inputs"""
+        config = tmp_path / "config.json"
+        strategy = tmp_path / "Strategy.py"
+        config.write_text("{}")
+        strategy.write_text("class S: pass\n")
+        fingerprint = prediction_fingerprint(config, "20250101-20250201", strategy)
+        
+        store = PredictionStore(tmp_path / "cache", model_hash=fingerprint)
+        assert load_predictions(store, "hybrid") is None
+        arrays = extract_arrays(make_frame(10))
+        save_predictions(store, "hybrid", {"BTC/USDT:USDT": arrays, "ETH/USDT:USDT": arrays})
+        
+        data = load_predictions(store, "hybrid")
+        assert sorted(data) == ["BTC/USDT:USDT", "ETH/USDT:USDT"]
+        assert isinstance(data["BTC/USDT:USDT"].arrays["close"], np.memmap)
+        for name in ("date", "close", "di"):
+            assert np.array_equal(data["BTC/USDT:USDT"].arrays[name], arrays[name])
+        assert data["BTC/USDT:USDT"].timeframe_minutes == 5.0
+        
+        strategy.write_text("class S: x = 1\n")
+        changed = prediction_fingerprint(config, "20250101-20250201", strategy)
+        assert changed != fingerprint
+        assert prediction_fingerprint(config, "20250101-20250301", strategy) != fingerprint
+        assert load_predictions(PredictionStore(tmp_path / "cache", model_hash=changed), "hybrid") is None
+    
+    def test_fingerprint_tracks_params_packages_and_model(self, tmp_path):
+        """The strategy parameter file, local packages and the freqaimodel source change the fingerprint"""
+        config = tmp_path / "config.json"
+        config.write_text('{"freqaimodel": "MyModel"}')
+        strategy = tmp_path / "Strategy.py"
+        strategy.write_text("class S: pass\n")
+        (tmp_path / "features").mkdir()
+        models = tmp_path / "user_data" / "freqaimodels"
+        models.mkdir(parents=True)
+        
+        fingerprints = {prediction_fingerprint(config, "20250101-20250201", strategy, project_dir=tmp_path)}
+        for path, text in (
+            (strategy.with_suffix(".json"), '{"params": {"buy": {"vol_min": 0.8}}}'),
+            (tmp_path / "features" / "regime.py", "WINDOW = 20\n"),
+            (models / "MyModel.py", "class MyModel: pass\n"),
+        ):
+            path.write_text(text)
+            fingerprints.add(prediction_fingerprint(config, "20250101-20250201", strategy, project_dir=tmp_path))
+        assert len(fingerprints) == 4
+
+
+class TestBatchEvaluation:
+    """Test broadcast evaluation of many parameter sets"""
+    
+    def test_batch_signals_match_single(self):
+        """Each row of the (K, N) signals equals the single-set signals"""
+        data = random_pair(5000, seed=3)
+        points = FastHyperopt({"BTC/USDT:USDT": data}).sample(np.random.default_rng(0), 16)
+        enter_long, enter_short = entry_signals_batch(data, params_matrix(points))
+        
+        assert enter_long.shape == (16, 5000)
+        assert enter_long.any() and enter_short.any()
+        for i, point in enumerate(points):
+            single_long, single_short = reference_entries(data, point)
+            assert np.array_equal(enter_long[i], single_long)
+            assert np.array_equal(enter_short[i], single_short)
+    
+    def test_batch_loss(self):
+        """Vectorized loss equals the scalar formula"""
+        profit = [0.1, -0.2, 0.5]
+        drawdown = [50.0, 2000.0, 0.0]
+        trades = [10, 40, 80]
+        expected = [hyperopt_loss({"profit_ratio": p, "max_drawdown_abs": d}, t) for p, d, t in zip(profit, drawdown, trades)]
+        assert hyperopt_loss_batch(profit, drawdown, trades).tolist() == pytest.approx(expected)
+    
+    def test_evaluate_batch_matches_evaluate(self):
+        """Blocked batch evaluation gives the same results as one-by-one evaluation"""
+        data = {p: random_pair(3000, seed, p) for seed, p in enumerate(["BTC/USDT:USDT", "ETH/USDT:USDT"])}
+        hyperopt = FastHyperopt(data)
+        points = hyperopt.sample(np.random.default_rng(5), 12)
+        
+        batch = hyperopt.evaluate_batch(points, max_cells=5 * 3000)  # Blocks of 5 rows
+        for point, result in zip(points, batch):
+            single = hyperopt.evaluate(point)
+            assert result["results"] == single["results"]
+            assert result["loss"] == pytest.approx(single["loss"])
+            assert result["params"] == pytest.approx(point)
+        
+        custom = FastHyperopt(data, loss_fn=lambda results, trade_count, min_trades, params: -results["profit_abs"])
+        assert [r["loss"] for r in custom.evaluate_batch(points)] == pytest.approx([-r["results"]["profit_abs"] for r in batch])
+
+
+class TestSuccessiveHalving:
+    """Test successive halving over timerange prefixes"""
+    
+    def test_prefix(self):
+        """Prefixes cut every pair at the same date"""
+        data = {"A": random_pair(1000, 1, "A"), "B": make_pair(make_frame(500), "B")}
+        half = FastHyperopt(data).prefix(0.5)
+        
+        assert len(half.data["A"]) == 500
+        assert len(half.data["B"]) == 500
+        assert len(FastHyperopt(data).prefix(0.1).data["B"]) == 100
+        assert FastHyperopt(data).prefix(1.0).data["A"] is data["A"]
+    
+    def test_rungs_and_cost(self):
+        """27 candidates, eta=3: 27 -> 9 -> 3 at a third of the cost of a full sweep"""
+        data = {p: random_pair(20000, seed, p) for seed, p in enumerate(["BTC/USDT:USDT", "ETH/USDT:USDT"])}
+        hyperopt = FastHyperopt(data, SimulationConfig(max_open_trades=1))
+        outcome = hyperopt.successive_halving(n_candidates=27, eta=3, seed=0)
+        
+        assert [(r["candidates"], round(r["fraction"], 3)) for r in outcome["rungs"]] == [(27, 0.111), (9, 0.333), (3, 1.0)]
+        assert outcome["cost"] == pytest.approx(9.0)
+        assert outcome["best"]["results"] == hyperopt.evaluate(outcome["best"]["params"])["results"]
+        
+        # Same candidates, full sweep: the winner is among the best
+        rng = np.random.default_rng(0)
+        matrix = np.vstack([params_matrix([DEFAULT_PARAMS]), hyperopt.sample_matrix(rng, 26)])
+        full = sorted(r["loss"] for r in hyperopt.evaluate_batch(matrix))
+        assert outcome["best"]["loss"] <= full[2]
+        
+        with pytest.raises(ValueError):
+            hyperopt.successive_halving(n_candidates=9, eta=1)
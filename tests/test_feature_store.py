@@ -0,0 +1,164 @@
+"""
+Unit tests for the partitioned feature store.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from features.feature_store import FeatureStore, cached_features, schema_hash
+
+
+def make_candles(n, start="2025-01-20", seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    return pd.DataFrame({
+        "date": pd.date_range(start, periods=n, freq="1h", tz="UTC"),
+        "close": close,
+        "volume": rng.uniform(1, 10, n),
+    })
+
+
+class Param:
+    def __init__(self, value):
+        self.value = value
+        self.space = "buy"
+
+
+class FakeStrategy:
+    """Strategy stand-in with rolling and recursive features"""
+    threshold = Param(0.5)
+    
+    def __init__(self, store=None):
+        self.store = store
+        self.rows_seen = []
+    
+    def _get_feature_store(self):
+        return self.store
+    
+    @cached_features('feature_engineering_expand_all')
+    def feature_engineering_expand_all(self, dataframe, period, **kwargs):
+        self.rows_seen.append(len(dataframe))
+        dataframe[f"%-sma-{period}"] = dataframe["close"].rolling(period).mean()
+        dataframe[f"%-ema-{period}"] = dataframe["close"].ewm(span=period, adjust=False).mean()
+        return dataframe
+    
+    @cached_features('feature_engineering_standard')
+    def feature_engineering_standard(self, dataframe, metadata, **kwargs):
+        self.rows_seen.append(len(dataframe))
+        dataframe["%-volume_regime"] = dataframe["volume"] / dataframe["volume"].rolling(20).mean()
+        dataframe["%-flag"] = (dataframe["%-volume_regime"] > self.threshold.value).astype(int)
+        return dataframe
+
+
+METADATA = {"pair": "BTC/USDT:USDT", "tf": "1h"}
+
+
+def make_store(tmp_path, strategy=None, warmup=300):
+    return FeatureStore(tmp_path, schema_hash(strategy or FakeStrategy(), {"feature_parameters": {}}), warmup=warmup)
+
+
+class TestFeatureStore:
+    """Test caching, tail computation and invalidation"""
+    
+    def test_rerun_hits_cache(self, tmp_path):
+        """The same history is served from the cache without calling the hook"""
+        candles = make_candles(1500)
+        expected = FakeStrategy().feature_engineering_expand_all(candles.copy(), 10, metadata=METADATA)
+        
+        strategy = FakeStrategy(make_store(tmp_path))
+        first = strategy.feature_engineering_expand_all(candles.copy(), 10, metadata=METADATA)
+        second = strategy.feature_engineering_expand_all(candles.copy(), 10, metadata=METADATA)
+        
+        pd.testing.assert_frame_equal(first, expected)
+        pd.testing.assert_frame_equal(second, expected)
+        assert strategy.rows_seen == [1500]
+        assert strategy.store.stats["hits"] == 1
+        # Month partitions per pair/timeframe/hook-period
+        months = sorted(p.stem for p in (tmp_path / "BTC_USDT_USDT" / "1h" / "feature_engineering_expand_all-10").glob("*.parquet"))
+        assert months == ["2025-01", "2025-02", "2025-03"]
+    
+    def test_later_start_matches_hook(self, tmp_path):
+        """A cached frame starting after the cache gets the hook's own leading rows"""
+        candles = make_candles(1500)
+        strategy = FakeStrategy(make_store(tmp_path, warmup=300))
+        strategy.feature_engineering_standard(candles.copy(), metadata=METADATA)
+        strategy.feature_engineering_expand_all(candles.copy(), 20, metadata=METADATA)
+        strategy.rows_seen.clear()
+        
+        window = candles.iloc[200:].reset_index(drop=True)
+        standard = strategy.feature_engineering_standard(window.copy(), metadata=METADATA)
+        expand = strategy.feature_engineering_expand_all(window.copy(), 20, metadata=METADATA)
+        
+        assert strategy.rows_seen == [300, 300]  # Only the warm-up rows
+        own = FakeStrategy()
+        pd.testing.assert_frame_equal(standard, own.feature_engineering_standard(window.copy(), metadata=METADATA))
+        reference = own.feature_engineering_expand_all(window.copy(), 20, metadata=METADATA)
+        assert expand["%-sma-20"].isna().sum() == 19
+        pd.testing.assert_frame_equal(expand, reference, check_exact=False, rtol=1e-9)
+        assert strategy.store.stats["partial"] == 2
+    
+    def test_tail_only(self, tmp_path):
+        """New candles are computed with warm-up rows only, matching the hook on the frame"""
+        candles = make_candles(2000)
+        strategy = FakeStrategy(make_store(tmp_path, warmup=300))
+        strategy.feature_engineering_standard(candles.iloc[:1500].copy(), metadata=METADATA)
+        strategy.feature_engineering_expand_all(candles.iloc[:1500].copy(), 20, metadata=METADATA)
+        strategy.rows_seen.clear()
+        
+        # Live-style sliding window: drops old rows, adds 500 new ones
+        window = candles.iloc[200:].reset_index(drop=True)
+        standard = strategy.feature_engineering_standard(window.copy(), metadata=METADATA)
+        expand = strategy.feature_engineering_expand_all(window.copy(), 20, metadata=METADATA)
+        
+        assert strategy.rows_seen == [300, 800, 300, 800]  # Leading rows, then 300 warm-up + 500 new
+        own = FakeStrategy()
+        pd.testing.assert_frame_equal(standard, own.feature_engineering_standard(window.copy(), metadata=METADATA))
+        reference = own.feature_engineering_expand_all(window.copy(), 20, metadata=METADATA)
+        pd.testing.assert_frame_equal(expand, reference, check_exact=False, rtol=1e-9)
+        assert strategy.store.stats["partial"] == 2
+    
+    def test_earlier_start_replaces_cache(self, tmp_path):
+        """A frame starting before the cache recomputes and replaces the cached history"""
+        candles = make_candles(1500)
+        strategy = FakeStrategy(make_store(tmp_path))
+        strategy.feature_engineering_expand_all(candles.iloc[800:].copy(), 20, metadata=METADATA)
+        strategy.feature_engineering_expand_all(candles.iloc[:1000].copy(), 20, metadata=METADATA)
+        strategy.rows_seen.clear()
+        
+        result = strategy.feature_engineering_expand_all(candles.copy(), 20, metadata=METADATA)
+        
+        assert strategy.rows_seen == [800]  # Cache now runs from the first candle to row 1000
+        reference = FakeStrategy().feature_engineering_expand_all(candles.copy(), 20, metadata=METADATA)
+        pd.testing.assert_frame_equal(result, reference, check_exact=False, rtol=1e-9)
+    
+    def test_schema_change_invalidates(self, tmp_path):
+        """Changed parameters produce a new schema hash; old partitions are ignored and replaced"""
+        candles = make_candles(200)
+        strategy = FakeStrategy(make_store(tmp_path))
+        strategy.feature_engineering_standard(candles.copy(), metadata=METADATA)
+        
+        class Changed(FakeStrategy):
+            threshold = Param(2.0)
+        
+        changed = Changed()
+        assert schema_hash(changed, {"feature_parameters": {}}) != strategy.store.schema
+        changed.store = make_store(tmp_path, changed)
+        assert changed.store.load("BTC/USDT:USDT", "1h", "feature_engineering_standard") is None
+        
+        result = changed.feature_engineering_standard(candles.copy(), metadata=METADATA)
+        assert changed.rows_seen == [200]
+        assert (result["%-flag"] == (result["%-volume_regime"] > 2.0)).all()
+        assert strategy.store.load("BTC/USDT:USDT", "1h", "feature_engineering_standard") is None
+    
+    def test_disabled_or_no_metadata(self, tmp_path):
+        """Without a store or pair/timeframe metadata the hook runs as is"""
+        candles = make_candles(50)
+        strategy = FakeStrategy()
+        strategy.feature_engineering_standard(candles.copy(), metadata=METADATA)
+        strategy.store = make_store(tmp_path)
+        strategy.feature_engineering_standard(candles.copy(), metadata={})
+        assert strategy.rows_seen == [50, 50]
+        assert not list(tmp_path.iterdir())
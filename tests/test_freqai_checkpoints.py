@@ -0,0 +1,157 @@
+"""
+Unit tests for FreqAI checkpoint detection and resumed local backtests.
+"""
+
+import json
+import sys
+import textwrap
+
+import pytest
+
+from tools.backtest_executor import BacktestConfig, LocalBacktestExecutor
+from tools.freqai_checkpoints import TrainTimeLog, freqai_identifier, scan_checkpoints
+
+
+def save_window(models_dir, coin, ts, model=True, prediction=True):
+    """Lay out one window the way FreqAI backtesting saves it"""
+    root = models_dir / "hybrid"
+    if model:
+        sub = root / f"sub-train-{coin}_{ts}"
+        sub.mkdir(parents=True, exist_ok=True)
+        (sub / f"cb_{coin.lower()}_{ts}_model.joblib").write_bytes(b"model")
+        (sub / f"cb_{coin.lower()}_{ts}_metadata.json").write_text("{}")
+    if prediction:
+        preds = root / "backtesting_predictions"
+        preds.mkdir(parents=True, exist_ok=True)
+        (preds / f"cb_{coin.lower()}_{ts}_prediction.feather").write_bytes(b"preds")
+
+
+class TestScanCheckpoints:
+    """Test scan_checkpoints"""
+    
+    def test_detects_windows(self, tmp_path):
+        """Models and predictions of the same window are merged"""
+        save_window(tmp_path, "BTC", 1735689600)
+        save_window(tmp_path, "BTC", 1736294400, model=False)
+        save_window(tmp_path, "ETH", 1735689600, prediction=False)
+        (tmp_path / "hybrid" / "sub-train-SOL_1735689600").mkdir()  # Interrupted before saving
+        
+        report = scan_checkpoints(str(tmp_path), "hybrid")
+        
+        assert [(w.coin, w.timestamp, w.has_model, w.has_prediction) for w in report.windows] == [
+            ("BTC", 1735689600, True, True),
+            ("ETH", 1735689600, True, False),
+            ("BTC", 1736294400, False, True),
+        ]
+        assert report.reusable == 3
+        assert report.latest().strftime("%Y-%m-%d") == "2025-01-08"
+        assert report.summary(60.0)["estimated_seconds_saved"] == 180.0
+    
+    def test_filters_timerange_and_pairs(self, tmp_path):
+        """Only windows of the backtest's timerange and pairs are counted"""
+        save_window(tmp_path, "BTC", 1735689600)  # 2025-01-01
+        save_window(tmp_path, "BTC", 1738368000)  # 2025-02-01
+        save_window(tmp_path, "ETH", 1735689600)
+        save_window(tmp_path, "BTC", 1733011200)  # 2024-12-01
+        
+        report = scan_checkpoints(str(tmp_path), "hybrid", timerange="20250101-20250201", pairs=["BTC/USDT:USDT"])
+        assert [(w.coin, w.timestamp) for w in report.windows] == [("BTC", 1735689600)]
+        assert report.summary(60.0)["estimated_seconds_saved"] == 60.0
+        
+        report = scan_checkpoints(str(tmp_path), "hybrid", timerange="20250101-")
+        assert [(w.coin, w.timestamp) for w in report.windows] == [
+            ("BTC", 1735689600), ("ETH", 1735689600), ("BTC", 1738368000)
+        ]
+    
+    def test_missing_identifier(self, tmp_path):
+        """No saved models: nothing to reuse"""
+        report = scan_checkpoints(str(tmp_path), "hybrid")
+        assert report.reusable == 0
+        assert report.summary(None)["estimated_seconds_saved"] is None
+    
+    def test_custom_listdir(self, tmp_path):
+        """A remote listing function (e.g. sftp.listdir) is used for every directory"""
+        save_window(tmp_path, "BTC", 1735689600)
+        listed = []
+        
+        def listdir(path):
+            listed.append(path)
+            return [p.name for p in (tmp_path / path[len(str(tmp_path)) + 1:]).iterdir()]
+        
+        report = scan_checkpoints(str(tmp_path), "hybrid", listdir=listdir)
+        assert report.reusable == 1
+        assert all(path.startswith(str(tmp_path)) for path in listed)
+    
+    def test_identifier_and_train_times(self, tmp_path):
+        """Identifier read from config; training times averaged"""
+        config = tmp_path / "config.json"
+        config.write_text(json.dumps({"freqai": {"identifier": "hybrid"}}))
+        assert freqai_identifier(config) == "hybrid"
+        assert freqai_identifier(tmp_path / "missing.json") is None
+        
+        log = TrainTimeLog(tmp_path / "times.json", max_samples=3)
+        assert log.mean() is None
+        log.record([10.0, 20.0])
+        log.record([30.0, 40.0])
+        assert log.samples() == [20.0, 30.0, 40.0]
+        assert log.mean() == 30.0
+
+
+# Trains every window whose prediction is not saved yet, like FreqAI backtesting;
+# exits with an error after max_windows newly trained windows
+FAKE_FREQTRADE = textwrap.dedent('''
+    import json, os, sys
+    from pathlib import Path
+    
+    args = sys.argv[1:]
+    userdir = Path(args[args.index("--userdir") + 1])
+    max_windows = int(os.environ.get("FAKE_MAX_WINDOWS", "100"))
+    preds = userdir / "models" / "hybrid" / "backtesting_predictions"
+    preds.mkdir(parents=True, exist_ok=True)
+    trained = 0
+    for i in range(4):
+        ts = 1735689600 + i * 604800
+        if (preds / f"cb_btc_{ts}_prediction.feather").exists():
+            continue
+        if trained == max_windows:
+            print("preempted", file=sys.stderr)
+            sys.exit(1)
+        print(f"Training BTC/USDT:USDT, 1/1 pairs from 2024-10-01 00:00:00 to 2025-01-01 00:00:00, {i + 1}/4 trains")
+        print(f"Done training BTC/USDT:USDT (30.00 secs)")
+        (preds / f"cb_btc_{ts}_prediction.feather").write_bytes(b"x")
+        trained += 1
+    results = userdir / "backtest_results"
+    (results / "r.json").write_text(json.dumps({"strategy": {"FreqAIHybridStrategy": {"total_trades": 2}}}))
+    (results / ".last_result.json").write_text(json.dumps({"latest_backtest": "r.json"}))
+''')
+
+
+class TestLocalResume:
+    """Test resuming an interrupted local backtest"""
+    
+    def test_resume_after_interruption(self, tmp_path, monkeypatch):
+        """Windows trained before the crash are reused and the saving reported"""
+        (tmp_path / "user_data" / "strategies").mkdir(parents=True)
+        (tmp_path / "config").mkdir()
+        (tmp_path / "config" / "config.json").write_text(json.dumps({"freqai": {"identifier": "hybrid"}}))
+        (tmp_path / "fake_freqtrade.py").write_text(FAKE_FREQTRADE)
+        monkeypatch.chdir(tmp_path)
+        executor = LocalBacktestExecutor(
+            project_dir=str(tmp_path),
+            freqtrade_cmd=[sys.executable, str(tmp_path / "fake_freqtrade.py")]
+        )
+        config = BacktestConfig(strategy="FreqAIHybridStrategy", timerange="20250101-20250201", pairs=["BTC/USDT:USDT"])
+        
+        monkeypatch.setenv("FAKE_MAX_WINDOWS", "3")
+        with pytest.raises(RuntimeError, match="preempted"):
+            executor.execute_backtest(config)
+        assert len(list((tmp_path / "backtest_checkpoints").rglob("*_prediction.feather"))) == 3
+        
+        monkeypatch.delenv("FAKE_MAX_WINDOWS")
+        result = executor.execute_backtest(config)
+        
+        assert result["results"]["total_trades"] == 2
+        assert result["resume"]["reused_windows"] == 3
+        assert result["resume"]["estimated_seconds_saved"] == 90.0
+        # Checkpoints of a finished backtest are removed
+        assert not list((tmp_path / "backtest_checkpoints").iterdir())
@@ -0,0 +1,109 @@
+"""
+Unit tests for the memory-mapped FreqAI prediction store.
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+
+from diagnostics.prediction_store import (
+    PREDICTION_COLUMNS,
+    PredictionStore,
+    feature_fingerprint,
+    model_fingerprint,
+)
+
+
+def make_predictions(start="2025-01-01", days=4, seed=0):
+    """Hourly frame with every prediction column"""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(start, periods=days * 24, freq="1h", tz="UTC")
+    frame = pd.DataFrame({"date": dates, "close": 100.0})
+    for column in PREDICTION_COLUMNS:
+        frame[column] = rng.normal(size=len(dates))
+    frame["do_predict"] = 1
+    return frame
+
+
+def ms(value):
+    return pd.Timestamp(value, tz="UTC").value // 1_000_000
+
+
+class FakeStrategy:
+    def feature_engineering_standard(self, dataframe, metadata, **kwargs):
+        return dataframe
+
+
+class TestPredictionStore:
+    """Test writing, zero-copy reads and invalidation"""
+    
+    def test_windows_and_mmap_read(self, tmp_path):
+        """Rows are split into training windows and read back memory-mapped"""
+        store = PredictionStore(tmp_path)
+        frame = make_predictions(days=4)
+        written = store.write("hybrid", "BTC/USDT:USDT", frame, window_days=2)
+        
+        assert [(w.start, w.rows) for w in written] == [(ms("2025-01-01"), 48), (ms("2025-01-03"), 48)]
+        window = store.windows("hybrid", "BTC/USDT:USDT")[0]
+        column = window.load("&-s_close")
+        assert isinstance(column, np.memmap)
+        assert np.array_equal(column, frame["&-s_close"].to_numpy()[:48])
+        
+        arrays = store.read("hybrid", "BTC/USDT:USDT", columns=["DI_values"])
+        assert sorted(arrays) == ["DI_values", "date"]
+        assert np.array_equal(arrays["DI_values"], frame["DI_values"].to_numpy())
+        assert store.pairs("hybrid") == ["BTC/USDT:USDT"]
+    
+    def test_range_and_frame(self, tmp_path):
+        """Reads filter by time; read_frame returns a date-indexed frame"""
+        store = PredictionStore(tmp_path)
+        frame = make_predictions(days=4)
+        store.write("hybrid", "ETH/USDT:USDT", frame, window_days=1, anchor=pd.Timestamp("2025-01-01", tz="UTC"))
+        
+        assert len(store.windows("hybrid", "ETH/USDT:USDT", start=ms("2025-01-02 12:00"), end=ms("2025-01-03 01:00"))) == 2
+        df = store.read_frame("hybrid", "ETH/USDT:USDT", start=ms("2025-01-02"), end=ms("2025-01-02 23:00"))
+        assert len(df) == 24
+        assert df.index[0] == pd.Timestamp("2025-01-02", tz="UTC")
+        assert df["&-s_close_mean"].tolist() == frame["&-s_close_mean"].iloc[24:48].tolist()
+        assert store.read("hybrid", "SOL/USDT:USDT") == {}
+    
+    def test_overwrite_overlapping(self, tmp_path):
+        """A rerun over the same dates replaces the stored windows"""
+        store = PredictionStore(tmp_path)
+        store.write("hybrid", "BTC/USDT:USDT", make_predictions(days=2, seed=1))
+        newer = make_predictions(start="2025-01-02", days=2, seed=2)
+        store.write("hybrid", "BTC/USDT:USDT", newer)
+        
+        arrays = store.read("hybrid", "BTC/USDT:USDT")
+        assert np.array_equal(arrays["&-s_close"], newer["&-s_close"].to_numpy())
+        assert len([p for p in (tmp_path / "hybrid" / "BTC_USDT_USDT").iterdir() if p.is_dir()]) == 1
+    
+    def test_invalidation(self, tmp_path):
+        """Windows from another model or feature set are ignored and replaced"""
+        freqai = {"identifier": "hybrid", "feature_parameters": {"include_timeframes": ["5m"]}}
+        config = {"freqaimodel": "LightGBMRegressor", "freqai": freqai}
+        store = PredictionStore.for_strategy(tmp_path, FakeStrategy(), config)
+        store.write("hybrid", "BTC/USDT:USDT", make_predictions(days=2), window_days=1)
+        assert len(store.windows("hybrid", "BTC/USDT:USDT")) == 2
+        
+        # Same identifier, another model class (--freqaimodel is top-level config)
+        other_model = {**config, "freqaimodel": "XGBoostRegressor"}
+        assert model_fingerprint(other_model) != model_fingerprint(config)
+        assert PredictionStore.for_strategy(tmp_path, FakeStrategy(), other_model).windows("hybrid", "BTC/USDT:USDT") == []
+        
+        retrained = {**config, "freqai": {**freqai, "model_training_parameters": {"n_estimators": 800}}}
+        assert model_fingerprint(retrained) != model_fingerprint(config)
+        stale = PredictionStore.for_strategy(tmp_path, FakeStrategy(), retrained)
+        assert stale.windows("hybrid", "BTC/USDT:USDT") == []
+        
+        new_features = {**freqai, "feature_parameters": {"include_timeframes": ["5m", "1h"]}}
+        assert feature_fingerprint(FakeStrategy(), new_features) != feature_fingerprint(FakeStrategy(), freqai)
+        
+        # Writing with the new fingerprints drops the stale windows from disk
+        stale.write("hybrid", "BTC/USDT:USDT", make_predictions(start="2025-02-01", days=1))
+        index = json.loads((tmp_path / "hybrid" / "BTC_USDT_USDT" / "index.json").read_text())
+        assert [w["start"] for w in index["windows"]] == [ms("2025-02-01")]
+        assert len([p for p in (tmp_path / "hybrid" / "BTC_USDT_USDT").iterdir() if p.is_dir()]) == 1
+        # Accept-any reader still opens it
+        assert len(PredictionStore(tmp_path).read("hybrid", "BTC/USDT:USDT")["date"]) == 24
@@ -0,0 +1,190 @@
+"""
+Unit tests for backtest progress streaming.
+"""
+
+import subprocess
+import sys
+import textwrap
+import time
+
+import pytest
+
+from tools.progress_stream import ProgressParser, drain_channel, iter_process_events, run_process
+
+
+TRAINING = (
+    "2025-10-01 12:00:00,000 - freqtrade.freqai.freqai_interface - INFO - "
+    "Training BTC/USDT:USDT, 1/2 pairs from 2025-01-01 00:00:00 to 2025-02-01 00:00:00, 3/4 trains"
+)
+
+
+def python_cmd(source):
+    return [sys.executable, "-c", textwrap.dedent(source)]
+
+
+class TestProgressParser:
+    """Test ProgressParser"""
+    
+    def test_parses_freqai_lines(self):
+        """Training, backtest, results and error lines become typed events"""
+        parser = ProgressParser()
+        
+        training = parser.parse(TRAINING)
+        assert training.kind == "training"
+        assert training.pair == "BTC/USDT:USDT"
+        assert training.window == "2025-01-01 00:00:00 - 2025-02-01 00:00:00"
+        assert training.percentage == 50.0
+        
+        trained = parser.parse("--- Done training BTC/USDT:USDT (12.34 secs) ---")
+        assert (trained.kind, trained.pair, trained.percentage) == ("trained", "BTC/USDT:USDT", 50.0)
+        assert trained.duration == 12.34
+        
+        backtest = parser.parse("Backtesting with data from 2025-01-01 00:00:00 up to 2025-02-01 00:00:00 (31 days).")
+        assert backtest.kind == "backtest"
+        
+        assert parser.parse("Dumping backtest results to user_data/backtest_results/x.zip").percentage == 100.0
+        assert parser.parse("2025-10-01 - freqtrade - ERROR - Fatal exception!").kind == "error"
+        assert parser.parse("Using config: config/config.json").kind == "output"
+    
+    def test_feed_splits_chunks(self):
+        """Lines split across chunks (and UTF-8 characters) are reassembled"""
+        events = []
+        parser = ProgressParser(on_event=events.append)
+        data = "first ✅\r\nsecond\nthird".encode()
+        for i in range(len(data)):
+            parser.feed(data[i:i + 1], "stdout")
+        parser.close()
+        
+        assert parser.lines == ["first ✅", "second", "third"]
+        assert [e.message for e in events] == parser.lines
+
+
+class TestRunProcess:
+    """Test local process draining"""
+    
+    def test_drains_both_streams(self):
+        """A process flooding stderr before stdout does not deadlock"""
+        events = []
+        exit_code, lines = run_process(
+            python_cmd('''
+                import sys
+                sys.stderr.write("e" * 100 + "\\n") if False else None
+                for i in range(2000):
+                    sys.stderr.write("warning line %d %s\\n" % (i, "x" * 100))
+                sys.stderr.flush()
+                print("Backtesting done")
+            '''),
+            on_event=events.append,
+            timeout=10
+        )
+        
+        assert exit_code == 0
+        assert len(lines) == 2001
+        assert {e.stream for e in events} == {"stdout", "stderr", "exit"} - {"exit"} | {"stdout"}
+        assert events[-1].kind == "exit"
+        assert events[-1].exit_code == 0
+    
+    def test_exit_code_and_timeout(self):
+        """Non-zero exits are returned; hung processes are killed"""
+        exit_code, lines = run_process(python_cmd("import sys; print('boom', file=sys.stderr); sys.exit(3)"))
+        assert (exit_code, lines) == (3, ["boom"])
+        
+        with pytest.raises(subprocess.TimeoutExpired):
+            run_process(python_cmd("import time; time.sleep(5)"), timeout=0.3)
+    
+    def test_iterator_streams_live(self):
+        """Events arrive while the process is still running"""
+        start = time.time()
+        events = iter_process_events(python_cmd(f'''
+            import time
+            print({TRAINING!r}, flush=True)
+            time.sleep(0.5)
+        '''))
+        
+        first = next(events)
+        assert first.kind == "training"
+        assert time.time() - start < 0.45
+        assert [e.kind for e in events] == ["exit"]
+
+
+class FakeChannel:
+    """paramiko channel stand-in delivering scripted chunks"""
+    
+    def __init__(self, chunks, exit_code=0):
+        self.chunks = list(chunks)  # (stream, bytes)
+        self.exit_code = exit_code
+        self.closed = False
+    
+    def recv_ready(self):
+        return bool(self.chunks) and self.chunks[0][0] == "stdout"
+    
+    def recv_stderr_ready(self):
+        return bool(self.chunks) and self.chunks[0][0] == "stderr"
+    
+    def recv(self, nbytes):
+        return self.chunks.pop(0)[1]
+    
+    def recv_stderr(self, nbytes):
+        return self.chunks.pop(0)[1]
+    
+    def exit_status_ready(self):
+        return not self.chunks
+    
+    @property
+    def eof_received(self):
+        return not self.chunks
+    
+    def recv_exit_status(self):
+        return self.exit_code
+    
+    def close(self):
+        self.closed = True
+
+
+class TestDrainChannel:
+    """Test SSH channel draining"""
+    
+    def test_interleaved_streams(self):
+        """stdout and stderr are read in arrival order"""
+        channel = FakeChannel([
+            ("stdout", TRAINING[:40].encode()),
+            ("stderr", b"UserWarning: deprecated\n"),
+            ("stdout", (TRAINING[40:] + "\nDone\n").encode()),
+        ], exit_code=1)
+        events = []
+        
+        exit_code, lines = drain_channel(channel, on_event=events.append, poll_interval=0)
+        
+        assert exit_code == 1
+        assert lines == ["UserWarning: deprecated", TRAINING, "Done"]
+        assert [e.kind for e in events] == ["output", "training", "output", "exit"]
+        assert events[0].stream == "stderr"
+    
+    def test_output_after_exit_status(self):
+        """Output buffered after the exit status is still read"""
+        class LateChannel(FakeChannel):
+            polls = 0
+            
+            def recv_ready(self):
+                self.polls += 1
+                return self.polls > 3 and super().recv_ready()
+            
+            def exit_status_ready(self):
+                return True
+        
+        channel = LateChannel([("stdout", b"Backtest finished\n"), ("stderr", b"Closing exchange\n")])
+        exit_code, lines = drain_channel(channel, poll_interval=0)
+        
+        assert exit_code == 0
+        assert lines == ["Backtest finished", "Closing exchange"]
+    
+    def test_timeout(self):
+        """A command that never exits is abandoned after the timeout"""
+        class HungChannel(FakeChannel):
+            def exit_status_ready(self):
+                return False
+        
+        channel = HungChannel([])
+        with pytest.raises(TimeoutError):
+            drain_channel(channel, poll_interval=0.01, timeout=0.05)
+        assert channel.closed
@@ -0,0 +1,128 @@
+"""
+Unit tests for the incremental multi-timeframe resampler.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from features.resampler import MultiTimeframeResampler, OHLCVAggregator, ResampledDataProvider, timeframe_to_minutes
+
+
+def make_candles(n, start="2025-01-01", seed=0):
+    """5m OHLCV candles"""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+    open_ = np.concatenate([[100.0], close[:-1]])
+    spread = rng.uniform(0, 0.3, n)
+    return pd.DataFrame({
+        "date": pd.date_range(start, periods=n, freq="5min", tz="UTC"),
+        "open": open_,
+        "high": np.maximum(open_, close) + spread,
+        "low": np.minimum(open_, close) - spread,
+        "close": close,
+        "volume": rng.uniform(1, 10, n),
+    })
+
+
+def exchange_bars(candles, rule):
+    """Reference bars as the exchange would build them"""
+    bars = candles.set_index("date").resample(rule, label="left", closed="left").agg(
+        {"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"}
+    )
+    return bars.dropna().reset_index()
+
+
+class FakeDataProvider:
+    def __init__(self, frames):
+        self.frames = frames
+        self.requests = []
+    
+    def get_pair_dataframe(self, pair, timeframe=None, candle_type=""):
+        self.requests.append((pair, timeframe))
+        return self.frames.get((pair, timeframe), pd.DataFrame())
+    
+    def current_whitelist(self):
+        return ["BTC/USDT:USDT"]
+
+
+class TestResampler:
+    """Test aggregation, incremental updates and parity reports"""
+    
+    def test_matches_exchange_bars(self):
+        """Derived 15m/1h bars equal pandas resampling of the 5m candles"""
+        candles = make_candles(24 * 12 * 2)
+        resampler = MultiTimeframeResampler("5m", ("15m", "1h"))
+        resampler.update("BTC/USDT:USDT", candles)
+        
+        for tf, rule in (("15m", "15min"), ("1h", "1h")):
+            derived = resampler.frame("BTC/USDT:USDT", tf)
+            expected = exchange_bars(candles, rule)
+            pd.testing.assert_frame_equal(derived, expected, check_dtype=False, check_index_type=False)
+    
+    def test_incremental_equals_batch(self):
+        """Feeding candles one by one closes bars only on their last 5m candle"""
+        candles = make_candles(200)
+        aggregator = OHLCVAggregator(5, 60)
+        closed = []
+        for i in range(len(candles)):
+            row = candles.iloc[: i + 1]
+            date_ms = row["date"].dt.as_unit("ms").astype("int64").to_numpy()
+            closed.append(aggregator.extend(date_ms, row["open"], row["high"], row["low"], row["close"], row["volume"]))
+        
+        assert sum(closed) == 200 // 12
+        assert closed[10] == 0 and closed[11] == 1
+        batch = MultiTimeframeResampler("5m", ("1h",))
+        batch.update("BTC/USDT:USDT", candles)
+        pd.testing.assert_frame_equal(aggregator.frame(), batch.frame("BTC/USDT:USDT", "1h"))
+    
+    def test_parity_report(self):
+        """Parity flags differing and incomplete bars"""
+        candles = make_candles(12 * 10).iloc[3:].reset_index(drop=True)  # First hour starts mid-bar
+        resampler = MultiTimeframeResampler("5m", ("1h",))
+        resampler.update("ETH/USDT:USDT", candles)
+        exchange = exchange_bars(make_candles(12 * 10), "1h")
+        exchange.loc[5, "high"] += 1.0
+        
+        report = resampler.parity("ETH/USDT:USDT", "1h", exchange)
+        assert report["incomplete"] == 1
+        assert report["compared"] == 9
+        assert report["mismatched"] == 1
+        assert report["missing"] == 0
+        assert resampler.parity_stats[("ETH/USDT:USDT", "1h")] is report
+    
+    def test_data_provider_serves_derived(self):
+        """The wrapper answers derived timeframes from base candles only"""
+        candles = make_candles(12 * 6)
+        dp = FakeDataProvider({("BTC/USDT:USDT", "5m"): candles})
+        wrapped = ResampledDataProvider(dp, MultiTimeframeResampler("5m", ("15m", "1h")))
+        
+        hourly = wrapped.get_pair_dataframe("BTC/USDT:USDT", "1h")
+        assert len(hourly) == 6
+        assert dp.requests == [("BTC/USDT:USDT", "5m")]
+        assert wrapped.current_whitelist() == ["BTC/USDT:USDT"]
+        # Unknown pairs fall back to the wrapped provider
+        assert wrapped.get_pair_dataframe("SOL/USDT:USDT", "1h").empty
+    
+    def test_data_provider_parity(self):
+        """With verify on, serving a derived timeframe reports parity with the exchange bars"""
+        candles = make_candles(12 * 6)
+        exchange = exchange_bars(candles, "1h")
+        exchange.loc[2, "close"] *= 1.01
+        dp = FakeDataProvider({("BTC/USDT:USDT", "5m"): candles, ("BTC/USDT:USDT", "1h"): exchange})
+        resampler = MultiTimeframeResampler("5m", ("1h",))
+        wrapped = ResampledDataProvider(dp, resampler, verify=True)
+        
+        hourly = wrapped.get_pair_dataframe("BTC/USDT:USDT", "1h")
+        assert len(hourly) == 6
+        assert dp.requests == [("BTC/USDT:USDT", "5m"), ("BTC/USDT:USDT", "1h")]
+        report = resampler.parity_stats[("BTC/USDT:USDT", "1h")]
+        assert (report["compared"], report["mismatched"], report["missing"]) == (6, 1, 0)
+        assert report["max_rel_diff"]["close"] == pytest.approx(0.01 / 1.01)
+    
+    def test_invalid_timeframes(self):
+        assert timeframe_to_minutes("4h") == 240
+        with pytest.raises(ValueError):
+            timeframe_to_minutes("1w")
+        with pytest.raises(ValueError):
+            MultiTimeframeResampler("5m", ("7m",))
@@ -0,0 +1,155 @@
+"""
+Unit tests for the fingerprinted backtest result cache.
+"""
+
+import json
+import os
+import sys
+import time
+
+import pytest
+
+from tools.backtest_executor import BacktestConfig, LocalBacktestExecutor
+from tools.result_cache import ResultCache
+
+
+@pytest.fixture
+def project(tmp_path):
+    """Project tree with a strategy and a config"""
+    (tmp_path / "user_data" / "strategies").mkdir(parents=True)
+    (tmp_path / "user_data" / "strategies" / "FreqAIHybridStrategy.py").write_text("class FreqAIHybridStrategy(IStrategy):\n    pass\n")
+    (tmp_path / "config").mkdir()
+    (tmp_path / "config" / "config.json").write_text(json.dumps({"stake_currency": "USDT", "max_open_trades": 3}))
+    return tmp_path
+
+
+def make_config(timerange="20250101-20250201", pairs=("BTC/USDT:USDT", "ETH/USDT:USDT"), model="LightGBMRegressorMultiTarget"):
+    return BacktestConfig(strategy="FreqAIHybridStrategy", timerange=timerange, pairs=list(pairs), freqai_model=model)
+
+
+def make_cache(project, **kwargs):
+    return ResultCache(cache_dir=str(project / "cache"), project_dir=str(project), **kwargs)
+
+
+class TestFingerprint:
+    """Test ResultCache.fingerprint"""
+    
+    def test_inputs_change_fingerprint(self, project):
+        """Strategy source, config contents, timerange and model all count"""
+        cache = make_cache(project)
+        base = cache.fingerprint(make_config())
+        
+        assert cache.fingerprint(make_config()) == base
+        assert cache.fingerprint(make_config(timerange="20250201-20250301")) != base
+        assert cache.fingerprint(make_config(model="XGBoostRegressor")) != base
+        
+        (project / "config" / "config.json").write_text(json.dumps({"stake_currency": "USDT", "max_open_trades": 5}))
+        changed_config = cache.fingerprint(make_config())
+        assert changed_config != base
+        
+        (project / "user_data" / "strategies" / "FreqAIHybridStrategy.py").write_text("class FreqAIHybridStrategy(IStrategy):\n    x = 1\n")
+        assert cache.fingerprint(make_config()) not in (base, changed_config)
+    
+    def test_params_and_packages_change_fingerprint(self, project):
+        """The strategy parameter file and the local packages it imports count"""
+        (project / "features").mkdir()
+        (project / "features" / "resampler.py").write_text("WINDOW = 1\n")
+        cache = make_cache(project)
+        base = cache.fingerprint(make_config())
+        
+        params = project / "user_data" / "strategies" / "FreqAIHybridStrategy.json"
+        params.write_text(json.dumps({"params": {"buy": {"trend_threshold": 0.004}}}))
+        with_params = cache.fingerprint(make_config())
+        assert with_params != base
+        
+        (project / "features" / "resampler.py").write_text("WINDOW = 2\n")
+        changed_package = cache.fingerprint(make_config())
+        assert changed_package not in (base, with_params)
+        
+        (project / "monitoring").mkdir()
+        (project / "monitoring" / "governance_runtime.py").write_text("STATE = None\n")
+        assert cache.fingerprint(make_config()) not in (base, with_params, changed_package)
+    
+    def test_irrelevant_differences_ignored(self, project):
+        """Pair order and config formatting do not change the fingerprint"""
+        cache = make_cache(project)
+        base = cache.fingerprint(make_config())
+        
+        assert cache.fingerprint(make_config(pairs=("ETH/USDT:USDT", "BTC/USDT:USDT"))) == base
+        (project / "config" / "config.json").write_text(json.dumps({"max_open_trades": 3, "stake_currency": "USDT"}, indent=4))
+        assert cache.fingerprint(make_config()) == base
+    
+    def test_strategy_found_by_class_name(self, project):
+        """A strategy in a differently named file is located by its class"""
+        (project / "user_data" / "strategies" / "other.py").write_text("class MyStrategy(IStrategy):\n    pass\n")
+        cache = make_cache(project)
+        assert cache.strategy_file("MyStrategy").name == "other.py"
+
+
+class TestResultCache:
+    """Test storing, retention and executor integration"""
+    
+    def test_put_get(self, project):
+        """Only successful results are stored"""
+        cache = make_cache(project)
+        config = make_config()
+        
+        assert cache.get(config) is None
+        assert cache.put(config, {"config": config, "results": {}}) is None
+        cache.put(config, {"config": config, "elapsed_seconds": 42.0, "results": {"total_trades": 9}})
+        
+        entry = cache.get(config)
+        assert entry["results"] == {"total_trades": 9}
+        assert entry["elapsed_seconds"] == 42.0
+        assert (cache.hits, cache.misses) == (1, 1)
+        assert make_cache(project, refresh=True).get(config) is None
+    
+    def test_retention(self, project):
+        """Old and least recently used entries are dropped"""
+        cache = make_cache(project, max_entries=2, max_age_days=1)
+        configs = [make_config(timerange=f"2025010{i}-20250201") for i in range(1, 4)]
+        cache.put(configs[0], {"results": {"total_trades": 1}})
+        old = time.time() - 2 * 86400
+        os.utime(cache._entry_path(cache.fingerprint(configs[0])), (old, old))
+        
+        cache.put(configs[1], {"results": {"total_trades": 2}})
+        assert cache.get(configs[0]) is None  # Expired
+        
+        time.sleep(0.01)
+        cache.put(configs[2], {"results": {"total_trades": 3}})
+        cache.get(configs[1])  # Touch: configs[1] is now most recently used
+        cache.put(make_config(timerange="x"), {"results": {"total_trades": 4}})
+        
+        assert cache.get(configs[1]) is not None
+        assert cache.get(configs[2]) is None
+        assert len(list((project / "cache").glob("*.json"))) == 2
+    
+    def test_executor_uses_cache(self, project, monkeypatch):
+        """Identical reruns skip the backtest unless forced"""
+        runs = project / "runs.txt"
+        script = project / "fake_freqtrade.py"
+        script.write_text(
+            "import json, sys, pathlib\n"
+            "args = sys.argv[1:]\n"
+            f"open({str(runs)!r}, 'a').write('run\\n')\n"
+            "d = pathlib.Path(args[args.index('--userdir') + 1]) / 'backtest_results'\n"
+            "(d / 'r.json').write_text(json.dumps({'strategy': {'FreqAIHybridStrategy': {'total_trades': 4}}}))\n"
+            "(d / '.last_result.json').write_text(json.dumps({'latest_backtest': 'r.json'}))\n"
+        )
+        monkeypatch.chdir(project)
+        executor = LocalBacktestExecutor(
+            project_dir=str(project),
+            freqtrade_cmd=[sys.executable, str(script)],
+            result_cache=make_cache(project)
+        )
+        
+        first = executor.execute_backtest(make_config())
+        second = executor.execute_backtest(make_config())
+        forced = executor.execute_backtest(make_config(), force=True)
+        
+        # Result file names carry the run's timestamp
+        without_file = [{k: v for k, v in r["results"].items() if k != "result_file"} for r in (first, second, forced)]
+        assert without_file[0] == without_file[1] == without_file[2]
+        assert first["results"] == second["results"]
+        assert second["cached"] and "cached" not in forced
+        assert len(runs.read_text().split()) == 2
@@ -0,0 +1,123 @@
+"""
+Unit tests for the per-cycle shared corr-pair feature blocks.
+"""
+
+import numpy as np
+import pandas as pd
+
+from features.feature_store import cached_features
+from features.shared_features import SharedFeatureBlocks
+
+
+def make_candles(n, start="2025-01-01", seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    return pd.DataFrame({
+        "date": pd.date_range(start, periods=n, freq="15min", tz="UTC"),
+        "close": close,
+        "volume": rng.uniform(1, 10, n),
+    })
+
+
+class FakeStrategy:
+    """Strategy stand-in counting hook calls per pair"""
+    
+    def __init__(self, blocks=None):
+        self.blocks = blocks
+        self.calls = []
+    
+    def _get_shared_features(self):
+        return self.blocks
+    
+    @cached_features('feature_engineering_expand_all', shared=True)
+    def feature_engineering_expand_all(self, dataframe, period, **kwargs):
+        self.calls.append((kwargs["metadata"]["pair"], period))
+        dataframe[f"%-sma-{period}"] = dataframe["close"].rolling(period).mean()
+        dataframe[f"%-ema-{period}"] = dataframe["close"].ewm(span=period, adjust=False).mean()
+        return dataframe
+    
+    @cached_features('feature_engineering_standard')
+    def feature_engineering_standard(self, dataframe, metadata, **kwargs):
+        self.calls.append((metadata["pair"], "standard"))
+        dataframe["%-hour"] = dataframe["date"].dt.hour
+        return dataframe
+
+
+ETH = {"pair": "ETH/USDT:USDT", "tf": "15m"}
+
+
+class TestSharedFeatureBlocks:
+    """Test sharing within a cycle, date joins and invalidation"""
+    
+    def test_corr_pair_computed_once(self):
+        """Three whitelist pipelines computing ETH's features share one block"""
+        candles = make_candles(500)
+        expected = FakeStrategy().feature_engineering_expand_all(candles.copy(), 10, metadata=ETH)
+        strategy = FakeStrategy(SharedFeatureBlocks())
+        
+        results = [strategy.feature_engineering_expand_all(candles.copy(), 10, metadata=ETH) for _ in range(3)]
+        
+        assert strategy.calls == [("ETH/USDT:USDT", 10)]
+        for result in results:
+            pd.testing.assert_frame_equal(result, expected)
+        assert strategy.blocks.summary() == {"computed": 1, "shared": 2, "cycles": 0, "blocks": 1}
+        # Another period or timeframe is its own block
+        strategy.feature_engineering_expand_all(candles.copy(), 20, metadata=ETH)
+        strategy.feature_engineering_expand_all(candles.copy(), 10, metadata={"pair": "ETH/USDT:USDT", "tf": "1h"})
+        assert len(strategy.calls) == 3
+    
+    def test_join_by_date(self):
+        """A frame covering fewer candles from the same start joins the block by date"""
+        candles = make_candles(500)
+        strategy = FakeStrategy(SharedFeatureBlocks())
+        full = strategy.feature_engineering_expand_all(candles.copy(), 10, metadata=ETH)
+        
+        window = candles.iloc[:400].reset_index(drop=True)
+        joined = strategy.feature_engineering_expand_all(window.copy(), 10, metadata=ETH)
+        
+        assert len(strategy.calls) == 1
+        pd.testing.assert_frame_equal(joined, full.iloc[:400].reset_index(drop=True))
+    
+    def test_later_start_recomputes(self):
+        """A frame starting after the block's first candle gets the hook's own output"""
+        candles = make_candles(500)
+        strategy = FakeStrategy(SharedFeatureBlocks())
+        strategy.feature_engineering_expand_all(candles.copy(), 10, metadata=ETH)
+        
+        window = candles.iloc[100:400].reset_index(drop=True)
+        result = strategy.feature_engineering_expand_all(window.copy(), 10, metadata=ETH)
+        
+        assert len(strategy.calls) == 2
+        pd.testing.assert_frame_equal(result, FakeStrategy().feature_engineering_expand_all(window.copy(), 10, metadata=ETH))
+        assert result["%-sma-10"].isna().sum() == 9
+    
+    def test_changed_candles_or_new_cycle_recompute(self):
+        """Different closes, newer candles or a new cycle recompute the block"""
+        candles = make_candles(300)
+        strategy = FakeStrategy(SharedFeatureBlocks())
+        strategy.feature_engineering_expand_all(candles.copy(), 10, metadata=ETH)
+        
+        revised = candles.copy()
+        revised.loc[299, "close"] *= 1.01
+        strategy.feature_engineering_expand_all(revised.copy(), 10, metadata=ETH)
+        strategy.feature_engineering_expand_all(make_candles(301).copy(), 10, metadata=ETH)
+        assert len(strategy.calls) == 3
+        
+        strategy.blocks.new_cycle()
+        assert len(strategy.blocks) == 0
+        strategy.feature_engineering_expand_all(candles.copy(), 10, metadata=ETH)
+        assert len(strategy.calls) == 4
+    
+    def test_unshared_hook_and_eviction(self):
+        """Hooks without shared=True always run; old blocks are evicted"""
+        candles = make_candles(50)
+        strategy = FakeStrategy(SharedFeatureBlocks(max_blocks=2))
+        strategy.feature_engineering_standard(candles.copy(), metadata=ETH)
+        strategy.feature_engineering_standard(candles.copy(), metadata=ETH)
+        assert strategy.calls == [("ETH/USDT:USDT", "standard")] * 2
+        
+        for period in (5, 10, 20):
+            strategy.feature_engineering_expand_all(candles.copy(), period, metadata=ETH)
+        assert len(strategy.blocks) == 2
+        strategy.feature_engineering_expand_all(candles.copy(), 5, metadata=ETH)
+        assert strategy.blocks.stats["computed"] == 4
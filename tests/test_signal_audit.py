@@ -286,6 +286,99 @@ class TestSignalAuditLogger:
         assert report == {}
 
 
+class TestVectorizedAudit:
+    """Test columnar audit entry point"""
+    
+    @pytest.fixture
+    def gate_arrays(self):
+        rng = np.random.default_rng(11)
+        n = 300
+        return {
+            'timestamps': pd.date_range('2023-01-01', periods=n, freq='5min'),
+            'do_predict': rng.random(n) > 0.2,
+            'di_ok': rng.random(n) > 0.3,
+            'vol_ok': rng.random(n) > 0.3,
+            'ts_ok_long': rng.random(n) > 0.5,
+            'ts_ok_short': rng.random(n) > 0.5,
+            'long_sig': rng.random(n) > 0.7,
+            'short_sig': rng.random(n) > 0.7,
+        }
+    
+    def test_matches_per_record_logging(self, audit_config, gate_arrays):
+        """Batch call produces the same counters as one record per candle"""
+        batch_audit = SignalAuditLogger(audit_config)
+        logged = batch_audit.log_gate_arrays(pair="BTC/USDT:USDT", **gate_arrays)
+        assert logged == 300
+        
+        record_audit = SignalAuditLogger(audit_config)
+        g = gate_arrays
+        for i in range(300):
+            long_setup = g['ts_ok_long'][i] and g['long_sig'][i]
+            short_setup = g['ts_ok_short'][i] and g['short_sig'][i]
+            filters_ok = g['do_predict'][i] and g['di_ok'][i] and g['vol_ok'][i]
+            record_audit.log_record(SignalAuditRecord(
+                timestamp=g['timestamps'][i],
+                pair="BTC/USDT:USDT",
+                do_predict=bool(g['do_predict'][i]),
+                di_ok=bool(g['di_ok'][i]),
+                vol_ok=bool(g['vol_ok'][i]),
+                regime_ok=True,
+                trend_strength_ok=bool(g['ts_ok_long'][i] or g['ts_ok_short'][i]),
+                z_score_signal=bool(long_setup or short_setup),
+                quantile_ok=True,
+                governance_ok=True,
+                enter_long=bool(filters_ok and long_setup),
+                enter_short=bool(filters_ok and short_setup),
+            ))
+        
+        assert batch_audit.get_summary_report() == record_audit.get_summary_report()
+    
+    def test_skips_already_audited_candles(self, audit_config, gate_arrays):
+        """Re-sending the same dataframe only audits new candles"""
+        audit = SignalAuditLogger(audit_config)
+        first = {k: v[:200] for k, v in gate_arrays.items()}
+        
+        assert audit.log_gate_arrays(pair="BTC/USDT:USDT", **first) == 200
+        assert audit.log_gate_arrays(pair="BTC/USDT:USDT", **first) == 0
+        assert audit.log_gate_arrays(pair="BTC/USDT:USDT", **gate_arrays) == 100
+        assert audit.log_gate_arrays(pair="ETH/USDT:USDT", **gate_arrays) == 300
+        assert audit.total_candles_processed == 600
+    
+    def test_governance_halt_rejects_setups(self, audit_config):
+        """Scalar governance flag is broadcast and rejects full setups"""
+        audit = SignalAuditLogger(audit_config)
+        audit.log_gate_arrays(
+            pair="BTC/USDT:USDT",
+            do_predict=np.ones(10, dtype=bool),
+            di_ok=True,
+            vol_ok=True,
+            ts_ok_long=np.ones(10, dtype=bool),
+            ts_ok_short=False,
+            long_sig=np.ones(10, dtype=bool),
+            short_sig=False,
+            governance_ok=False,
+        )
+        
+        report = audit.get_summary_report()
+        assert report['total_trades_entered'] == 0
+        assert report['top_rejection_reasons'] == [('governance', 10)]
+    
+    def test_export_includes_batches(self, audit_config, gate_arrays, sample_record):
+        """CSV export contains both records and batch rows"""
+        audit = SignalAuditLogger(audit_config)
+        audit.log_record(sample_record)
+        audit.log_gate_arrays(
+            pair="BTC/USDT:USDT",
+            values={'z_score': np.linspace(-1, 1, 300)},
+            **gate_arrays,
+        )
+        
+        df = pd.read_csv(audit.export_to_csv())
+        assert len(df) == 301
+        assert df['z_score'].iloc[-1] == pytest.approx(1.0)
+        assert set(df['pair']) == {"BTC/USDT:USDT"}
+
+
 class TestIntegration:
     """Integration tests"""
     
@@ -0,0 +1,128 @@
+"""
+Unit tests for the per-stage latency histograms.
+"""
+
+import json
+import time
+
+import numpy as np
+import pytest
+
+from diagnostics.stage_timer import (
+    LatencyHistogram,
+    StageTimer,
+    bucket_index,
+    bucket_lower,
+    bucket_upper,
+    timed_stage,
+)
+
+
+class FakeStrategy:
+    def __init__(self, timer=None):
+        self.timer = timer
+    
+    def _get_stage_timer(self):
+        return self.timer
+    
+    @timed_stage('populate_entry_trend')
+    def populate_entry_trend(self, dataframe, metadata):
+        return dataframe
+    
+    @timed_stage('custom_stoploss')
+    def custom_stoploss(self, pair, trade, current_time, current_rate, current_profit, **kwargs):
+        return -0.05
+
+
+class TestLatencyHistogram:
+    """Test bucket layout and percentile accuracy"""
+    
+    def test_bucket_bounds(self):
+        """Every value lies within its bucket, whose width is under 1% of the value"""
+        for value in [0, 1, 255, 256, 257, 511, 512, 10_000, 123_456_789, 2 ** 40 + 17]:
+            index = bucket_index(value)
+            assert bucket_lower(index) <= value <= bucket_upper(index)
+            assert bucket_upper(index) - bucket_lower(index) <= max(1, value) * 0.008
+        indices = [bucket_index(v) for v in range(0, 100_000, 7)]
+        assert indices == sorted(indices)
+    
+    def test_percentiles(self):
+        """Percentiles are within the bucket precision of the exact ones"""
+        rng = np.random.default_rng(0)
+        values = rng.lognormal(mean=13, sigma=1.0, size=20_000).astype(np.int64)
+        hist = LatencyHistogram()
+        for v in values:
+            hist.record(int(v))
+        for q in (50, 90, 99, 99.9):
+            exact = np.percentile(values, q)
+            assert hist.percentile(q) == pytest.approx(exact, rel=0.01)
+        assert hist.percentile(100) == values.max()
+        assert hist.count == len(values)
+    
+    def test_merge_and_round_trip(self):
+        a, b = LatencyHistogram(), LatencyHistogram()
+        for v in (1_000, 2_000, 3_000):
+            a.record(v)
+        b.record(50_000)
+        a.merge(b)
+        assert (a.count, a.min, a.max) == (4, 1_000, 50_000)
+        restored = LatencyHistogram.from_dict(json.loads(json.dumps(a.to_dict())))
+        assert restored.percentile(50) == a.percentile(50)
+        assert restored.count == 4
+
+
+class TestStageTimer:
+    """Test stage recording, the runtime switch and JSON dumps"""
+    
+    def test_context_manager_and_decorator(self):
+        """Stages are recorded per pair, from metadata dicts or pair arguments"""
+        timer = StageTimer(enabled=True)
+        strategy = FakeStrategy(timer)
+        with timer.stage("freqai.start", "BTC/USDT:USDT"):
+            time.sleep(0.002)
+        strategy.populate_entry_trend([], {"pair": "ETH/USDT:USDT"})
+        strategy.custom_stoploss(pair="SOL/USDT:USDT", trade=None, current_time=None,
+                                 current_rate=1.0, current_profit=0.0)
+        
+        assert timer.histogram("freqai.start", "BTC/USDT:USDT").min >= 2_000_000
+        assert timer.histogram("populate_entry_trend", "ETH/USDT:USDT").count == 1
+        assert timer.histogram("custom_stoploss").count == 1
+        assert timer.histogram("populate_exit_trend") is None
+    
+    def test_runtime_switch(self, tmp_path):
+        """Disabled timers record nothing; the toggle file switches them"""
+        toggle = tmp_path / "timing.on"
+        timer = StageTimer(enabled=False, toggle_file=toggle)
+        strategy = FakeStrategy(timer)
+        strategy.populate_entry_trend([], {"pair": "BTC/USDT:USDT"})
+        with timer.stage("freqai.start"):
+            pass
+        assert timer.snapshot()["stages"] == {}
+        
+        toggle.touch()
+        timer.maybe_dump()
+        strategy.populate_entry_trend([], {"pair": "BTC/USDT:USDT"})
+        assert timer.histogram("populate_entry_trend").count == 1
+        toggle.unlink()
+        timer.maybe_dump()
+        assert not timer.enabled
+    
+    def test_periodic_dump(self, tmp_path):
+        """maybe_dump writes a JSON snapshot once the interval has elapsed"""
+        path = tmp_path / "stage_timing.json"
+        timer = StageTimer(enabled=True, dump_path=path, dump_interval=0.0)
+        timer.record("populate_indicators", "BTC/USDT:USDT", 5_000_000)
+        timer.record("populate_indicators", "ETH/USDT:USDT", 7_000_000)
+        jobs = []
+        assert timer.maybe_dump(lambda fn, *args: jobs.append((fn, args)))
+        fn, args = jobs[0]
+        fn(*args)
+        
+        data = json.loads(path.read_text())
+        stage = data["stages"]["populate_indicators"]
+        assert stage["all"]["count"] == 2
+        assert sorted(stage["pairs"]) == ["BTC/USDT:USDT", "ETH/USDT:USDT"]
+        assert stage["pairs"]["BTC/USDT:USDT"]["p50_ns"] == pytest.approx(5_000_000, rel=0.01)
+        
+        timer.dump_interval = 3600
+        assert not timer.maybe_dump()
@@ -0,0 +1,175 @@
+"""
+Unit tests for the strategy benchmark harness.
+"""
+
+import json
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from features.feature_store import cached_features
+from features.shared_features import SharedFeatureBlocks
+from tools.strategy_benchmark import (
+    CALLBACK_BENCHMARKS,
+    FRAME_BENCHMARKS,
+    FakeDataProvider,
+    compare,
+    load_results,
+    run_benchmarks,
+    synthetic_ohlcv,
+    write_results,
+)
+
+CONFIG = {"freqai": {"feature_parameters": {"indicator_periods_candles": [10, 20]}}}
+
+
+class PandasStrategy:
+    """Strategy stand-in with the benchmarked methods in plain pandas"""
+    timeframe = "5m"
+    stoploss = -0.05
+    
+    def __init__(self, config):
+        self.config = config
+    
+    def feature_engineering_expand_all(self, dataframe, period, **kwargs):
+        dataframe[f"%-sma-{period}"] = dataframe["close"].rolling(period).mean()
+        return dataframe
+    
+    def feature_engineering_expand_basic(self, dataframe, metadata, **kwargs):
+        dataframe["%-pct-change"] = dataframe["close"].pct_change()
+        return dataframe
+    
+    def feature_engineering_standard(self, dataframe, metadata, **kwargs):
+        dataframe["%-market_regime"] = 0
+        return dataframe
+    
+    def set_freqai_targets(self, dataframe, metadata, **kwargs):
+        dataframe["&-s_close"] = dataframe["close"].pct_change(24).shift(-24).fillna(0)
+        return dataframe
+    
+    def populate_indicators(self, dataframe, metadata):
+        dataframe = self.freqai.start(dataframe, metadata, self)
+        dataframe["atr_14"] = (dataframe["high"] - dataframe["low"]).rolling(14).mean()
+        return dataframe.fillna(0)
+    
+    def populate_entry_trend(self, dataframe, metadata):
+        dataframe["enter_long"] = (dataframe["&-s_close"] > dataframe["&-s_close_mean"]).astype(int)
+        return dataframe
+    
+    def populate_exit_trend(self, dataframe, metadata):
+        dataframe["exit_long"] = (dataframe["&-s_close"] < 0).astype(int)
+        return dataframe
+    
+    def custom_stoploss(self, pair, trade, current_time, current_rate, current_profit, **kwargs):
+        dataframe, _ = self.dp.get_analyzed_dataframe(pair, self.timeframe)
+        return -max(0.015, min(0.05, 1.5 * dataframe["atr_14"].iloc[-1] / dataframe["close"].iloc[-1]))
+    
+    def custom_exit(self, pair, trade, current_time, current_rate, current_profit, **kwargs):
+        dataframe, _ = self.dp.get_analyzed_dataframe(pair, self.timeframe)
+        return "exit" if dataframe["DI_values"].iloc[-1] > 2.0 else None
+    
+    def leverage(self, pair, current_time, current_rate, proposed_leverage, max_leverage, entry_tag, side, **kwargs):
+        return min(3.0, max_leverage)
+
+
+class SharedBlocksStrategy(PandasStrategy):
+    """Stand-in whose corr-pair hooks go through the per-cycle shared feature blocks"""
+    
+    def __init__(self, config):
+        super().__init__(config)
+        self._shared_features = SharedFeatureBlocks()
+        self.executions = Counter()
+    
+    def _get_shared_features(self):
+        return self._shared_features
+    
+    @cached_features('feature_engineering_expand_all', shared=True)
+    def feature_engineering_expand_all(self, dataframe, period, **kwargs):
+        self.executions['expand_all'] += 1
+        return PandasStrategy.feature_engineering_expand_all(self, dataframe, period, **kwargs)
+    
+    @cached_features('feature_engineering_expand_basic', shared=True)
+    def feature_engineering_expand_basic(self, dataframe, metadata, **kwargs):
+        self.executions['expand_basic'] += 1
+        return PandasStrategy.feature_engineering_expand_basic(self, dataframe, metadata, **kwargs)
+
+
+class TestSyntheticData:
+    """Test the synthetic candles and the fake DataProvider"""
+    
+    def test_ohlcv_consistency(self):
+        candles = synthetic_ohlcv(10_000, seed=1)
+        assert len(candles) == 10_000
+        assert (candles["high"] >= candles[["open", "close"]].max(axis=1)).all()
+        assert (candles["low"] <= candles[["open", "close"]].min(axis=1)).all()
+        assert (candles["volume"] > 0).all()
+        assert candles["date"].diff().dropna().eq(pd.Timedelta("5min")).all()
+        pd.testing.assert_frame_equal(candles, synthetic_ohlcv(10_000, seed=1))
+    
+    def test_fake_data_provider(self):
+        candles = synthetic_ohlcv(100)
+        dp = FakeDataProvider({("BTC/USDT:USDT", "5m"): candles}, ["BTC/USDT:USDT"])
+        assert dp.runmode.value == "backtest"
+        assert dp.get_pair_dataframe("BTC/USDT:USDT", "5m") is candles
+        assert dp.get_pair_dataframe("ETH/USDT:USDT", "5m").empty
+        frame, _ = dp.get_analyzed_dataframe("BTC/USDT:USDT", "5m")
+        assert frame.empty
+
+
+class TestBenchmarks:
+    """Test timing runs, result files and baseline comparison"""
+    
+    def test_run_all_benchmarks(self):
+        results = run_benchmarks(CONFIG, sizes=[2_000, 5_000], repeat=2, strategy_factory=PandasStrategy,
+                                 callback_calls=50)
+        names = FRAME_BENCHMARKS + CALLBACK_BENCHMARKS
+        assert [(r["benchmark"], r["candles"]) for r in results] == [(n, s) for s in (2_000, 5_000) for n in names]
+        for result in results:
+            assert result["repeat"] == 2
+            assert 0 < result["best_s"] <= result["median_s"]
+            key = "ns_per_call" if result["benchmark"] in CALLBACK_BENCHMARKS else "ns_per_candle"
+            assert result[key] > 0
+        with pytest.raises(ValueError):
+            run_benchmarks(CONFIG, sizes=[100], benchmarks=["bogus"], strategy_factory=PandasStrategy)
+    
+    def test_hooks_run_on_every_repeat(self):
+        """Shared feature blocks are reset before each timed run, so hook bodies always execute"""
+        strategies = []
+        
+        def factory(config):
+            strategies.append(SharedBlocksStrategy(config))
+            return strategies[-1]
+        run_benchmarks(CONFIG, sizes=[1_000], repeat=5, strategy_factory=factory,
+                       benchmarks=["feature_engineering_expand_all", "feature_engineering_expand_basic"])
+        # One populate_indicators pre-pass plus five timed runs, two periods for expand_all
+        assert strategies[0].executions == {"expand_all": 2 * (1 + 5), "expand_basic": 1 + 5}
+    
+    def test_compare_with_baseline(self, tmp_path):
+        baseline = [
+            {"benchmark": "populate_entry_trend", "candles": 10_000, "median_s": 0.10},
+            {"benchmark": "populate_exit_trend", "candles": 10_000, "median_s": 0.10},
+            {"benchmark": "custom_exit", "candles": 10_000, "median_s": 0.10},
+        ]
+        current = [
+            {"benchmark": "populate_entry_trend", "candles": 10_000, "median_s": 0.125},
+            {"benchmark": "populate_exit_trend", "candles": 10_000, "median_s": 0.105},
+            {"benchmark": "custom_exit", "candles": 10_000, "median_s": 0.05},
+            {"benchmark": "leverage", "candles": 10_000, "median_s": 0.01},
+        ]
+        path = write_results(tmp_path / "baseline.json", baseline, {"repeat": 3})
+        assert json.loads(Path(path).read_text())["environment"]["numpy"] == np.__version__
+        
+        rows = compare(current, load_results(path), tolerance=0.10)
+        assert [r["status"] for r in rows] == ["regression", "ok", "improvement", "new"]
+        assert rows[0]["ratio"] == pytest.approx(1.25)
+    
+    def test_real_strategy(self):
+        """The harness drives FreqAIHybridStrategy when freqtrade and TA-Lib are installed"""
+        pytest.importorskip("talib")
+        pytest.importorskip("freqtrade")
+        config = json.loads((Path(__file__).parent.parent / "config" / "config.json").read_text())
+        results = run_benchmarks(config, sizes=[5_000], repeat=1, callback_calls=10)
+        assert {r["benchmark"] for r in results} == set(FRAME_BENCHMARKS + CALLBACK_BENCHMARKS)
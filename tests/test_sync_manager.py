@@ -0,0 +1,244 @@
+"""
+Unit tests for the incremental sync manager.
+"""
+
+import io
+import os
+import subprocess
+import sys
+
+import pytest
+
+from tools.sync_manager import LocalFS, SFTPFS, SyncManager, build_manifest
+
+
+CHUNK = 1024
+
+
+class FakeChannel:
+    def __init__(self, returncode):
+        self.returncode = returncode
+    
+    def recv_exit_status(self):
+        return self.returncode
+
+
+class FakeStream(io.BytesIO):
+    def __init__(self, data, channel):
+        super().__init__(data)
+        self.channel = channel
+
+
+class FakeSFTP:
+    """SFTP over the local filesystem"""
+    
+    def __init__(self, client):
+        self.client = client
+    
+    def open(self, path, mode="rb"):
+        if mode == "rb":
+            self.client.reads.append(path)
+        return open(path, mode)
+    
+    def stat(self, path):
+        try:
+            return os.stat(path)
+        except OSError as e:
+            raise IOError(str(e))
+    
+    def mkdir(self, path):
+        os.mkdir(path)
+    
+    def remove(self, path):
+        os.remove(path)
+    
+    def posix_rename(self, old, new):
+        os.replace(old, new)
+    
+    def close(self):
+        self.client.sftp_closes += 1
+
+
+class FakeSSHClient:
+    """paramiko.SSHClient stand-in running commands in a local shell"""
+    
+    def __init__(self):
+        self.commands = []
+        self.sftp_opens = 0
+        self.sftp_closes = 0
+        self.reads = []
+    
+    def exec_command(self, command):
+        self.commands.append(command)
+        proc = subprocess.run(command, shell=True, capture_output=True)
+        channel = FakeChannel(proc.returncode)
+        return None, FakeStream(proc.stdout, channel), FakeStream(proc.stderr, channel)
+    
+    def open_sftp(self):
+        self.sftp_opens += 1
+        return FakeSFTP(self)
+
+
+@pytest.fixture
+def hosts(tmp_path):
+    """Source tree with models and data, empty destination"""
+    src = tmp_path / "src"
+    dst = tmp_path / "dst"
+    models = src / "user_data" / "models" / "run1"
+    models.mkdir(parents=True)
+    (models / "model.bin").write_bytes(os.urandom(10 * CHUNK + 100))
+    (models / "meta.json").write_text('{"pairs": ["BTC/USDT:USDT"]}')
+    data = src / "user_data" / "data" / "binance"
+    data.mkdir(parents=True)
+    (data / "BTC_USDT-5m.feather").write_bytes(os.urandom(3 * CHUNK))
+    dst.mkdir()
+    return src, dst
+
+
+def tree(root, rel_dir="user_data/models"):
+    root = os.path.join(root, rel_dir)
+    return {
+        os.path.relpath(os.path.join(d, f), root): open(os.path.join(d, f), "rb").read()
+        for d, _, files in os.walk(root) for f in files
+        if f != ".sync_manifest.json"
+    }
+
+
+class TestBuildManifest:
+    """Test build_manifest"""
+    
+    def test_chunks_and_cache(self, hosts):
+        """Files are hashed per chunk and unchanged files come from the cache"""
+        src, _ = hosts
+        root = str(src / "user_data" / "models")
+        
+        manifest = build_manifest(root, CHUNK)
+        assert len(manifest["run1/model.bin"]["chunks"]) == 11
+        assert (src / "user_data" / "models" / ".sync_manifest.json").exists()
+        assert ".sync_manifest.json" not in manifest
+        
+        (src / "user_data" / "models" / "run1" / "meta.json").write_text("{}")
+        updated = build_manifest(root, CHUNK)
+        assert updated["run1/model.bin"] == manifest["run1/model.bin"]
+        assert updated["run1/meta.json"]["chunks"] != manifest["run1/meta.json"]["chunks"]
+    
+    def test_missing_directory(self, tmp_path):
+        """A directory that does not exist has an empty manifest"""
+        assert build_manifest(str(tmp_path / "nope"), CHUNK) == {}
+
+
+class TestSyncManager:
+    """Test SyncManager between local directories"""
+    
+    def test_initial_and_noop_sync(self, hosts):
+        """First sync copies everything, a second one transfers nothing"""
+        src, dst = hosts
+        manager = SyncManager(LocalFS(str(src)), LocalFS(str(dst)), chunk_size=CHUNK)
+        
+        reports = manager.sync_all(["user_data/models", "user_data/data"])
+        assert tree(dst) == tree(src)
+        assert tree(dst, "user_data/data") == tree(src, "user_data/data")
+        assert reports["user_data/models"].files_transferred == 2
+        
+        again = manager.sync("user_data/models")
+        assert again.files_transferred == 0
+        assert again.bytes_transferred == 0
+        assert again.bytes_skipped == 10 * CHUNK + 100 + len('{"pairs": ["BTC/USDT:USDT"]}')
+    
+    def test_transfers_only_changed_chunks(self, hosts):
+        """Modifying one chunk sends one chunk; shrinking truncates"""
+        src, dst = hosts
+        manager = SyncManager(LocalFS(str(src)), LocalFS(str(dst)), chunk_size=CHUNK)
+        manager.sync("user_data/models")
+        
+        model = src / "user_data" / "models" / "run1" / "model.bin"
+        content = bytearray(model.read_bytes())
+        content[5 * CHUNK + 10] ^= 0xFF
+        model.write_bytes(bytes(content[:8 * CHUNK]))
+        
+        report = manager.sync("user_data/models")
+        assert report.files_transferred == 1
+        assert report.chunks_transferred == 1
+        assert report.bytes_transferred == CHUNK
+        assert tree(dst) == tree(src)
+    
+    def test_failed_transfer_keeps_destination(self, hosts):
+        """A file is only replaced once all of its chunks were written"""
+        src, dst = hosts
+        SyncManager(LocalFS(str(src)), LocalFS(str(dst)), chunk_size=CHUNK).sync("user_data/models")
+        before = tree(dst)
+        
+        class FailingFS(LocalFS):
+            def read_chunk(self, path, offset, size):
+                if offset >= 2 * CHUNK:
+                    raise IOError("connection lost")
+                return super().read_chunk(path, offset, size)
+        
+        model = src / "user_data" / "models" / "run1" / "model.bin"
+        model.write_bytes(os.urandom(10 * CHUNK + 100))
+        report = SyncManager(FailingFS(str(src)), LocalFS(str(dst)), chunk_size=CHUNK).sync("user_data/models")
+        
+        assert report.errors and report.files_transferred == 0
+        assert tree(dst) == before
+        assert not any(path.endswith(".synctmp") for path in os.listdir(dst / "user_data" / "models" / "run1"))
+    
+    def test_delete(self, hosts):
+        """delete=True removes destination files gone from the source"""
+        src, dst = hosts
+        SyncManager(LocalFS(str(src)), LocalFS(str(dst)), chunk_size=CHUNK).sync("user_data/models")
+        (src / "user_data" / "models" / "run1" / "meta.json").unlink()
+        
+        kept = SyncManager(LocalFS(str(src)), LocalFS(str(dst)), chunk_size=CHUNK).sync("user_data/models")
+        assert kept.files_deleted == 0
+        assert (dst / "user_data" / "models" / "run1" / "meta.json").exists()
+        
+        pruned = SyncManager(LocalFS(str(src)), LocalFS(str(dst)), chunk_size=CHUNK, delete=True).sync("user_data/models")
+        assert pruned.files_deleted == 1
+        assert tree(dst) == tree(src)
+
+
+class TestSFTPFS:
+    """Test syncing against the SSH endpoint"""
+    
+    def test_push_and_pull(self, hosts, tmp_path):
+        """Manifests are built remotely; content round-trips both ways"""
+        src, remote_root = hosts
+        client = FakeSSHClient()
+        remote = SFTPFS(client, str(remote_root), python=sys.executable)
+        
+        SyncManager(LocalFS(str(src)), remote, chunk_size=CHUNK, max_workers=2).sync("user_data/models")
+        assert tree(remote_root) == tree(src)
+        assert any("build_manifest" in cmd for cmd in client.commands)
+        assert client.reads == []  # Hashing never reads remote files over SFTP
+        assert 1 <= client.sftp_opens <= 2
+        assert client.sftp_closes == client.sftp_opens
+        
+        local = tmp_path / "pulled"
+        SyncManager(remote, LocalFS(str(local)), chunk_size=CHUNK).sync("user_data/models")
+        assert tree(local) == tree(src)
+        assert client.sftp_closes == client.sftp_opens
+    
+    def test_remote_update_is_copied_remotely(self, hosts):
+        """Changed files are updated in a remote copy and renamed over the original"""
+        src, remote_root = hosts
+        client = FakeSSHClient()
+        remote = SFTPFS(client, str(remote_root), python=sys.executable)
+        manager = SyncManager(LocalFS(str(src)), remote, chunk_size=CHUNK)
+        manager.sync("user_data/models")
+        
+        model = src / "user_data" / "models" / "run1" / "model.bin"
+        content = bytearray(model.read_bytes())
+        content[3 * CHUNK] ^= 0xFF
+        model.write_bytes(bytes(content))
+        report = manager.sync("user_data/models")
+        
+        assert report.chunks_transferred == 1
+        assert tree(remote_root) == tree(src)
+        assert any(cmd.startswith("cp ") and cmd.endswith("model.bin.synctmp") for cmd in client.commands)
+        assert client.reads == []
+    
+    def test_remote_failure(self, tmp_path):
+        """A failing remote interpreter raises with its stderr"""
+        remote = SFTPFS(FakeSSHClient(), str(tmp_path), python="false")
+        with pytest.raises(RuntimeError, match="Remote manifest failed"):
+            remote.manifest("user_data/models", CHUNK)
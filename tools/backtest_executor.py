@@ -1,19 +1,43 @@
 #!/usr/bin/env python3
 """
 Professional Automated Backtest Executor
-Executes backtests on remote Colab GPU with proper monitoring and result sync
+Executes backtests on remote Colab GPU (or local freqtrade processes) with
+proper monitoring and result sync
 """
 
 import os
 import sys
 import json
 import time
+import gzip
+import uuid
+import shlex
+import shutil
+import zipfile
 import paramiko
 import logging
+import threading
+import subprocess
+from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Dict, List, Optional
+from functools import partial
+from typing import Callable, Dict, List, Optional, Tuple, Union
 from dataclasses import dataclass
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+try:
+    from tools.backtest_sharding import execute_sharded
+    from tools.batch_journal import BatchJournal, config_key
+    from tools.freqai_checkpoints import CheckpointReport, TrainTimeLog, freqai_identifier, scan_checkpoints
+    from tools.progress_stream import ProgressEvent, drain_channel, run_process
+    from tools.result_cache import ResultCache
+except ImportError:  # Run as a script from tools/
+    from backtest_sharding import execute_sharded
+    from batch_journal import BatchJournal, config_key
+    from freqai_checkpoints import CheckpointReport, TrainTimeLog, freqai_identifier, scan_checkpoints
+    from progress_stream import ProgressEvent, drain_channel, run_process
+    from result_cache import ResultCache
 
 logging.basicConfig(
     level=logging.INFO,
@@ -43,20 +67,267 @@ class BacktestConfig:
             f"--timerange {self.timerange} "
             f"--export {self.export}"
         )
+        if self.pairs:
+            cmd += f" --pairs {pairs_str}"
         return cmd
 
 
-class ColabBacktestExecutor:
-    """Executes backtests on Colab GPU via SSH tunnel"""
+class BacktestExecutorBase(ABC):
+    """Shared batch handling and result parsing for backtest executors"""
+    
+    results_dir: Path
+    config_path: Path = Path("config/config.json")
+    on_progress: Optional[Callable[[BacktestConfig, ProgressEvent], None]] = None
+    result_cache: Optional[ResultCache] = None
+    max_concurrency: Optional[int] = None  # Concurrent execute_backtest calls supported (None = no limit)
+    
+    def execute_backtest(self, config: BacktestConfig, force: bool = False) -> Dict:
+        """Execute single backtest (or return the cached result for identical inputs)
+        
+        Args:
+            config: Backtest configuration
+            force: Run even if result_cache holds a result for this config
+        """
+        if self.result_cache is not None and not force:
+            entry = self.result_cache.get(config)
+            if entry is not None:
+                logger.info(f"♻️  Cached result for {config.strategy} - {config.timerange} ({entry['fingerprint']})")
+                return {
+                    "config": config,
+                    "elapsed_seconds": entry["elapsed_seconds"],
+                    "results": entry["results"],
+                    "output": [],
+                    "cached": True
+                }
+        
+        result = self._run_backtest(config)
+        if self.result_cache is not None:
+            self.result_cache.put(config, result)
+        return result
+    
+    @abstractmethod
+    def _run_backtest(self, config: BacktestConfig) -> Dict:
+        """Run one backtest (implemented by each executor)"""
+    
+    def execute_batch(
+        self,
+        configs: List[BacktestConfig],
+        journal: Union[BatchJournal, str, Path, None] = None
+    ) -> List[Dict]:
+        """Execute multiple backtests
+        
+        Args:
+            configs: Backtest configs
+            journal: Batch journal (or its path) to resume; default starts a new one
+        """
+        journal, results, pending = self._start_batch(configs, journal)
+        logger.info(f"Starting batch execution: {len(pending)} backtests")
+        
+        for n, i in enumerate(pending, 1):
+            logger.info(f"\n{'='*70}")
+            logger.info(f"Backtest {n}/{len(pending)}")
+            logger.info(f"{'='*70}")
+            
+            try:
+                results[i] = self.execute_backtest(configs[i])
+            except Exception as e:
+                logger.error(f"Backtest {n} failed: {e}")
+                results[i] = {
+                    "config": configs[i],
+                    "error": str(e)
+                }
+            journal.append(configs[i], results[i])
+        
+        journal.compact()
+        logger.info(f"\n✅ Batch execution completed: {len(results)} results")
+        return results
+    
+    def execute_sharded(
+        self,
+        config: BacktestConfig,
+        shard_size: int = 1,
+        max_open_trades: Optional[int] = None
+    ) -> Dict:
+        """Run a multi-pair config as pair shards via execute_batch and merge the trades
+        
+        Args:
+            config: Backtest config with several pairs
+            shard_size: Pairs per shard
+            max_open_trades: Slot limit applied across shards (default: from the results)
+        """
+        return execute_sharded(self, config, shard_size, max_open_trades)
+    
+    def _start_batch(
+        self,
+        configs: List[BacktestConfig],
+        journal: Union[BatchJournal, str, Path, None]
+    ) -> Tuple[BatchJournal, List[Optional[Dict]], List[int]]:
+        """Open the journal and find the configs still to run
+        
+        Returns:
+            (journal, results with completed entries filled in, indexes of pending configs)
+        """
+        if journal is None:
+            journal = BatchJournal.for_new_batch(self.results_dir)
+        elif not isinstance(journal, BatchJournal):
+            journal = BatchJournal(journal)
+        
+        results = journal.resume(configs)
+        pending = [i for i, result in enumerate(results) if result is None]
+        return journal, results, pending
     
-    def __init__(self, tunnel_url: str, password: Optional[str] = None, ssh_key_path: Optional[str] = None):
+    def _track_progress(self, config: BacktestConfig) -> Tuple[Callable[[ProgressEvent], None], List[float]]:
+        """Progress callback that also collects per-window training durations"""
+        durations: List[float] = []
+        
+        def on_event(event: ProgressEvent):
+            if event.kind == "trained" and event.duration is not None:
+                durations.append(event.duration)
+            self._handle_progress(config, event)
+        
+        return on_event, durations
+    
+    def _find_checkpoints(self, config: BacktestConfig, models_dir, listdir=os.listdir) -> Optional[CheckpointReport]:
+        """Training windows of this config's timerange and pairs an earlier (interrupted) run already saved"""
+        identifier = freqai_identifier(self.config_path)
+        if not identifier:
+            return None
+        
+        try:
+            report = scan_checkpoints(models_dir, identifier, listdir, config.timerange, config.pairs)
+        except Exception as e:
+            logger.warning(f"Could not scan FreqAI checkpoints: {e}")
+            return None
+        
+        if report.reusable:
+            logger.info(
+                f"♻️  Found {report.reusable} saved FreqAI training windows for {identifier} "
+                f"(up to {report.latest():%Y-%m-%d}); resuming with them"
+            )
+        return report
+    
+    def _resume_summary(self, report: Optional[CheckpointReport], durations: List[float]) -> Optional[Dict]:
+        """Record this run's training times and report what resuming saved"""
+        if report is None:
+            return None
+        
+        train_times = TrainTimeLog(self.results_dir / "train_times" / f"{report.identifier}.json")
+        train_times.record(durations)
+        summary = report.summary(train_times.mean())
+        
+        if report.reusable and summary["estimated_seconds_saved"]:
+            logger.info(
+                f"♻️  Resume reused {report.reusable} training windows, "
+                f"saving ~{summary['estimated_seconds_saved'] / 60:.1f} minutes of training"
+            )
+        return summary
+    
+    def _handle_progress(self, config: BacktestConfig, event: ProgressEvent):
+        """Log a progress event and forward it to on_progress"""
+        if event.kind == "error":
+            logger.error(event.message)
+        elif event.kind not in ("output", "exit"):
+            logger.info(f"{config.timerange}: {event.describe()}")
+        
+        if self.on_progress is not None:
+            self.on_progress(config, event)
+    
+    def _parse_results(self, data: Dict, config: BacktestConfig) -> Dict:
+        """Parse backtest results"""
+        if "strategy" not in data or config.strategy not in data["strategy"]:
+            return {"error": "Strategy results not found"}
+        
+        stats = data["strategy"][config.strategy]
+        
+        return {
+            "total_profit_abs": stats.get("profit_total_abs"),
+            "total_profit_pct": stats.get("profit_total"),
+            "sharpe_ratio": stats.get("sharpe"),
+            "max_drawdown": stats.get("max_drawdown"),
+            "total_trades": stats.get("total_trades"),
+            "wins": stats.get("wins"),
+            "losses": stats.get("losses"),
+            "win_rate": stats.get("winrate")
+        }
+    
+    def _local_result_path(self, config: BacktestConfig, suffix: str) -> Path:
+        """Unique local name for a downloaded/copied result file"""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        return self.results_dir / (
+            f"backtest_{config.strategy}_{config.timerange}_{timestamp}_{config_key(config)[:8]}{suffix}"
+        )
+    
+    @staticmethod
+    def _load_result_file(path: Path) -> Dict:
+        """Load result JSON (plain or inside freqtrade's zip export)"""
+        if path.suffix == ".zip":
+            with zipfile.ZipFile(path) as zf:
+                return json.loads(zf.read(f"{path.stem}.json"))
+        with open(path) as f:
+            return json.load(f)
+
+
+class ColabBacktestExecutor(BacktestExecutorBase):
+    """Executes backtests on Colab GPU via SSH tunnel
+    
+    One SSH transport is kept for the executor's lifetime: commands run on
+    their own (PTY-less) channels over it, a single SFTP session is reused
+    for all transfers, and a dropped connection is re-established
+    transparently before the next operation.
+    """
+    
+    # Errors that indicate a dead connection (retried after reconnecting)
+    CONNECTION_ERRORS = (paramiko.SSHException, EOFError, ConnectionError, OSError)
+    
+    # Runs share the remote results directory (.last_result.json) and one SFTP session
+    max_concurrency = 1
+    
+    def __init__(
+        self,
+        tunnel_url: str,
+        password: Optional[str] = None,
+        ssh_key_path: Optional[str] = None,
+        username: str = "root",
+        remote_dir: str = "/content/freqai-futures-strategy",
+        compress_results: bool = True,
+        keepalive_interval: int = 30,
+        max_reconnects: int = 3,
+        client_factory=None,
+        on_progress: Optional[Callable[[BacktestConfig, ProgressEvent], None]] = None,
+        result_cache: Optional[ResultCache] = None
+    ):
+        """
+        Args:
+            tunnel_url: Tunnel URL (ngrok, cloudflared or host:port)
+            password: SSH password (if no key)
+            ssh_key_path: SSH private key path
+            username: SSH user
+            remote_dir: Repository checkout on the remote host
+            compress_results: gzip result JSON on the remote side before transfer
+            keepalive_interval: Transport keepalive in seconds (0 = off)
+            max_reconnects: Reconnect attempts per operation
+            client_factory: Builds the SSH client (default paramiko.SSHClient)
+            on_progress: Called with (config, ProgressEvent) while a backtest runs
+            result_cache: Return stored results for previously run identical backtests
+        """
         self.tunnel_url = tunnel_url
         self.password = password
         self.ssh_key_path = ssh_key_path
+        self.username = username
+        self.remote_dir = remote_dir.rstrip("/")
+        self.compress_results = compress_results
+        self.keepalive_interval = keepalive_interval
+        self.max_reconnects = max_reconnects
+        self.client_factory = client_factory or paramiko.SSHClient
+        self.on_progress = on_progress
+        self.result_cache = result_cache
         self.client = None
+        self._sftp = None
+        self._lock = threading.RLock()
+        self.reconnects = 0
         self.results_dir = Path("backtest_results")
         self.results_dir.mkdir(exist_ok=True)
-        
+    
     def connect(self):
         """Establish SSH connection via tunnel"""
         logger.info("Connecting to Colab via tunnel...")
@@ -64,35 +335,87 @@ class ColabBacktestExecutor:
         # Parse tunnel URL
         host, port = self._parse_tunnel_url(self.tunnel_url)
         
-        self.client = paramiko.SSHClient()
-        self.client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-        
-        try:
-            if self.ssh_key_path:
-                self.client.connect(
-                    hostname=host,
-                    port=port,
-                    username="root",
-                    key_filename=self.ssh_key_path,
-                    timeout=30
-                )
-            else:
-                # Use password authentication
-                if not self.password:
-                    raise ValueError("Password is required when not using SSH key")
-                self.client.connect(
-                    hostname=host,
-                    port=port,
-                    username="root",
-                    password=self.password,
-                    timeout=30
-                )
+        with self._lock:
+            self._close()
+            self.client = self.client_factory()
+            self.client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
             
-            logger.info("✅ Connected to Colab")
+            try:
+                if self.ssh_key_path:
+                    self.client.connect(
+                        hostname=host,
+                        port=port,
+                        username=self.username,
+                        key_filename=self.ssh_key_path,
+                        timeout=30
+                    )
+                else:
+                    # Use password authentication
+                    if not self.password:
+                        raise ValueError("Password is required when not using SSH key")
+                    self.client.connect(
+                        hostname=host,
+                        port=port,
+                        username=self.username,
+                        password=self.password,
+                        timeout=30
+                    )
+                
+                transport = self.client.get_transport()
+                if transport is not None and self.keepalive_interval:
+                    transport.set_keepalive(self.keepalive_interval)
+                
+                logger.info("✅ Connected to Colab")
             
-        except Exception as e:
-            logger.error(f"Connection failed: {e}")
-            raise
+            except Exception as e:
+                logger.error(f"Connection failed: {e}")
+                raise
+    
+    @property
+    def connected(self) -> bool:
+        """True while the SSH transport is alive"""
+        if self.client is None:
+            return False
+        transport = self.client.get_transport()
+        return transport is not None and transport.is_active()
+    
+    def _ensure_connected(self):
+        """Reconnect if the transport has dropped"""
+        with self._lock:
+            if not self.connected:
+                if self.client is not None:
+                    logger.warning("SSH connection lost, reconnecting...")
+                    self.reconnects += 1
+                self.connect()
+    
+    def _with_reconnect(self, operation):
+        """Run operation(), reconnecting and retrying on connection errors"""
+        for attempt in range(self.max_reconnects + 1):
+            self._ensure_connected()
+            try:
+                return operation()
+            except self.CONNECTION_ERRORS as e:
+                if attempt == self.max_reconnects or self.connected:
+                    # Out of retries, or the connection is fine and the error is real
+                    raise
+                logger.warning(f"Connection error ({e}), retrying ({attempt + 1}/{self.max_reconnects})")
+    
+    def _get_sftp(self):
+        """Cached SFTP session on the current transport"""
+        with self._lock:
+            if self._sftp is None or self._sftp.get_channel().closed:
+                self._sftp = self.client.open_sftp()
+            return self._sftp
+    
+    def run_command(self, command: str):
+        """Start a command on a new channel (no PTY) in the remote checkout
+        
+        Returns:
+            (stdin, stdout, stderr) file objects as from exec_command
+        """
+        return self._with_reconnect(
+            lambda: self.client.exec_command(f"cd {shlex.quote(self.remote_dir)} && {command}")
+        )
     
     def _parse_tunnel_url(self, url: str) -> tuple:
         """Parse tunnel URL to get host and port
@@ -119,7 +442,7 @@ class ColabBacktestExecutor:
         else:
             return url, 22
     
-    def execute_backtest(self, config: BacktestConfig) -> Dict:
+    def _run_backtest(self, config: BacktestConfig) -> Dict:
         """Execute single backtest"""
         logger.info(f"Starting backtest: {config.strategy} - {config.timerange}")
         
@@ -130,26 +453,24 @@ class ColabBacktestExecutor:
             cmd = config.to_command()
             logger.info(f"Command: {cmd}")
             
-            # Execute remotely
-            stdin, stdout, stderr = self.client.exec_command(
-                f"cd /content/freqai-futures-strategy && {cmd}",
-                get_pty=True
+            # Windows saved by an interrupted run are reused by FreqAI (same identifier)
+            self._ensure_connected()
+            checkpoints = self._find_checkpoints(
+                config, f"{self.remote_dir}/user_data/models", lambda path: self._get_sftp().listdir(path)
             )
             
-            # Monitor progress
-            output_lines = []
-            for line in stdout:
-                line = line.strip()
-                output_lines.append(line)
-                
-                # Log progress indicators
-                if "Training" in line or "Backtesting" in line or "pair" in line:
-                    logger.info(line)
+            # The previous run's result pointer must never stand in for this run's result
+            self._remove_last_result()
             
-            # Check for errors
-            errors = stderr.read().decode()
-            if errors:
-                logger.error(f"Stderr: {errors}")
+            # Execute remotely (own channel on the shared transport)
+            stdin, stdout, stderr = self.run_command(cmd)
+            
+            # Drain stdout and stderr together, reporting progress as it arrives
+            on_event, durations = self._track_progress(config)
+            exit_code, output_lines = drain_channel(stdout.channel, on_event=on_event)
+            if exit_code != 0:
+                tail = "\n".join(output_lines[-20:])
+                raise RuntimeError(f"Remote backtest exited with code {exit_code}:\n{tail}")
             
             elapsed = time.time() - start_time
             
@@ -162,142 +483,420 @@ class ColabBacktestExecutor:
                 "config": config,
                 "elapsed_seconds": elapsed,
                 "results": results,
-                "output": output_lines
+                "output": output_lines,
+                "resume": self._resume_summary(checkpoints, durations)
             }
-            
+        
         except Exception as e:
             logger.error(f"Backtest execution failed: {e}")
             raise
     
-    def execute_batch(self, configs: List[BacktestConfig]) -> List[Dict]:
-        """Execute multiple backtests"""
-        logger.info(f"Starting batch execution: {len(configs)} backtests")
-        
-        results = []
-        for i, config in enumerate(configs, 1):
-            logger.info(f"\n{'='*70}")
-            logger.info(f"Backtest {i}/{len(configs)}")
-            logger.info(f"{'='*70}")
-            
-            try:
-                result = self.execute_backtest(config)
-                results.append(result)
-                
-                # Save intermediate results
-                self._save_batch_results(results)
-                
-            except Exception as e:
-                logger.error(f"Backtest {i} failed: {e}")
-                results.append({
-                    "config": config,
-                    "error": str(e)
-                })
-        
-        logger.info(f"\n✅ Batch execution completed: {len(results)} results")
-        return results
-    
     def _download_results(self, config: BacktestConfig) -> Dict:
         """Download backtest results from Colab"""
-        remote_path = "/content/freqai-futures-strategy/user_data/backtest_results/backtest-result.json"
-        
-        # Generate local filename with timestamp
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        local_filename = f"backtest_{config.strategy}_{config.timerange}_{timestamp}.json"
-        local_path = self.results_dir / local_filename
+        remote_results = f"{self.remote_dir}/user_data/backtest_results"
         
         try:
-            sftp = self.client.open_sftp()
-            sftp.get(remote_path, str(local_path))
-            sftp.close()
+            remote_path = self._with_reconnect(lambda: self._latest_remote_result(remote_results))
+            suffix = Path(remote_path).suffix
             
-            logger.info(f"Results downloaded: {local_path}")
+            # Local filename with timestamp and config hash (parallel shards share a timerange)
+            local_path = self._local_result_path(config, suffix)
             
-            # Load and parse results
-            with open(local_path) as f:
-                results_data = json.load(f)
+            if self.compress_results and suffix == ".json":
+                self._with_reconnect(lambda: self._get_compressed(remote_path, local_path))
+            else:
+                self._with_reconnect(lambda: self._get_sftp().get(remote_path, str(local_path)))
             
-            return self._parse_results(results_data, config)
+            logger.info(f"Results downloaded: {local_path}")
             
+            # Load and parse results
+            results = self._parse_results(self._load_result_file(local_path), config)
+            results["result_file"] = str(local_path)
+            return results
+        
         except Exception as e:
             logger.error(f"Failed to download results: {e}")
             return {}
     
-    def _parse_results(self, data: Dict, config: BacktestConfig) -> Dict:
-        """Parse backtest results"""
-        if "strategy" not in data or config.strategy not in data["strategy"]:
-            return {"error": "Strategy results not found"}
-        
-        stats = data["strategy"][config.strategy]
-        
-        return {
-            "total_profit_abs": stats.get("profit_total_abs"),
-            "total_profit_pct": stats.get("profit_total"),
-            "sharpe_ratio": stats.get("sharpe"),
-            "max_drawdown": stats.get("max_drawdown"),
-            "total_trades": stats.get("total_trades"),
-            "wins": stats.get("wins"),
-            "losses": stats.get("losses"),
-            "win_rate": stats.get("winrate")
-        }
+    def _remove_last_result(self):
+        """Delete the remote .last_result.json left by the previous run"""
+        remote_results = f"{self.remote_dir}/user_data/backtest_results"
+        try:
+            self._get_sftp().remove(f"{remote_results}/.last_result.json")
+        except IOError:
+            pass
     
-    def _save_batch_results(self, results: List[Dict]):
-        """Save batch results to JSON"""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = self.results_dir / f"batch_results_{timestamp}.json"
-        
-        with open(filename, 'w') as f:
-            json.dump(results, f, indent=2, default=str)
+    def _latest_remote_result(self, remote_results: str) -> str:
+        """Remote path of the latest result (via .last_result.json)"""
+        sftp = self._get_sftp()
+        try:
+            with sftp.open(f"{remote_results}/.last_result.json") as f:
+                latest = json.loads(f.read()).get("latest_backtest")
+            if latest:
+                return f"{remote_results}/{latest}"
+        except IOError:
+            pass
+        return f"{remote_results}/backtest-result.json"
+    
+    def _get_compressed(self, remote_path: str, local_path: Path):
+        """gzip on the remote side, transfer, decompress locally"""
+        remote_gz = f"{remote_path}.gz"
+        _, stdout, stderr = self.client.exec_command(
+            f"gzip -c {shlex.quote(remote_path)} > {shlex.quote(remote_gz)}"
+        )
+        if stdout.channel.recv_exit_status() != 0:
+            # No gzip (or no space): plain transfer
+            logger.warning(f"Remote gzip failed: {stderr.read().decode().strip()}")
+            self._get_sftp().get(remote_path, str(local_path))
+            return
         
-        logger.info(f"Batch results saved: {filename}")
+        sftp = self._get_sftp()
+        local_gz = local_path.with_name(local_path.name + ".gz")
+        try:
+            sftp.get(remote_gz, str(local_gz))
+            with gzip.open(local_gz, "rb") as src, open(local_path, "wb") as dst:
+                shutil.copyfileobj(src, dst)
+        finally:
+            local_gz.unlink(missing_ok=True)
+            sftp.remove(remote_gz)
+    
+    def _close(self):
+        """Close SFTP session and SSH client"""
+        if self._sftp is not None:
+            try:
+                self._sftp.close()
+            except Exception:
+                pass
+            self._sftp = None
+        if self.client is not None:
+            self.client.close()
     
     def disconnect(self):
         """Close SSH connection"""
         if self.client:
-            self.client.close()
+            with self._lock:
+                self._close()
+                self.client = None
             logger.info("Disconnected from Colab")
 
 
+class LocalBacktestExecutor(BacktestExecutorBase):
+    """Executes backtests as local freqtrade processes in a bounded pool
+    
+    Every job runs in its own user directory (--userdir) with symlinks to
+    the shared strategies, data and model classes, plus private
+    backtest_results and models directories, so parallel jobs never
+    overwrite each other's result files or FreqAI models.
+    
+    The models directory links to a checkpoint directory per config that
+    outlives failed runs: rerunning an interrupted backtest lets FreqAI
+    reuse the training windows it already saved. It is removed once the
+    backtest succeeds.
+    """
+    
+    SHARED_USER_DIRS = ("strategies", "hyperopts", "freqaimodels", "data")
+    
+    def __init__(
+        self,
+        project_dir: str = ".",
+        max_workers: Optional[int] = None,
+        jobs_dir: str = "backtest_jobs",
+        checkpoints_dir: str = "backtest_checkpoints",
+        keep_job_dirs: bool = False,
+        freqtrade_cmd: Optional[List[str]] = None,
+        timeout: Optional[float] = None,
+        on_progress: Optional[Callable[[BacktestConfig, ProgressEvent], None]] = None,
+        result_cache: Optional[ResultCache] = None
+    ):
+        """
+        Args:
+            project_dir: Repository root (freqtrade runs here, config paths are relative to it)
+            max_workers: Concurrent freqtrade processes (default: CPU count)
+            jobs_dir: Per-job user directories, relative to project_dir
+            checkpoints_dir: FreqAI models of unfinished backtests, relative to project_dir
+            keep_job_dirs: Keep job directories (trained models, logs) after completion
+            freqtrade_cmd: Replaces the leading "freqtrade" of the command
+                (e.g. [sys.executable, "-m", "freqtrade"])
+            timeout: Seconds before a backtest process is killed
+            on_progress: Called with (config, ProgressEvent) while a backtest runs
+            result_cache: Return stored results for previously run identical backtests
+        """
+        self.project_dir = Path(project_dir).resolve()
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.jobs_dir = self.project_dir / jobs_dir
+        self.checkpoints_dir = self.project_dir / checkpoints_dir
+        self.config_path = self.project_dir / "config" / "config.json"
+        self.keep_job_dirs = keep_job_dirs
+        self.freqtrade_cmd = freqtrade_cmd
+        self.timeout = timeout
+        self.on_progress = on_progress
+        self.result_cache = result_cache
+        self.results_dir = Path("backtest_results")
+        self.results_dir.mkdir(exist_ok=True)
+    
+    def connect(self):
+        """No connection needed (interface parity with ColabBacktestExecutor)"""
+    
+    def disconnect(self):
+        """No connection needed (interface parity with ColabBacktestExecutor)"""
+    
+    def build_command(self, config: BacktestConfig, job_dir: Path) -> List[str]:
+        """Command line for one job"""
+        cmd = shlex.split(config.to_command())
+        if self.freqtrade_cmd:
+            cmd = list(self.freqtrade_cmd) + cmd[1:]
+        return cmd + ["--userdir", str(job_dir)]
+    
+    def _run_backtest(self, config: BacktestConfig) -> Dict:
+        """Execute single backtest"""
+        logger.info(f"Starting local backtest: {config.strategy} - {config.timerange}")
+        
+        start_time = time.time()
+        checkpoint_dir = self.checkpoints_dir / config_key(config)
+        checkpoints = self._find_checkpoints(config, checkpoint_dir)
+        job_dir = self._prepare_job_dir(config, checkpoint_dir)
+        succeeded = False
+        
+        try:
+            cmd = self.build_command(config, job_dir)
+            logger.info(f"Command: {' '.join(cmd)}")
+            
+            # stdout and stderr drained concurrently, progress reported as it arrives
+            on_event, durations = self._track_progress(config)
+            exit_code, output_lines = run_process(
+                cmd,
+                cwd=self.project_dir,
+                on_event=on_event,
+                timeout=self.timeout
+            )
+            
+            if exit_code != 0:
+                tail = "\n".join(output_lines[-20:])
+                raise RuntimeError(f"freqtrade exited with code {exit_code}:\n{tail}")
+            
+            elapsed = time.time() - start_time
+            
+            results = self._collect_results(config, job_dir)
+            succeeded = True
+            
+            logger.info(f"✅ Backtest completed in {elapsed/60:.1f} minutes")
+            
+            return {
+                "config": config,
+                "elapsed_seconds": elapsed,
+                "results": results,
+                "output": output_lines,
+                "resume": self._resume_summary(checkpoints, durations)
+            }
+        
+        except Exception as e:
+            logger.error(f"Backtest execution failed: {e}")
+            raise
+        
+        finally:
+            if not self.keep_job_dirs:
+                shutil.rmtree(job_dir, ignore_errors=True)
+                if succeeded:
+                    shutil.rmtree(checkpoint_dir, ignore_errors=True)
+    
+    def execute_batch(
+        self,
+        configs: List[BacktestConfig],
+        journal: Union[BatchJournal, str, Path, None] = None
+    ) -> List[Dict]:
+        """Execute multiple backtests, up to max_workers at a time
+        
+        Args:
+            configs: Backtest configs
+            journal: Batch journal (or its path) to resume; default starts a new one
+        """
+        journal, results, pending = self._start_batch(configs, journal)
+        logger.info(f"Starting batch execution: {len(pending)} backtests on {self.max_workers} processes")
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {pool.submit(self.execute_backtest, configs[i]): i for i in pending}
+            for done, future in enumerate(as_completed(futures), 1):
+                i = futures[future]
+                try:
+                    results[i] = future.result()
+                except Exception as e:
+                    logger.error(f"Backtest {i + 1} failed: {e}")
+                    results[i] = {
+                        "config": configs[i],
+                        "error": str(e)
+                    }
+                logger.info(f"Backtest {done}/{len(pending)} finished ({configs[i].timerange})")
+                journal.append(configs[i], results[i])
+        
+        journal.compact()
+        logger.info(f"\n✅ Batch execution completed: {len(results)} results")
+        return results
+    
+    def _prepare_job_dir(self, config: BacktestConfig, checkpoint_dir: Path) -> Path:
+        """Create a private user directory linked to the shared inputs"""
+        job_dir = self.jobs_dir / f"{config.strategy}_{config.timerange}_{uuid.uuid4().hex[:8]}"
+        (job_dir / "backtest_results").mkdir(parents=True)
+        
+        checkpoint_dir.mkdir(parents=True, exist_ok=True)
+        try:
+            os.symlink(checkpoint_dir, job_dir / "models", target_is_directory=True)
+        except OSError:
+            # No symlink privilege: private models, no resume
+            (job_dir / "models").mkdir()
+        
+        user_data = self.project_dir / "user_data"
+        for name in self.SHARED_USER_DIRS:
+            source = user_data / name
+            if not source.exists():
+                continue
+            try:
+                os.symlink(source, job_dir / name, target_is_directory=True)
+            except OSError:
+                # No symlink privilege (e.g. Windows without developer mode)
+                shutil.copytree(source, job_dir / name)
+        
+        return job_dir
+    
+    def _collect_results(self, config: BacktestConfig, job_dir: Path) -> Dict:
+        """Copy the job's result file to results_dir and parse it"""
+        result_file = self._find_result_file(job_dir / "backtest_results")
+        if result_file is None:
+            logger.error(f"No backtest result found in {job_dir}")
+            return {}
+        
+        local_path = self._local_result_path(config, result_file.suffix)
+        shutil.copy2(result_file, local_path)
+        logger.info(f"Results saved: {local_path}")
+        
+        results = self._parse_results(self._load_result_file(result_file), config)
+        results["result_file"] = str(local_path)
+        return results
+    
+    @staticmethod
+    def _find_result_file(results_dir: Path) -> Optional[Path]:
+        """Latest result file (via .last_result.json, else newest backtest-result-*)"""
+        last_result = results_dir / ".last_result.json"
+        if last_result.exists():
+            with open(last_result) as f:
+                latest = json.load(f).get("latest_backtest")
+            if latest and (results_dir / latest).exists():
+                return results_dir / latest
+        
+        candidates = [
+            p for p in results_dir.glob("backtest-result*")
+            if p.suffix in (".json", ".zip") and not p.name.endswith(".meta.json")
+        ]
+        return max(candidates, key=lambda p: p.stat().st_mtime) if candidates else None
+
+
 def main():
     """CLI interface"""
     import argparse
     
     parser = argparse.ArgumentParser(description="Automated Backtest Executor")
-    parser.add_argument("--tunnel-url", required=True, help="SSH tunnel URL")
+    parser.add_argument("--tunnel-url", nargs="+", help="SSH tunnel URL (several = one worker per host)")
+    parser.add_argument("--local", action="store_true", help="Run freqtrade locally instead of over SSH")
+    parser.add_argument("--workers", type=int, help="Concurrent local freqtrade processes (default: CPU count)")
     parser.add_argument("--strategy", default="FreqAIHybridStrategy", help="Strategy name")
-    parser.add_argument("--timerange", required=True, help="Backtest timerange")
+    parser.add_argument("--timerange", required=True, nargs="+", help="Backtest timerange (several = sweep)")
     parser.add_argument("--pairs", nargs="+", default=["BTC/USDT:USDT"], help="Trading pairs")
     parser.add_argument("--password", help="SSH password for authentication")
     parser.add_argument("--ssh-key", help="SSH private key path (alternative to password)")
+    parser.add_argument("--user", default="root", help="SSH user")
+    parser.add_argument("--remote-dir", default="/content/freqai-futures-strategy", help="Repository path on the remote host")
+    parser.add_argument("--no-compress", action="store_true", help="Transfer result files uncompressed")
+    parser.add_argument("--max-retries", type=int, default=2, help="Retries per failed backtest in a sweep")
+    parser.add_argument("--journal", help="Sweep journal (.jsonl) to resume; completed backtests are skipped")
+    parser.add_argument("--no-cache", action="store_true", help="Do not use the backtest result cache")
+    parser.add_argument("--force", action="store_true", help="Rerun backtests even if a cached result exists")
+    parser.add_argument("--shard-size", type=int, help="Split a single backtest into parallel shards of this many pairs")
     
     args = parser.parse_args()
+    if not args.local and not args.tunnel_url:
+        parser.error("--tunnel-url is required unless --local is given")
+    
+    # Create backtest configs
+    configs = [
+        BacktestConfig(
+            strategy=args.strategy,
+            timerange=timerange,
+            pairs=args.pairs
+        )
+        for timerange in args.timerange
+    ]
     
-    # Create backtest config
-    config = BacktestConfig(
-        strategy=args.strategy,
-        timerange=args.timerange,
-        pairs=args.pairs
-    )
+    # Identical inputs (strategy source, config, timerange, pairs, model) reuse stored results
+    result_cache = None if args.no_cache else ResultCache(refresh=args.force)
     
     # Execute
-    executor = ColabBacktestExecutor(
-        tunnel_url=args.tunnel_url,
-        password=args.password,
-        ssh_key_path=args.ssh_key
-    )
+    if args.local:
+        workers = {"local": LocalBacktestExecutor(max_workers=args.workers, result_cache=result_cache)}
+    else:
+        workers = {
+            url: ColabBacktestExecutor(
+                tunnel_url=url,
+                password=args.password,
+                ssh_key_path=args.ssh_key,
+                username=args.user,
+                remote_dir=args.remote_dir,
+                compress_results=not args.no_compress,
+                result_cache=result_cache
+            )
+            for url in args.tunnel_url
+        }
+    executors = list(workers.values())
     
     try:
-        executor.connect()
-        result = executor.execute_backtest(config)
+        for executor in executors:
+            executor.connect()
         
-        print("\n" + "="*70)
-        print("BACKTEST RESULTS")
-        print("="*70)
-        for key, value in result["results"].items():
-            print(f"{key}: {value}")
-        print("="*70)
+        try:
+            from tools.batch_scheduler import BatchScheduler
+        except ImportError:  # Run as a script from tools/
+            from batch_scheduler import BatchScheduler
         
+        scheduler = BatchScheduler(
+            workers,
+            max_concurrency={"local": executors[0].max_workers} if args.local else 1,
+            max_retries=args.max_retries
+        )
+        
+        if len(configs) == 1 and (len(executors) == 1 or args.shard_size):
+            if args.shard_size:
+                # Shards in parallel: local process pool, or one shard per remote host
+                runner = executors[0] if args.local else scheduler
+                result = execute_sharded(runner, configs[0], args.shard_size)
+            else:
+                result = executors[0].execute_backtest(configs[0])
+            
+            print("\n" + "="*70)
+            print("BACKTEST RESULTS")
+            print("="*70)
+            for key, value in result["results"].items():
+                print(f"{key}: {value}")
+            print("="*70)
+        else:
+            journal = BatchJournal(args.journal) if args.journal else BatchJournal.for_new_batch("backtest_results")
+            pending = [c for c, stored in zip(configs, journal.resume(configs)) if stored is None]
+            
+            print("\n" + "="*70)
+            print("SWEEP RESULTS")
+            print("="*70)
+            for job in scheduler.run(pending):
+                journal.append(job.config, job.to_dict())
+                if job.ok:
+                    results = job.result["results"]
+                    print(f"{job.config.timerange}: profit={results.get('total_profit_abs')} "
+                          f"sharpe={results.get('sharpe_ratio')} [{job.worker}]")
+                else:
+                    print(f"{job.config.timerange}: FAILED after {job.attempts} attempts: {job.error}")
+            print("="*70)
+            print(f"{len(configs) - len(pending)} already completed in {journal.path}")
+            print(f"Summary: {journal.compact()}")
+    
     finally:
-        executor.disconnect()
+        for executor in executors:
+            executor.disconnect()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Sharded Backtests
+Splits one multi-pair BacktestConfig into per-pair (or per-group) shards,
+runs them in parallel and merges the trade lists back into one result,
+re-applying max_open_trades across shards and recomputing the stats
+"""
+
+import json
+import math
+import heapq
+import logging
+import zipfile
+import dataclasses
+from pathlib import Path
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def shard_config(config: Any, shard_size: int = 1) -> List[Any]:
+    """
+    Split a config's pairs into groups of shard_size.
+    
+    Returns:
+        One copy of config per group (pairs replaced)
+    """
+    if shard_size < 1:
+        raise ValueError("shard_size must be positive")
+    pairs = list(config.pairs)
+    return [
+        dataclasses.replace(config, pairs=pairs[i:i + shard_size])
+        for i in range(0, len(pairs), shard_size)
+    ]
+
+
+def load_result_stats(path, strategy: str) -> Dict:
+    """Strategy section of a freqtrade result file (plain JSON or zip export)"""
+    path = Path(path)
+    if path.suffix == ".zip":
+        with zipfile.ZipFile(path) as zf:
+            data = json.loads(zf.read(f"{path.stem}.json"))
+    else:
+        with open(path) as f:
+            data = json.load(f)
+    return data["strategy"][strategy]
+
+
+def _timestamp_ms(trade: Dict, field: str) -> int:
+    """open/close time of a freqtrade trade in ms (timestamp field, else date string)"""
+    if trade.get(f"{field}_timestamp") is not None:
+        return int(trade[f"{field}_timestamp"])
+    date = datetime.fromisoformat(str(trade[f"{field}_date"]).replace("Z", "+00:00"))
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return int(date.timestamp() * 1000)
+
+
+def apply_max_open_trades(trades: List[Dict], max_open_trades: Optional[int]) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Replay trades in opening order and drop those that would exceed the
+    slot limit (a trade frees its slot at its close time).
+    
+    Each shard already respected max_open_trades on its own; together they
+    may not. Dropping the overflow approximates the combined run: a
+    dropped trade's later alternatives (that the strategy would have
+    entered instead) cannot be recovered from shard results.
+    
+    Returns:
+        (accepted trades, rejected trades)
+    """
+    ordered = sorted(trades, key=lambda t: (_timestamp_ms(t, "open"), t.get("pair", "")))
+    if max_open_trades is None or max_open_trades < 0:
+        return ordered, []
+    
+    accepted, rejected = [], []
+    open_closes: List[int] = []  # Heap of close times of open accepted trades
+    for trade in ordered:
+        opened = _timestamp_ms(trade, "open")
+        while open_closes and open_closes[0] <= opened:
+            heapq.heappop(open_closes)
+        if len(open_closes) < max_open_trades:
+            accepted.append(trade)
+            heapq.heappush(open_closes, _timestamp_ms(trade, "close"))
+        else:
+            rejected.append(trade)
+    return accepted, rejected
+
+
+def compute_stats(trades: List[Dict], starting_balance: float) -> Dict:
+    """
+    Aggregate stats of a trade list (keys as in _parse_results).
+    
+    Drawdown is the largest peak-to-trough fall of the balance relative to
+    the peak; Sharpe uses daily returns on the starting balance, annualised
+    with sqrt(365) (freqtrade's convention).
+    """
+    by_close = sorted(trades, key=lambda t: _timestamp_ms(t, "close"))
+    profit = sum(t.get("profit_abs", 0.0) for t in by_close)
+    wins = sum(1 for t in by_close if t.get("profit_abs", 0.0) > 0)
+    losses = sum(1 for t in by_close if t.get("profit_abs", 0.0) < 0)
+    
+    balance = peak = starting_balance
+    max_drawdown = 0.0
+    daily: Dict[str, float] = {}
+    for trade in by_close:
+        balance += trade.get("profit_abs", 0.0)
+        peak = max(peak, balance)
+        if peak > 0:
+            max_drawdown = max(max_drawdown, (peak - balance) / peak)
+        day = datetime.fromtimestamp(_timestamp_ms(trade, "close") / 1000, tz=timezone.utc).date().isoformat()
+        daily[day] = daily.get(day, 0.0) + trade.get("profit_abs", 0.0)
+    
+    sharpe = None
+    if len(daily) > 1 and starting_balance:
+        returns = [v / starting_balance for v in daily.values()]
+        mean = sum(returns) / len(returns)
+        std = math.sqrt(sum((r - mean) ** 2 for r in returns) / (len(returns) - 1))
+        sharpe = mean / std * math.sqrt(365) if std > 0 else None
+    
+    return {
+        "total_profit_abs": profit,
+        "total_profit_pct": profit / starting_balance if starting_balance else None,
+        "sharpe_ratio": sharpe,
+        "max_drawdown": max_drawdown,
+        "total_trades": len(by_close),
+        "wins": wins,
+        "losses": losses,
+        "win_rate": wins / len(by_close) if by_close else 0.0,
+    }
+
+
+def merge_shard_results(
+    config: Any,
+    shard_results: List[Dict],
+    max_open_trades: Optional[int] = None,
+    starting_balance: Optional[float] = None,
+) -> Dict:
+    """
+    Merge execute_backtest results of the shards of config.
+    
+    Args:
+        config: The unsharded config
+        shard_results: One execute_backtest result per shard (with results.result_file)
+        max_open_trades: Slot limit across all pairs (default: from the shards' stats)
+        starting_balance: Default: from the shards' stats
+    
+    Returns:
+        execute_backtest-shaped result for the whole config
+    """
+    failed = [r for r in shard_results if "error" in r or not r.get("results", {}).get("result_file")]
+    if failed:
+        errors = "; ".join(str(r.get("error") or r.get("results", {}).get("error", "no result file")) for r in failed)
+        raise RuntimeError(f"{len(failed)}/{len(shard_results)} shards failed: {errors}")
+    
+    trades: List[Dict] = []
+    for result in shard_results:
+        stats = load_result_stats(result["results"]["result_file"], config.strategy)
+        trades.extend(stats.get("trades", []))
+        if max_open_trades is None:
+            max_open_trades = stats.get("max_open_trades")
+        if starting_balance is None:
+            starting_balance = stats.get("starting_balance")
+    
+    accepted, rejected = apply_max_open_trades(trades, max_open_trades)
+    results = compute_stats(accepted, starting_balance or 0.0)
+    results["rejected_trades"] = len(rejected)
+    results["shards"] = len(shard_results)
+    if rejected:
+        logger.info(f"max_open_trades={max_open_trades}: dropped {len(rejected)} of {len(trades)} shard trades")
+    
+    return {
+        "config": config,
+        "elapsed_seconds": max(r.get("elapsed_seconds") or 0.0 for r in shard_results),
+        "results": results,
+        "output": [],
+        "shards": [r["results"]["result_file"] for r in shard_results],
+    }
+
+
+def execute_sharded(runner: Any, config: Any, shard_size: int = 1, max_open_trades: Optional[int] = None) -> Dict:
+    """
+    Run config as parallel pair shards and merge the results.
+    
+    Args:
+        runner: Anything with execute_batch(configs) -> List[Dict], e.g.
+            LocalBacktestExecutor (parallel processes) or BatchScheduler
+            (parallel hosts). A single ColabBacktestExecutor runs shards one
+            after another (concurrent runs would share its remote results
+            directory).
+        config: Backtest config with several pairs
+        shard_size: Pairs per shard
+        max_open_trades: Slot limit across shards (default: from the results)
+    
+    Returns:
+        Merged execute_backtest-shaped result
+    """
+    shards = shard_config(config, shard_size)
+    logger.info(f"Splitting {len(config.pairs)} pairs into {len(shards)} shards")
+    return merge_shard_results(config, runner.execute_batch(shards), max_open_trades)
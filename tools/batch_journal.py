@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Batch Journal for Backtest Sweeps
+Append-only JSONL record of finished backtests, keyed by a hash of the
+config, so interrupted sweeps resume where they stopped; compaction writes
+the final summary
+"""
+
+import os
+import json
+import hashlib
+import logging
+import threading
+import dataclasses
+from pathlib import Path
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Result fields not written to the journal (large, not needed to resume)
+SKIPPED_FIELDS = ("config", "output")
+
+
+def config_key(config: Any) -> str:
+    """Stable hash of a config's fields"""
+    data = dataclasses.asdict(config) if dataclasses.is_dataclass(config) else config
+    payload = json.dumps(data, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+class BatchJournal:
+    """
+    One JSON line per finished backtest.
+    
+    Lines are only ever appended (and flushed) so a worker dying mid-sweep
+    loses at most the line being written; a truncated last line is
+    ignored on read. A successful record for a key is final: later errors
+    for the same config do not mark it pending again.
+    
+    Usage:
+        journal = BatchJournal("backtest_results/batch_results_sweep.jsonl")
+        stored = journal.resume(configs)          # None = still to run
+        for config in [c for c, r in zip(configs, stored) if r is None]:
+            journal.append(config, executor.execute_backtest(config))
+        journal.compact()                        # -> batch_results_sweep.json
+    """
+    
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def for_new_batch(cls, results_dir) -> "BatchJournal":
+        """Journal with a timestamped name in results_dir"""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        return cls(Path(results_dir) / f"batch_results_{timestamp}.jsonl")
+    
+    @property
+    def summary_path(self) -> Path:
+        return self.path.with_suffix(".json")
+    
+    def append(self, config: Any, result: Dict) -> Dict:
+        """
+        Record a finished backtest.
+        
+        Args:
+            config: Backtest config (dataclass)
+            result: execute_backtest result, or {"error": ...}
+        
+        Returns:
+            The journal record
+        """
+        record = {
+            "key": config_key(config),
+            "status": "error" if "error" in result else "ok",
+            "timestamp": datetime.now().isoformat(),
+            "config": dataclasses.asdict(config) if dataclasses.is_dataclass(config) else config,
+            "result": {k: v for k, v in result.items() if k not in SKIPPED_FIELDS},
+        }
+        line = json.dumps(record, default=str) + "\n"
+        
+        with self._lock:
+            with open(self.path, "ab+") as f:
+                # Start on a fresh line after a truncated write
+                if f.tell() > 0:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        line = "\n" + line
+                f.write(line.encode())
+                f.flush()
+        return record
+    
+    def read(self) -> List[Dict]:
+        """All complete records in file order"""
+        if not self.path.exists():
+            return []
+        
+        records = []
+        with open(self.path) as f:
+            for line_no, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    logger.warning(f"Skipping unreadable journal line {line_no} in {self.path}")
+        return records
+    
+    def latest(self) -> Dict[str, Dict]:
+        """One record per key: the first success, else the latest error"""
+        latest: Dict[str, Dict] = {}
+        for record in self.read():
+            current = latest.get(record["key"])
+            if current is None or current["status"] != "ok":
+                latest[record["key"]] = record
+        return latest
+    
+    def resume(self, configs: List[Any]) -> List[Optional[Dict]]:
+        """
+        Stored results for configs that already completed.
+        
+        Returns:
+            Per config: the result dict (with "config" set to the given
+            object) if it completed successfully, else None
+        """
+        latest = self.latest()
+        stored = []
+        for config in configs:
+            record = latest.get(config_key(config))
+            if record is not None and record["status"] == "ok":
+                stored.append({"config": config, **record["result"]})
+            else:
+                stored.append(None)
+        
+        done = sum(r is not None for r in stored)
+        if done:
+            logger.info(f"Resuming from {self.path}: {done}/{len(configs)} backtests already completed")
+        return stored
+    
+    def compact(self) -> Path:
+        """
+        Rewrite the journal with one record per config and write the summary.
+        
+        Returns:
+            Path of the summary JSON (journal path with .json suffix)
+        """
+        with self._lock:
+            records = list(self.latest().values())
+            
+            tmp = self.path.with_suffix(".jsonl.tmp")
+            with open(tmp, "w") as f:
+                for record in records:
+                    f.write(json.dumps(record, default=str) + "\n")
+            os.replace(tmp, self.path)
+            
+            summary = [{"config": r["config"], **r["result"]} for r in records]
+            tmp = self.summary_path.with_suffix(".json.tmp")
+            with open(tmp, "w") as f:
+                json.dump(summary, f, indent=2, default=str)
+            os.replace(tmp, self.summary_path)
+        
+        logger.info(f"Batch results saved: {self.summary_path}")
+        return self.summary_path
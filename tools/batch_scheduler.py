@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Concurrent Batch Scheduler for Backtests
+Fans BacktestConfigs out over several executors (remote hosts or local
+process pools) through a shared job queue, streams results back as they
+finish, retries failed jobs with exponential backoff and takes workers
+that keep failing out of rotation
+"""
+
+import time
+import queue
+import logging
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Union
+from dataclasses import dataclass, field
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BatchJob:
+    """A config waiting to run"""
+    job_id: int
+    config: Any
+    attempts: int = 0
+    errors: List[str] = field(default_factory=list)
+
+
+@dataclass
+class JobResult:
+    """Outcome of one job (after all retries)"""
+    job_id: int
+    config: Any
+    worker: Optional[str]
+    attempts: int
+    result: Optional[Dict] = None
+    error: Optional[str] = None
+    elapsed_seconds: float = 0.0
+    
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+    
+    def to_dict(self) -> Dict:
+        """Same shape as ColabBacktestExecutor.execute_batch entries"""
+        if self.ok:
+            return self.result
+        return {"config": self.config, "error": self.error}
+
+
+class BatchScheduler:
+    """
+    Runs backtests concurrently across executors.
+    
+    Any object with execute_backtest(config) -> Dict is a worker, e.g. a
+    connected ColabBacktestExecutor per remote host. Each worker gets
+    max_concurrency slots (threads); all slots pull from one job queue, so
+    fast workers naturally take more jobs. A failed job is re-queued after
+    backoff_base * 2**(attempt - 1) seconds and may run on any worker.
+    
+    A worker whose jobs fail max_consecutive_failures times in a row (across
+    its slots) is taken out of rotation for the rest of the run. Once no
+    worker is left, the remaining jobs are reported as failed.
+    
+    Workers that declare a max_concurrency attribute are clamped to it.
+    ColabBacktestExecutor declares 1: concurrent runs on one host would
+    share its results directory (.last_result.json) and its SFTP session,
+    so use one executor per host to run remote jobs in parallel.
+    
+    Usage:
+        scheduler = BatchScheduler({"colab-a": exec_a, "colab-b": exec_b}, max_retries=2)
+        for job in scheduler.run(configs):   # In completion order
+            print(job.worker, job.ok, job.elapsed_seconds)
+    """
+    
+    def __init__(
+        self,
+        workers: Union[Dict[str, Any], List[Any]],
+        max_concurrency: Union[int, Dict[str, int]] = 1,
+        max_retries: int = 2,
+        backoff_base: float = 10.0,
+        backoff_max: float = 300.0,
+        max_consecutive_failures: Optional[int] = 3,
+    ):
+        """
+        Args:
+            workers: Executors by name (a list is named worker-0, worker-1, ...)
+            max_concurrency: Concurrent jobs per worker (int for all, or per name),
+                capped at the worker's own max_concurrency if it declares one
+            max_retries: Retries per job after the first failure
+            backoff_base: Delay before the first retry in seconds
+            backoff_max: Upper bound for the retry delay
+            max_consecutive_failures: Failures in a row that take a worker out
+                of rotation (None = never)
+        """
+        if not isinstance(workers, dict):
+            workers = {f"worker-{i}": w for i, w in enumerate(workers)}
+        if not workers:
+            raise ValueError("At least one worker is required")
+        
+        self.workers = workers
+        if isinstance(max_concurrency, dict):
+            self.max_concurrency = {name: int(max_concurrency.get(name, 1)) for name in workers}
+        else:
+            self.max_concurrency = {name: int(max_concurrency) for name in workers}
+        if any(n < 1 for n in self.max_concurrency.values()):
+            raise ValueError("max_concurrency must be positive")
+        for name, executor in workers.items():
+            limit = getattr(executor, "max_concurrency", None)
+            if limit is not None and self.max_concurrency[name] > limit:
+                logger.warning(
+                    f"{name} runs at most {limit} concurrent backtests "
+                    f"(requested {self.max_concurrency[name]})"
+                )
+                self.max_concurrency[name] = limit
+        
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_consecutive_failures = max_consecutive_failures
+        
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._failures: Dict[str, int] = {}
+        self._retired: set = set()
+    
+    @property
+    def total_slots(self) -> int:
+        return sum(self.max_concurrency.values())
+    
+    @property
+    def healthy_workers(self) -> List[str]:
+        """Workers still in rotation in the current (or last) run"""
+        return [name for name in self.workers if name not in self._retired]
+    
+    def retry_delay(self, attempt: int) -> float:
+        """Backoff before retrying after the given failed attempt (1-based)"""
+        return min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1))
+    
+    def run(self, configs: List[Any]) -> Iterator[JobResult]:
+        """
+        Execute configs and yield results as they complete.
+        
+        Closing the iterator early stops the workers after their current job.
+        
+        Args:
+            configs: Backtest configs
+        
+        Yields:
+            JobResult per config, in completion order
+        """
+        jobs: "queue.Queue" = queue.Queue()
+        results: "queue.Queue" = queue.Queue()
+        timers: List[threading.Timer] = []
+        self._stop.clear()
+        self._failures = {name: 0 for name in self.workers}
+        self._retired = set()
+        
+        for job_id, config in enumerate(configs):
+            jobs.put(BatchJob(job_id, config))
+        
+        logger.info(
+            f"Scheduling {len(configs)} backtests on {len(self.workers)} workers "
+            f"({self.total_slots} slots)"
+        )
+        
+        threads = []
+        for name, executor in self.workers.items():
+            for slot in range(self.max_concurrency[name]):
+                thread = threading.Thread(
+                    target=self._slot_loop,
+                    args=(name, executor, jobs, results, timers),
+                    name=f"batch-{name}-{slot}",
+                    daemon=True,
+                )
+                thread.start()
+                threads.append(thread)
+        
+        try:
+            for done in range(1, len(configs) + 1):
+                job_result = results.get()
+                status = "✅" if job_result.ok else "❌"
+                logger.info(
+                    f"{status} Job {job_result.job_id} on {job_result.worker} "
+                    f"({done}/{len(configs)}, {job_result.elapsed_seconds:.1f}s, "
+                    f"attempts={job_result.attempts})"
+                )
+                yield job_result
+        finally:
+            self._stop.set()
+            for timer in timers:
+                timer.cancel()
+            for _ in threads:
+                jobs.put(None)
+    
+    def execute_batch(self, configs: List[Any]) -> List[Dict]:
+        """
+        Execute configs concurrently; results in input order.
+        
+        Returns:
+            One dict per config, shaped like ColabBacktestExecutor.execute_batch
+        """
+        ordered: List[Optional[JobResult]] = [None] * len(configs)
+        for job_result in self.run(configs):
+            ordered[job_result.job_id] = job_result
+        return [job_result.to_dict() for job_result in ordered]
+    
+    def _slot_loop(self, name, executor, jobs, results, timers) -> None:
+        """One concurrency slot of a worker: take jobs until told to stop or retired"""
+        while not self._stop.is_set() and name not in self._retired:
+            job = jobs.get()
+            if job is None:
+                return
+            if name in self._retired:
+                self._requeue(job, jobs, results)
+                return
+            
+            job.attempts += 1
+            start = time.time()
+            try:
+                result = executor.execute_backtest(job.config)
+            except Exception as e:
+                job.errors.append(f"{name}: {e}")
+                self._record_failure(name, jobs, results)
+                if job.attempts <= self.max_retries and not self._stop.is_set() and self.healthy_workers:
+                    delay = self.retry_delay(job.attempts)
+                    logger.warning(
+                        f"Job {job.job_id} failed on {name} (attempt {job.attempts}): {e}; "
+                        f"retrying in {delay:.1f}s"
+                    )
+                    timer = threading.Timer(delay, self._requeue, args=(job, jobs, results))
+                    timer.daemon = True
+                    timers.append(timer)
+                    timer.start()
+                else:
+                    results.put(JobResult(
+                        job_id=job.job_id,
+                        config=job.config,
+                        worker=name,
+                        attempts=job.attempts,
+                        error="; ".join(job.errors),
+                        elapsed_seconds=time.time() - start,
+                    ))
+                continue
+            
+            with self._lock:
+                self._failures[name] = 0
+            results.put(JobResult(
+                job_id=job.job_id,
+                config=job.config,
+                worker=name,
+                attempts=job.attempts,
+                result=result,
+                elapsed_seconds=time.time() - start,
+            ))
+    
+    def _record_failure(self, name, jobs, results) -> None:
+        """Count a failure; retire the worker at the limit, abandon queued jobs once none is left"""
+        if self.max_consecutive_failures is None:
+            return
+        with self._lock:
+            self._failures[name] += 1
+            if self._failures[name] < self.max_consecutive_failures or name in self._retired:
+                return
+            self._retired.add(name)
+            logger.warning(f"Taking {name} out of rotation after {self._failures[name]} consecutive failures")
+            if self.healthy_workers:
+                return
+            logger.error("No healthy workers left; failing the remaining jobs")
+            while True:
+                try:
+                    job = jobs.get_nowait()
+                except queue.Empty:
+                    break
+                if job is not None:
+                    results.put(self._abandoned(job))
+    
+    def _requeue(self, job, jobs, results) -> None:
+        """Put a job back on the queue, or fail it if no worker is left to run it"""
+        with self._lock:
+            if self.healthy_workers:
+                jobs.put(job)
+                return
+        results.put(self._abandoned(job))
+    
+    @staticmethod
+    def _abandoned(job: BatchJob) -> JobResult:
+        return JobResult(
+            job_id=job.job_id,
+            config=job.config,
+            worker=None,
+            attempts=job.attempts,
+            error="; ".join(job.errors + ["no healthy workers left"]),
+        )
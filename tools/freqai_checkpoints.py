@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+FreqAI Backtest Checkpoints
+Finds the training windows an interrupted FreqAI backtest already completed
+under user_data/models/<identifier> (saved sub-train models and
+backtesting_predictions), which FreqAI reuses instead of retraining when the
+backtest is rerun with the same identifier, and estimates the training time
+that saves
+"""
+
+import os
+import re
+import json
+import logging
+import posixpath
+from pathlib import Path
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from dataclasses import dataclass, field
+
+logger = logging.getLogger(__name__)
+
+# <identifier>/sub-train-BTC_1735689600/cb_btc_1735689600_model.joblib
+SUB_TRAIN_RE = re.compile(r"^sub-train-(?P<coin>.+)_(?P<ts>\d+)$")
+# <identifier>/backtesting_predictions/cb_btc_1735689600_prediction.feather
+PREDICTION_RE = re.compile(r"^cb_(?P<coin>.+)_(?P<ts>\d+)_prediction\.feather$")
+PREDICTIONS_DIR = "backtesting_predictions"
+
+
+def timerange_bounds(timerange: Optional[str]) -> Tuple[Optional[int], Optional[int]]:
+    """Unix start and end of a freqtrade timerange (YYYYMMDD or unix seconds; None for an open side)"""
+    def stamp(value: str) -> Optional[int]:
+        if not value:
+            return None
+        if len(value) == 8:
+            return int(datetime.strptime(value, "%Y%m%d").replace(tzinfo=timezone.utc).timestamp())
+        return int(value)
+    
+    start, _, end = (timerange or "").partition("-")
+    return stamp(start), stamp(end)
+
+
+def freqai_identifier(config_file) -> Optional[str]:
+    """freqai.identifier from a freqtrade config (None if unreadable)"""
+    try:
+        with open(config_file) as f:
+            return json.load(f).get("freqai", {}).get("identifier")
+    except (OSError, ValueError):
+        return None
+
+
+@dataclass
+class TrainingWindow:
+    """One FreqAI sub-train window of one coin"""
+    coin: str
+    timestamp: int
+    has_model: bool = False
+    has_prediction: bool = False
+    
+    @property
+    def reusable(self) -> bool:
+        """FreqAI skips training when predictions or the model are saved"""
+        return self.has_model or self.has_prediction
+
+
+@dataclass
+class CheckpointReport:
+    """Saved training windows of one identifier"""
+    identifier: str
+    windows: List[TrainingWindow] = field(default_factory=list)
+    
+    @property
+    def reusable(self) -> int:
+        return sum(w.reusable for w in self.windows)
+    
+    def latest(self) -> Optional[datetime]:
+        """End of the most recent reusable window"""
+        stamps = [w.timestamp for w in self.windows if w.reusable]
+        return datetime.fromtimestamp(max(stamps), tz=timezone.utc) if stamps else None
+    
+    def summary(self, mean_train_seconds: Optional[float] = None) -> Dict:
+        """Reuse statistics (saved time estimated from the mean training time)"""
+        return {
+            "identifier": self.identifier,
+            "reused_windows": self.reusable,
+            "coins": sorted({w.coin for w in self.windows if w.reusable}),
+            "mean_train_seconds": mean_train_seconds,
+            "estimated_seconds_saved": (
+                round(self.reusable * mean_train_seconds, 1) if mean_train_seconds else None
+            ),
+        }
+
+
+def scan_checkpoints(
+    models_dir: str,
+    identifier: str,
+    listdir: Callable[[str], List[str]] = os.listdir,
+    timerange: Optional[str] = None,
+    pairs: Optional[Iterable[str]] = None,
+) -> CheckpointReport:
+    """
+    List the training windows saved for an identifier.
+    
+    Args:
+        models_dir: user_data/models directory (local, or remote with listdir)
+        identifier: freqai.identifier
+        listdir: Directory listing function (default os.listdir; pass
+            sftp.listdir to scan a remote host)
+        timerange: Only windows a backtest over this timerange reuses (a
+            window is stamped with the end of its training period, which
+            is where its backtest period starts)
+        pairs: Only windows of these pairs' coins
+    
+    Returns:
+        CheckpointReport (empty if nothing is saved)
+    """
+    root = posixpath.join(str(models_dir).replace("\\", "/"), identifier)
+    report = CheckpointReport(identifier=identifier)
+    windows: Dict[tuple, TrainingWindow] = {}
+    
+    def window(coin: str, ts: str) -> TrainingWindow:
+        key = (coin.upper(), int(ts))
+        if key not in windows:
+            windows[key] = TrainingWindow(coin=key[0], timestamp=key[1])
+        return windows[key]
+    
+    try:
+        entries = listdir(root)
+    except OSError:
+        return report
+    
+    for name in entries:
+        match = SUB_TRAIN_RE.match(name)
+        if match:
+            try:
+                files = listdir(posixpath.join(root, name))
+            except OSError:
+                continue
+            if any("_model" in f for f in files):
+                window(match["coin"], match["ts"]).has_model = True
+    
+    if PREDICTIONS_DIR in entries:
+        try:
+            predictions = listdir(posixpath.join(root, PREDICTIONS_DIR))
+        except OSError:
+            predictions = []
+        for name in predictions:
+            match = PREDICTION_RE.match(name)
+            if match:
+                window(match["coin"], match["ts"]).has_prediction = True
+    
+    start, end = timerange_bounds(timerange)
+    coins = {pair.split("/")[0].upper() for pair in pairs} if pairs else None
+    report.windows = sorted(
+        (
+            w for w in windows.values()
+            if (start is None or w.timestamp >= start)
+            and (end is None or w.timestamp < end)
+            and (coins is None or w.coin in coins)
+        ),
+        key=lambda w: (w.timestamp, w.coin)
+    )
+    return report
+
+
+class TrainTimeLog:
+    """Recent per-window training durations (seconds) of one identifier"""
+    
+    def __init__(self, path, max_samples: int = 500):
+        self.path = Path(path)
+        self.max_samples = max_samples
+    
+    def samples(self) -> List[float]:
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return []
+    
+    def record(self, durations: List[float]):
+        if not durations:
+            return
+        samples = (self.samples() + list(durations))[-self.max_samples:]
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "w") as f:
+            json.dump(samples, f)
+    
+    def mean(self) -> Optional[float]:
+        samples = self.samples()
+        return sum(samples) / len(samples) if samples else None
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Backtest Progress Streaming
+Drains stdout and stderr of a running backtest concurrently (asyncio pipes
+for local processes, channel polling for SSH) and turns FreqAI training and
+backtesting log lines into typed progress events
+"""
+
+import re
+import time
+import queue
+import codecs
+import asyncio
+import logging
+import threading
+import subprocess
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+# FreqAI: "Training BTC/USDT:USDT, 1/4 pairs from 2025-01-01 00:00:00 to 2025-02-01 00:00:00, 3/12 trains"
+TRAINING_RE = re.compile(
+    r"Training (?P<pair>\S+), (?P<pair_it>\d+)/(?P<pairs>\d+) pairs from (?P<start>.+?) "
+    r"to (?P<end>.+?), (?P<it>\d+)/(?P<total>\d+) trains"
+)
+TRAINED_RE = re.compile(r"Done training (?P<pair>\S+) \((?P<secs>[\d.]+) secs\)")
+BACKTEST_RE = re.compile(r"Backtesting with data from (?P<start>.+?) up to (?P<end>.+?) \(")
+RESULTS_RE = re.compile(r"[Dd]umping backtest results to (?P<path>\S+)")
+ERROR_RE = re.compile(r" - (ERROR|CRITICAL) - |^Traceback \(most recent call last\)")
+
+
+@dataclass
+class ProgressEvent:
+    """One parsed line of backtest output
+    
+    kind is one of: training, trained (duration = training seconds),
+    backtest, results, error, output (unrecognised line) and exit
+    (process finished, see exit_code).
+    """
+    kind: str
+    message: str
+    stream: str = "stdout"
+    elapsed: float = 0.0
+    pair: Optional[str] = None
+    window: Optional[str] = None
+    percentage: Optional[float] = None
+    exit_code: Optional[int] = None
+    duration: Optional[float] = None
+    
+    def describe(self) -> str:
+        """Short human-readable form for logs"""
+        parts = [self.kind]
+        if self.pair:
+            parts.append(self.pair)
+        if self.window:
+            parts.append(f"[{self.window}]")
+        if self.percentage is not None:
+            parts.append(f"{self.percentage:.0f}%")
+        parts.append(f"({self.elapsed:.0f}s)")
+        return " ".join(parts)
+
+
+class ProgressParser:
+    """Splits raw output into lines and lines into ProgressEvents
+    
+    The last known percentage is carried over to later events, so every
+    event reports how far the training windows have progressed.
+    """
+    
+    def __init__(self, on_event: Optional[Callable[[ProgressEvent], None]] = None):
+        self.on_event = on_event
+        self.start = time.time()
+        self.lines: List[str] = []
+        self.percentage: Optional[float] = None
+        self._decoders: Dict[str, codecs.IncrementalDecoder] = {}
+        self._partial: Dict[str, str] = {}
+    
+    def feed(self, data: bytes, stream: str = "stdout"):
+        """Raw bytes from a stream (may end mid-line or mid-character)"""
+        decoder = self._decoders.setdefault(stream, codecs.getincrementaldecoder("utf-8")("replace"))
+        text = self._partial.get(stream, "") + decoder.decode(data)
+        *lines, self._partial[stream] = re.split(r"\r?\n|\r", text)
+        for line in lines:
+            self.feed_line(line, stream)
+    
+    def close(self):
+        """Emit unterminated trailing lines"""
+        for stream, rest in self._partial.items():
+            if rest:
+                self.feed_line(rest, stream)
+        self._partial.clear()
+    
+    def feed_line(self, line: str, stream: str = "stdout") -> Optional[ProgressEvent]:
+        """Parse one complete line and dispatch the event"""
+        line = line.strip()
+        if not line:
+            return None
+        self.lines.append(line)
+        event = self.parse(line, stream)
+        if self.on_event is not None:
+            self.on_event(event)
+        return event
+    
+    def parse(self, line: str, stream: str = "stdout") -> ProgressEvent:
+        """Classify one line"""
+        event = ProgressEvent(kind="output", message=line, stream=stream, elapsed=time.time() - self.start)
+        
+        match = TRAINING_RE.search(line)
+        if match:
+            self.percentage = 100.0 * (int(match["it"]) - 1) / max(int(match["total"]), 1)
+            event.kind = "training"
+            event.pair = match["pair"]
+            event.window = f"{match['start']} - {match['end']}"
+        elif TRAINED_RE.search(line):
+            match = TRAINED_RE.search(line)
+            event.kind = "trained"
+            event.pair = match["pair"]
+            event.duration = float(match["secs"])
+        elif BACKTEST_RE.search(line):
+            match = BACKTEST_RE.search(line)
+            event.kind = "backtest"
+            event.window = f"{match['start']} - {match['end']}"
+        elif RESULTS_RE.search(line):
+            self.percentage = 100.0
+            event.kind = "results"
+        elif ERROR_RE.search(line):
+            event.kind = "error"
+        
+        event.percentage = self.percentage
+        return event
+    
+    def exit_event(self, exit_code: int) -> ProgressEvent:
+        """Dispatch the final event"""
+        event = ProgressEvent(
+            kind="exit",
+            message=f"exited with code {exit_code}",
+            elapsed=time.time() - self.start,
+            percentage=self.percentage,
+            exit_code=exit_code,
+        )
+        if self.on_event is not None:
+            self.on_event(event)
+        return event
+
+
+async def _drain_process(cmd: Sequence[str], cwd, parser: ProgressParser, timeout: Optional[float]) -> int:
+    proc = await asyncio.create_subprocess_exec(
+        *cmd,
+        cwd=cwd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    
+    async def pump(reader: asyncio.StreamReader, stream: str):
+        while True:
+            data = await reader.read(65536)
+            if not data:
+                break
+            parser.feed(data, stream)
+    
+    try:
+        await asyncio.wait_for(
+            asyncio.gather(pump(proc.stdout, "stdout"), pump(proc.stderr, "stderr"), proc.wait()),
+            timeout,
+        )
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        raise subprocess.TimeoutExpired(list(cmd), timeout)
+    finally:
+        parser.close()
+    return proc.returncode
+
+
+def run_process(
+    cmd: Sequence[str],
+    cwd=None,
+    on_event: Optional[Callable[[ProgressEvent], None]] = None,
+    timeout: Optional[float] = None,
+) -> Tuple[int, List[str]]:
+    """
+    Run a local command, draining stdout and stderr concurrently.
+    
+    Args:
+        cmd: Command line
+        cwd: Working directory
+        on_event: Called with every ProgressEvent as it is parsed
+        timeout: Seconds before the process is killed (raises subprocess.TimeoutExpired)
+    
+    Returns:
+        (exit code, output lines of both streams in arrival order)
+    """
+    parser = ProgressParser(on_event)
+    exit_code = asyncio.run(_drain_process(cmd, cwd, parser, timeout))
+    parser.exit_event(exit_code)
+    return exit_code, parser.lines
+
+
+def drain_channel(
+    channel,
+    on_event: Optional[Callable[[ProgressEvent], None]] = None,
+    poll_interval: float = 0.1,
+    timeout: Optional[float] = None,
+) -> Tuple[int, List[str]]:
+    """
+    Drain a paramiko channel's stdout and stderr until the command exits.
+    
+    Both streams are read as soon as data is available, so neither
+    window can fill up while the other is being waited on. The exit
+    status can arrive before the last output has been buffered, so
+    reading stops only once the channel is also at end of file.
+    
+    Args:
+        channel: paramiko.Channel of an exec_command
+        on_event: Called with every ProgressEvent as it is parsed
+        poll_interval: Sleep between polls when no data is pending
+        timeout: Seconds before the channel is closed (raises TimeoutError)
+    
+    Returns:
+        (exit code, output lines of both streams in arrival order)
+    """
+    parser = ProgressParser(on_event)
+    while True:
+        busy = False
+        if channel.recv_ready():
+            parser.feed(channel.recv(32768), "stdout")
+            busy = True
+        if channel.recv_stderr_ready():
+            parser.feed(channel.recv_stderr(32768), "stderr")
+            busy = True
+        if busy:
+            continue
+        if channel.exit_status_ready() and (channel.eof_received or channel.closed):
+            break
+        if timeout is not None and time.time() - parser.start > timeout:
+            channel.close()
+            raise TimeoutError(f"Remote command still running after {timeout}s")
+        time.sleep(poll_interval)
+    
+    parser.close()
+    exit_code = channel.recv_exit_status()
+    parser.exit_event(exit_code)
+    return exit_code, parser.lines
+
+
+def iter_process_events(cmd: Sequence[str], cwd=None, timeout: Optional[float] = None) -> Iterator[ProgressEvent]:
+    """
+    Run a local command and yield its ProgressEvents as they arrive.
+    
+    The last event has kind "exit". Errors raised while running the
+    process are re-raised from the iterator.
+    """
+    events: "queue.Queue" = queue.Queue()
+    done = object()
+    failure: List[BaseException] = []
+    
+    def target():
+        try:
+            run_process(cmd, cwd=cwd, on_event=events.put, timeout=timeout)
+        except BaseException as e:
+            failure.append(e)
+        finally:
+            events.put(done)
+    
+    threading.Thread(target=target, name="progress-stream", daemon=True).start()
+    while True:
+        event = events.get()
+        if event is done:
+            break
+        yield event
+    if failure:
+        raise failure[0]
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Backtest Result Cache
+Stores parsed backtest results under a fingerprint of everything that
+determines them (strategy source and parameter file, local packages the
+strategy imports, config JSON, timerange, pairs, FreqAI model), so
+identical reruns return immediately instead of retraining
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import dataclasses
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Repository packages the strategy imports; edits to them change results
+LOCAL_PACKAGES = ("diagnostics", "features", "monitoring")
+
+
+def _file_digest(path: Optional[Path]) -> Optional[str]:
+    if path is None or not path.is_file():
+        return None
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def _tree_digest(root: Path) -> Optional[str]:
+    """Hash of every .py file under root (paths and contents)"""
+    if not root.is_dir():
+        return None
+    digest = hashlib.sha256()
+    for path in sorted(root.rglob("*.py")):
+        digest.update(path.relative_to(root).as_posix().encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def input_digests(
+    project_dir: Path,
+    config_path: str,
+    strategy_file: Optional[Path],
+    freqai_model: Optional[str],
+    packages: Sequence[str] = LOCAL_PACKAGES,
+) -> Dict[str, Any]:
+    """
+    Digests of the checked-out files a FreqAI run depends on: strategy source
+    and parameter file, local packages, config JSON and custom model source.
+    
+    Args:
+        project_dir: Repository root
+        config_path: freqtrade config, relative to project_dir
+        strategy_file: Source file of the strategy class (None if not found)
+        freqai_model: freqaimodel class name
+        packages: Local packages hashed as a whole
+    """
+    project_dir = Path(project_dir)
+    try:
+        with open(project_dir / config_path) as f:
+            # Canonical form: formatting-only edits keep the digest
+            config_json = json.dumps(json.load(f), sort_keys=True)
+    except (OSError, ValueError):
+        config_json = None
+    
+    return {
+        "strategy_source": _file_digest(strategy_file),
+        # Hyperopt parameter file freqtrade loads next to the strategy
+        "strategy_params": _file_digest(strategy_file.with_suffix(".json") if strategy_file else None),
+        "packages": {name: _tree_digest(project_dir / name) for name in packages},
+        "config_json": hashlib.sha256(config_json.encode()).hexdigest() if config_json else None,
+        # Custom model classes: their source counts too
+        "model_source": _file_digest(project_dir / "user_data" / "freqaimodels" / f"{freqai_model}.py"),
+    }
+
+
+class ResultCache:
+    """
+    Fingerprinted cache of parsed backtest results (one JSON file per entry).
+    
+    The fingerprint is computed from the local checkout: keep the remote
+    host's copy in sync (tools/sync_manager.py) when caching remote runs.
+    
+    Usage:
+        cache = ResultCache("backtest_results/cache", max_age_days=30)
+        executor = ColabBacktestExecutor(tunnel_url=url, result_cache=cache)
+        executor.execute_backtest(config)              # Runs and stores
+        executor.execute_backtest(config)              # Returns stored result
+        executor.execute_backtest(config, force=True)  # Runs again
+    """
+    
+    LOCAL_PACKAGES = LOCAL_PACKAGES
+    
+    def __init__(
+        self,
+        cache_dir: str = "backtest_results/cache",
+        project_dir: str = ".",
+        config_path: str = "config/config.json",
+        max_entries: Optional[int] = 500,
+        max_age_days: Optional[float] = 30,
+        refresh: bool = False,
+    ):
+        """
+        Args:
+            cache_dir: Directory for cache entries
+            project_dir: Repository root the fingerprinted files are read from
+            config_path: freqtrade config, relative to project_dir
+            max_entries: Keep at most this many entries (least recently used dropped)
+            max_age_days: Drop entries not used for this many days
+            refresh: Ignore stored results (new results are still stored)
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.project_dir = Path(project_dir)
+        self.config_path = config_path
+        self.max_entries = max_entries
+        self.max_age_days = max_age_days
+        self.refresh = refresh
+        self.hits = 0
+        self.misses = 0
+    
+    def strategy_file(self, strategy: str) -> Optional[Path]:
+        """Source file defining the strategy class"""
+        strategies = self.project_dir / "user_data" / "strategies"
+        candidate = strategies / f"{strategy}.py"
+        if candidate.is_file():
+            return candidate
+        for path in sorted(strategies.glob("*.py")):
+            if f"class {strategy}(" in path.read_text(errors="ignore"):
+                return path
+        return None
+    
+    def fingerprint(self, config: Any) -> str:
+        """Hash of the inputs that determine a backtest's result"""
+        fields = dataclasses.asdict(config)
+        fields["pairs"] = sorted(fields.get("pairs") or [])
+        payload = {
+            "config": fields,
+            **input_digests(
+                self.project_dir,
+                self.config_path,
+                self.strategy_file(config.strategy),
+                config.freqai_model,
+                self.LOCAL_PACKAGES,
+            ),
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()[:24]
+    
+    def _entry_path(self, fingerprint: str) -> Path:
+        return self.cache_dir / f"{fingerprint}.json"
+    
+    def get(self, config: Any) -> Optional[Dict]:
+        """
+        Stored entry for the config's fingerprint.
+        
+        Returns:
+            {"fingerprint", "cached_at", "elapsed_seconds", "results"} or None
+        """
+        if self.refresh:
+            return None
+        
+        path = self._entry_path(self.fingerprint(config))
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        
+        self._touch(path)  # Last use drives retention
+        self.hits += 1
+        return entry
+    
+    def put(self, config: Any, result: Dict) -> Optional[Path]:
+        """
+        Store an execute_backtest result (skipped if it has no results).
+        
+        Returns:
+            Path of the entry, or None if not stored
+        """
+        if not result.get("results") or "error" in result["results"]:
+            return None
+        
+        fingerprint = self.fingerprint(config)
+        entry = {
+            "fingerprint": fingerprint,
+            "cached_at": time.time(),
+            "config": dataclasses.asdict(config),
+            "elapsed_seconds": result.get("elapsed_seconds"),
+            "results": result["results"],
+        }
+        path = self._entry_path(fingerprint)
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump(entry, f, indent=2, default=str)
+        os.replace(tmp, path)
+        self._touch(path)
+        
+        self.prune()
+        return path
+    
+    @staticmethod
+    def _touch(path: Path):
+        # Explicit time: file system timestamps can be too coarse to order entries
+        now = time.time()
+        os.utime(path, (now, now))
+    
+    def prune(self) -> int:
+        """
+        Apply retention (max_age_days, then max_entries by last use).
+        
+        Returns:
+            Number of entries removed
+        """
+        entries = sorted(self.cache_dir.glob("*.json"), key=lambda p: p.stat().st_mtime, reverse=True)
+        expired = []
+        if self.max_age_days is not None:
+            cutoff = time.time() - self.max_age_days * 86400
+            expired = [p for p in entries if p.stat().st_mtime < cutoff]
+            entries = [p for p in entries if p not in expired]
+        if self.max_entries is not None:
+            expired += entries[self.max_entries:]
+        
+        for path in expired:
+            path.unlink(missing_ok=True)
+        if expired:
+            logger.info(f"Pruned {len(expired)} cached backtest results")
+        return len(expired)
+    
+    def clear(self):
+        """Remove all entries"""
+        for path in self.cache_dir.glob("*.json"):
+            path.unlink(missing_ok=True)
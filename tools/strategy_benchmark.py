@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+"""
+Strategy Benchmarks
+Times FreqAIHybridStrategy's feature hooks, targets, entry/exit trend and
+trade callbacks on synthetic OHLCV (10k to 5M candles). The strategy runs
+against a fake DataProvider and a stub freqai object, so no exchange,
+downloaded data or trained model is needed (freqtrade and TA-Lib must be
+installed). Results are written as JSON and compared against a stored
+baseline; regressions beyond the tolerance fail the run
+"""
+
+import sys
+import json
+import time
+import platform
+import logging
+import statistics
+from pathlib import Path
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000, 5_000_000)
+
+# Benchmarks timed over a whole dataframe (reported per candle)
+FRAME_BENCHMARKS = (
+    'feature_engineering_expand_all',
+    'feature_engineering_expand_basic',
+    'feature_engineering_standard',
+    'set_freqai_targets',
+    'populate_indicators',
+    'populate_entry_trend',
+    'populate_exit_trend',
+)
+# Trade callbacks, timed per call against the analyzed dataframe
+CALLBACK_BENCHMARKS = ('custom_stoploss', 'custom_exit', 'leverage')
+
+BENCHMARK_PAIR = 'BTC/USDT:USDT'
+
+
+def synthetic_ohlcv(n: int, timeframe_minutes: int = 5, seed: int = 0, start: str = "2020-01-01") -> pd.DataFrame:
+    """
+    Random-walk OHLCV with switching volatility and drift regimes.
+    
+    Regimes change every 2000 candles so the regime, volatility and volume
+    features see trending, ranging and volatile stretches.
+    """
+    rng = np.random.default_rng(seed)
+    blocks = n // 2000 + 1
+    vol = np.repeat(rng.choice([0.001, 0.003, 0.008], size=blocks), 2000)[:n]
+    drift = np.repeat(rng.choice([-2e-4, 0.0, 2e-4], size=blocks), 2000)[:n]
+    returns = drift + vol * rng.standard_normal(n)
+    close = 30_000.0 * np.exp(np.cumsum(returns))
+    open_ = np.concatenate([[30_000.0], close[:-1]])
+    wick = np.abs(rng.standard_normal((2, n))) * vol * close
+    return pd.DataFrame({
+        'date': pd.date_range(start, periods=n, freq=f"{timeframe_minutes}min", tz="UTC"),
+        'open': open_,
+        'high': np.maximum(open_, close) + wick[0],
+        'low': np.minimum(open_, close) - wick[1],
+        'close': close,
+        'volume': rng.lognormal(mean=5.0, sigma=0.5, size=n) * (1 + 50 * vol),
+    })
+
+
+class _RunMode:
+    def __init__(self, value: str):
+        self.value = value
+
+
+class FakeDataProvider:
+    """
+    DataProvider stand-in serving in-memory frames.
+    
+    Args:
+        frames: {(pair, timeframe): candles}
+        whitelist: Pairs returned by current_whitelist()
+        runmode: Value of runmode.value ('backtest' keeps live-only features off)
+    """
+    
+    def __init__(self, frames: Dict[tuple, pd.DataFrame], whitelist: Sequence[str], runmode: str = 'backtest'):
+        self.frames = frames
+        self.whitelist = list(whitelist)
+        self.runmode = _RunMode(runmode)
+        self.analyzed: Dict[tuple, pd.DataFrame] = {}
+    
+    def current_whitelist(self) -> List[str]:
+        return list(self.whitelist)
+    
+    def get_pair_dataframe(self, pair: str, timeframe: Optional[str] = None, candle_type: str = '') -> pd.DataFrame:
+        return self.frames.get((pair, timeframe), pd.DataFrame())
+    
+    def get_analyzed_dataframe(self, pair: str, timeframe: str):
+        frame = self.analyzed.get((pair, timeframe), pd.DataFrame())
+        last = frame['date'].iloc[-1] if len(frame) else datetime.now(timezone.utc)
+        return frame, last
+
+
+class StubFreqAI:
+    """
+    freqai stand-in: runs the strategy's feature hooks and targets on the
+    base frame like FreqAI does, then adds deterministic prediction columns
+    (no model is trained or loaded).
+    """
+    
+    def __init__(self, config: Dict, seed: int = 0):
+        feature_parameters = config.get('freqai', {}).get('feature_parameters', {})
+        self.periods = feature_parameters.get('indicator_periods_candles', [10, 20, 50])
+        self.seed = seed
+    
+    def start(self, dataframe: pd.DataFrame, metadata: Dict, strategy: Any) -> pd.DataFrame:
+        hook_metadata = {'pair': metadata.get('pair'), 'tf': strategy.timeframe}
+        for period in self.periods:
+            dataframe = strategy.feature_engineering_expand_all(dataframe, period, metadata={**hook_metadata, 'period': period})
+        dataframe = strategy.feature_engineering_expand_basic(dataframe, metadata=hook_metadata)
+        dataframe = strategy.feature_engineering_standard(dataframe, metadata=hook_metadata)
+        dataframe = strategy.set_freqai_targets(dataframe, metadata=hook_metadata)
+        return add_predictions(dataframe, self.seed)
+
+
+def add_predictions(dataframe: pd.DataFrame, seed: int = 0) -> pd.DataFrame:
+    """Noisy copy of the &-s_close target plus the columns FreqAI returns"""
+    rng = np.random.default_rng(seed)
+    n = len(dataframe)
+    target = dataframe['&-s_close'].to_numpy() if '&-s_close' in dataframe.columns else np.zeros(n)
+    prediction = target + rng.normal(0, 0.002, n)
+    dataframe['&-s_close'] = prediction
+    rolling = pd.Series(prediction).rolling(288, min_periods=1)
+    dataframe['&-s_close_mean'] = rolling.mean().to_numpy()
+    dataframe['&-s_close_std'] = rolling.std().fillna(0).to_numpy()
+    dataframe['do_predict'] = 1
+    dataframe['DI_values'] = rng.uniform(0, 1.2, n)
+    return dataframe
+
+
+class FakeTrade:
+    """Minimal open trade for the callbacks"""
+    
+    def __init__(self, pair: str, open_rate: float, is_short: bool = False):
+        self.pair = pair
+        self.open_rate = open_rate
+        self.is_short = is_short
+        self.leverage = 3.0
+        self.open_date_utc = datetime.now(timezone.utc)
+
+
+def load_strategy(config: Dict) -> Any:
+    """Instantiate FreqAIHybridStrategy from user_data/strategies (needs freqtrade and TA-Lib)"""
+    strategy_dir = Path(__file__).resolve().parent.parent / 'user_data' / 'strategies'
+    if str(strategy_dir) not in sys.path:
+        sys.path.insert(0, str(strategy_dir))
+    from FreqAIHybridStrategy import FreqAIHybridStrategy
+    strategy = FreqAIHybridStrategy(config)
+    strategy.diagnostics_async = False
+    # Time feature engineering itself, not cache lookups
+    strategy.shared_corr_features = False
+    strategy.feature_store_dir = None
+    strategy.cross_pair_batching = False
+    return strategy
+
+
+def _reset_caches(strategy: Any) -> None:
+    """Start a new cycle in the strategy's per-cycle feature caches (untimed)"""
+    for attr in ('_shared_features', '_batch_engine'):
+        cache = getattr(strategy, attr, None)
+        if cache is not None:
+            cache.new_cycle()
+
+
+def _attach_harness(strategy: Any, config: Dict, candles: pd.DataFrame) -> FakeDataProvider:
+    dp = FakeDataProvider({(BENCHMARK_PAIR, strategy.timeframe): candles}, [BENCHMARK_PAIR])
+    strategy.dp = dp
+    strategy.freqai = StubFreqAI(config)
+    return dp
+
+
+def _time(fn: Callable[[], Any], repeat: int, setup: Optional[Callable[[], Any]] = None) -> List[float]:
+    """Wall times of repeat calls of fn(setup()); setup is not timed"""
+    times = []
+    for _ in range(repeat):
+        args = (setup(),) if setup is not None else ()
+        start = time.perf_counter()
+        fn(*args)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def _result(name: str, candles: int, times: List[float], calls: int = 1) -> Dict[str, Any]:
+    median = statistics.median(times)
+    unit = 'ns_per_call' if name in CALLBACK_BENCHMARKS else 'ns_per_candle'
+    return {
+        'benchmark': name,
+        'candles': candles,
+        'repeat': len(times),
+        'calls': calls,
+        'best_s': min(times),
+        'median_s': median,
+        unit: median / (calls if unit == 'ns_per_call' else max(candles, 1)) * 1e9,
+    }
+
+
+def run_benchmarks(
+    config: Dict,
+    sizes: Iterable[int] = DEFAULT_SIZES,
+    repeat: int = 3,
+    benchmarks: Optional[Sequence[str]] = None,
+    strategy_factory: Callable[[Dict], Any] = load_strategy,
+    callback_calls: int = 1000,
+    seed: int = 0,
+) -> List[Dict[str, Any]]:
+    """
+    Time the strategy's hot path for each candle count.
+    
+    Args:
+        config: freqtrade config (needs the freqai section)
+        sizes: Candle counts
+        repeat: Timed runs per benchmark (each on a fresh copy of the input,
+            with the per-cycle feature caches reset)
+        benchmarks: Subset of FRAME_BENCHMARKS + CALLBACK_BENCHMARKS (default: all)
+        strategy_factory: Builds the strategy from config
+        callback_calls: Calls per timed callback run
+        seed: Synthetic data seed
+    
+    Returns:
+        One result dict per (benchmark, size)
+    """
+    selected = list(benchmarks or FRAME_BENCHMARKS + CALLBACK_BENCHMARKS)
+    unknown = set(selected) - set(FRAME_BENCHMARKS + CALLBACK_BENCHMARKS)
+    if unknown:
+        raise ValueError(f"Unknown benchmarks: {sorted(unknown)}")
+    strategy = strategy_factory(config)
+    periods = config.get('freqai', {}).get('feature_parameters', {}).get('indicator_periods_candles', [10, 20, 50])
+    metadata = {'pair': BENCHMARK_PAIR, 'tf': strategy.timeframe}
+    results = []
+    
+    for size in sizes:
+        candles = synthetic_ohlcv(size, seed=seed)
+        dp = _attach_harness(strategy, config, candles)
+        logger.info(f"Benchmarking {size:,} candles")
+        
+        # Inputs for the later stages, built once per size
+        analyzed = strategy.populate_indicators(candles.copy(), {'pair': BENCHMARK_PAIR})
+        dp.analyzed[(BENCHMARK_PAIR, strategy.timeframe)] = analyzed
+        
+        stages = {
+            'feature_engineering_expand_all': (
+                lambda df: [strategy.feature_engineering_expand_all(df, p, metadata={**metadata, 'period': p}) for p in periods],
+                lambda: candles.copy()),
+            'feature_engineering_expand_basic': (
+                lambda df: strategy.feature_engineering_expand_basic(df, metadata=metadata), lambda: candles.copy()),
+            'feature_engineering_standard': (
+                lambda df: strategy.feature_engineering_standard(df, metadata=metadata), lambda: candles.copy()),
+            'set_freqai_targets': (
+                lambda df: strategy.set_freqai_targets(df, metadata=metadata), lambda: candles.copy()),
+            'populate_indicators': (
+                lambda df: strategy.populate_indicators(df, {'pair': BENCHMARK_PAIR}), lambda: candles.copy()),
+            'populate_entry_trend': (
+                lambda df: strategy.populate_entry_trend(df, {'pair': BENCHMARK_PAIR}), lambda: analyzed.copy()),
+            'populate_exit_trend': (
+                lambda df: strategy.populate_exit_trend(df, {'pair': BENCHMARK_PAIR}), lambda: analyzed.copy()),
+        }
+        now = analyzed['date'].iloc[-1].to_pydatetime()
+        rate = float(analyzed['close'].iloc[-1])
+        trade = FakeTrade(BENCHMARK_PAIR, rate * 0.99)
+        callbacks = {
+            'custom_stoploss': lambda: strategy.custom_stoploss(
+                pair=BENCHMARK_PAIR, trade=trade, current_time=now, current_rate=rate, current_profit=0.01),
+            'custom_exit': lambda: strategy.custom_exit(
+                pair=BENCHMARK_PAIR, trade=trade, current_time=now, current_rate=rate, current_profit=0.02),
+            'leverage': lambda: strategy.leverage(
+                pair=BENCHMARK_PAIR, current_time=now, current_rate=rate, proposed_leverage=3.0,
+                max_leverage=10.0, entry_tag=None, side='long'),
+        }
+        
+        for name in selected:
+            if name in stages:
+                fn, make_input = stages[name]
+                
+                def setup(make_input=make_input):
+                    _reset_caches(strategy)
+                    return make_input()
+                results.append(_result(name, size, _time(fn, repeat, setup)))
+            else:
+                call = callbacks[name]
+                times = _time(lambda: [call() for _ in range(callback_calls)], repeat)
+                results.append(_result(name, size, times, calls=callback_calls))
+    return results
+
+
+def environment() -> Dict[str, Any]:
+    """Interpreter and library versions recorded with the results"""
+    info = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+    }
+    for module in ('talib', 'freqtrade'):
+        try:
+            info[module] = __import__(module).__version__
+        except Exception:
+            info[module] = None
+    return info
+
+
+def write_results(path: Path, results: List[Dict[str, Any]], meta: Optional[Dict[str, Any]] = None) -> Path:
+    """Write results with environment metadata as JSON"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        'created': datetime.now(timezone.utc).isoformat(),
+        'environment': environment(),
+        'meta': meta or {},
+        'results': results,
+    }
+    path.write_text(json.dumps(payload, indent=2))
+    return path
+
+
+def load_results(path: Path) -> List[Dict[str, Any]]:
+    with open(path) as f:
+        return json.load(f)['results']
+
+
+def compare(
+    results: List[Dict[str, Any]],
+    baseline: List[Dict[str, Any]],
+    tolerance: float = 0.10,
+) -> List[Dict[str, Any]]:
+    """
+    Compare median times against a baseline.
+    
+    Returns:
+        One row per current result with the baseline median, the ratio and a
+        status: 'regression' (slower than baseline * (1 + tolerance)),
+        'improvement' (faster than baseline / (1 + tolerance)), 'ok' or 'new'
+    """
+    reference = {(r['benchmark'], r['candles']): r for r in baseline}
+    rows = []
+    for result in results:
+        base = reference.get((result['benchmark'], result['candles']))
+        row = {
+            'benchmark': result['benchmark'],
+            'candles': result['candles'],
+            'median_s': result['median_s'],
+            'baseline_s': base['median_s'] if base else None,
+            'ratio': None,
+            'status': 'new',
+        }
+        if base and base['median_s'] > 0:
+            ratio = result['median_s'] / base['median_s']
+            row['ratio'] = ratio
+            if ratio > 1 + tolerance:
+                row['status'] = 'regression'
+            elif ratio < 1 / (1 + tolerance):
+                row['status'] = 'improvement'
+            else:
+                row['status'] = 'ok'
+        rows.append(row)
+    return rows
+
+
+def main():
+    """CLI interface"""
+    import argparse
+    
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+    
+    parser = argparse.ArgumentParser(description="Benchmark FreqAIHybridStrategy on synthetic candles")
+    parser.add_argument("--config", default="config/config.json")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="Candle counts")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per benchmark")
+    parser.add_argument("--benchmarks", nargs="+", choices=FRAME_BENCHMARKS + CALLBACK_BENCHMARKS)
+    parser.add_argument("--output", default="user_data/benchmarks/latest.json")
+    parser.add_argument("--baseline", default="user_data/benchmarks/baseline.json")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed slowdown vs. the baseline median")
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the new baseline")
+    
+    args = parser.parse_args()
+    
+    with open(args.config) as f:
+        config = json.load(f)
+    results = run_benchmarks(config, args.sizes, args.repeat, args.benchmarks)
+    write_results(args.output, results, {'sizes': args.sizes, 'repeat': args.repeat})
+    
+    if args.save_baseline:
+        write_results(args.baseline, results, {'sizes': args.sizes, 'repeat': args.repeat})
+        logger.info(f"Baseline saved to {args.baseline}")
+        return
+    
+    if not Path(args.baseline).exists():
+        logger.info(f"No baseline at {args.baseline}; run with --save-baseline to create one")
+        return
+    rows = compare(results, load_results(args.baseline), args.tolerance)
+    for row in rows:
+        ratio = f"{row['ratio']:.2f}x" if row['ratio'] is not None else "-"
+        logger.info(f"{row['benchmark']:<34} {row['candles']:>9,} {row['median_s']:>9.4f}s {ratio:>7} {row['status']}")
+    regressions = [r for r in rows if r['status'] == 'regression']
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
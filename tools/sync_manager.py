@@ -0,0 +1,425 @@
+#!/usr/bin/env python3
+"""
+Incremental Sync Manager
+Keeps user_data/models, user_data/data and backtest results in sync between
+the local machine and the remote worker. Files are compared through
+content-hash manifests (SHA-256 per fixed-size chunk); only changed chunks
+are transferred, several files at a time, into a temporary copy that
+replaces the destination file only once it is complete
+"""
+
+import os
+import sys
+import json
+import time
+import shlex
+import shutil
+import inspect
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = ".sync_manifest.json"
+TMP_SUFFIX = ".synctmp"
+DEFAULT_CHUNK_SIZE = 4 * 1024 * 1024
+DEFAULT_SYNC_DIRS = ("user_data/models", "user_data/data", "user_data/backtest_results")
+
+
+def build_manifest(root, chunk_size, cache_name=".sync_manifest.json"):
+    """Hash every file under root in chunks (stdlib only: also runs remotely)
+    
+    Hashes are cached in root/cache_name and reused while a file's size and
+    mtime are unchanged, so repeated scans only read modified files.
+    
+    Returns:
+        {relative/path: {"size", "mtime_ns", "chunks": [sha256 hex, ...]}}
+    """
+    import hashlib
+    import json
+    import os
+    
+    if not os.path.isdir(root):
+        return {}
+    
+    cache_path = os.path.join(root, cache_name)
+    try:
+        with open(cache_path) as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        cache = {}
+    cached_files = cache.get("files", {}) if cache.get("chunk_size") == chunk_size else {}
+    
+    files = {}
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in sorted(filenames):
+            path = os.path.join(dirpath, name)
+            rel = os.path.relpath(path, root).replace(os.sep, "/")
+            if rel == cache_name or name.endswith(".synctmp"):
+                continue
+            st = os.stat(path)
+            entry = cached_files.get(rel)
+            if not entry or entry["size"] != st.st_size or entry["mtime_ns"] != st.st_mtime_ns:
+                chunks = []
+                with open(path, "rb") as f:
+                    block = f.read(chunk_size)
+                    while block:
+                        chunks.append(hashlib.sha256(block).hexdigest())
+                        block = f.read(chunk_size)
+                entry = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "chunks": chunks}
+            files[rel] = entry
+    
+    try:
+        with open(cache_path, "w") as f:
+            json.dump({"chunk_size": chunk_size, "files": files}, f)
+    except OSError:
+        pass
+    return files
+
+
+class LocalFS:
+    """Sync endpoint on the local filesystem"""
+    
+    def __init__(self, root: str = "."):
+        self.root = Path(root)
+    
+    def __str__(self):
+        return str(self.root)
+    
+    def manifest(self, rel_dir: str, chunk_size: int) -> Dict[str, Dict]:
+        return build_manifest(str(self.root / rel_dir), chunk_size, MANIFEST_NAME)
+    
+    def read_chunk(self, path: str, offset: int, size: int) -> bytes:
+        with open(self.root / path, "rb") as f:
+            f.seek(offset)
+            return f.read(size)
+    
+    def open_update(self, path: str):
+        """Open a temporary copy of path for chunk updates (empty if path is missing)"""
+        full = self.root / path
+        tmp = self.root / (path + TMP_SUFFIX)
+        full.parent.mkdir(parents=True, exist_ok=True)
+        if full.exists():
+            shutil.copyfile(full, tmp)
+            return open(tmp, "r+b")
+        return open(tmp, "w+b")
+    
+    def commit_update(self, path: str):
+        """Atomically replace path with its updated copy"""
+        os.replace(self.root / (path + TMP_SUFFIX), self.root / path)
+    
+    def remove(self, path: str):
+        (self.root / path).unlink(missing_ok=True)
+    
+    def close(self):
+        pass
+
+
+class SFTPFS:
+    """Sync endpoint on a remote host over an SSH connection
+    
+    Manifests are built by running build_manifest remotely (one python3
+    call), so hashing never pulls file contents over the network. Each
+    transfer thread gets its own SFTP session on the shared transport;
+    close() ends them once the transfer pool is done.
+    """
+    
+    def __init__(self, client, root: str, python: str = "python3"):
+        """
+        Args:
+            client: Connected paramiko.SSHClient
+            root: Remote base directory
+            python: Remote Python interpreter
+        """
+        self.client = client
+        self.root = root.rstrip("/")
+        self.python = python
+        self._local = threading.local()
+        self._sessions = []
+        self._lock = threading.Lock()
+    
+    def __str__(self):
+        return f"remote:{self.root}"
+    
+    def _sftp(self):
+        sftp = getattr(self._local, "sftp", None)
+        if sftp is None:
+            sftp = self._local.sftp = self.client.open_sftp()
+            with self._lock:
+                self._sessions.append(sftp)
+        return sftp
+    
+    def close(self):
+        """Close the SFTP sessions of all threads"""
+        with self._lock:
+            sessions, self._sessions = self._sessions, []
+            self._local = threading.local()
+        for sftp in sessions:
+            try:
+                sftp.close()
+            except Exception as e:
+                logger.debug(f"Closing SFTP session failed: {e}")
+    
+    def _path(self, path: str) -> str:
+        return f"{self.root}/{path}"
+    
+    def manifest(self, rel_dir: str, chunk_size: int) -> Dict[str, Dict]:
+        script = (
+            inspect.getsource(build_manifest)
+            + "\nimport json, sys\n"
+            + "print(json.dumps(build_manifest(sys.argv[1], int(sys.argv[2]), sys.argv[3])))\n"
+        )
+        command = " ".join(shlex.quote(arg) for arg in (
+            self.python, "-c", script, self._path(rel_dir), str(chunk_size), MANIFEST_NAME
+        ))
+        _, stdout, stderr = self.client.exec_command(command)
+        output = stdout.read()
+        if stdout.channel.recv_exit_status() != 0:
+            raise RuntimeError(f"Remote manifest failed: {stderr.read().decode().strip()}")
+        return json.loads(output)
+    
+    def read_chunk(self, path: str, offset: int, size: int) -> bytes:
+        with self._sftp().open(self._path(path), "rb") as f:
+            f.seek(offset)
+            return f.read(size)
+    
+    def open_update(self, path: str):
+        """Open a temporary copy of path for chunk updates (empty if path is missing)"""
+        sftp = self._sftp()
+        full = self._path(path)
+        tmp = full + TMP_SUFFIX
+        self._makedirs(sftp, full.rsplit("/", 1)[0])
+        try:
+            sftp.stat(full)
+        except IOError:
+            return sftp.open(tmp, "w+b")
+        
+        # Unchanged chunks are copied on the remote host, not over the network
+        _, stdout, stderr = self.client.exec_command(f"cp {shlex.quote(full)} {shlex.quote(tmp)}")
+        if stdout.channel.recv_exit_status() != 0:
+            raise RuntimeError(f"Remote copy failed: {stderr.read().decode().strip()}")
+        return sftp.open(tmp, "r+b")
+    
+    def commit_update(self, path: str):
+        """Atomically replace path with its updated copy"""
+        full = self._path(path)
+        self._sftp().posix_rename(full + TMP_SUFFIX, full)
+    
+    def remove(self, path: str):
+        try:
+            self._sftp().remove(self._path(path))
+        except IOError:
+            pass
+    
+    @staticmethod
+    def _makedirs(sftp, path: str):
+        parts = path.split("/")
+        for i in range(2, len(parts) + 1):
+            current = "/".join(parts[:i])
+            try:
+                sftp.stat(current)
+            except IOError:
+                try:
+                    sftp.mkdir(current)
+                except IOError:
+                    sftp.stat(current)  # Created by another transfer thread
+
+
+@dataclass
+class SyncReport:
+    """Outcome of syncing one directory"""
+    directory: str
+    files_checked: int = 0
+    files_transferred: int = 0
+    files_deleted: int = 0
+    chunks_transferred: int = 0
+    bytes_transferred: int = 0
+    bytes_skipped: int = 0
+    elapsed_seconds: float = 0.0
+    errors: List[str] = field(default_factory=list)
+
+
+class SyncManager:
+    """
+    One-way incremental sync from a source to a destination endpoint.
+    
+    Usage:
+        remote = SFTPFS(executor.client, executor.remote_dir)
+        SyncManager(LocalFS("."), remote).sync_all()       # push
+        SyncManager(remote, LocalFS(".")).sync("user_data/models")  # pull
+    """
+    
+    def __init__(
+        self,
+        source,
+        dest,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        max_workers: int = 4,
+        delete: bool = False,
+    ):
+        """
+        Args:
+            source: Endpoint to copy from (LocalFS or SFTPFS)
+            dest: Endpoint to copy to
+            chunk_size: Bytes per hashed chunk
+            max_workers: Files transferred in parallel
+            delete: Remove destination files that no longer exist at the source
+        """
+        self.source = source
+        self.dest = dest
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers
+        self.delete = delete
+    
+    def plan(self, rel_dir: str) -> Tuple[Dict[str, List[int]], List[str], Dict[str, Dict], int]:
+        """
+        Compare manifests.
+        
+        Returns:
+            (chunk indexes to transfer per file, files to delete, source manifest, bytes unchanged)
+        """
+        src = self.source.manifest(rel_dir, self.chunk_size)
+        dst = self.dest.manifest(rel_dir, self.chunk_size)
+        
+        transfers: Dict[str, List[int]] = {}
+        unchanged = 0
+        for path, entry in src.items():
+            old = dst.get(path)
+            old_chunks = old["chunks"] if old else []
+            changed = [
+                i for i, digest in enumerate(entry["chunks"])
+                if i >= len(old_chunks) or old_chunks[i] != digest
+            ]
+            unchanged += entry["size"] - self._bytes_in(entry, changed)
+            if changed or old is None or old["size"] != entry["size"]:
+                transfers[path] = changed
+        
+        deletes = [path for path in dst if path not in src] if self.delete else []
+        return transfers, deletes, src, unchanged
+    
+    def sync(self, rel_dir: str) -> SyncReport:
+        """Sync one directory (relative to both endpoint roots)"""
+        start = time.time()
+        report = SyncReport(directory=rel_dir)
+        
+        transfers, deletes, src, report.bytes_skipped = self.plan(rel_dir)
+        report.files_checked = len(src)
+        
+        def transfer(path: str) -> Tuple[str, int, int, Optional[str]]:
+            try:
+                n_bytes = self._transfer_file(f"{rel_dir}/{path}", src[path], transfers[path])
+                return path, len(transfers[path]), n_bytes, None
+            except Exception as e:
+                return path, 0, 0, str(e)
+        
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                for path, n_chunks, n_bytes, error in pool.map(transfer, sorted(transfers)):
+                    if error:
+                        report.errors.append(f"{path}: {error}")
+                        logger.error(f"Sync failed for {path}: {error}")
+                        continue
+                    report.files_transferred += 1
+                    report.chunks_transferred += n_chunks
+                    report.bytes_transferred += n_bytes
+            
+            for path in deletes:
+                self.dest.remove(f"{rel_dir}/{path}")
+                report.files_deleted += 1
+        finally:
+            # The transfer threads are gone; so is any use for their sessions
+            self.source.close()
+            self.dest.close()
+        
+        report.elapsed_seconds = time.time() - start
+        logger.info(
+            f"Synced {rel_dir} ({self.source} -> {self.dest}): "
+            f"{report.files_transferred}/{report.files_checked} files, "
+            f"{report.bytes_transferred / 1e6:.1f} MB sent, "
+            f"{report.bytes_skipped / 1e6:.1f} MB unchanged"
+        )
+        return report
+    
+    def sync_all(self, rel_dirs=DEFAULT_SYNC_DIRS) -> Dict[str, SyncReport]:
+        """Sync several directories"""
+        return {rel_dir: self.sync(rel_dir) for rel_dir in rel_dirs}
+    
+    def _bytes_in(self, entry: Dict, chunk_indexes: List[int]) -> int:
+        return sum(min(self.chunk_size, entry["size"] - i * self.chunk_size) for i in chunk_indexes)
+    
+    def _transfer_file(self, path: str, entry: Dict, chunk_indexes: List[int]) -> int:
+        """Write the changed chunks into a copy of the destination file, then swap it in"""
+        sent = 0
+        try:
+            with self.dest.open_update(path) as f:
+                for i in chunk_indexes:
+                    offset = i * self.chunk_size
+                    data = self.source.read_chunk(path, offset, self.chunk_size)
+                    f.seek(offset)
+                    f.write(data)
+                    sent += len(data)
+                f.truncate(entry["size"])
+            self.dest.commit_update(path)
+        except Exception:
+            self.dest.remove(path + TMP_SUFFIX)
+            raise
+        return sent
+
+
+def main():
+    """CLI interface"""
+    import argparse
+    
+    try:
+        from tools.backtest_executor import ColabBacktestExecutor
+    except ImportError:  # Run as a script from tools/
+        from backtest_executor import ColabBacktestExecutor
+    
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+    
+    parser = argparse.ArgumentParser(description="Incremental sync with the remote worker")
+    parser.add_argument("direction", choices=["push", "pull"], help="push = local -> remote, pull = remote -> local")
+    parser.add_argument("--tunnel-url", required=True, help="SSH tunnel URL")
+    parser.add_argument("--password", help="SSH password for authentication")
+    parser.add_argument("--ssh-key", help="SSH private key path (alternative to password)")
+    parser.add_argument("--user", default="root", help="SSH user")
+    parser.add_argument("--remote-dir", default="/content/freqai-futures-strategy", help="Repository path on the remote host")
+    parser.add_argument("--dirs", nargs="+", default=list(DEFAULT_SYNC_DIRS), help="Directories to sync")
+    parser.add_argument("--workers", type=int, default=4, help="Files transferred in parallel")
+    parser.add_argument("--delete", action="store_true", help="Delete files missing at the source")
+    
+    args = parser.parse_args()
+    
+    executor = ColabBacktestExecutor(
+        tunnel_url=args.tunnel_url,
+        password=args.password,
+        ssh_key_path=args.ssh_key,
+        username=args.user,
+        remote_dir=args.remote_dir
+    )
+    
+    try:
+        executor.connect()
+        local, remote = LocalFS("."), SFTPFS(executor.client, args.remote_dir)
+        source, dest = (local, remote) if args.direction == "push" else (remote, local)
+        
+        manager = SyncManager(source, dest, max_workers=args.workers, delete=args.delete)
+        reports = manager.sync_all(args.dirs)
+        
+        failed = sum(len(r.errors) for r in reports.values())
+        sys.exit(1 if failed else 0)
+    
+    finally:
+        executor.disconnect()
+
+
+if __name__ == "__main__":
+    main()
@@ -41,6 +41,55 @@ except Exception:  # pragma: no cover - strategy must not break if optional modu
             min_stop_pct = None
             max_stop_pct = None
         return _S()
+try:
+    # Columnar signal audit (gating funnel diagnostics)
+    from diagnostics.signal_audit import SignalAuditLogger, SignalAuditConfig
+except Exception:  # pragma: no cover - audit is optional
+    SignalAuditLogger = None
+    SignalAuditConfig = None
+try:
+    # Off-thread diagnostics (audit logging, debug summaries)
+    from diagnostics.background_writer import BackgroundDiagnosticsWriter
+except Exception:  # pragma: no cover - runs diagnostics inline
+    BackgroundDiagnosticsWriter = None
+try:
+    # Memory-mapped store of FreqAI prediction columns
+    from diagnostics.prediction_store import PredictionStore, PREDICTION_COLUMNS
+except Exception:  # pragma: no cover - prediction store is optional
+    PredictionStore = None
+    PREDICTION_COLUMNS = ()
+try:
+    # Persistent Parquet cache of feature hook outputs
+    from features.feature_store import FeatureStore, cached_features
+except Exception:  # pragma: no cover - hooks always compute from scratch
+    FeatureStore = None
+    def cached_features(hook, **kwargs):
+        return lambda fn: fn
+try:
+    # Corr-pair feature blocks shared across whitelist pipelines within a cycle
+    from features.shared_features import SharedFeatureBlocks
+except Exception:  # pragma: no cover - every pipeline computes its corr pairs
+    SharedFeatureBlocks = None
+try:
+    # Higher timeframes derived incrementally from the base candles
+    from features.resampler import MultiTimeframeResampler, ResampledDataProvider, timeframe_to_minutes
+except Exception:  # pragma: no cover - all timeframes are fetched
+    MultiTimeframeResampler = None
+    ResampledDataProvider = None
+try:
+    # Per-stage, per-pair latency histograms of the hot path
+    from diagnostics.stage_timer import StageTimer, timed_stage
+except Exception:  # pragma: no cover - stages are not timed
+    StageTimer = None
+    def timed_stage(stage):
+        return lambda fn: fn
+try:
+    # Regime and rolling volume/volatility features for all pairs at once over a pairs x time tensor
+    from features.batched_features import BatchedFeatureEngine, batched_features
+except Exception:  # pragma: no cover - every pipeline computes its own features
+    BatchedFeatureEngine = None
+    def batched_features(hook, **kwargs):
+        return lambda fn: fn
 
 
 class FreqAIHybridStrategy(IStrategy):
@@ -94,8 +143,35 @@ class FreqAIHybridStrategy(IStrategy):
     z_hv_thr = DecimalParameter(0.5, 2.0, default=0.8, space='buy', optimize=True)
     vol_min = DecimalParameter(0.5, 1.5, default=0.7, space='buy', optimize=True)
     vol_max = DecimalParameter(1.5, 5.0, default=4.0, space='buy', optimize=True)
-    # Toggle for entry audit logs
+    # Toggle for entry audit (gating funnel via diagnostics.SignalAuditLogger)
     entry_audit_logs: bool = False
+    entry_audit_parquet: bool = False  # Stream audit rows to a partitioned Parquet dataset (needs pyarrow)
+    _signal_audit = None
+    # Run diagnostics on a background writer thread (drop jobs when its queue is full); off = inline
+    diagnostics_async: bool = False
+    _diagnostics_writer = None
+    # Persist FreqAI predictions per training window (backtest/hyperopt) for zero-copy reuse; None = off
+    prediction_store_dir: Optional[str] = None
+    _prediction_store = None
+    # Cache feature hook outputs per pair/timeframe/month (computes only new candles); None = off
+    feature_store_dir: Optional[str] = None
+    _feature_store = None
+    # Compute each corr pair's expand_all/expand_basic features once per cycle, not once per whitelist pair
+    shared_corr_features: bool = True
+    _shared_features = None
+    # Derive higher include_timeframes from base candles instead of fetching them (live/dry-run)
+    resample_informative: bool = False
+    resample_verify: bool = False  # Keep derived timeframes subscribed and report parity with exchange bars
+    _resampler = None
+    # Per-stage latency histograms (freqai.start, hooks, trends, callbacks), dumped to JSON every interval
+    stage_timing: bool = False
+    stage_timing_file: Optional[str] = 'user_data/stage_timing.json'
+    stage_timing_interval_seconds: int = 300
+    stage_timing_toggle_file: Optional[str] = None  # If set, timing is on while this file exists
+    _stage_timer = None
+    # Compute standard/expand_basic features for all whitelist and corr pairs in one batch per cycle (live/dry-run)
+    cross_pair_batching: bool = False
+    _batch_engine = None
     
     # Market regime thresholds
     trend_threshold = DecimalParameter(0.001, 0.01, default=0.005, space='buy', optimize=True)
@@ -127,8 +203,16 @@ class FreqAIHybridStrategy(IStrategy):
         whitelist_pairs = self.dp.current_whitelist()
         corr_pairs = self.config["freqai"]["feature_parameters"]["include_corr_pairlist"]
         informative_pairs = []
-        
-        for tf in self.config["freqai"]["feature_parameters"]["include_timeframes"]:
+        timeframes = self.config["freqai"]["feature_parameters"]["include_timeframes"]
+        resampler = self._get_resampler()
+        if resampler is not None and not self.resample_verify:
+            # Derived timeframes are served from base candles, so only request those
+            # (while verifying they stay subscribed as the exchange reference for parity)
+            timeframes = [tf for tf in timeframes if tf not in resampler.timeframes]
+            if self.timeframe not in timeframes:
+                timeframes.append(self.timeframe)
+        
+        for tf in timeframes:
             for pair in whitelist_pairs:
                 informative_pairs.append((pair, tf))
             for pair in corr_pairs:
@@ -138,12 +222,35 @@ class FreqAIHybridStrategy(IStrategy):
         
         return informative_pairs
     
+    def bot_loop_start(self, current_time: datetime, **kwargs) -> None:
+        """
+        Start of a bot iteration: drop last cycle's shared corr-pair feature blocks
+        and batched features, and route derived timeframes through the resampler
+        """
+        if self._shared_features is not None:
+            self._shared_features.new_cycle()
+        if self._batch_engine is not None:
+            self._batch_engine.new_cycle()
+        resampler = self._get_resampler()
+        if resampler is not None and not isinstance(self.dp, ResampledDataProvider):
+            self.dp = ResampledDataProvider(self.dp, resampler, verify=self.resample_verify)
+        timer = self._get_stage_timer()
+        if timer is not None:
+            timer.maybe_dump(self._submit_diagnostics)
+    
+    @timed_stage('populate_indicators')
     def populate_indicators(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
         """
         Main indicator population - FreqAI will be called here
         """
         # Call FreqAI
-        dataframe = self.freqai.start(dataframe, metadata, self)
+        timer = self._get_stage_timer()
+        if timer is not None and timer.enabled:
+            with timer.stage('freqai.start', metadata.get('pair')):
+                dataframe = self.freqai.start(dataframe, metadata, self)
+        else:
+            dataframe = self.freqai.start(dataframe, metadata, self)
+        self._store_predictions(dataframe, metadata)
         
         # Add some basic indicators for strategy logic (not for FreqAI)
         dataframe['ema_50'] = ta.EMA(dataframe, timeperiod=50)
@@ -154,22 +261,13 @@ class FreqAIHybridStrategy(IStrategy):
         dataframe = dataframe.replace([np.inf, -np.inf], np.nan)
         dataframe = dataframe.fillna(0)
 
-        # Lightweight debug to understand why no trades are produced
+        # Lightweight debug to understand why no trades are produced (logged off-thread)
         try:
             if metadata.get('pair') and metadata.get('timeframe') == self.timeframe:
                 # Only log for the first pair to avoid excessive logs
                 if metadata['pair'] == self.dp.current_whitelist()[0]:
                     cols = [c for c in dataframe.columns if c.startswith('&-') or c in ['do_predict', 'DI_values', 'enter_long', 'enter_short']]
-                    do_pred_count = int((dataframe.get('do_predict', 0) == 1).sum()) if 'do_predict' in dataframe else 0
-                    enter_l = int(dataframe.get('enter_long', 0).sum()) if 'enter_long' in dataframe else 0
-                    enter_s = int(dataframe.get('enter_short', 0).sum()) if 'enter_short' in dataframe else 0
-                    # Basic stats for targets if present
-                    s_close_stats = None
-                    if '&-s_close' in dataframe:
-                        s_close_stats = (float(dataframe['&-s_close'].min()), float(dataframe['&-s_close'].max()))
-                    s_close_mean_std_present = ('&-s_close_mean' in dataframe.columns, '&-s_close_std' in dataframe.columns)
-                    logger.info("[FreqAIHybridStrategy DEBUG] pair=%s do_predict_count=%s enter_long_sum=%s enter_short_sum=%s cols_sample=%s", metadata['pair'], do_pred_count, enter_l, enter_s, cols[:6])
-                    logger.info("[FreqAIHybridStrategy DEBUG] s_close_present=%s s_close_min_max=%s s_close_mean_std_present=%s", ('&-s_close' in dataframe), s_close_stats, s_close_mean_std_present)
+                    self._submit_diagnostics(self._log_debug_summary, metadata['pair'], dataframe[cols].copy())
         except Exception:
             # Never fail because of debug
             pass
@@ -178,6 +276,8 @@ class FreqAIHybridStrategy(IStrategy):
     
     # ============ FreqAI Feature Engineering ============
     
+    @timed_stage('feature_engineering_expand_all')
+    @cached_features('feature_engineering_expand_all', shared=True)
     def feature_engineering_expand_all(self, dataframe: DataFrame, period, **kwargs) -> DataFrame:
         """
         Features that will be auto-expanded based on:
@@ -222,6 +322,9 @@ class FreqAIHybridStrategy(IStrategy):
         
         return dataframe
     
+    @timed_stage('feature_engineering_expand_basic')
+    @cached_features('feature_engineering_expand_basic', shared=True)
+    @batched_features('feature_engineering_expand_basic')
     def feature_engineering_expand_basic(self, dataframe: DataFrame, metadata, **kwargs) -> DataFrame:
         """
         Features that will be expanded based on:
@@ -245,6 +348,10 @@ class FreqAIHybridStrategy(IStrategy):
         
         return dataframe
     
+    @timed_stage('feature_engineering_standard')
+    @cached_features('feature_engineering_standard')
+    @batched_features('feature_engineering_standard', trend_threshold='trend_threshold',
+                      volatility_threshold='volatility_threshold')
     def feature_engineering_standard(self, dataframe: DataFrame, metadata, **kwargs) -> DataFrame:
         """
         Features that are NOT auto-expanded
@@ -305,6 +412,7 @@ class FreqAIHybridStrategy(IStrategy):
         
         return dataframe
     
+    @timed_stage('set_freqai_targets')
     def set_freqai_targets(self, dataframe: DataFrame, metadata, **kwargs) -> DataFrame:
         """
         Define prediction targets for the model
@@ -363,6 +471,7 @@ class FreqAIHybridStrategy(IStrategy):
     
     # ============ Entry/Exit Logic ============
     
+    @timed_stage('populate_entry_trend')
     def populate_entry_trend(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
         """
         Balanced entry signals using z-score of target vs rolling mean/std,
@@ -410,30 +519,44 @@ class FreqAIHybridStrategy(IStrategy):
         dataframe.loc[long_cond, 'enter_long'] = 1
         dataframe.loc[short_cond, 'enter_short'] = 1
         
-        # Optional entry audit logs (first whitelist pair only)
+        # Optional gating funnel audit (one vectorized call per pair per candle batch)
         try:
-            if getattr(self, 'entry_audit_logs', False) and metadata.get('pair') and metadata.get('timeframe') == self.timeframe:
-                if metadata['pair'] == self.dp.current_whitelist()[0]:
-                    do_pred_count = int(do_pred.sum()) if hasattr(do_pred, 'sum') else int(do_pred)
-                    di_ok_count = int((do_pred & di_ok).sum()) if hasattr(di_ok, 'sum') else 0
-                    vol_ok_count = int((do_pred & vol_ok).sum()) if hasattr(vol_ok, 'sum') else 0
-                    ts_long_count = int((do_pred & ts_ok_long).sum()) if hasattr(ts_ok_long, 'sum') else 0
-                    ts_short_count = int((do_pred & ts_ok_short).sum()) if hasattr(ts_ok_short, 'sum') else 0
-                    long_sig_count = int(long_sig.sum()) if hasattr(long_sig, 'sum') else 0
-                    short_sig_count = int(short_sig.sum()) if hasattr(short_sig, 'sum') else 0
-                    enter_l = int(dataframe.get('enter_long', 0).sum()) if 'enter_long' in dataframe else 0
-                    enter_s = int(dataframe.get('enter_short', 0).sum()) if 'enter_short' in dataframe else 0
-                    logger.info(
-                        "[EntryAudit] pair=%s do_pred=%s di_ok=%s vol_ok=%s ts_long=%s ts_short=%s long_sig=%s short_sig=%s enter_long=%s enter_short=%s base_thr=%.3f hv_thr=%.3f vol_bounds=(%.2f,%.2f) di_thr=%.3f",
-                        metadata['pair'], do_pred_count, di_ok_count, vol_ok_count, ts_long_count, ts_short_count,
-                        long_sig_count, short_sig_count, enter_l, enter_s,
-                        float(self.z_base_thr.value), float(self.z_hv_thr.value), float(self.vol_min.value), float(self.vol_max.value), float(self.buy_di_threshold.value)
+            if getattr(self, 'entry_audit_logs', False) and metadata.get('pair'):
+                audit = self._get_signal_audit()
+                if audit is not None:
+                    # Snapshot series so the writer thread never sees later dataframe edits
+                    snap = lambda x: x.copy() if isinstance(x, pd.Series) else x
+                    self._submit_diagnostics(
+                        audit.log_gate_arrays,
+                        pair=metadata['pair'],
+                        timestamps=snap(dataframe['date']) if 'date' in dataframe else None,
+                        do_predict=snap(do_pred),
+                        di_ok=snap(di_ok),
+                        vol_ok=snap(vol_ok),
+                        ts_ok_long=snap(ts_ok_long),
+                        ts_ok_short=snap(ts_ok_short),
+                        long_sig=snap(long_sig),
+                        short_sig=snap(short_sig),
+                        governance_ok=allow_entries,
+                        allow_shorts=allow_shorts,
+                        enter_long=snap(long_cond),
+                        enter_short=snap(short_cond),
+                        values={
+                            'di_value': snap(dataframe.get('DI_values', 0.0)),
+                            'volume_regime': snap(vol_regime),
+                            'market_regime': snap(regime),
+                            'trend_strength': snap(ts),
+                            'z_score': snap(z),
+                            'governance_status': gov.status,
+                            'governance_risk_multiplier': float(getattr(gov, 'risk_multiplier', 1.0) or 1.0),
+                        },
                     )
         except Exception:
             pass
 
         return dataframe
     
+    @timed_stage('populate_exit_trend')
     def populate_exit_trend(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
         """
         Exit on z-score flips and high-volatility regime deterioration.
@@ -455,8 +578,143 @@ class FreqAIHybridStrategy(IStrategy):
         
         return dataframe
     
+    def _get_signal_audit(self):
+        """Lazily create the signal audit logger (None if diagnostics unavailable)"""
+        if self._signal_audit is None and SignalAuditLogger is not None:
+            self._signal_audit = SignalAuditLogger(
+                SignalAuditConfig(parquet_export=getattr(self, 'entry_audit_parquet', False))
+            )
+            writer = self._get_diagnostics_writer()
+            if writer is not None and self._signal_audit.exporter is not None:
+                # Write buffered audit rows when the process exits
+                writer.close_callbacks.append(self._signal_audit.export_to_parquet)
+        return self._signal_audit
+    
+    def _get_prediction_store(self):
+        """Lazily create the prediction store (None if disabled or unavailable)"""
+        if self._prediction_store is None and PredictionStore is not None and self.prediction_store_dir:
+            self._prediction_store = PredictionStore.for_strategy(
+                self.prediction_store_dir, self, self.config
+            )
+        return self._prediction_store
+    
+    def _get_feature_store(self):
+        """Lazily create the feature store (None if disabled or unavailable)"""
+        if self._feature_store is None and FeatureStore is not None and self.feature_store_dir:
+            try:
+                self._feature_store = FeatureStore.for_strategy(
+                    self.feature_store_dir, self, self.config.get('freqai', {})
+                )
+            except ImportError as e:
+                logger.warning("Feature store disabled: %s", e)
+                self.feature_store_dir = None
+        return self._feature_store
+    
+    def _get_shared_features(self):
+        """Lazily create the per-cycle shared feature blocks (None if disabled or unavailable)"""
+        if (self._shared_features is None and SharedFeatureBlocks is not None
+                and getattr(self, 'shared_corr_features', True)):
+            self._shared_features = SharedFeatureBlocks()
+        return self._shared_features
+    
+    def _get_resampler(self):
+        """Lazily create the timeframe resampler (None if disabled, unavailable or not live/dry-run)"""
+        if (self._resampler is None and MultiTimeframeResampler is not None and self.resample_informative
+                and self.dp is not None and self.dp.runmode.value in ('live', 'dry_run')):
+            base = timeframe_to_minutes(self.timeframe)
+            derived = [
+                tf for tf in self.config['freqai']['feature_parameters']['include_timeframes']
+                if timeframe_to_minutes(tf) > base and timeframe_to_minutes(tf) % base == 0
+            ]
+            self._resampler = MultiTimeframeResampler(self.timeframe, derived)
+        return self._resampler
+    
+    def _get_batch_engine(self):
+        """Lazily create the cross-pair batched feature engine (None if disabled, unavailable or not live/dry-run)"""
+        if (self._batch_engine is None and BatchedFeatureEngine is not None and self.cross_pair_batching
+                and self.dp is not None and self.dp.runmode.value in ('live', 'dry_run')):
+            self._batch_engine = BatchedFeatureEngine(self._batch_frames)
+        return self._batch_engine
+    
+    def _batch_frames(self, timeframe: str) -> dict:
+        """Candles of every whitelist and corr pair for one timeframe (stacked by the batch engine)"""
+        corr_pairs = self.config['freqai']['feature_parameters'].get('include_corr_pairlist', [])
+        pairs = dict.fromkeys(list(self.dp.current_whitelist()) + list(corr_pairs))
+        return {pair: self.dp.get_pair_dataframe(pair, timeframe) for pair in pairs}
+    
+    def _get_stage_timer(self):
+        """Lazily create the stage timer (None if never enabled or unavailable)"""
+        if (self._stage_timer is None and StageTimer is not None
+                and (self.stage_timing or self.stage_timing_toggle_file)):
+            self._stage_timer = StageTimer(
+                enabled=self.stage_timing,
+                dump_path=self.stage_timing_file,
+                dump_interval=self.stage_timing_interval_seconds,
+                toggle_file=self.stage_timing_toggle_file,
+            )
+            writer = self._get_diagnostics_writer()
+            if writer is not None and self.stage_timing_file:
+                # Final dump when the process exits
+                writer.close_callbacks.append(self._stage_timer.dump)
+        return self._stage_timer
+    
+    def _store_predictions(self, dataframe: DataFrame, metadata: dict) -> None:
+        """Write this pair's raw prediction columns to the store (off-thread, backtest/hyperopt only)"""
+        try:
+            if not metadata.get('pair') or self.dp.runmode.value not in ('backtest', 'hyperopt'):
+                return
+            store = self._get_prediction_store()
+            if store is None:
+                return
+            freqai_cfg = self.config.get('freqai', {})
+            timerange = str(self.config.get('timerange') or '')
+            anchor = pd.Timestamp(timerange.split('-')[0], tz='UTC') if timerange[:8].isdigit() else None
+            cols = ['date'] + [c for c in PREDICTION_COLUMNS if c in dataframe.columns]
+            self._submit_diagnostics(
+                store.write,
+                freqai_cfg.get('identifier', 'default'),
+                metadata['pair'],
+                dataframe[cols].copy(),
+                window_days=freqai_cfg.get('backtest_period_days'),
+                anchor=anchor,
+            )
+        except Exception as e:
+            # Never fail the strategy because of the store
+            logger.warning("Prediction store write failed for %s: %s", metadata.get('pair'), e)
+    
+    def _get_diagnostics_writer(self):
+        """Lazily start the background diagnostics writer (None = run inline)"""
+        if (self._diagnostics_writer is None and BackgroundDiagnosticsWriter is not None
+                and getattr(self, 'diagnostics_async', False)):
+            self._diagnostics_writer = BackgroundDiagnosticsWriter(name="strategy-diagnostics")
+        return self._diagnostics_writer
+    
+    def _submit_diagnostics(self, fn, *args, **kwargs) -> None:
+        """Run a diagnostics job on the writer thread, or inline if unavailable"""
+        writer = self._get_diagnostics_writer()
+        if writer is not None:
+            writer.submit(fn, *args, **kwargs)
+        else:
+            fn(*args, **kwargs)
+    
+    @staticmethod
+    def _log_debug_summary(pair: str, dataframe: DataFrame) -> None:
+        """Log prediction/entry counts and target stats for one pair"""
+        cols = list(dataframe.columns)
+        do_pred_count = int((dataframe['do_predict'] == 1).sum()) if 'do_predict' in dataframe else 0
+        enter_l = int(dataframe['enter_long'].sum()) if 'enter_long' in dataframe else 0
+        enter_s = int(dataframe['enter_short'].sum()) if 'enter_short' in dataframe else 0
+        # Basic stats for targets if present
+        s_close_stats = None
+        if '&-s_close' in dataframe:
+            s_close_stats = (float(dataframe['&-s_close'].min()), float(dataframe['&-s_close'].max()))
+        s_close_mean_std_present = ('&-s_close_mean' in dataframe.columns, '&-s_close_std' in dataframe.columns)
+        logger.info("[FreqAIHybridStrategy DEBUG] pair=%s do_predict_count=%s enter_long_sum=%s enter_short_sum=%s cols_sample=%s", pair, do_pred_count, enter_l, enter_s, cols[:6])
+        logger.info("[FreqAIHybridStrategy DEBUG] s_close_present=%s s_close_min_max=%s s_close_mean_std_present=%s", ('&-s_close' in dataframe), s_close_stats, s_close_mean_std_present)
+    
     # ============ Custom Methods ============
     
+    @timed_stage('leverage')
     def leverage(self, pair: str, current_time: datetime, current_rate: float,
                  proposed_leverage: float, max_leverage: float, entry_tag: Optional[str], 
                  side: str, **kwargs) -> float:
@@ -494,6 +752,7 @@ class FreqAIHybridStrategy(IStrategy):
         # Never below 1.0 for futures leverage
         return max(1.0, float(lev))
     
+    @timed_stage('custom_exit')
     def custom_exit(self, pair: str, trade: Trade, current_time: datetime, 
                    current_rate: float, current_profit: float, **kwargs):
         """
@@ -512,6 +771,7 @@ class FreqAIHybridStrategy(IStrategy):
         
         return None
 
+    @timed_stage('custom_stoploss')
     def custom_stoploss(self, pair: str, trade: Trade, current_time: datetime,
                         current_rate: float, current_profit: float, **kwargs) -> float:
         """